@@ -0,0 +1,234 @@
+/*
+  This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+  and design optimization.
+
+  Copyright (C) 2015 Georgia Tech Research Corporation.
+  Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+  All rights reserved.
+
+  FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this software except in compliance with the License.
+  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+*/
+
+/*
+  Benchmark the projection of the aerodynamic points onto the beam elements
+  used by BeamTransfer. The previous approach, which locates the closest
+  structural node and only checks the elements attached to it, is compared
+  against the bounding volume hierarchy over the elements. A sample of the
+  points is checked against an exhaustive search over all the elements. The
+  beam is curved and swept, and the aerodynamic points are spread over a
+  wing-like surface about the beam.
+
+  Usage: ./beam_projection [num_aero_points] [num_elems] [num_threads]
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+
+#include "LocatePoint.h"
+#include "LocateSegment.h"
+
+// Generate the nodes of a swept and curved beam with nelems linear elements.
+// The nodes are either evenly spaced or randomly spaced along the beam.
+void generateBeam(int nelems, int uniform, F2FScalar *Xs, int *conn) {
+  for (int i = 0; i <= nelems; i++) {
+    double s = 1.0 * i / nelems;
+    if (!uniform && i > 0 && i < nelems) {
+      s = 1.0 * rand() / RAND_MAX;
+    }
+    Xs[3 * i] = 8.0 * s * s;
+    Xs[3 * i + 1] = 10.0 * s;
+    Xs[3 * i + 2] = 0.5 * s * s * s;
+  }
+  // Sort the nodes along the beam
+  for (int i = 1; i < nelems; i++) {
+    for (int j = i;
+         j > 0 && F2FRealPart(Xs[3 * j + 1]) < F2FRealPart(Xs[3 * (j - 1) + 1]);
+         j--) {
+      for (int k = 0; k < 3; k++) {
+        F2FScalar tmp = Xs[3 * j + k];
+        Xs[3 * j + k] = Xs[3 * (j - 1) + k];
+        Xs[3 * (j - 1) + k] = tmp;
+      }
+    }
+  }
+  for (int i = 0; i < nelems; i++) {
+    conn[2 * i] = i;
+    conn[2 * i + 1] = i + 1;
+  }
+}
+
+// Generate points scattered about the wing surface around the beam
+void generatePoints(int npts, F2FScalar *X) {
+  for (int i = 0; i < npts; i++) {
+    double s = 1.0 * rand() / RAND_MAX;
+    double t = 1.0 * rand() / RAND_MAX;
+    double h = 0.2 * rand() / RAND_MAX - 0.1;
+    X[3 * i] = 8.0 * s * s + 2.0 * t - 0.8;
+    X[3 * i + 1] = 10.0 * s;
+    X[3 * i + 2] = 0.5 * s * s * s + h;
+  }
+}
+
+// Squared distance between a point and a segment
+double segmentDistance(const F2FScalar *X1, const F2FScalar *X2,
+                       const F2FScalar *x) {
+  double d[3], v[3];
+  for (int k = 0; k < 3; k++) {
+    d[k] = F2FRealPart(X2[k] - X1[k]);
+    v[k] = F2FRealPart(x[k] - X1[k]);
+  }
+  double t = (d[0] * v[0] + d[1] * v[1] + d[2] * v[2]) /
+             (d[0] * d[0] + d[1] * d[1] + d[2] * d[2]);
+  t = (t < 0.0 ? 0.0 : (t > 1.0 ? 1.0 : t));
+  double dist = 0.0;
+  for (int k = 0; k < 3; k++) {
+    dist += (v[k] - t * d[k]) * (v[k] - t * d[k]);
+  }
+  return dist;
+}
+
+// Find the element with the previous approach: locate the closest node and
+// check the elements attached to it
+void locateNodeAdjacent(int ns, const F2FScalar *Xs, int nelems,
+                        const int *conn, int npts, const F2FScalar *Xa,
+                        int *elems) {
+  int *ptr = new int[ns + 1];
+  int *node_to_elem = new int[2 * nelems];
+  for (int i = 0; i <= ns; i++) {
+    ptr[i] = 0;
+  }
+  for (int i = 0; i < 2 * nelems; i++) {
+    ptr[conn[i] + 1]++;
+  }
+  for (int i = 0; i < ns; i++) {
+    ptr[i + 1] += ptr[i];
+  }
+  for (int i = 0; i < 2 * nelems; i++) {
+    node_to_elem[ptr[conn[i]]] = i / 2;
+    ptr[conn[i]]++;
+  }
+  for (int i = ns; i > 0; i--) {
+    ptr[i] = ptr[i - 1];
+  }
+  ptr[0] = 0;
+
+  LocatePoint *locator = new LocatePoint(Xs, ns, 10);
+  for (int i = 0; i < npts; i++) {
+    int node = locator->locateClosest(&Xa[3 * i]);
+    double min_dist = 1e20;
+    for (int j = ptr[node]; j < ptr[node + 1]; j++) {
+      int e = node_to_elem[j];
+      double d = segmentDistance(&Xs[3 * conn[2 * e]], &Xs[3 * conn[2 * e + 1]],
+                                 &Xa[3 * i]);
+      if (d < min_dist) {
+        min_dist = d;
+        elems[i] = e;
+      }
+    }
+  }
+
+  delete locator;
+  delete[] ptr;
+  delete[] node_to_elem;
+}
+
+void runCase(int na, int nelems, int uniform, int num_threads) {
+  int ns = nelems + 1;
+  F2FScalar *Xs = new F2FScalar[3 * ns];
+  int *conn = new int[2 * nelems];
+  generateBeam(nelems, uniform, Xs, conn);
+
+  F2FScalar *Xa = new F2FScalar[3 * na];
+  generatePoints(na, Xa);
+
+  // Time the previous approach
+  int *elems_node = new int[na];
+  double t0 = MPI_Wtime();
+  locateNodeAdjacent(ns, Xs, nelems, conn, na, Xa, elems_node);
+  double t_node = MPI_Wtime() - t0;
+
+  // Time the bounding volume hierarchy, including its construction
+  int *elems_bvh = new int[na];
+  t0 = MPI_Wtime();
+  LocateSegment *locator = new LocateSegment(Xs, nelems, conn);
+  locator->locateClosestBatch(na, Xa, elems_bvh, num_threads);
+  double t_bvh = MPI_Wtime() - t0;
+
+  // Compare both with an exhaustive search on a sample of the points
+  int nsample = (na < 2000 ? na : 2000);
+  int nwrong_node = 0, nwrong_bvh = 0;
+  double max_err_node = 0.0;
+  for (int k = 0; k < nsample; k++) {
+    int i = (int)((1.0 * k * na) / nsample);
+    int e = locator->locateExhaustive(&Xa[3 * i]);
+    double d = segmentDistance(&Xs[3 * conn[2 * e]], &Xs[3 * conn[2 * e + 1]],
+                               &Xa[3 * i]);
+
+    int en = elems_node[i];
+    double dn = segmentDistance(&Xs[3 * conn[2 * en]],
+                                &Xs[3 * conn[2 * en + 1]], &Xa[3 * i]);
+    if (dn > d) {
+      nwrong_node++;
+      if (dn - d > max_err_node) {
+        max_err_node = dn - d;
+      }
+    }
+    if (elems_bvh[i] != e) {
+      nwrong_bvh++;
+    }
+  }
+
+  printf("Beam elements: %d (%s spacing)  aerodynamic points: %d\n", nelems,
+         (uniform ? "uniform" : "random"), na);
+  printf("  Closest node:     %8.3f s  %5d/%d sampled points not closest",
+         t_node, nwrong_node, nsample);
+  printf(" (max squared distance error %9.3e)\n", max_err_node);
+  printf("  Segment BVH:      %8.3f s  %5d/%d sampled points not closest",
+         t_bvh, nwrong_bvh, nsample);
+  printf("  speedup %6.2f\n", t_node / t_bvh);
+
+  delete locator;
+  delete[] Xs;
+  delete[] conn;
+  delete[] Xa;
+  delete[] elems_node;
+  delete[] elems_bvh;
+}
+
+int main(int argc, char *argv[]) {
+  MPI_Init(&argc, &argv);
+
+  int na = 1000000;
+  int nelems = 10000;
+  int num_threads = 1;
+  if (argc > 1) {
+    na = atoi(argv[1]);
+  }
+  if (argc > 2) {
+    nelems = atoi(argv[2]);
+  }
+  if (argc > 3) {
+    num_threads = atoi(argv[3]);
+  }
+
+  srand(1234);
+  runCase(na, nelems, 1, num_threads);
+  runCase(na, nelems, 0, num_threads);
+
+  // A long, coarsely discretized beam
+  runCase(na, 20, 1, num_threads);
+  runCase(na, 20, 0, num_threads);
+
+  MPI_Finalize();
+  return 0;
+}
@@ -0,0 +1,119 @@
+/*
+  This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+  and design optimization.
+
+  Copyright (C) 2015 Georgia Tech Research Corporation.
+  Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+  All rights reserved.
+
+  FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this software except in compliance with the License.
+  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+*/
+
+/*
+  Benchmark the K-nearest neighbor search used to build the aerostructural
+  connectivity. The per-point search with the sorted insertion list is
+  compared against the batched heap-based search and the connectivity from
+  both is checked to be identical.
+
+  Usage: ./knn_search [num_struct_nodes] [num_aero_nodes] [K] [num_threads]
+*/
+
+#include <stdio.h>
+#include <stdlib.h>
+
+#include "LocatePoint.h"
+
+// Generate points scattered about a wing-like surface
+void generatePoints(int npts, F2FScalar *X) {
+  for (int i = 0; i < npts; i++) {
+    double s = 1.0 * rand() / RAND_MAX;
+    double t = 1.0 * rand() / RAND_MAX;
+    double h = 0.01 * rand() / RAND_MAX;
+    X[3 * i] = 2.0 * t + 0.5 * s;
+    X[3 * i + 1] = 10.0 * s;
+    X[3 * i + 2] = 0.1 * t * (1.0 - t) + h;
+  }
+}
+
+int main(int argc, char *argv[]) {
+  MPI_Init(&argc, &argv);
+
+  int ns = 50000;
+  int na = 100000;
+  int K = 200;
+  int num_threads = 1;
+  if (argc > 1) {
+    ns = atoi(argv[1]);
+  }
+  if (argc > 2) {
+    na = atoi(argv[2]);
+  }
+  if (argc > 3) {
+    K = atoi(argv[3]);
+  }
+  if (argc > 4) {
+    num_threads = atoi(argv[4]);
+  }
+
+  srand(1234);
+  F2FScalar *Xs = new F2FScalar[3 * ns];
+  F2FScalar *Xa = new F2FScalar[3 * na];
+  generatePoints(ns, Xs);
+  generatePoints(na, Xa);
+
+  int min_bin_size = 10;
+  LocatePoint *locator = new LocatePoint(Xs, ns, min_bin_size);
+
+  printf("Structural nodes: %d  Aerodynamic nodes: %d  K: %d\n", ns, na, K);
+
+  // Search for one point at a time with the sorted insertion list
+  int *conn = new int[K * na];
+  F2FScalar *dist = new F2FScalar[K * na];
+  double t0 = MPI_Wtime();
+  for (int i = 0; i < na; i++) {
+    locator->locateKClosest(K, &conn[K * i], &dist[K * i], &Xa[3 * i]);
+  }
+  double t_single = MPI_Wtime() - t0;
+  printf("locateKClosest (per point):        %10.4f s\n", t_single);
+
+  // Search for all the points at once with one and multiple threads
+  int *conn_batch = new int[K * na];
+  F2FScalar *dist_batch = new F2FScalar[K * na];
+  for (int nthreads = 1; nthreads <= num_threads; nthreads *= 2) {
+    t0 = MPI_Wtime();
+    locator->locateKClosestBatch(K, na, Xa, conn_batch, dist_batch, nthreads);
+    double t_batch = MPI_Wtime() - t0;
+
+    int ndiff = 0;
+    for (int i = 0; i < K * na; i++) {
+      if (conn[i] != conn_batch[i]) {
+        ndiff++;
+      }
+    }
+
+    printf("locateKClosestBatch (%2d threads):  %10.4f s  speedup %6.2f  %s\n",
+           nthreads, t_batch, t_single / t_batch,
+           ndiff == 0 ? "identical" : "DIFFERENT");
+  }
+
+  delete locator;
+  delete[] Xs;
+  delete[] Xa;
+  delete[] conn;
+  delete[] dist;
+  delete[] conn_batch;
+  delete[] dist_batch;
+
+  MPI_Finalize();
+  return 0;
+}
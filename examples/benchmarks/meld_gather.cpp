@@ -0,0 +1,230 @@
+/*
+  This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+  and design optimization.
+
+  Copyright (C) 2015 Georgia Tech Research Corporation.
+  Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+  All rights reserved.
+
+  FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this software except in compliance with the License.
+  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+*/
+
+/*
+  Benchmark the throughput of the MELD displacement transfer. The centroids
+  and the covariance matrix of the structural nodes linked to each
+  aerodynamic node are computed by gathering the nodes into arrays of their
+  components, reading the reflected nodes from a reflected copy of the
+  structural mesh. This is compared against the previous kernels, which check
+  for a reflected node and copy it for every link. Cases without symmetry and
+  with a symmetry plane are run.
+
+  Usage: ./meld_gather [num_aero_nodes] [num_nearest] [num_repeats]
+*/
+
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include "MELD.h"
+
+// Expose the previous displacement transfer kernels of MELD
+class MELDBenchmark : public MELD {
+ public:
+  MELDBenchmark(MPI_Comm comm, int isymm, int nn)
+      : MELD(comm, comm, 0, comm, 0, isymm, nn, 0.5) {}
+
+  // Previous version of the centroid with a check for reflected nodes
+  void computeCentroidPrev(const int *local_conn, const F2FScalar *W,
+                           const F2FScalar *X, F2FScalar *xsbar) {
+    memset(xsbar, 0, 3 * sizeof(F2FScalar));
+    for (int j = 0; j < nn; j++) {
+      if (local_conn[j] < ns) {
+        const F2FScalar *xs = &X[3 * local_conn[j]];
+        for (int k = 0; k < 3; k++) {
+          xsbar[k] += W[j] * xs[k];
+        }
+      } else {
+        F2FScalar rxs[3];
+        memcpy(rxs, &X[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
+        rxs[isymm] *= -1.0;
+        for (int k = 0; k < 3; k++) {
+          xsbar[k] += W[j] * rxs[k];
+        }
+      }
+    }
+  }
+
+  // Previous version of the covariance with a check for reflected nodes
+  void computeCovariancePrev(const F2FScalar *X, const F2FScalar *Xd,
+                             const int *local_conn, const F2FScalar *W,
+                             const F2FScalar *xs0bar, const F2FScalar *xsbar,
+                             F2FScalar *H) {
+    memset(H, 0, 9 * sizeof(F2FScalar));
+    for (int j = 0; j < nn; j++) {
+      F2FScalar q[3], p[3];
+      if (local_conn[j] < ns) {
+        vec_diff(xs0bar, &X[3 * local_conn[j]], q);
+        vec_diff(xsbar, &Xd[3 * local_conn[j]], p);
+      } else {
+        F2FScalar rxs0[3], rxs[3];
+        memcpy(rxs0, &X[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
+        memcpy(rxs, &Xd[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
+        rxs0[isymm] *= -1.0;
+        rxs[isymm] *= -1.0;
+        vec_diff(xs0bar, rxs0, q);
+        vec_diff(xsbar, rxs, p);
+      }
+      for (int n = 0; n < 3; n++) {
+        for (int m = 0; m < 3; m++) {
+          H[m + 3 * n] += W[j] * p[m] * q[n];
+        }
+      }
+    }
+  }
+
+  // Previous version of the displacement transfer using the structural
+  // displacements from the last call to transferDisps
+  void computeAeroDispsPrev(F2FScalar *aero_disps) {
+    F2FScalar *Xsd = new F2FScalar[3 * ns];
+    for (int j = 0; j < 3 * ns; j++) {
+      Xsd[j] = Xs[j] + Us[j];
+    }
+
+    for (int i = 0; i < na; i++) {
+      const int *local_conn = &global_conn[i * nn];
+      const F2FScalar *W = &global_W[i * nn];
+      F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar xsbar[3], H[9];
+      computeCentroidPrev(local_conn, W, Xs, xs0bar);
+      computeCentroidPrev(local_conn, W, Xsd, xsbar);
+      computeCovariancePrev(Xs, Xsd, local_conn, W, xs0bar, xsbar, H);
+
+      F2FScalar *R = &global_R[9 * i];
+      computeRotation(H, R, &global_S[9 * i]);
+
+      F2FScalar r[3], rho[3];
+      vec_diff(xs0bar, &Xa[3 * i], r);
+      rho[0] = R[0] * r[0] + R[3] * r[1] + R[6] * r[2];
+      rho[1] = R[1] * r[0] + R[4] * r[1] + R[7] * r[2];
+      rho[2] = R[2] * r[0] + R[5] * r[1] + R[8] * r[2];
+      for (int k = 0; k < 3; k++) {
+        aero_disps[3 * i + k] = xsbar[k] + rho[k] - Xa[3 * i + k];
+      }
+    }
+
+    delete[] Xsd;
+  }
+};
+
+double randUniform(double low, double high) {
+  return low + (high - low) * rand() / RAND_MAX;
+}
+
+// Generate points on a half-wing surface with y >= 0
+void generateNodes(int n, F2FScalar *X) {
+  for (int i = 0; i < n; i++) {
+    double s = randUniform(0.0, 1.0);
+    double t = randUniform(0.0, 1.0);
+    X[3 * i] = 2.0 * t + 0.5 * s;
+    X[3 * i + 1] = 10.0 * s;
+    X[3 * i + 2] = 0.1 * sin(M_PI * t) * (randUniform(0.0, 1.0) < 0.5 ? 1 : -1);
+  }
+}
+
+void runCase(int na, int ns, int nn, int isymm, int nrepeat) {
+  F2FScalar *Xa = new F2FScalar[3 * na];
+  F2FScalar *Xs = new F2FScalar[3 * ns];
+  generateNodes(na, Xa);
+  generateNodes(ns, Xs);
+
+  MELDBenchmark *meld = new MELDBenchmark(MPI_COMM_SELF, isymm, nn);
+  meld->setAeroNodes(Xa, na);
+  meld->setStructNodes(Xs, ns);
+  meld->initialize();
+
+  // Apply a bending and twisting deformation to the structure
+  F2FScalar *Us = new F2FScalar[3 * ns];
+  for (int i = 0; i < ns; i++) {
+    double y = F2FRealPart(Xs[3 * i + 1]);
+    Us[3 * i] = 0.01 * y;
+    Us[3 * i + 1] = 0.0;
+    Us[3 * i + 2] = 0.02 * y * y + 0.01 * y * F2FRealPart(Xs[3 * i]);
+  }
+
+  F2FScalar *ua = new F2FScalar[3 * na];
+  F2FScalar *ua_prev = new F2FScalar[3 * na];
+  meld->transferDisps(Us, ua);
+
+  double t0 = MPI_Wtime();
+  for (int k = 0; k < nrepeat; k++) {
+    meld->computeAeroDispsPrev(ua_prev);
+  }
+  double t_prev = (MPI_Wtime() - t0) / nrepeat;
+
+  t0 = MPI_Wtime();
+  for (int k = 0; k < nrepeat; k++) {
+    meld->computeAeroDisps(ua);
+  }
+  double t_new = (MPI_Wtime() - t0) / nrepeat;
+
+  double max_diff = 0.0, max_disp = 0.0;
+  for (int i = 0; i < 3 * na; i++) {
+    double d = fabs(F2FRealPart(ua[i]) - F2FRealPart(ua_prev[i]));
+    if (d > max_diff) {
+      max_diff = d;
+    }
+    if (fabs(F2FRealPart(ua[i])) > max_disp) {
+      max_disp = fabs(F2FRealPart(ua[i]));
+    }
+  }
+
+  printf("isymm = %2d  aero nodes: %d  struct nodes: %d  nearest: %d\n", isymm,
+         na, ns, nn);
+  printf("  Previous kernels: %12.0f aero nodes/s\n", na / t_prev);
+  printf("  Gather kernels:   %12.0f aero nodes/s  speedup %6.2f\n", na / t_new,
+         t_prev / t_new);
+  printf("  max |difference| = %10.3e (max |displacement| = %10.3e)\n",
+         max_diff, max_disp);
+
+  delete meld;
+  delete[] Xa;
+  delete[] Xs;
+  delete[] Us;
+  delete[] ua;
+  delete[] ua_prev;
+}
+
+int main(int argc, char *argv[]) {
+  MPI_Init(&argc, &argv);
+
+  int na = 200000;
+  int nn = 40;
+  int nrepeat = 5;
+  if (argc > 1) {
+    na = atoi(argv[1]);
+  }
+  if (argc > 2) {
+    nn = atoi(argv[2]);
+  }
+  if (argc > 3) {
+    nrepeat = atoi(argv[3]);
+  }
+
+  srand(1234);
+  runCase(na, na / 10, nn, -1, nrepeat);
+  runCase(na, na / 10, nn, 1, nrepeat);
+
+  MPI_Finalize();
+  return 0;
+}
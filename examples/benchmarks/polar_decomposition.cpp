@@ -0,0 +1,186 @@
+/*
+  This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+  and design optimization.
+
+  Copyright (C) 2015 Georgia Tech Research Corporation.
+  Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+  All rights reserved.
+
+  FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this software except in compliance with the License.
+  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+*/
+
+/*
+  Benchmark the computation of the rotation matrix from the covariance matrix
+  in the MELD displacement transfer. The Newton iteration for the polar
+  decomposition is compared against the SVD-based routine. The covariance
+  matrices are built from rotated and deformed clouds of nearest neighbors,
+  which are either fully three-dimensional or nearly planar. In complex mode,
+  the covariance matrices carry a complex perturbation and the derivatives of
+  the two rotations are compared as well.
+
+  Usage: ./polar_decomposition [num_nodes] [num_nearest]
+*/
+
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include "MELD.h"
+
+// Expose the protected rotation routines of the transfer scheme
+class RotationBenchmark : public MELD {
+ public:
+  RotationBenchmark(MPI_Comm comm)
+      : MELD(comm, comm, 0, comm, 0, -1, 10, 0.5) {}
+
+  void rotationSVD(const F2FScalar *H, F2FScalar *R) {
+    computeRotationSVD(H, R);
+  }
+};
+
+double randUniform(double low, double high) {
+  return low + (high - low) * rand() / RAND_MAX;
+}
+
+// Build the covariance matrix of a cloud of nn points before and after a
+// random rotation plus a small deformation
+void generateCovariance(int nn, double thickness, F2FScalar *H) {
+  // Rotation about a random axis
+  double axis[3] = {randUniform(-1, 1), randUniform(-1, 1), randUniform(-1, 1)};
+  double norm = sqrt(axis[0] * axis[0] + axis[1] * axis[1] + axis[2] * axis[2]);
+  double theta = randUniform(-0.5, 0.5);
+  double c = cos(theta), s = sin(theta);
+  double n[3] = {axis[0] / norm, axis[1] / norm, axis[2] / norm};
+  double Q[9];
+  for (int i = 0; i < 3; i++) {
+    for (int j = 0; j < 3; j++) {
+      Q[i + 3 * j] = (1.0 - c) * n[i] * n[j] + (i == j ? c : 0.0);
+    }
+  }
+  Q[1] += s * n[2];
+  Q[2] -= s * n[1];
+  Q[3] -= s * n[2];
+  Q[5] += s * n[0];
+  Q[6] += s * n[1];
+  Q[7] -= s * n[0];
+
+  memset(H, 0, 9 * sizeof(F2FScalar));
+  for (int k = 0; k < nn; k++) {
+    double q[3] = {randUniform(-1, 1), randUniform(-1, 1),
+                   thickness * randUniform(-1, 1)};
+    double p[3];
+    for (int i = 0; i < 3; i++) {
+      p[i] = Q[i] * q[0] + Q[i + 3] * q[1] + Q[i + 6] * q[2] +
+             0.05 * randUniform(-1, 1);
+    }
+    double w = randUniform(0, 1);
+    for (int i = 0; i < 3; i++) {
+      for (int j = 0; j < 3; j++) {
+        H[i + 3 * j] += w * p[i] * q[j];
+      }
+    }
+  }
+
+#ifdef FUNTOFEM_USE_COMPLEX
+  for (int i = 0; i < 9; i++) {
+    H[i] += F2FScalar(0.0, 1e-30 * randUniform(-1, 1));
+  }
+#endif
+}
+
+void runCase(RotationBenchmark *bench, int nnodes, int nn, double thickness,
+             const char *name) {
+  F2FScalar *H = new F2FScalar[9 * nnodes];
+  F2FScalar *R0 = new F2FScalar[9 * nnodes];
+  F2FScalar *R1 = new F2FScalar[9 * nnodes];
+  for (int i = 0; i < nnodes; i++) {
+    generateCovariance(nn, thickness, &H[9 * i]);
+  }
+
+  double t0 = MPI_Wtime();
+  for (int i = 0; i < nnodes; i++) {
+    bench->rotationSVD(&H[9 * i], &R0[9 * i]);
+  }
+  double t_svd = MPI_Wtime() - t0;
+
+  int nfallback = 0;
+  t0 = MPI_Wtime();
+  for (int i = 0; i < nnodes; i++) {
+    if (!computePolarRotation(&H[9 * i], &R1[9 * i])) {
+      nfallback++;
+      bench->rotationSVD(&H[9 * i], &R1[9 * i]);
+    }
+  }
+  double t_polar = MPI_Wtime() - t0;
+
+  // Compare the rotations and their complex-step derivatives
+  double max_err = 0.0, max_deriv_err = 0.0;
+  for (int i = 0; i < 9 * nnodes; i++) {
+    double err = fabs(F2FRealPart(R0[i]) - F2FRealPart(R1[i]));
+    if (err > max_err) {
+      max_err = err;
+    }
+#ifdef FUNTOFEM_USE_COMPLEX
+    double scale = 1e-30;
+    for (int j = 9 * (i / 9); j < 9 * (i / 9) + 9; j++) {
+      if (fabs(F2FImagPart(R0[j])) > scale) {
+        scale = fabs(F2FImagPart(R0[j]));
+      }
+    }
+    err = fabs(F2FImagPart(R0[i]) - F2FImagPart(R1[i])) / scale;
+    if (err > max_deriv_err) {
+      max_deriv_err = err;
+    }
+#endif
+  }
+
+  printf("%s (%d neighbors)\n", name, nn);
+  printf("  SVD:    %12.0f nodes/s\n", nnodes / t_svd);
+  printf("  Newton: %12.0f nodes/s  speedup %6.2f  fallbacks %d\n",
+         nnodes / t_polar, t_svd / t_polar, nfallback);
+  printf("  max |R_svd - R_newton| = %10.3e\n", max_err);
+#ifdef FUNTOFEM_USE_COMPLEX
+  printf("  max relative derivative difference = %10.3e\n", max_deriv_err);
+#endif
+
+  delete[] H;
+  delete[] R0;
+  delete[] R1;
+}
+
+int main(int argc, char *argv[]) {
+  MPI_Init(&argc, &argv);
+
+  int nnodes = 200000;
+  int nn = 20;
+  if (argc > 1) {
+    nnodes = atoi(argv[1]);
+  }
+  if (argc > 2) {
+    nn = atoi(argv[2]);
+  }
+
+  srand(1234);
+  RotationBenchmark *bench = new RotationBenchmark(MPI_COMM_WORLD);
+
+  printf("Nodes: %d\n", nnodes);
+  runCase(bench, nnodes, nn, 1.0, "Three-dimensional clouds");
+  runCase(bench, nnodes, nn, 1e-3, "Thin clouds");
+  runCase(bench, nnodes, nn, 0.0, "Planar clouds");
+
+  delete bench;
+
+  MPI_Finalize();
+  return 0;
+}
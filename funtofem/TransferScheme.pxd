@@ -13,12 +13,24 @@ cdef extern from "TransferScheme.h":
 
     # Initialization
     void initialize()
+    int updateGeometry()
+    void setDistributedStructMesh(int distributed)
+    void setNumThreads(int nthreads)
+    int getNumThreads()
+    size_t getMemoryUsage()
+    int saveState(const char *filename)
+    int loadState(const char *filename)
 
     # Load and displacement transfers
     void transferDisps(const F2FScalar *struct_disps,
                        F2FScalar *aero_disps)
     void transferLoads(const F2FScalar *aero_loads,
                        F2FScalar *struct_loads)
+    void beginTransferDisps(const F2FScalar *struct_disps)
+    void endTransferDisps(F2FScalar *aero_disps)
+    void beginTransferLoads(const F2FScalar *aero_loads,
+                            F2FScalar *struct_loads)
+    void endTransferLoads()
 
     # Get the dimensions
     int getStructNodeDof()
@@ -36,6 +48,14 @@ cdef extern from "TransferScheme.h":
     void applydLdfA(const F2FScalar *vecs, F2FScalar *prods)
     void applydLdfATrans(const F2FScalar *vecs, F2FScalar *prods)
 
+    # Action of transpose Jacobians on a block of vectors
+    void applydDduSTransBatch(int nvecs, const F2FScalar *vecs,
+                              F2FScalar *prods)
+    void applydLduSTransBatch(int nvecs, const F2FScalar *vecs,
+                              F2FScalar *prods)
+    void applydLdfATransBatch(int nvecs, const F2FScalar *vecs,
+                              F2FScalar *prods)
+
     # Action of Jacobians needed for assembling gradient from adjoint variables
     void applydDdxA0(const F2FScalar *vecs, F2FScalar *prods)
     void applydDdxS0(const F2FScalar *vecs, F2FScalar *prods)
@@ -100,6 +120,13 @@ cdef extern from "TransferScheme.h":
 
     # Initialization
     void initialize()
+    int updateGeometry()
+    void setDistributedStructMesh(int distributed)
+    void setNumThreads(int nthreads)
+    int getNumThreads()
+    size_t getMemoryUsage()
+    int saveState(const char *filename)
+    int loadState(const char *filename)
 
     # Transfer temperatures and heat fluxes
     void transferTemp(const F2FScalar *struct_temp,
@@ -134,6 +161,12 @@ cdef extern from "MELD.h":
          MPI_Comm aero, int aero_root,
          int symmetry, int num_nearest, F2FScalar beta)
 
+    # Compute the factorizations of M1 when needed instead of storing them
+    void setMemoryLean(int lean)
+
+    # Store single precision copies of the weights and node locations
+    void setSinglePrecision(int single)
+
 cdef extern from "MELDThermal.h":
   cppclass MELDThermal(ThermalTransfer):
     # Constructor
@@ -142,6 +175,10 @@ cdef extern from "MELDThermal.h":
                 MPI_Comm aero, int aero_root,
                 int symmetry, int num_nearest, F2FScalar beta)
 
+    # Get the sparse matrix of the temperature transfer
+    void getTransferMatrix(int *nrows, int *ncols, const int **rowp,
+                           const int **cols, const F2FScalar **vals)
+
 cdef extern from "LinearizedMELD.h":
   cppclass LinearizedMELD(MELD):
     # Constructor
@@ -150,12 +187,19 @@ cdef extern from "LinearizedMELD.h":
                    MPI_Comm aero, int aero_root,
                    int symmetry, int num_nearest, F2FScalar beta)
 
+    # Get the sparse matrix of the displacement transfer
+    void getTransferMatrix(int *nrows, int *ncols, const int **rowp,
+                           const int **cols, const F2FScalar **vals)
+
 cdef extern from "RBF.h":
   enum RbfType "RBF::RbfType":
     GAUSSIAN "RBF::GAUSSIAN"
     MULTIQUADRIC "RBF::MULTIQUADRIC"
     INVERSE_MULTIQUADRIC "RBF::INVERSE_MULTIQUADRIC"
     THIN_PLATE_SPLINE "RBF::THIN_PLATE_SPLINE"
+    WENDLAND_C0 "RBF::WENDLAND_C0"
+    WENDLAND_C2 "RBF::WENDLAND_C2"
+    WENDLAND_C4 "RBF::WENDLAND_C4"
 
   cppclass RBF(LDTransferScheme):
     # Constructor
@@ -164,6 +208,16 @@ cdef extern from "RBF.h":
         MPI_Comm aero, int aero_root,
         RbfType rbf_type, int sampling_ratio)
 
+    # Set the support radius of the compactly supported basis functions
+    void setSupportRadius(double radius)
+
+    # Set the seed used to randomly sample the structural nodes
+    void setSamplingSeed(unsigned int seed)
+
+    # Options and convergence of the iterative solver
+    void setSolverOptions(double rtol, int max_iters)
+    int getSolverConverged()
+
 cdef extern from "BeamTransfer.h":
   cppclass BeamTransfer(LDTransferScheme):
     # Constructor
@@ -32,6 +32,9 @@ cdef class pyTransferScheme:
     """
     cdef LDTransferScheme *ptr
 
+    # Arrays used by a nonblocking transfer that is in progress
+    cdef object pending_struct
+
     def setAeroNodes(self, np.ndarray[F2FScalar, ndim=1, mode='c'] X):
         """
         Set and store the aerodynamic surface node locations in memory
@@ -80,6 +83,101 @@ cdef class pyTransferScheme:
 
         return
 
+    def updateGeometry(self):
+        """
+        Update the transfer scheme after the node locations have been changed
+        with setAeroNodes or setStructNodes. Schemes that support it keep the
+        existing connectivity when the nodes have moved little enough that the
+        nearest structural nodes are unchanged, otherwise the scheme is
+        initialized again
+
+        Returns
+        -------
+        reinitialized: bool
+            whether the scheme was initialized again
+        """
+        return bool(self.ptr.updateGeometry())
+
+    def setDistributedStructMesh(self, distributed=True):
+        """
+        Only store the structural nodes connected to the local aerodynamic
+        nodes on each process. The point-to-point communication pattern is
+        built in initialize, so this must be called before initialize
+
+        Parameters
+        ----------
+        distributed: bool
+            whether to distribute the structural mesh
+        """
+        self.ptr.setDistributedStructMesh(int(distributed))
+
+        return
+
+    def setNumThreads(self, int num_threads):
+        """
+        Set the number of threads used by the transfer kernels and the
+        connectivity search
+
+        Parameters
+        ----------
+        num_threads: int
+            number of threads
+        """
+        self.ptr.setNumThreads(num_threads)
+
+        return
+
+    def getNumThreads(self):
+        """
+        Get the number of threads used by the transfer kernels
+        """
+        return self.ptr.getNumThreads()
+
+    def getMemoryUsage(self):
+        """
+        Get the number of bytes allocated for the data stored by the transfer
+        scheme on this processor
+        """
+        return self.ptr.getMemoryUsage()
+
+    def saveState(self, filename):
+        """
+        Save the connectivity, weights and sampling computed by initialize to
+        a restart file. The file is written with MPI-IO on all processes
+
+        Parameters
+        ----------
+        filename: str
+            name of the restart file
+
+        Returns
+        -------
+        saved: bool
+            whether the file was written
+        """
+        cdef bytes fname = filename.encode()
+        return bool(self.ptr.saveState(fname))
+
+    def loadState(self, filename):
+        """
+        Initialize the transfer scheme from a restart file written by
+        saveState. The file is only used if it matches the node locations,
+        the options and the number of processes, otherwise initialize must be
+        called instead
+
+        Parameters
+        ----------
+        filename: str
+            name of the restart file
+
+        Returns
+        -------
+        loaded: bool
+            whether the transfer scheme was initialized from the file
+        """
+        cdef bytes fname = filename.encode()
+        return bool(self.ptr.loadState(fname))
+
     def transferDisps(self,
             np.ndarray[F2FScalar, ndim=1, mode='c'] struct_disps,
             np.ndarray[F2FScalar, ndim=1, mode='c'] aero_disps):
@@ -148,6 +246,106 @@ cdef class pyTransferScheme:
 
         return
 
+    def beginTransferDisps(self,
+            np.ndarray[F2FScalar, ndim=1, mode='c'] struct_disps):
+        """
+        Start the transfer of the structural node displacements. The
+        communication of the displacements proceeds while other work is done,
+        and the transfer is completed by :meth:`endTransferDisps`. The
+        structural displacements must not be modified until then.
+
+        Parameters
+        ----------
+        struct_disps: ndarray
+            One-dimensional array of structural displacements
+        """
+        cdef F2FScalar *struct_array = NULL
+        cdef int struct_len = 0
+        if struct_disps is not None:
+            struct_len = len(struct_disps)
+            struct_array = <F2FScalar*>struct_disps.data
+
+        if struct_len != self.ptr.getLocalStructArrayLen():
+            raise ValueError("Structural array incorrect length")
+
+        self.ptr.beginTransferDisps(struct_array)
+        self.pending_struct = struct_disps
+
+        return
+
+    def endTransferDisps(self,
+            np.ndarray[F2FScalar, ndim=1, mode='c'] aero_disps):
+        """
+        Complete the transfer started by :meth:`beginTransferDisps` and store
+        the aerodynamic surface node displacements in the input array
+
+        Parameters
+        ----------
+        aero_disps: ndarray
+            One-dimensional empty array of size of aerodynamic displacements
+        """
+        cdef F2FScalar *aero_array = NULL
+        cdef int aero_len = 0
+        if aero_disps is not None:
+            aero_len = len(aero_disps)
+            aero_array = <F2FScalar*>aero_disps.data
+
+        if aero_len != self.ptr.getLocalAeroArrayLen():
+            raise ValueError("Aerodynamic array incorrect length")
+
+        self.ptr.endTransferDisps(aero_array)
+        self.pending_struct = None
+
+        return
+
+    def beginTransferLoads(self,
+            np.ndarray[F2FScalar, ndim=1, mode='c'] aero_loads,
+            np.ndarray[F2FScalar, ndim=1, mode='c'] struct_loads):
+        """
+        Start the transfer of the aerodynamic surface loads. The structural
+        loads are computed and their communication proceeds while other work
+        is done. The values in struct_loads are not valid until
+        :meth:`endTransferLoads` is called.
+
+        Parameters
+        ----------
+        aero_loads: ndarray
+            One-dimensional array of aerodynamic surface loads
+        struct_loads: ndarray
+            One-dimensional empty array of size of structural loads
+        """
+        cdef F2FScalar *struct_array = NULL
+        cdef int struct_len = 0
+        cdef F2FScalar *aero_array = NULL
+        cdef int aero_len = 0
+        if struct_loads is not None:
+            struct_len = len(struct_loads)
+            struct_array = <F2FScalar*>struct_loads.data
+        if aero_loads is not None:
+            aero_len = len(aero_loads)
+            aero_array = <F2FScalar*>aero_loads.data
+
+        if struct_len != self.ptr.getLocalStructArrayLen():
+            raise ValueError("Structural array incorrect length")
+        if aero_len != self.ptr.getLocalAeroArrayLen():
+            raise ValueError("Aerodynamic array incorrect length")
+
+        self.ptr.beginTransferLoads(aero_array, struct_array)
+        self.pending_struct = struct_loads
+
+        return
+
+    def endTransferLoads(self):
+        """
+        Complete the transfer started by :meth:`beginTransferLoads`. The
+        structural loads are stored in the array passed to
+        :meth:`beginTransferLoads`.
+        """
+        self.ptr.endTransferLoads()
+        self.pending_struct = None
+
+        return
+
     def applydDduS(self, np.ndarray[F2FScalar, ndim=1, mode='c'] v,
                    np.ndarray[F2FScalar, ndim=1, mode='c'] p):
         """
@@ -351,6 +549,93 @@ cdef class pyTransferScheme:
         self.ptr.applydLdfATrans(struct_array, aero_array)
         return
 
+    def applydDduSTransBatch(self, np.ndarray[F2FScalar, ndim=2, mode='c'] v,
+                             np.ndarray[F2FScalar, ndim=2, mode='c'] p):
+        """
+        Apply the action of the transpose of the Jacobian containing the
+        derivatives of the displacement transfer residuals with respect to the
+        structural displacements to a block of input vectors and store the
+        products in empty input array
+
+        Parameters
+        ----------
+        v: ndarray
+            Two-dimensional array of size of aerodynamic displacements by the
+            number of vectors
+        p: ndarray
+            Two-dimensional empty array of size of structural displacements by
+            the number of vectors
+        """
+        cdef int nvecs = v.shape[1]
+        if p.shape[1] != nvecs:
+            raise ValueError("Number of input and output vectors differ")
+        if p.shape[0] != self.ptr.getLocalStructArrayLen():
+            raise ValueError("Structural array incorrect length")
+        if v.shape[0] != self.ptr.getLocalAeroArrayLen():
+            raise ValueError("Aerodynamic array incorrect length")
+
+        self.ptr.applydDduSTransBatch(nvecs, <F2FScalar*>v.data,
+                                      <F2FScalar*>p.data)
+        return
+
+    def applydLduSTransBatch(self, np.ndarray[F2FScalar, ndim=2, mode='c'] v,
+                             np.ndarray[F2FScalar, ndim=2, mode='c'] p):
+        """
+        Apply the action of the transpose of the Jacobian containing the
+        derivatives of the load transfer residuals with respect to the
+        structural displacements to a block of input vectors and store the
+        products in empty input array
+
+        Parameters
+        ----------
+        v: ndarray
+            Two-dimensional array of size of structural loads by the number of
+            vectors
+        p: ndarray
+            Two-dimensional empty array of size of structural displacements by
+            the number of vectors
+        """
+        cdef int nvecs = v.shape[1]
+        if p.shape[1] != nvecs:
+            raise ValueError("Number of input and output vectors differ")
+        if v.shape[0] != self.ptr.getLocalStructArrayLen():
+            raise ValueError("Input structural array incorrect length")
+        if p.shape[0] != self.ptr.getLocalStructArrayLen():
+            raise ValueError("Output structural array incorrect length")
+
+        self.ptr.applydLduSTransBatch(nvecs, <F2FScalar*>v.data,
+                                      <F2FScalar*>p.data)
+        return
+
+    def applydLdfATransBatch(self, np.ndarray[F2FScalar, ndim=2, mode='c'] v,
+                             np.ndarray[F2FScalar, ndim=2, mode='c'] p):
+        """
+        Apply the action of the transpose of the Jacobian containing the
+        derivatives of the load transfer residuals with respect to the
+        aerodynamic forces to a block of input vectors and store the products
+        in empty input array
+
+        Parameters
+        ----------
+        v: ndarray
+            Two-dimensional array of size of structural loads by the number of
+            vectors
+        p: ndarray
+            Two-dimensional empty array of size of aerodynamic forces by the
+            number of vectors
+        """
+        cdef int nvecs = v.shape[1]
+        if p.shape[1] != nvecs:
+            raise ValueError("Number of input and output vectors differ")
+        if v.shape[0] != self.ptr.getLocalStructArrayLen():
+            raise ValueError("Structural array incorrect length")
+        if p.shape[0] != self.ptr.getLocalAeroArrayLen():
+            raise ValueError("Aerodynamic array incorrect length")
+
+        self.ptr.applydLdfATransBatch(nvecs, <F2FScalar*>v.data,
+                                      <F2FScalar*>p.data)
+        return
+
     def applydDdxA0(self, np.ndarray[F2FScalar, ndim=1, mode='c'] v,
                     np.ndarray[F2FScalar, ndim=1, mode='c'] p):
         """
@@ -663,6 +948,101 @@ cdef class pyThermalTransfer:
 
         return
 
+    def updateGeometry(self):
+        """
+        Update the transfer scheme after the node locations have been changed
+        with setAeroNodes or setStructNodes. Schemes that support it keep the
+        existing connectivity when the nodes have moved little enough that the
+        nearest structural nodes are unchanged, otherwise the scheme is
+        initialized again
+
+        Returns
+        -------
+        reinitialized: bool
+            whether the scheme was initialized again
+        """
+        return bool(self.ptr.updateGeometry())
+
+    def setDistributedStructMesh(self, distributed=True):
+        """
+        Only store the structural nodes connected to the local aerodynamic
+        nodes on each process. The point-to-point communication pattern is
+        built in initialize, so this must be called before initialize
+
+        Parameters
+        ----------
+        distributed: bool
+            whether to distribute the structural mesh
+        """
+        self.ptr.setDistributedStructMesh(int(distributed))
+
+        return
+
+    def setNumThreads(self, int num_threads):
+        """
+        Set the number of threads used by the transfer kernels and the
+        connectivity search
+
+        Parameters
+        ----------
+        num_threads: int
+            number of threads
+        """
+        self.ptr.setNumThreads(num_threads)
+
+        return
+
+    def getNumThreads(self):
+        """
+        Get the number of threads used by the transfer kernels
+        """
+        return self.ptr.getNumThreads()
+
+    def getMemoryUsage(self):
+        """
+        Get the number of bytes allocated for the data stored by the transfer
+        scheme on this processor
+        """
+        return self.ptr.getMemoryUsage()
+
+    def saveState(self, filename):
+        """
+        Save the connectivity, weights and sampling computed by initialize to
+        a restart file. The file is written with MPI-IO on all processes
+
+        Parameters
+        ----------
+        filename: str
+            name of the restart file
+
+        Returns
+        -------
+        saved: bool
+            whether the file was written
+        """
+        cdef bytes fname = filename.encode()
+        return bool(self.ptr.saveState(fname))
+
+    def loadState(self, filename):
+        """
+        Initialize the transfer scheme from a restart file written by
+        saveState. The file is only used if it matches the node locations,
+        the options and the number of processes, otherwise initialize must be
+        called instead
+
+        Parameters
+        ----------
+        filename: str
+            name of the restart file
+
+        Returns
+        -------
+        loaded: bool
+            whether the transfer scheme was initialized from the file
+        """
+        cdef bytes fname = filename.encode()
+        return bool(self.ptr.loadState(fname))
+
     def transferTemp(self,
                      np.ndarray[F2FScalar, ndim=1, mode='c'] struct_temps,
                      np.ndarray[F2FScalar, ndim=1, mode='c'] aero_temps):
@@ -837,6 +1217,34 @@ cdef class pyThermalTransfer:
         return self.ptr.testAllDerivatives(struct_array, aero_array, h, rtol, atol)
 
 
+cdef _copy_bsr_matrix(int nrows, int ncols, int bsize, const int *rowp,
+                      const int *cols, const F2FScalar *vals):
+    """
+    Copy a block compressed row matrix owned by a transfer scheme into a
+    scipy.sparse.bsr_matrix
+    """
+    import scipy.sparse
+
+    cdef int i = 0
+    cdef int nnz = rowp[nrows]
+    cdef np.ndarray[int, ndim=1, mode='c'] indptr
+    cdef np.ndarray[int, ndim=1, mode='c'] indices
+    cdef np.ndarray[F2FScalar, ndim=1, mode='c'] data
+    indptr = np.empty(nrows + 1, dtype=np.intc)
+    indices = np.empty(nnz, dtype=np.intc)
+    data = np.empty(bsize * bsize * nnz, dtype=dtype)
+    for i in range(nrows + 1):
+        indptr[i] = rowp[i]
+    for i in range(nnz):
+        indices[i] = cols[i]
+    for i in range(bsize * bsize * nnz):
+        data[i] = vals[i]
+
+    return scipy.sparse.bsr_matrix(
+        (data.reshape(nnz, bsize, bsize), indices, indptr),
+        shape=(bsize * nrows, bsize * ncols),
+    )
+
 cdef class pyMELD(pyTransferScheme):
     """
     MELD (Matching-based Extrapolation of Loads and Displacments) is scalable
@@ -867,12 +1275,16 @@ cdef class pyMELD(pyTransferScheme):
         number of structural nodes linked to each aerodynamic node
     beta: float
         weighting decay parameter
+    num_threads: int
+        number of threads used by the transfer kernels when compiled with
+        OpenMP (defaults to the FUNTOFEM_NUM_THREADS environment variable
+        or 1)
     """
     def __cinit__(self, MPI.Comm comm,
                   MPI.Comm struct, int struct_root,
                   MPI.Comm aero, int aero_root,
                   int symmetry, int num_nearest,
-                  F2FScalar beta):
+                  F2FScalar beta, int num_threads=0):
         cdef MPI_Comm c_comm = comm.ob_mpi
         cdef MPI_Comm struct_comm = struct.ob_mpi
         cdef MPI_Comm aero_comm = aero.ob_mpi
@@ -882,11 +1294,52 @@ cdef class pyMELD(pyTransferScheme):
                             aero_comm, aero_root, symmetry,
                             num_nearest, beta)
 
+        # Override the default number of threads
+        if num_threads > 0:
+            self.ptr.setNumThreads(num_threads)
+
         return
 
     def __dealloc__(self):
         del self.ptr
 
+    def setMemoryLean(self, lean=True):
+        """
+        Compute the factorizations needed by the load transfer and the
+        Jacobian-vector products for each aerodynamic node when they are
+        needed instead of storing them. This reduces the memory used by the
+        scheme at the cost of extra computation. This must be called before
+        initialize
+
+        Parameters
+        ----------
+        lean: bool
+            whether to use the memory-lean mode
+        """
+        (<MELD*>self.ptr).setMemoryLean(int(lean))
+
+        return
+
+    def setSinglePrecision(self, single=True):
+        """
+        Store single precision copies of the weights and the structural node
+        locations that are read by the load and displacement transfers. The
+        Jacobian-vector products w.r.t. the structural displacements and the
+        aerodynamic loads read the same copies, so the adjoint is consistent
+        with the transfers. The sums are still accumulated in double
+        precision, and the products w.r.t. the initial node locations use the
+        double precision values. This has no effect in complex mode. This must
+        be called before initialize
+
+        Parameters
+        ----------
+        single: bool
+            whether to use the single precision copies
+        """
+        (<MELD*>self.ptr).setSinglePrecision(int(single))
+
+        return
+
 cdef class pyMELDThermal(pyThermalTransfer):
     """
     MELD (Matching-based Extrapolation of Loads and Displacments) is scalable
@@ -939,6 +1392,30 @@ cdef class pyMELDThermal(pyThermalTransfer):
     def __dealloc__(self):
         del self.ptr
 
+    def getTransferMatrix(self):
+        """
+        Get the sparse matrix that maps the structural temperatures to the
+        aerodynamic temperatures. The rows correspond to the local
+        aerodynamic nodes and the columns to the global structural nodes, or
+        to the structural nodes referenced on this processor when the
+        structural mesh is distributed. The flux transfer is the transpose
+        of this matrix. The scheme must be initialized first
+
+        Returns
+        -------
+        W: scipy.sparse.csr_matrix
+            copy of the temperature transfer matrix
+        """
+        cdef int nrows = 0
+        cdef int ncols = 0
+        cdef const int *rowp = NULL
+        cdef const int *cols = NULL
+        cdef const F2FScalar *vals = NULL
+        (<MELDThermal*>self.ptr).getTransferMatrix(&nrows, &ncols,
+                                                   &rowp, &cols, &vals)
+
+        return _copy_bsr_matrix(nrows, ncols, 1, rowp, cols, vals).tocsr()
+
 cdef class pyLinearizedMELD(pyTransferScheme):
     """
     Linearized MELD is a transfer scheme developed from the MELD transfer scheme
@@ -982,10 +1459,53 @@ cdef class pyLinearizedMELD(pyTransferScheme):
     def __dealloc__(self):
         del self.ptr
 
+    def setMemoryLean(self, lean=True):
+        """
+        Store only the unique entries of the symmetric inverses of the point
+        inertia matrices used by the transfers and the Jacobian-vector
+        products. This must be called before initialize
+
+        Parameters
+        ----------
+        lean: bool
+            whether to use the memory-lean mode
+        """
+        (<MELD*>self.ptr).setMemoryLean(int(lean))
+
+        return
+
+    def getTransferMatrix(self):
+        """
+        Get the sparse matrix that maps the structural displacements to the
+        aerodynamic displacements. The block rows correspond to the local
+        aerodynamic nodes and the block columns to the global structural
+        nodes, or to the structural nodes referenced on this processor when
+        the structural mesh is distributed. The load transfer is the
+        transpose of this matrix. The matrix is assembled for the current
+        node locations
+
+        Returns
+        -------
+        D: scipy.sparse.bsr_matrix
+            copy of the displacement transfer matrix with 3 x 3 blocks
+        """
+        cdef int nrows = 0
+        cdef int ncols = 0
+        cdef const int *rowp = NULL
+        cdef const int *cols = NULL
+        cdef const F2FScalar *vals = NULL
+        (<LinearizedMELD*>self.ptr).getTransferMatrix(&nrows, &ncols,
+                                                      &rowp, &cols, &vals)
+
+        return _copy_bsr_matrix(nrows, ncols, 3, rowp, cols, vals)
+
 PY_GAUSSIAN = GAUSSIAN
 PY_MULTIQUADRIC = MULTIQUADRIC
 PY_INVERSE_MULTIQUADRIC = INVERSE_MULTIQUADRIC
 PY_THIN_PLATE_SPLINE = THIN_PLATE_SPLINE
+PY_WENDLAND_C0 = WENDLAND_C0
+PY_WENDLAND_C2 = WENDLAND_C2
+PY_WENDLAND_C4 = WENDLAND_C4
 
 cdef class pyRBF(pyTransferScheme):
     """
@@ -1005,7 +1525,8 @@ cdef class pyRBF(pyTransferScheme):
         id of the aerodynamic root process
     rbf_type: C++ enum
         type of radial basis function to use (PY_GAUSSIAN, PY_MULTIQUADRIC,
-        PY_INVERSE_MULTIQUADRIC, PY_THIN_PLATE_SPLINE)
+        PY_INVERSE_MULTIQUADRIC, PY_THIN_PLATE_SPLINE, or the compactly
+        supported PY_WENDLAND_C0, PY_WENDLAND_C2, PY_WENDLAND_C4)
     sampling_ratio: int
         minimum number of points in leaf node of octree (one point sampled
         from each node)
@@ -1044,6 +1565,62 @@ cdef class pyRBF(pyTransferScheme):
     def __dealloc__(self):
         del self.ptr
 
+    def setSupportRadius(self, double radius):
+        """
+        Set the support radius of the compactly supported basis functions.
+        This must be called before initialize
+
+        Parameters
+        ----------
+        radius: float
+            radius of the support of the basis functions
+        """
+        (<RBF*>self.ptr).setSupportRadius(radius)
+
+        return
+
+    def setSamplingSeed(self, unsigned int seed):
+        """
+        Set the seed used to randomly sample one structural node from each
+        leaf bin of the octree. This must be called before initialize
+
+        Parameters
+        ----------
+        seed: int
+            seed for the random sampling
+        """
+        (<RBF*>self.ptr).setSamplingSeed(seed)
+
+        return
+
+    def setSolverOptions(self, double rtol, int max_iters):
+        """
+        Set the options of the iterative solver used with the compactly
+        supported basis functions
+
+        Parameters
+        ----------
+        rtol: float
+            relative tolerance of the solver
+        max_iters: int
+            maximum number of iterations of the solver
+        """
+        (<RBF*>self.ptr).setSolverOptions(rtol, max_iters)
+
+        return
+
+    def getSolverConverged(self):
+        """
+        Check whether the iterative solves of the last initialization or
+        transfer converged on every processor
+
+        Returns
+        -------
+        converged: bool
+            False if any of the solves failed to converge
+        """
+        return (<RBF*>self.ptr).getSolverConverged() != 0
+
 cdef class pyBeamTransfer(pyTransferScheme):
     """
     Interpolation of loads and displacements for beam elements
@@ -16,8 +16,9 @@ class BeamTransfer : public LDTransferScheme {
   void initialize();
 
   // Load and displacement transfers
-  void transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps);
-  void transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads);
+  void computeAeroDisps(F2FScalar *aero_disps);
+  void computeStructLoads(const F2FScalar *aero_loads,
+                          F2FScalar *struct_loads_global);
 
   // Action of transpose Jacobians needed for solving adjoint system
   void applydDduS(const F2FScalar *vecs, F2FScalar *prods);
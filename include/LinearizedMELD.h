@@ -20,9 +20,13 @@ class LinearizedMELD : public MELD {
   // Initialization
   void initialize();
 
+  // Get the number of bytes allocated for the data stored by the scheme
+  size_t getMemoryUsage();
+
   // Load and displacement transfers
-  void transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps);
-  void transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads);
+  void computeAeroDisps(F2FScalar *aero_disps);
+  void computeStructLoads(const F2FScalar *aero_loads,
+                          F2FScalar *struct_loads_global);
 
   // Action of transpose Jacobians needed for solving adjoint system
   void applydDduS(const F2FScalar *vecs, F2FScalar *prods);
@@ -30,30 +34,48 @@ class LinearizedMELD : public MELD {
   void applydLduS(const F2FScalar *vecs, F2FScalar *prods);
   void applydLduSTrans(const F2FScalar *vecs, F2FScalar *prods);
 
+  // Action of transpose Jacobians on a block of vectors
+  void applydDduSTransBatch(int nvecs, const F2FScalar *vecs, F2FScalar *prods);
+  void applydLduSTransBatch(int nvecs, const F2FScalar *vecs, F2FScalar *prods);
+  void applydLdfATransBatch(int nvecs, const F2FScalar *vecs, F2FScalar *prods);
+
   // Action of Jacobians needed for assembling gradient from adjoint variables
   void applydDdxA0(const F2FScalar *vecs, F2FScalar *prods);
   void applydDdxS0(const F2FScalar *vecs, F2FScalar *prods);
   void applydLdxA0(const F2FScalar *vecs, F2FScalar *prods);
   void applydLdxS0(const F2FScalar *vecs, F2FScalar *prods);
 
+  // Get the sparse matrix of the displacement transfer
+  void getTransferMatrix(int *nrows, int *ncols, const int **rowp,
+                         const int **cols, const F2FScalar **vals);
+
  private:
-  // Data for the transfers
-  F2FScalar *global_H;
+  // Inverses of the point inertia matrices. In the memory-lean mode only the
+  // 6 unique entries of each symmetric inverse are stored.
+  F2FScalar *global_Hinv;
+
+  // Sparse matrix of the displacement transfer in block compressed row
+  // format with 3 x 3 blocks. The load transfer is the transpose.
+  int *mat_rowp;        // Offset of each aerodynamic node into mat_cols
+  int *mat_cols;        // Structural node of each nonzero block
+  F2FScalar *mat_vals;  // Values of the nonzero blocks in row-major order
+  int mat_geometry;     // Value of geometry_count when it was assembled
+
+  // Assemble the sparse matrix for the current node locations
+  void assembleTransferMatrix();
 
   // Auxiliary functions for linearized load and displacement transfer
   void computePointInertiaInverse(const F2FScalar *H, F2FScalar *Hinv);
+  void getPointInertiaInverse(int i, F2FScalar *Hinv);
   void adjPointInertiaInverse(const F2FScalar *Hinv, const F2FScalar *Hinvd,
                               F2FScalar *Hd);
-  void computeDispContribution(const F2FScalar w, const F2FScalar *r,
-                               const F2FScalar *Hinv, const F2FScalar *q,
-                               const F2FScalar *us, F2FScalar *ua);
+  void computeDispMatrix(const F2FScalar w, const F2FScalar *r,
+                         const F2FScalar *Hinv, const F2FScalar *q,
+                         F2FScalar *A);
   void addAdjDispContribution(const F2FScalar w, const F2FScalar *r,
                               const F2FScalar *Hinv, const F2FScalar *q,
                               const F2FScalar *us, const F2FScalar *uad,
                               F2FScalar *rd, F2FScalar *qd, F2FScalar *Hinvd);
-  void computeLoadContribution(const F2FScalar w, const F2FScalar *q,
-                               const F2FScalar *Hinv, const F2FScalar *r,
-                               const F2FScalar *fa, F2FScalar *fj);
   void addAdjLoadContribution(const F2FScalar w, const F2FScalar *r,
                               const F2FScalar *Hinv, const F2FScalar *q,
                               const F2FScalar *fa, const F2FScalar *fjd,
@@ -28,6 +28,13 @@ class LocatePoint {
   void locateKExhaustive(int K, int indices[], F2FScalar dist[],
                          const F2FScalar xpt[]);
 
+  // Locate the K-closest points for each point in a set of points (note that
+  // dist/indices must be of length K*num_xpts)
+  // ---------------------------------------------------------------------
+  void locateKClosestBatch(int K, int num_xpts, const F2FScalar xpts[],
+                           int indices[], F2FScalar dist[],
+                           int num_threads = 1);
+
   // Find the point with the closest taxi-cab distance to the plane
   // --------------------------------------------------------------
   void locateClosestTaxi(int K, int indices[], F2FScalar dist[],
@@ -40,10 +47,22 @@ class LocatePoint {
   void locateKClosest(int K, int root, const F2FScalar xpt[], F2FScalar *dist,
                       int *indices, int *nk);
 
+  void locateKClosestHeap(int K, int root, const F2FScalar xpt[],
+                          F2FScalar *dist, int *indices, int *order, int *nk,
+                          int *count);
+
+  // Find the leaf of the tree that contains a point
+  int findLeaf(const F2FScalar xpt[]);
+
   // Insert the index into the sorted list of indices
   void insertIndex(F2FScalar *dist, int *indices, int *nk, F2FScalar d,
                    int dindex, int K);
 
+  // Insert the index into a heap of the K-closest indices and sort the heap
+  void insertHeapIndex(F2FScalar *dist, int *indices, int *order, int *nk,
+                       F2FScalar d, int dindex, int dorder, int K);
+  void sortHeap(F2FScalar *dist, int *indices, int *order, int nk);
+
   // Sort the list of initial indices into the tree data structure
   int split(int start, int end);
   int splitList(F2FScalar xav[], F2FScalar normal[], int *indices, int npts);
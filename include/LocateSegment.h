@@ -0,0 +1,59 @@
+#ifndef LOCATE_SEGMENT_H
+#define LOCATE_SEGMENT_H
+
+#include "TransferScheme.h"
+
+/*
+  Given a set of line segments in R^3, locate the segment that is closest to
+  a given point. The segments are stored in a bounding volume hierarchy of
+  axis-aligned boxes, so that each search takes roughly O(log(n)) time after
+  an initial O(n log(n)) setup time. The search is exact: the segment that is
+  returned is always the one that an exhaustive search would find, with ties
+  broken in favor of the segment with the lowest index.
+*/
+class LocateSegment {
+ public:
+  LocateSegment(const F2FScalar *_Xpts, int _nsegs, const int *_seg_nodes,
+                int _max_num_segs = 4);
+  ~LocateSegment();
+
+  // Return the index of the closest segment
+  // ---------------------------------------
+  int locateClosest(const F2FScalar xpt[]);
+  int locateExhaustive(const F2FScalar xpt[]);
+
+  // Locate the closest segment for each point in a set of points (note that
+  // segs must be of length num_xpts)
+  // ---------------------------------------------------------------------
+  void locateClosestBatch(int num_xpts, const F2FScalar xpts[], int segs[],
+                          int num_threads = 1);
+
+ private:
+  // The recursive version of the search
+  void locateClosest(int node, const double xpt[], double *dist, int *seg);
+
+  // Build the tree over the segments in indices[start:end]
+  int build(int start, int end);
+
+  // Squared distances from a point to a segment and to the box of a node
+  double segmentDistance(int seg, const double xpt[]);
+  double boxDistance(int node, const double xpt[]);
+
+  // The nodes and the segments
+  const F2FScalar *Xpts;
+  int nsegs;
+  int *seg_nodes;  // The two end nodes of each segment
+
+  int max_num_segs;  // Maximum number of segments stored at a leaf
+  int *indices;      // The segments ordered by the leaves of the tree
+
+  // The tree data
+  int num_nodes;
+  double *node_bounds;  // Lower and upper bounds of the box of each node
+  int *node_left;       // Left child of each node (-1 for a leaf)
+  int *node_right;      // Right child of each node (-1 for a leaf)
+  int *node_start;      // First segment of each node in indices
+  int *node_end;        // End of the segments of each node in indices
+};
+
+#endif  // LOCATE_SEGMENT_H
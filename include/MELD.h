@@ -32,12 +32,31 @@ class MELD : public LDTransferScheme {
   // Destructor
   ~MELD();
 
+  // Do not store the factorizations of M1 for each aerodynamic node. They are
+  // computed when needed instead. This must be set before initialize() is
+  // called.
+  void setMemoryLean(int lean) { memory_lean = lean; }
+
+  // Store single precision copies of the weights and the structural node
+  // locations that are read by the load and displacement transfers and by
+  // their Jacobian-vector products w.r.t. the structural displacements and
+  // aerodynamic loads. The sums are still accumulated in double precision.
+  // The products w.r.t. the initial node locations use the full precision
+  // values. This has no effect in complex mode and must be set before
+  // initialize() is called.
+  void setSinglePrecision(int single);
+
   // Initialization
   void initialize();
+  int updateGeometry();
+
+  // Get the number of bytes allocated for the data stored by the scheme
+  size_t getMemoryUsage();
 
   // Load and displacement transfers
-  void transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps);
-  void transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads);
+  void computeAeroDisps(F2FScalar *aero_disps);
+  void computeStructLoads(const F2FScalar *aero_loads,
+                          F2FScalar *struct_loads_global);
 
   // Action of transpose Jacobians needed for solving adjoint system
   void applydDduS(const F2FScalar *vecs, F2FScalar *prods);
@@ -45,6 +64,11 @@ class MELD : public LDTransferScheme {
   void applydLduS(const F2FScalar *vecs, F2FScalar *prods);
   void applydLduSTrans(const F2FScalar *vecs, F2FScalar *prods);
 
+  // Action of transpose Jacobians on a block of vectors
+  void applydDduSTransBatch(int nvecs, const F2FScalar *vecs, F2FScalar *prods);
+  void applydLduSTransBatch(int nvecs, const F2FScalar *vecs, F2FScalar *prods);
+  void applydLdfATransBatch(int nvecs, const F2FScalar *vecs, F2FScalar *prods);
+
   // Action of Jacobians needed for assembling gradient from adjoint variables
   void applydDdxA0(const F2FScalar *vecs, F2FScalar *prods);
   void applydDdxS0(const F2FScalar *vecs, F2FScalar *prods);
@@ -69,16 +93,76 @@ class MELD : public LDTransferScheme {
   // Data for Jacobian-vector products
   F2FScalar *global_M1;
   int *global_ipiv;
+  int M1_factored;  // flag indicating global_M1 matches global_R/global_S
+  int memory_lean;  // flag to compute the factorizations of M1 when needed
+
+  // Single precision copies of the data read by the transfers
+  int single_precision;    // flag to use the single precision copies
+  float *global_W_single;  // weights
+  float *Xs_single;        // structural and reflected node locations
+
+  // Restart state with the connectivity and the weights
+  size_t getStateSize();
+  void writeState(char *buffer);
+  int readState(const char *buffer, size_t size);
+  uint64_t hashStateOptions(uint64_t key);
+
+  // Append the reflected nodes to an array of values at the structural nodes
+  void reflectStructNodes(F2FScalar *X);
 
-  // Auxiliary functions for displacement transfer
+  // Auxiliary functions for displacement transfer. These read the structural
+  // nodes from arrays that are followed by the reflected nodes.
   void computeCentroid(const int *local_conn, const F2FScalar *W,
                        const F2FScalar *X, F2FScalar *xsbar);
-  void computeCovariance(const F2FScalar *X, const F2FScalar *Xd,
-                         const int *local_conn, const F2FScalar *W,
-                         const F2FScalar *xs0bar, const F2FScalar *xsbar,
-                         F2FScalar *H);
+  void gatherStructNodes(const int *local_conn, const F2FScalar *X,
+                         const F2FScalar *Xd, F2FScalar *x0, F2FScalar *xd);
+  void computeCentroidCovariance(const F2FScalar *W, F2FScalar *x0,
+                                 F2FScalar *xd, F2FScalar *xs0bar,
+                                 F2FScalar *xsbar, F2FScalar *H);
+
+#ifdef FUNTOFEM_USE_COMPLEX
+  // Displacement transfer in real arithmetic for inputs that carry no complex
+  // perturbation
+  void computeAeroDispsReal(const F2FScalar *X0, const F2FScalar *Xd,
+                            F2FScalar *aero_disps);
+#endif  // FUNTOFEM_USE_COMPLEX
+
+  // Get the weight and the structural node location used by the transfers
+  F2FScalar getWeight(int i, int j) {
+    if (global_W_single) {
+      return global_W_single[nn * i + j];
+    }
+    return global_W[nn * i + j];
+  }
+  void getStructNode(int indx, F2FScalar xs0[]) {
+    if (Xs_single) {
+      xs0[0] = Xs_single[3 * indx];
+      xs0[1] = Xs_single[3 * indx + 1];
+      xs0[2] = Xs_single[3 * indx + 2];
+    } else {
+      xs0[0] = Xs[3 * indx];
+      xs0[1] = Xs[3 * indx + 1];
+      xs0[2] = Xs[3 * indx + 2];
+    }
+  }
+
+  // Single precision version of the gather that adds the structural
+  // displacements U to the node locations X
+  void updateSinglePrecision();
+  void gatherStructNodesSingle(const int *local_conn, const float *W,
+                               const float *X, const F2FScalar *U, F2FScalar *w,
+                               F2FScalar *x0, F2FScalar *xd);
+
+  // Add the contributions from a block of aerodynamic nodes to a structural
+  // vector in a fixed order
+  void addStructContributions(int start, int end, int dof,
+                              const F2FScalar *contrib, F2FScalar *struct_vec);
 
   // Auxiliary functions for Jacobian-vector products
+  void factorM1();
+  void getM1(int i, const F2FScalar **M1, const int **ipiv, F2FScalar *M1_work,
+             int *ipiv_work);
+  void computeXX(int i, F2FScalar *XX);
   void assembleM3(const F2FScalar *R, const F2FScalar *S, F2FScalar *A);
 };
 
@@ -35,6 +35,10 @@ class MELDThermal : public ThermalTransfer {
 
   // Initialization
   virtual void initialize();
+  int updateGeometry();
+
+  // Get the number of bytes allocated for the data stored by the scheme
+  size_t getMemoryUsage();
 
   // Set the aerodynamic and structural node locations
   void setStructNodes(const F2FScalar *struct_X, int struct_nnodes);
@@ -50,6 +54,10 @@ class MELDThermal : public ThermalTransfer {
   void applydQdqA(const F2FScalar *vecs, F2FScalar *prods);
   void applydQdqATrans(const F2FScalar *vecs, F2FScalar *prods);
 
+  // Get the sparse matrix of the temperature transfer
+  void getTransferMatrix(int *nrows, int *ncols, const int **rowp,
+                         const int **cols, const F2FScalar **vals);
+
  protected:
   // Symmetry specifier
   int isymm;
@@ -60,6 +68,24 @@ class MELDThermal : public ThermalTransfer {
   int *global_conn;       // connectivity
 
   F2FScalar *global_W;  // The global weights
+
+  // Sparse matrix of the temperature transfer in compressed row format
+  int *mat_rowp;        // Offset of each aerodynamic node into mat_cols
+  int *mat_cols;        // Structural node of each nonzero entry
+  F2FScalar *mat_vals;  // Values of the nonzero entries
+
+  // Restart state with the connectivity and the weights
+  size_t getStateSize();
+  void writeState(char *buffer);
+  int readState(const char *buffer, size_t size);
+  uint64_t hashStateOptions(uint64_t key);
+
+  // Assemble the sparse matrix from the connectivity and the weights
+  void assembleTransferMatrix();
+
+  // Compute y = A*x or add y += A^{T}*x with the sparse matrix
+  void multTransferMatrix(const F2FScalar *x, F2FScalar *y);
+  void addMultTransposeTransferMatrix(const F2FScalar *x, F2FScalar *y);
 };
 
 #endif  // MELD_THERMAL_H
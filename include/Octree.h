@@ -25,10 +25,22 @@ class Octree {
   int nleaf;            // number of leaf bins
   int *leaf_bins;       // IDs of leaf bins
 
+  // Points sorted by bin: the points in bin i are
+  // point_ids[bin_ptr[2*i]], ..., point_ids[bin_ptr[2*i+1]-1]
+  int *point_ids;  // IDs of the points ordered by bin
+  int *bin_ptr;    // start and end of the range of points in each bin
+
  private:
   // Recursive function used by initialize to create octree
   bool divide(int bin_num);
 
+  // Extend the bin arrays so that they can store one new bin
+  void extendBins();
+
+  // Allocated lengths of the bin and leaf arrays
+  int max_bins;
+  int max_leaf;
+
   // Recursion exit conditions
   int min_points;
   double min_edge;
@@ -10,6 +10,12 @@
   The basic algorithm and notation (names of variables) were taken from
   "Unified fluid–structure interpolation and mesh motion using radial basis
   functions" by T. C. S. Rendall and C. B. Allen.
+
+  The Wendland basis functions have compact support. For these types, the
+  interpolation and RBF matrices are stored in a sparse (CSR) format and the
+  interpolation system is solved with the conjugate gradient method,
+  preconditioned with an incomplete Cholesky factorization, instead of
+  forming the dense interpolation matrix.
 */
 class RBF : public LDTransferScheme {
  public:
@@ -18,7 +24,10 @@ class RBF : public LDTransferScheme {
     GAUSSIAN,
     MULTIQUADRIC,
     INVERSE_MULTIQUADRIC,
-    THIN_PLATE_SPLINE
+    THIN_PLATE_SPLINE,
+    WENDLAND_C0,
+    WENDLAND_C2,
+    WENDLAND_C4
   };
 
   // Constructor
@@ -28,12 +37,34 @@ class RBF : public LDTransferScheme {
   // Destructor
   ~RBF();
 
+  // Set the support radius of the compactly supported basis functions. This
+  // must be set before initialize() is called.
+  void setSupportRadius(double radius) { support_radius = radius; }
+
+  // Set the seed used to randomly sample the structural nodes
+  void setSamplingSeed(unsigned int seed) { sampling_seed = seed; }
+
+  // Set the relative tolerance and the maximum number of iterations of the
+  // iterative solver used with the compactly supported basis functions
+  void setSolverOptions(double rtol, int max_iters) {
+    solver_rtol = rtol;
+    solver_max_iters = max_iters;
+  }
+
+  // Check whether the iterative solves of the last operation converged on
+  // every processor
+  int getSolverConverged() { return solver_converged; }
+
   // Initialization
   void initialize();
 
+  // Get the number of bytes allocated for the data stored by the scheme
+  size_t getMemoryUsage();
+
   // Load and displacement transfers
-  void transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps);
-  void transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads);
+  void computeAeroDisps(F2FScalar *aero_disps);
+  void computeStructLoads(const F2FScalar *aero_loads,
+                          F2FScalar *struct_loads_global);
 
   // Action of transpose Jacobians needed for solving adjoint system
   void applydDduS(const F2FScalar *vecs, F2FScalar *prods);
@@ -54,19 +85,75 @@ class RBF : public LDTransferScheme {
   // Function to build interpolation matrix
   void buildInterpolationMatrix();
 
-  // Pointer to radial basis function
+  // Type and pointer to radial basis function
+  RbfType basis_type;
   F2FScalar (*phi)(F2FScalar *x, F2FScalar *y);
 
+  // Compactly supported basis function data
+  int compact_support;    // flag for compactly supported basis functions
+  double support_radius;  // radius of the support of the basis functions
+  double solver_rtol;     // relative tolerance of the iterative solver
+  int solver_max_iters;   // maximum number of iterations of the solver
+  int solver_converged;   // flag for convergence of the last solves
+  F2FScalar (*phi_compact)(F2FScalar r);  // function of r/support_radius
+
+  // Sparse RBF matrix between the sampled structural nodes
+  int *M_rowp, *M_cols;
+  F2FScalar *M_vals;
+
+  // Incomplete Cholesky factor of the sparse RBF matrix
+  int *L_rowp, *L_cols;
+  F2FScalar *L_vals;
+
+  // Sparse RBF matrix between the aerodynamic and sampled structural nodes
+  int *A_rowp, *A_cols;
+  F2FScalar *A_vals;
+
+  // Polynomial terms of the interpolation
+  int npoly;          // number of polynomial terms
+  int poly_dims[3];   // coordinate directions of the linear terms
+  F2FScalar *PT;      // polynomial terms at the sampled structural nodes
+  F2FScalar *A_poly;  // polynomial terms at the aerodynamic nodes
+  F2FScalar *MinvPT;  // M^{-1}*P^{T}
+  F2FScalar *Mp;      // (P*M^{-1}*P^{T})^{-1}
+
+  // Functions for the compactly supported basis functions
+  int buildSparseInterpolation();
+  void computeCompactMatrix(int nrows, const F2FScalar *X, int **_rowp,
+                            int **_cols, F2FScalar **_vals);
+  void evalPoly(const F2FScalar *x, F2FScalar *p);
+  void factorPreconditioner();
+  void applyPreconditioner(const F2FScalar *r, F2FScalar *z);
+  int solveRBFSystem(const F2FScalar *b, F2FScalar *x);
+  int solveInterpSystem(const F2FScalar *rhs_rbf, const F2FScalar *rhs_poly,
+                        F2FScalar *coef_rbf, F2FScalar *coef_poly);
+  void checkSolverConvergence(int converged);
+  void freeSparseData();
+
+  // Restart state with the sampled points and the interpolation matrix
+  size_t getStateSize();
+  void writeState(char *buffer);
+  int readState(const char *buffer, size_t size);
+  void clearState();
+  uint64_t hashStateOptions(uint64_t key);
+  int restart_nsub;                 // number of sampled points in the state
+  const int *restart_sample_ids;    // sampled points in the state
+  const F2FScalar *restart_interp;  // interpolation matrix in the state
+
   // Sampling data
-  int denominator;  // one point sampled for every denominator points
-  int nsub;         // number of structural points sampled
-  int *sample_ids;  // IDs of the sampled points
+  int denominator;             // one point sampled for every denominator points
+  int nsub;                    // number of structural points sampled
+  unsigned int sampling_seed;  // seed for the random sampling
+  int *sample_ids;             // IDs of the sampled points
 
   // Functions defining types of radial basis functions
   static F2FScalar gaussian(F2FScalar *x, F2FScalar *y);
   static F2FScalar multiquadric(F2FScalar *x, F2FScalar *y);
   static F2FScalar invMultiquadric(F2FScalar *x, F2FScalar *y);
   static F2FScalar thinPlateSpline(F2FScalar *x, F2FScalar *y);
+  static F2FScalar wendlandC0(F2FScalar r);
+  static F2FScalar wendlandC2(F2FScalar r);
+  static F2FScalar wendlandC4(F2FScalar r);
 
   // Function to write out point clouds for Tecplot visualization
   void writeCloudsToTecplot();
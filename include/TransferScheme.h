@@ -1,6 +1,9 @@
 #ifndef TRANSFER_SCHEME_H
 #define TRANSFER_SCHEME_H
 
+#include <stdint.h>
+#include <stdlib.h>
+
 #include <complex>
 
 #include "mpi.h"
@@ -61,14 +64,63 @@ class TransferScheme {
         aero_node_dof(aero_node_dof) {
     na = 0;
     na_global = 0;
+    Xa_bar[0] = Xa_bar[1] = Xa_bar[2] = 0.0;
     ns = 0;
     ns_local = 0;
     mesh_update = 0;
+    geometry_count = 0;
 
     Xa = NULL;        // Local array of aerodynamic nodes
     Xs = NULL;        // Global array of structural nodes
     Xs_local = NULL;  // Local array of structural nodes
 
+    // Communication pattern for the distributed structural mesh
+    struct_distributed = 0;
+    plan_send_counts = NULL;
+    plan_send_disps = NULL;
+    plan_send_nodes = NULL;
+    plan_recv_counts = NULL;
+    plan_recv_disps = NULL;
+
+    // Communication plan for the collectives and the scratch arrays
+    int size;
+    MPI_Comm_size(global_comm, &size);
+    comm_counts = new int[8 * size];
+    weights_real = 1;
+    struct_global_info = NULL;
+    struct_contiguous = 0;
+    exchange_request = MPI_REQUEST_NULL;
+    exchange_dof = 0;
+    exchange_local = NULL;
+    struct_node_counts = NULL;
+    struct_node_disps = NULL;
+    aero_node_counts = NULL;
+    aero_node_disps = NULL;
+    for (int k = 0; k < NUM_WORK_ARRAYS; k++) {
+      work[k] = NULL;
+      work_len[k] = 0;
+    }
+
+    // Node locations used to compute the connectivity
+    conn_na = -1;
+    conn_ns_local = -1;
+    conn_gap = 0.0;
+    conn_Xa = NULL;
+    conn_Xs_local = NULL;
+
+    // Connectivity and weights read from a restart file
+    restart_nn = 0;
+    restart_gap = 0.0;
+    restart_conn = NULL;
+    restart_W = NULL;
+
+    // Set the number of threads used by the transfer kernels
+    num_threads = 1;
+    const char *env_threads = getenv("FUNTOFEM_NUM_THREADS");
+    if (env_threads) {
+      setNumThreads(atoi(env_threads));
+    }
+
     object_id = object_count;
     object_count++;
   }
@@ -83,6 +135,35 @@ class TransferScheme {
   // Initialization
   virtual void initialize() = 0;
 
+  // Update the transfer scheme after the node locations have been changed
+  // with setAeroNodes/setStructNodes. By default, the scheme is initialized
+  // again. Returns 1 if the scheme was initialized again.
+  virtual int updateGeometry() {
+    initialize();
+    return 1;
+  }
+
+  // Only store the structural nodes connected to the local aerodynamic nodes
+  // on each processor. This must be set before initialize() is called.
+  void setDistributedStructMesh(int distributed) {
+    struct_distributed = distributed;
+  }
+
+  // Save the data computed by initialize() to a restart file, or initialize
+  // the scheme from a restart file. The file stores the state of each
+  // processor and is keyed by the node locations and the options of the
+  // scheme. loadState returns 0 if the file does not match, in which case
+  // initialize() must be called instead.
+  int saveState(const char *filename);
+  int loadState(const char *filename);
+
+  // Set the number of threads used by the transfer kernels
+  void setNumThreads(int nthreads);
+  int getNumThreads() { return num_threads; }
+
+  // Get the number of bytes allocated for the data stored by the scheme
+  virtual size_t getMemoryUsage();
+
   // Get information from the transfer object about the lengths of the expected
   // arrays
   int getStructNodeDof() { return struct_node_dof; }
@@ -115,13 +196,82 @@ class TransferScheme {
   void aeroGatherBcast(int local_len, const F2FScalar *local_data,
                        int global_len, F2FScalar *global_data);
 
+  // Replace the global structural mesh with the structural nodes referenced
+  // in the connectivity and build the point-to-point communication pattern
+  void localizeStructuralMesh(int nn, int *conn);
+  void freeStructPlan();
+
+  // Exchange structural values between the owning processors and the local
+  // images of the structural mesh using the point-to-point pattern
+  void structPlanForward(int dof, const F2FScalar *local_data,
+                         F2FScalar *image_data);
+  void structPlanReverse(int dof, const F2FScalar *image_data,
+                         F2FScalar *local_data);
+  void structPlanForwardBegin(int dof, const F2FScalar *local_data,
+                              F2FScalar *image_data);
+  void structPlanReverseBegin(int dof, const F2FScalar *image_data,
+                              F2FScalar *local_data);
+
+  // Nonblocking versions of structGatherBcast and structAddScatter. Only one
+  // exchange can be in progress at a time and it is completed by
+  // structExchangeEnd.
+  void structGatherBcastBegin(int local_len, const F2FScalar *local_data,
+                              int global_len, F2FScalar *global_data);
+  void structAddScatterBegin(int global_len, F2FScalar *global_data,
+                             int local_len, F2FScalar *local_data);
+  void structExchangeEnd();
+
+  // Scratch arrays that are kept between transfers. COMM_WORK is used by
+  // the collectives, the others are free for use by the transfer schemes.
+  // STRUCT_WORK holds the structural loads until endTransferLoads, so any
+  // exchange in progress must be completed before it is reused.
+  enum WorkArray { COMM_WORK, STRUCT_WORK, BLOCK_WORK, NUM_WORK_ARRAYS };
+  F2FScalar *getWorkArray(int k, int len);
+
   // Build an aerostructural connectivity through LocatePoint search, linking
   // each aerodynamic node with a specified number of nearest structural nodes
   void computeAeroStructConn(int isymm, int nn, int *conn, double tol = 1e-7);
 
+  // Record the node locations used to compute the connectivity, or the
+  // current node locations with a separation that accounts for the motion
+  void recordConnNodes();
+  void rebaseAeroStructConn();
+
+  // Check whether the connectivity from the last call to computeAeroStructConn
+  // is still valid for the current node locations
+  int checkAeroStructConn(int isymm, double tol = 1e-7);
+
   // Computes weights of structural nodes based on an exponential decay
   void computeWeights(double beta, int isymm, int nn, const int *conn,
                       F2FScalar *W, double tol = 1e-7);
+  int weights_real;  // Flag indicating the last weights computed are real
+
+  // Compute the nonzero pattern of the sparse matrix that maps the structural
+  // nodes to the aerodynamic nodes through the connectivity
+  void computeTransferPattern(int nn, const int *conn, int *rowp, int *cols,
+                              int *entry);
+
+  // Restart state of the scheme on this processor. getStateSize returns the
+  // number of bytes of the state (0 if the scheme has no state to save),
+  // writeState packs the state and readState checks a packed state and
+  // keeps it for the following call to initialize(). clearState releases a
+  // state kept by readState once the buffer is freed.
+  virtual size_t getStateSize() { return 0; }
+  virtual void writeState(char *buffer) {}
+  virtual int readState(const char *buffer, size_t size) { return 0; }
+  virtual void clearState() {}
+
+  // Add the options of the scheme to the key of the restart state
+  virtual uint64_t hashStateOptions(uint64_t key) { return key; }
+  uint64_t computeStateKey();
+  static uint64_t hashBytes(uint64_t key, const void *data, size_t len);
+
+  // Restart state of the schemes based on computeAeroStructConn and
+  // computeWeights
+  size_t getConnStateSize(int nn);
+  void writeConnState(int nn, const int *conn, const F2FScalar *W,
+                      char *buffer);
+  int readConnState(const char *buffer, size_t size);
 
   // Communicators
   MPI_Comm global_comm;  // Global communicator
@@ -135,10 +285,14 @@ class TransferScheme {
   // Keep track if the mesh has been updated
   int mesh_update;
 
+  // Number of times the aerodynamic or structural node locations have changed
+  int geometry_count;
+
   // Aerodynamic data
   F2FScalar *Xa;  // Aerodynamics node locations (x, y, z) at each node
   int na;         // Number of local aerodynamic nodes
   int na_global;  // Number of global aerodynamic nodes (on all aero procs)
+  F2FScalar Xa_bar[3];  // Centroid of the aerodynamic nodes on all procs
 
   // Structural data
   // Degrees of freedom per node for the structural solution and load vector.
@@ -154,6 +308,55 @@ class TransferScheme {
   int ns;        // Number of global structural nodes across all struct procs
   int ns_local;  // Number of local structural nodes on this processor
 
+  // Distributed structural mesh data. When struct_distributed is set, Xs and
+  // ns refer only to the structural nodes referenced on this processor.
+  int struct_distributed;  // Flag to only store the referenced nodes
+  int *plan_send_counts;   // Number of local nodes sent to each processor
+  int *plan_send_disps;    // Offsets into plan_send_nodes for each processor
+  int *plan_send_nodes;    // Local structural nodes sent to other processors
+  int *plan_recv_counts;   // Number of nodes received from each processor
+  int *plan_recv_disps;    // Offsets into the local image for each processor
+
+  // Number of nodes and offsets for each processor used by the collectives.
+  // These are exchanged once when the node locations are set.
+  int *struct_node_counts;  // Structural nodes on each struct_comm proc
+  int *struct_node_disps;   // Offsets of the structural nodes
+  int *aero_node_counts;    // Aerodynamic nodes on each aero_comm proc
+  int *aero_node_disps;     // Offsets of the aerodynamic nodes
+  int *comm_counts;         // Scaled counts and offsets (8 x global size)
+
+  // Location of the structural nodes of each processor on global_comm in
+  // the global ordering, and the state of the nonblocking exchange
+  int *struct_global_info;       // Number of nodes and offset for each proc
+  int struct_contiguous;         // Offsets increase with the global rank
+  MPI_Request exchange_request;  // Request for the exchange in progress
+  int exchange_dof;              // Values per node for a reverse exchange
+  F2FScalar *exchange_local;     // Output of a reverse exchange
+
+  // Scratch arrays kept between transfers
+  F2FScalar *work[NUM_WORK_ARRAYS];
+  int work_len[NUM_WORK_ARRAYS];
+
+  // Node locations used to compute the connectivity and the smallest
+  // separation between the farthest connected and the nearest unconnected
+  // structural node of any aerodynamic node
+  int conn_na;               // Number of local aero nodes (-1 if not built)
+  int conn_ns_local;         // Number of local structural nodes
+  double conn_gap;           // Smallest separation on this processor
+  F2FScalar *conn_Xa;        // Local aerodynamic node locations
+  F2FScalar *conn_Xs_local;  // Local structural node locations
+
+  // Connectivity and weights read from a restart file. These are used in
+  // place of the search by the next call to computeAeroStructConn with the
+  // same number of nearest nodes and by the call to computeWeights after it.
+  int restart_nn;              // Number of nearest nodes
+  double restart_gap;          // Separation stored in conn_gap
+  const int *restart_conn;     // Connectivity
+  const F2FScalar *restart_W;  // Weights
+
+  // Number of threads used by the transfer kernels
+  int num_threads;
+
   // Transfer scheme object counter and ID
   static int object_count;
   int object_id;
@@ -179,9 +382,28 @@ class LDTransferScheme : public TransferScheme {
 
   // Load and displacement transfers
   virtual void transferDisps(const F2FScalar *struct_disps,
-                             F2FScalar *aero_disps) = 0;
+                             F2FScalar *aero_disps);
   virtual void transferLoads(const F2FScalar *aero_loads,
-                             F2FScalar *struct_loads) = 0;
+                             F2FScalar *struct_loads);
+
+  // Nonblocking load and displacement transfers. The communication of the
+  // structural values is started by the begin call and completed by the end
+  // call, so that other work can be done in between. The structural arrays
+  // must not be used until the end call returns.
+  void beginTransferDisps(const F2FScalar *struct_disps);
+  void endTransferDisps(F2FScalar *aero_disps);
+  void beginTransferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads);
+  void endTransferLoads();
+
+  // Compute the aerodynamic displacements from the structural displacements
+  // stored in Us, and add the structural loads to the global image of the
+  // structural nodes
+  virtual void computeAeroDisps(F2FScalar *aero_disps) = 0;
+  virtual void computeStructLoads(const F2FScalar *aero_loads,
+                                  F2FScalar *struct_loads_global) = 0;
+
+  // Get the number of bytes allocated for the data stored by the scheme
+  virtual size_t getMemoryUsage();
 
   // Action of transpose Jacobians needed for solving adjoint system
   virtual void applydDduS(const F2FScalar *vecs, F2FScalar *prods) = 0;
@@ -199,6 +421,18 @@ class LDTransferScheme : public TransferScheme {
     applydDduS(vecs, prods);
   }
 
+  // Action of the transpose Jacobians on a block of nvecs vectors. The blocks
+  // are stored row-wise with nvecs consecutive entries for each degree of
+  // freedom, so that the entry for vector k of degree of freedom i is stored
+  // at vecs[nvecs * i + k]. By default, the single vector products are applied
+  // to each vector in turn.
+  virtual void applydDduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                    F2FScalar *prods);
+  virtual void applydLduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                    F2FScalar *prods);
+  virtual void applydLdfATransBatch(int nvecs, const F2FScalar *vecs,
+                                    F2FScalar *prods);
+
   // Action of Jacobians needed for assembling gradient from adjoint
   // variables
   virtual void applydDdxA0(const F2FScalar *vecs, F2FScalar *prods) = 0;
@@ -261,12 +495,17 @@ class LDTransferScheme : public TransferScheme {
   F2FScalar xa0bar[3];
   F2FScalar xabar[3];
 
-  // Auxiliary function for computing rotation from covariance matrix
+  // Auxiliary functions for computing rotation from covariance matrix
   void computeRotation(const F2FScalar *H, F2FScalar *R, F2FScalar *S);
+  void computeRotationSVD(const F2FScalar *H, F2FScalar *R);
 
   // Auxiliary functions for load transfer (needed in complex compute
   // rotation)
   void assembleM1(const F2FScalar *R, const F2FScalar *S, F2FScalar *A);
+
+  // Contract the sensitivities of the equivalent rigid rotation
+  void computeRigidRotationSens(const F2FScalar *psi_R, F2FScalar *Y,
+                                const F2FScalar *psi_t, F2FScalar *X);
 };
 
 class ThermalTransfer : public TransferScheme {
@@ -287,6 +526,9 @@ class ThermalTransfer : public TransferScheme {
     }
   }
 
+  // Get the number of bytes allocated for the data stored by the scheme
+  virtual size_t getMemoryUsage();
+
   // Temperature and flux transfers
   virtual void transferTemp(const F2FScalar *struct_temp,
                             F2FScalar *aero_temp) = 0;
@@ -332,5 +574,12 @@ void vec_cross(const F2FScalar *x, const F2FScalar *y, F2FScalar *xy);
 F2FScalar vec_mag(const F2FScalar *x);
 F2FScalar vec_dot(const F2FScalar *x, const F2FScalar *y);
 F2FScalar det(const F2FScalar *A);
+void cofactor(const F2FScalar *A, F2FScalar *C);
+int computePolarRotation(const F2FScalar *H, F2FScalar *R);
+#ifdef FUNTOFEM_USE_COMPLEX
+void cofactor(const F2FReal *A, F2FReal *C);
+int computePolarRotation(const F2FReal *H, F2FReal *R);
+#endif  // FUNTOFEM_USE_COMPLEX
+int isRealValued(int n, const F2FScalar *x);
 
 #endif  // TRANSFER_SCHEME_H
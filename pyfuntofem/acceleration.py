@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+"""
+This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+and design optimization.
+
+Copyright (C) 2015 Georgia Tech Research Corporation.
+Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+All rights reserved.
+
+FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+you may not use this software except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import numpy as np
+from mpi4py import MPI
+
+
+class Acceleration(object):
+    """
+    Base class for the acceleration of the coupling iterations of the NLBGS
+    driver.
+
+    In the forward analysis, the iterate is the vector of the structural
+    displacements and temperatures of all the bodies. apply is called after
+    each structural solve and replaces the new iterate with the accelerated
+    one. In the adjoint, the iterate is the block of the load and heat flux
+    transfer adjoint terms, struct_loads_ajp and struct_flux_ajp, with one
+    column for each function.
+    """
+
+    def __init__(self, tol=None, adjoint_tol=None):
+        """
+        Parameters
+        ----------
+        tol: float
+            the forward iterations stop when the norm of the change in the
+            iterate is less than tol
+        adjoint_tol: float
+            the adjoint iterations stop when the norm of the change in the
+            iterate for every function is less than adjoint_tol
+        """
+        self.tol = tol
+        self.adjoint_tol = adjoint_tol
+        self.comm = MPI.COMM_WORLD
+
+        return
+
+    def set_comm(self, comm):
+        """
+        Set the communicator used for the norms and inner products
+        """
+        self.comm = comm
+
+        return
+
+    def initialize(self, scenario, bodies):
+        """
+        Initialize the acceleration before the forward iterations
+        """
+        return
+
+    def apply(self, scenario, bodies):
+        """
+        Accelerate the forward iterate after a structural solve
+
+        Returns
+        -------
+        converged: bool
+            whether the coupling iterations have converged
+        """
+        return False
+
+    def initialize_adjoint(self, scenario, bodies):
+        """
+        Initialize the acceleration before the adjoint iterations
+        """
+        return
+
+    def apply_adjoint(self, scenario, bodies):
+        """
+        Accelerate the adjoint iterate after a structural adjoint solve
+
+        Returns
+        -------
+        converged: bool
+            whether the coupling iterations have converged
+        """
+        return False
+
+
+class AitkenAcceleration(Acceleration):
+    """
+    Aitken under-relaxation applied to each body separately, using the
+    settings of the bodies
+    """
+
+    def apply(self, scenario, bodies):
+        for body in bodies:
+            body.aitken_relax(scenario)
+
+        return False
+
+    def apply_adjoint(self, scenario, bodies):
+        for body in bodies:
+            body.aitken_adjoint_relax(scenario)
+
+        return False
+
+
+class AndersonAcceleration(Acceleration):
+    """
+    Anderson mixing for the coupling iterations.
+
+    For the fixed-point iteration x = G(x), with the residual f = G(x) - x,
+    the next iterate is
+
+    x_{k+1} = x_k + beta*f_k - (dX + beta*dF)*gamma
+
+    where dX and dF store the differences between the last depth iterates and
+    residuals, and gamma minimizes ||f_k - dF*gamma||. The first iteration is
+    relaxed with omega.
+
+    The adjoint iterations are the transpose of the linearized forward
+    iterations and are accelerated in the same way, with the least-squares
+    problem solved separately for each function.
+    """
+
+    def __init__(self, depth=5, beta=1.0, omega=0.125, tol=None, adjoint_tol=None):
+        """
+        Parameters
+        ----------
+        depth: int
+            the number of previous iterations kept
+        beta: float
+            the mixing parameter
+        omega: float
+            relaxation for the first iteration
+        tol: float
+            the forward iterations stop when the norm of the change in the
+            iterate is less than tol
+        adjoint_tol: float
+            the adjoint iterations stop when the norm of the change in the
+            iterate for every function is less than adjoint_tol
+        """
+        super(AndersonAcceleration, self).__init__(tol=tol, adjoint_tol=adjoint_tol)
+        self.depth = depth
+        self.beta = beta
+        self.omega = omega
+
+        return
+
+    def initialize(self, scenario, bodies):
+        x = self._get_forward_iterate(scenario, bodies)
+        self._reset(x.reshape(-1, 1))
+
+        return
+
+    def apply(self, scenario, bodies):
+        g = self._get_forward_iterate(scenario, bodies)
+        x, norm = self._update(g.reshape(-1, 1))
+        self._set_forward_iterate(scenario, bodies, x[:, 0])
+
+        return self.tol is not None and norm[0] < self.tol
+
+    def initialize_adjoint(self, scenario, bodies):
+        x = self._get_adjoint_iterate(scenario, bodies)
+        self._reset(x)
+
+        return
+
+    def apply_adjoint(self, scenario, bodies):
+        g = self._get_adjoint_iterate(scenario, bodies)
+        x, norm = self._update(g)
+        self._set_adjoint_iterate(scenario, bodies, x)
+
+        return self.adjoint_tol is not None and np.all(norm < self.adjoint_tol)
+
+    def _reset(self, x):
+        self.x = x
+        self.f_prev = None
+        self.g_prev = None
+        self.dF = []
+        self.dG = []
+
+        return
+
+    def _update(self, g):
+        """
+        Compute the next iterate from the output of the fixed-point map g for
+        each column of the block
+
+        Returns
+        -------
+        x: numpy array
+            the next iterate
+        norm: numpy array
+            the norm of the residual for each column
+        """
+        f = g - self.x
+
+        if self.f_prev is not None:
+            self.dF.append(f - self.f_prev)
+            self.dG.append(g - self.g_prev)
+            if len(self.dF) > self.depth:
+                self.dF.pop(0)
+                self.dG.pop(0)
+        self.f_prev = f
+        self.g_prev = g.copy()
+
+        # The norms use the real part so that the iterations are the same in
+        # complex step, while the inner products for gamma are not conjugated
+        norm = np.einsum("nk,nk->k", f.real, f.real)
+        norm = np.sqrt(self.comm.allreduce(norm))
+
+        if len(self.dF) == 0:
+            x = self.x + self.omega * f
+        else:
+            dF = np.array(self.dF)
+            dG = np.array(self.dG)
+            A = self.comm.allreduce(np.einsum("ink,jnk->kij", dF, dF))
+            b = self.comm.allreduce(np.einsum("ink,nk->ki", dF, f))
+
+            # Regularize the normal equations for nearly dependent differences
+            m = dF.shape[0]
+            gamma = np.zeros(b.shape, dtype=b.dtype)
+            for k in range(A.shape[0]):
+                scale = np.real(np.trace(A[k])) / m
+                if scale > 0.0:
+                    reg = 1e-12 * scale * np.eye(m)
+                    gamma[k] = np.linalg.solve(A[k] + reg, b[k])
+
+            # dX + beta*dF = dG - (1 - beta)*dF
+            x = self.x + self.beta * f
+            x -= np.einsum("ink,ki->nk", dG, gamma)
+            if self.beta != 1.0:
+                x += (1.0 - self.beta) * np.einsum("ink,ki->nk", dF, gamma)
+
+        self.x = x
+
+        return x.copy(), norm
+
+    def _get_forward_iterate(self, scenario, bodies):
+        vecs = []
+        for body in bodies:
+            struct_disps = body.get_struct_disps(scenario)
+            if struct_disps is not None:
+                vecs.append(struct_disps)
+            struct_temps = body.get_struct_temps(scenario)
+            if struct_temps is not None:
+                vecs.append(struct_temps)
+
+        if len(vecs) == 0:
+            return np.zeros(0)
+        return np.concatenate(vecs)
+
+    def _set_forward_iterate(self, scenario, bodies, x):
+        offset = 0
+        for body in bodies:
+            struct_disps = body.get_struct_disps(scenario)
+            if struct_disps is not None:
+                struct_disps[:] = x[offset : offset + struct_disps.size]
+                offset += struct_disps.size
+            struct_temps = body.get_struct_temps(scenario)
+            if struct_temps is not None:
+                struct_temps[:] = x[offset : offset + struct_temps.size]
+                offset += struct_temps.size
+
+        return
+
+    def _get_adjoint_iterate(self, scenario, bodies):
+        nfunctions = scenario.count_adjoint_functions()
+        blocks = []
+        for body in bodies:
+            struct_loads_ajp = body.get_struct_loads_ajp(scenario)
+            if struct_loads_ajp is not None:
+                blocks.append(struct_loads_ajp)
+            struct_flux_ajp = body.get_struct_heat_flux_ajp(scenario)
+            if struct_flux_ajp is not None:
+                blocks.append(struct_flux_ajp)
+
+        if len(blocks) == 0:
+            return np.zeros((0, nfunctions))
+        return np.concatenate(blocks, axis=0)
+
+    def _set_adjoint_iterate(self, scenario, bodies, x):
+        offset = 0
+        for body in bodies:
+            struct_loads_ajp = body.get_struct_loads_ajp(scenario)
+            if struct_loads_ajp is not None:
+                n = struct_loads_ajp.shape[0]
+                struct_loads_ajp[:] = x[offset : offset + n]
+                offset += n
+            struct_flux_ajp = body.get_struct_heat_flux_ajp(scenario)
+            if struct_flux_ajp is not None:
+                n = struct_flux_ajp.shape[0]
+                struct_flux_ajp[:] = x[offset : offset + n]
+                offset += n
+
+        return
+
+
+class IQNILSAcceleration(AndersonAcceleration):
+    """
+    The interface quasi-Newton method with an inverse Jacobian from a least
+    squares model (IQN-ILS).
+
+    The differences of the last depth iterations of the interface residual
+    define a least-squares model of the inverse Jacobian of the residual. This
+    is algebraically the same update as Anderson mixing with beta = 1.
+    """
+
+    def __init__(self, depth=5, omega=0.125, tol=None, adjoint_tol=None):
+        """
+        Parameters
+        ----------
+        depth: int
+            the number of previous iterations kept
+        omega: float
+            relaxation for the first iteration
+        tol: float
+            the forward iterations stop when the norm of the change in the
+            iterate is less than tol
+        adjoint_tol: float
+            the adjoint iterations stop when the norm of the change in the
+            iterate for every function is less than adjoint_tol
+        """
+        super(IQNILSAcceleration, self).__init__(
+            depth=depth, beta=1.0, omega=omega, tol=tol, adjoint_tol=adjoint_tol
+        )
+
+        return
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+and design optimization.
+
+Copyright (C) 2015 Georgia Tech Research Corporation.
+Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+All rights reserved.
+
+FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+you may not use this software except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import numpy as np
+
+
+def _column_dot(a, b):
+    """
+    Compute the sum over the rows of a*b for each column without forming a*b
+    """
+    return np.einsum("i...,i...->...", a, b)
+
+
+def aitken_update(vec, aitken_vec, prev_update, theta, theta_min, theta_max, tol):
+    """
+    Apply one step of Aitken under-relaxation in place.
+
+    The arrays are either vectors of length n, or (n x nfunc) blocks where each
+    column is relaxed with its own value of theta. All of the reductions are
+    computed column by column over the whole block at once.
+
+    Parameters
+    ----------
+    vec: numpy array
+        the new unrelaxed iterate, overwritten with the relaxed iterate
+    aitken_vec: numpy array
+        the previous relaxed iterate, updated in place
+    prev_update: numpy array
+        the previous update, overwritten with the new update
+    theta: float or numpy array
+        the relaxation parameter, or one per column
+    theta_min: float
+        minimum value of theta
+    theta_max: float
+        maximum value of theta
+    tol: float
+        theta is only updated for the columns where the squared norm of the
+        change in the update is larger than tol
+
+    Returns
+    -------
+    theta: float or numpy array
+        the new relaxation parameter(s)
+    """
+
+    # Compute the update in place of the iterate
+    up = np.subtract(vec, aitken_vec, out=vec)
+
+    # Overwrite the previous update with the (negative) change in the update
+    diff = np.subtract(prev_update, up, out=prev_update)
+
+    if np.iscomplexobj(diff):
+        norm2 = _column_dot(diff.real, diff.real) + _column_dot(diff.imag, diff.imag)
+    else:
+        norm2 = _column_dot(diff, diff)
+    dot = -_column_dot(diff, up)
+
+    # Only update theta if the iterate changed. Only the real part is used so
+    # that theta is not perturbed in complex step.
+    mask = norm2 > tol
+    ratio = np.real(dot) / np.where(mask, norm2, 1.0)
+    theta = np.where(mask, theta * (1.0 - ratio), theta)
+    theta = np.clip(np.real(theta), theta_min, theta_max)
+
+    # Store the update and apply the relaxation
+    prev_update[...] = up
+    up *= theta
+    aitken_vec += up
+    vec[...] = aitken_vec
+
+    if np.ndim(theta) == 0:
+        return float(theta)
+    return theta
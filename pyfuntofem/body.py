@@ -22,6 +22,8 @@ limitations under the License.
 
 import numpy as np
 from .base import Base
+from .aitken import aitken_update
+from .history_store import HistoryStore
 from mpi4py import MPI
 from funtofem import TransferScheme
 
@@ -124,6 +126,9 @@ class Body(Base):
         # heat flux and temperature transfer
         self.thermal_transfer = None
 
+        # update the transfer geometry when the node locations change
+        self.update_transfer_geometry = False
+
         # Number of nodes
         self.struct_nnodes = 0
         self.aero_nnodes = 0
@@ -151,6 +156,7 @@ class Body(Base):
 
         self.aitken_init = None
         self.aitken_vec = None
+        self.theta_forward = {}
         self.aitken_therm_vec = None
         self.up_prev = None
         self.therm_up_prev = None
@@ -170,6 +176,23 @@ class Body(Base):
         self.aero_temps = {}
         self.aero_heat_flux = {}
 
+        # storage for the time histories of unsteady scenarios
+        self.history_store = HistoryStore()
+
+        return
+
+    def set_history_store(self, history_store):
+        """
+        Set the storage used for the time histories of unsteady scenarios.
+        The new storage is used the next time the variables are initialized.
+
+        Parameters
+        ----------
+        history_store: :class:`~history_store.HistoryStore`
+            the storage for the time histories
+        """
+        self.history_store = history_store
+
         return
 
     def initialize_struct_nodes(self, struct_X, struct_id=None):
@@ -340,6 +363,12 @@ class Body(Base):
                         == "inverse multiquadric"
                     ):
                         basis = TransferScheme.PY_INVERSE_MULTIQUADRIC
+                    elif transfer_options["basis function"].lower() == "wendland c0":
+                        basis = TransferScheme.PY_WENDLAND_C0
+                    elif transfer_options["basis function"].lower() == "wendland c2":
+                        basis = TransferScheme.PY_WENDLAND_C2
+                    elif transfer_options["basis function"].lower() == "wendland c4":
+                        basis = TransferScheme.PY_WENDLAND_C4
                     else:
                         print("Unknown RBF basis function for body number")
                         quit()
@@ -348,6 +377,20 @@ class Body(Base):
                     comm, struct_comm, struct_root, aero_comm, aero_root, basis, 1
                 )
 
+                # Support radius of the compactly supported basis functions
+                if "support radius" in transfer_options:
+                    self.transfer.setSupportRadius(transfer_options["support radius"])
+
+                # Tolerance and iteration limit of the iterative solver
+                if (
+                    "solver rtol" in transfer_options
+                    or "solver max iters" in transfer_options
+                ):
+                    self.transfer.setSolverOptions(
+                        transfer_options.get("solver rtol", 1e-12),
+                        transfer_options.get("solver max iters", 10000),
+                    )
+
             elif transfer_options["scheme"].lower() == "meld":
                 # defaults
                 isym = -1  # No symmetry
@@ -372,6 +415,10 @@ class Body(Base):
                     beta,
                 )
 
+                # Compute the factorizations when needed instead of storing them
+                if "memory_lean" in transfer_options:
+                    self.transfer.setMemoryLean(transfer_options["memory_lean"])
+
             elif transfer_options["scheme"].lower() == "linearized meld":
                 # defaults
                 isym = -1
@@ -452,16 +499,58 @@ class Body(Base):
                 print("Error: Unknown thermal transfer scheme for body")
                 quit()
 
+        # Set the number of threads used by the transfer schemes
+        if "num_threads" in transfer_options:
+            if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+                self.transfer.setNumThreads(transfer_options["num_threads"])
+            if self.thermal_transfer is not None:
+                self.thermal_transfer.setNumThreads(transfer_options["num_threads"])
+
+        # Only store the structural nodes referenced on each processor
+        if "distributed_struct" in transfer_options:
+            if transfer_options["distributed_struct"]:
+                if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+                    self.transfer.setDistributedStructMesh(True)
+                if self.thermal_transfer is not None:
+                    self.thermal_transfer.setDistributedStructMesh(True)
+
         # Set the node locations
         self.update_transfer()
 
+        # Read the setup of the transfer schemes from a restart file when it
+        # matches the node locations and options. Otherwise the setup is
+        # computed and saved to the file for the next run. The same options
+        # are usually passed to every body, so each body uses its own file.
+        state_file = None
+        if transfer_options.get("state_file") is not None:
+            state_file = "%s.%s" % (transfer_options["state_file"], self.id)
+
         # Initialize the load/displacement transfer
         if self.transfer is not None:
-            self.transfer.initialize()
+            if state_file is not None and isinstance(
+                self.transfer, TransferScheme.pyTransferScheme
+            ):
+                if not self.transfer.loadState(state_file):
+                    self.transfer.initialize()
+                    self.transfer.saveState(state_file)
+            else:
+                self.transfer.initialize()
 
         # Initialize the thermal transfer
         if self.thermal_transfer is not None:
-            self.thermal_transfer.initialize()
+            if state_file is not None:
+                thermal_state_file = state_file + ".thermal"
+                if not self.thermal_transfer.loadState(thermal_state_file):
+                    self.thermal_transfer.initialize()
+                    self.thermal_transfer.saveState(thermal_state_file)
+            else:
+                self.thermal_transfer.initialize()
+
+        # Update the connectivity and weights when the node locations change.
+        # This is opt-in since the sensitivities of the weights with respect to
+        # the node locations are not included in the adjoint
+        if "update_geometry" in transfer_options:
+            self.update_transfer_geometry = transfer_options["update_geometry"]
 
         return
 
@@ -474,10 +563,17 @@ class Body(Base):
             self.transfer.setStructNodes(self.struct_X)
             self.transfer.setAeroNodes(self.aero_X)
 
+            if self.update_transfer_geometry:
+                if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+                    self.transfer.updateGeometry()
+
         if self.thermal_transfer is not None:
             self.thermal_transfer.setStructNodes(self.struct_X)
             self.thermal_transfer.setAeroNodes(self.aero_X)
 
+            if self.update_transfer_geometry:
+                self.thermal_transfer.updateGeometry()
+
         return
 
     def set_id(self, id):
@@ -515,6 +611,11 @@ class Body(Base):
         """
         Initialize the variables each time we run an analysis.
 
+        For unsteady scenarios, the time history of each quantity is allocated
+        by the history store with shape (scenario.steps + 1, n). The get_*
+        methods return the row for the requested time index, so that values
+        written into the returned array are stored in the history.
+
         Parameters
         ----------
         scenario: :class:`~scenario.Scenario`
@@ -524,6 +625,11 @@ class Body(Base):
         # We re-initialize aitken acceleration every time
         self.aitken_is_initialized = False
 
+        # Free the histories from the previous analysis of this scenario
+        if not scenario.steady:
+            for history in self._get_histories(scenario):
+                self.history_store.release(history)
+
         if self.transfer is not None:
             ns = 3 * self.struct_nnodes
             na = 3 * self.aero_nnodes
@@ -534,17 +640,14 @@ class Body(Base):
                 self.struct_disps[scenario.id] = np.zeros(ns, dtype=self.dtype)
                 self.aero_disps[scenario.id] = np.zeros(na, dtype=self.dtype)
             else:
+                # Store each time history with one row per time step
                 id = scenario.id
-                self.struct_loads[id] = []
-                self.aero_loads[id] = []
-                self.struct_disps[id] = []
-                self.aero_disps[id] = []
-
-                for time_index in range(scenario.steps + 1):
-                    self.struct_loads[id].append(np.zeros(ns, dtype=self.dtype))
-                    self.aero_loads[id].append(np.zeros(na, dtype=self.dtype))
-                    self.struct_disps[id].append(np.zeros(ns, dtype=self.dtype))
-                    self.aero_disps[id].append(np.zeros(na, dtype=self.dtype))
+                nt = scenario.steps + 1
+                store = self.history_store
+                self.struct_loads[id] = store.allocate((nt, ns), self.dtype)
+                self.aero_loads[id] = store.allocate((nt, na), self.dtype)
+                self.struct_disps[id] = store.allocate((nt, ns), self.dtype)
+                self.aero_disps[id] = store.allocate((nt, na), self.dtype)
 
         if self.thermal_transfer is not None:
             ns = self.struct_nnodes
@@ -559,21 +662,56 @@ class Body(Base):
                 self.aero_temps[scenario.id] = np.zeros(na, dtype=self.dtype)
             else:
                 id = scenario.id
-                self.struct_heat_flux[id] = []
-                self.aero_heat_flux[id] = []
-                self.struct_temps[id] = []
-                self.aero_temps[id] = []
-
-                for time_index in range(scenario.steps + 1):
-                    self.struct_heat_flux[id].append(np.zeros(ns, dtype=self.dtype))
-                    self.aero_heat_flux[id].append(np.zeros(na, dtype=self.dtype))
-                    self.struct_temps[id].append(
-                        np.ones(ns, dtype=self.dtype) * scenario.T_ref
-                    )
-                    self.aero_temps[id].append(np.zeros(na, dtype=self.dtype))
+                nt = scenario.steps + 1
+                store = self.history_store
+                self.struct_heat_flux[id] = store.allocate((nt, ns), self.dtype)
+                self.aero_heat_flux[id] = store.allocate((nt, na), self.dtype)
+                self.struct_temps[id] = store.allocate(
+                    (nt, ns), self.dtype, fill=scenario.T_ref
+                )
+                self.aero_temps[id] = store.allocate((nt, na), self.dtype)
+
+        return
+
+    def prefetch_history(self, scenario, time_index):
+        """
+        Start loading the time histories for the steps that precede time_index
+        so that they are available for the next steps of the reverse adjoint
+        sweep.
+
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            The current scenario
+        time_index: int
+            The current time index of the reverse sweep
+        """
+        if not scenario.steady:
+            histories = self._get_histories(scenario)
+            self.history_store.prefetch(histories, time_index)
 
         return
 
+    def _get_histories(self, scenario):
+        """
+        Get the time histories allocated for the given scenario
+        """
+        histories = []
+        for hist in [
+            self.struct_loads,
+            self.aero_loads,
+            self.struct_disps,
+            self.aero_disps,
+            self.struct_heat_flux,
+            self.aero_heat_flux,
+            self.struct_temps,
+            self.aero_temps,
+        ]:
+            if scenario.id in hist:
+                histories.append(hist[scenario.id])
+
+        return histories
+
     def initialize_adjoint_variables(self, scenario):
         """
         Initialize the adjoint variables for the body.
@@ -786,6 +924,24 @@ class Body(Base):
         Transfer the displacements on the structural mesh to the aerodynamic mesh
         for the given scenario.
 
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            The current scenario
+        time_index: int
+            The time-index for time-dependent problems
+        """
+        self.begin_transfer_disps(scenario, time_index)
+        self.end_transfer_disps(scenario, time_index)
+
+        return
+
+    def begin_transfer_disps(self, scenario, time_index=0):
+        """
+        Start the transfer of the displacements on the structural mesh to the
+        aerodynamic mesh. The communication of the displacements proceeds while
+        other work is done until end_transfer_disps is called.
+
         Parameters
         ----------
         scenario: :class:`~scenario.Scenario`
@@ -800,7 +956,31 @@ class Body(Base):
             else:
                 aero_disps = self.aero_disps[scenario.id][time_index]
                 struct_disps = self.struct_disps[scenario.id][time_index]
-            self.transfer.transferDisps(struct_disps, aero_disps)
+
+            if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+                self.transfer.beginTransferDisps(struct_disps)
+            else:
+                self.transfer.transferDisps(struct_disps, aero_disps)
+
+        return
+
+    def end_transfer_disps(self, scenario, time_index=0):
+        """
+        Complete the displacement transfer started by begin_transfer_disps
+
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            The current scenario
+        time_index: int
+            The time-index for time-dependent problems
+        """
+        if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+            if scenario.steady:
+                aero_disps = self.aero_disps[scenario.id]
+            else:
+                aero_disps = self.aero_disps[scenario.id][time_index]
+            self.transfer.endTransferDisps(aero_disps)
 
         return
 
@@ -809,6 +989,24 @@ class Body(Base):
         Transfer the aerodynamic loads on the aero surface mesh to loads on the
         structural mesh for the given scenario.
 
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            The current scenario
+        time_index: int
+            The time-index for time-dependent problems
+        """
+        self.begin_transfer_loads(scenario, time_index)
+        self.end_transfer_loads(scenario, time_index)
+
+        return
+
+    def begin_transfer_loads(self, scenario, time_index=0):
+        """
+        Start the transfer of the aerodynamic loads to loads on the structural
+        mesh. The structural loads are not set until end_transfer_loads is
+        called.
+
         Parameters
         ----------
         scenario: :class:`~scenario.Scenario`
@@ -823,7 +1021,27 @@ class Body(Base):
             else:
                 aero_loads = self.aero_loads[scenario.id][time_index]
                 struct_loads = self.struct_loads[scenario.id][time_index]
-            self.transfer.transferLoads(aero_loads, struct_loads)
+
+            if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+                self.transfer.beginTransferLoads(aero_loads, struct_loads)
+            else:
+                self.transfer.transferLoads(aero_loads, struct_loads)
+
+        return
+
+    def end_transfer_loads(self, scenario, time_index=0):
+        """
+        Complete the load transfer started by begin_transfer_loads
+
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            The current scenario
+        time_index: int
+            The time-index for time-dependent problems
+        """
+        if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+            self.transfer.endTransferLoads()
 
         return
 
@@ -1052,20 +1270,33 @@ class Body(Base):
         if self.transfer is not None:
             # Contribute to the force integration and structural adjoint right-hand-sides
             # from the load transfer adjoint
-            temp_fa = np.zeros(3 * self.aero_nnodes, dtype=self.dtype)
-            temp_us = np.zeros(3 * self.struct_nnodes, dtype=self.dtype)
-            for k in range(nfunctions):
-                # Solve for psi_L - Note that dL/dfS is the identity matrix. Ensure that
-                # the vector is in contiguous memory.
-                psi_L = -self.struct_loads_ajp[:, k].copy()
+            temp_fa = np.zeros((3 * self.aero_nnodes, nfunctions), dtype=self.dtype)
+            temp_us = np.zeros((3 * self.struct_nnodes, nfunctions), dtype=self.dtype)
+
+            # Solve for psi_L for all the functions - Note that dL/dfS is the identity
+            # matrix. Ensure that the array is in contiguous memory.
+            psi_L = np.ascontiguousarray(-self.struct_loads_ajp[:, :nfunctions])
 
+            if isinstance(self.transfer, TransferScheme.pyTransferScheme):
                 # Compute aero_loads_ajp = dL/dfa^{T} * psi_L
-                self.transfer.applydLdfATrans(psi_L, temp_fa)
-                self.aero_loads_ajp[:, k] = temp_fa
+                self.transfer.applydLdfATransBatch(psi_L, temp_fa)
 
                 # Compute struct_disps_ajp_loads = dL/dus^{T} * psi_L
-                self.transfer.applydLduSTrans(psi_L, temp_us)
-                self.struct_disps_ajp_loads[:, k] = temp_us
+                self.transfer.applydLduSTransBatch(psi_L, temp_us)
+            else:
+                # Apply the products one function at a time
+                for k in range(nfunctions):
+                    psi_L_k = psi_L[:, k].copy()
+                    temp = np.zeros(3 * self.aero_nnodes, dtype=self.dtype)
+                    self.transfer.applydLdfATrans(psi_L_k, temp)
+                    temp_fa[:, k] = temp
+
+                    temp = np.zeros(3 * self.struct_nnodes, dtype=self.dtype)
+                    self.transfer.applydLduSTrans(psi_L_k, temp)
+                    temp_us[:, k] = temp
+
+            self.aero_loads_ajp[:, :nfunctions] = temp_fa
+            self.struct_disps_ajp_loads[:, :nfunctions] = temp_us
 
             # Compute the update to the struct_disps_ajp
             self.struct_disps_ajp[:] = (
@@ -1100,16 +1331,22 @@ class Body(Base):
         nfunctions = scenario.count_adjoint_functions()
 
         if self.transfer is not None:
-            temp_us = np.zeros(3 * self.struct_nnodes, dtype=self.dtype)
+            temp_us = np.zeros((3 * self.struct_nnodes, nfunctions), dtype=self.dtype)
 
-            for k in range(nfunctions):
-                # Solve for psi_D - Note that dD/dua is the identity matrix
-                # Copy the values into contiguous memory.
-                psi_D = -self.aero_disps_ajp[:, k].copy()
+            # Solve for psi_D for all the functions - Note that dD/dua is the identity
+            # matrix. Copy the values into contiguous memory.
+            psi_D = np.ascontiguousarray(-self.aero_disps_ajp[:, :nfunctions])
 
-                # Set the dD/duS^{T} * psi_D product
-                self.transfer.applydDduSTrans(psi_D, temp_us)
-                self.struct_disps_ajp_disps[:, k] = temp_us
+            # Set the dD/duS^{T} * psi_D product
+            if isinstance(self.transfer, TransferScheme.pyTransferScheme):
+                self.transfer.applydDduSTransBatch(psi_D, temp_us)
+            else:
+                # Apply the product one function at a time
+                for k in range(nfunctions):
+                    temp = np.zeros(3 * self.struct_nnodes, dtype=self.dtype)
+                    self.transfer.applydDduSTrans(psi_D[:, k].copy(), temp)
+                    temp_us[:, k] = temp
+            self.struct_disps_ajp_disps[:, :nfunctions] = temp_us
 
             # Compute the update to the struct_disps_ajp
             self.struct_disps_ajp[:] = (
@@ -1275,108 +1512,57 @@ class Body(Base):
 
         if self.transfer is not None:
             struct_disps = self.get_struct_disps(scenario)
-            up = struct_disps - self.aitken_vec
-            norm2 = np.linalg.norm(up - self.prev_update) ** 2.0
-
-            # Only update theta if the displacements changed
-            if norm2 > tol:
-                # Compute the tentative theta value
-                self.theta *= 1.0 - (up - self.prev_update).dot(up) / norm2
-
-                self.theta = np.max(
-                    (np.min((self.theta, self.theta_max)), self.theta_min)
-                )
-
-            # handle the min/max for complex step
-            if type(self.theta) == np.complex128 or type(self.theta) == complex:
-                self.theta = self.theta.real + 0.0j
+            self.theta = aitken_update(
+                struct_disps,
+                self.aitken_vec,
+                self.prev_update,
+                self.theta,
+                self.theta_min,
+                self.theta_max,
+                tol,
+            )
 
-            self.aitken_vec += self.theta * up
-            self.prev_update[:] = up[:]
-            struct_disps[:] = self.aitken_vec
+            # Keep the final value to seed the adjoint of this scenario
+            self.theta_forward[scenario.id] = self.theta
 
         return
 
-    def aitken_adjoint_relax(self, scenario, tol=1e-16):
-        return
-        """
-        INCOMPLETE NEW AITKEN IMPLEMENTATION BELOW
-        Attempt at elastic implementation, not thermal
+    def aitken_adjoint_relax(self, scenario, tol=1e-13):
         """
+        Perform Aitken relaxation for the load transfer adjoint terms of all the
+        adjoint functions at once. Each function has its own value of theta.
 
-        nfunctions = scenario.count_adjoint_functions()
-        if self.aitken_init:
-            self.aitken_init = False
-
-            # initialize "previous update" to zero
+        The adjoint iterations have the same convergence rate as the forward
+        iterations, so theta starts from the last value used in the forward
+        analysis of the same scenario when there is one.
+        """
 
-            self.aitken_vec = np.zeros(3 * self.struct_nnodes, dtype=self.dtype)
-            self.prev_update = np.zeros(3 * self.struct_nnodes, dtype=self.dtype)
-            self.theta = self.theta_init
+        # If Aitken relaxation is turned off, skip this
+        if self.use_aitken_accel is False:
+            return
 
-            # initialize "previous (thermal) update" to zero
-            self.therm_up_prev = []
-            self.aitken_therm_vec = []
-            self.theta_therm = []
-            if self.transfer is not None:
-                up_prev_body = []
-                aitken_vec_body = []
-                theta_body = []
-                for func in range(nfunctions):
-                    up_prev_body.append(
-                        np.zeros(self.struct_nnodes * 3, dtype=TransferScheme.dtype)
-                    )
-                    aitken_vec_body.append(
-                        np.zeros(self.struct_nnodes * 3, dtype=TransferScheme.dtype)
-                    )
-                    # theta_body.append(self.theta_init)
-                # self.up_prev.append(up_prev_body)
-                # self.aitken_vec (aitken_vec_body)
-                # self.theta.append(theta_body)
+        if self.transfer is None:
+            return
 
-            if self.thermal_transfer is not None:
-                up_prev_body = []
-                aitken_therm_vec_body = []
-                theta_body = []
-                for func in range(nfunctions):
-                    up_prev_body.append(
-                        scenario.T_ref
-                        * np.ones(self.struct_nnodes * 1, dtype=TransferScheme.dtype)
-                    )
-                    aitken_therm_vec_body.append(
-                        scenario.T_ref
-                        * np.ones(self.struct_nnodes * 1, dtype=TransferScheme.dtype)
-                    )
-                    theta_body.append(self.theta_therm_init)
-                self.therm_up_prev.append(up_prev_body)
-                self.aitken_therm_vec.append(aitken_therm_vec_body)
-                self.theta_therm.append(theta_body)
+        if self.aitken_init:
+            self.aitken_init = False
 
-        # do the Aitken update
-        if self.transfer is not None:
-            for func in range(nfunctions):
-                up = self.struct_loads_ajp[:, func] - self.aitken_vec
-                # print("adj up shape: ", self.aitken_vec[func].shape)
-                # print("Update: ", up[-1])
-                norm2 = np.linalg.norm(up - self.prev_update) ** 2.0
-                # print("Prev update: ", np.linalg.norm(self.prev_update))
-
-                # only update theta if vec changed
-                if norm2 > tol:
-                    self.theta *= 1.0 - (up - self.prev_update).dot(up) / norm2
-                    # print("theta pre = ", self.theta)
-
-                    self.theta = np.max(
-                        (
-                            np.min((self.theta, self.theta_max)),
-                            self.theta_min,
-                        )
-                    )
-                self.aitken_vec += self.theta * up
-                # print("theta = ", self.theta)
-                # print("aitken vec norm: ", np.linalg.norm(self.aitken_vec))
-                self.prev_update = up[:]
-                self.struct_loads_ajp[:, func] = self.aitken_vec[:]
+            theta = self.theta_forward.get(scenario.id, self.theta_init)
+
+            shape = self.struct_loads_ajp.shape
+            self.theta_adjoint = np.full(shape[1], theta)
+            self.prev_adjoint_update = np.zeros(shape, dtype=self.dtype)
+            self.aitken_adjoint_vec = np.zeros(shape, dtype=self.dtype)
+
+        self.theta_adjoint = aitken_update(
+            self.struct_loads_ajp,
+            self.aitken_adjoint_vec,
+            self.prev_adjoint_update,
+            self.theta_adjoint,
+            self.theta_min,
+            self.theta_max,
+            tol,
+        )
 
         return
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+and design optimization.
+
+Copyright (C) 2015 Georgia Tech Research Corporation.
+Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+All rights reserved.
+
+FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+you may not use this software except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from math import comb
+
+
+def revolve_schedule(steps, snaps):
+    """
+    Compute a binomial checkpointing schedule for the reverse sweep of an
+    unsteady adjoint with a limited number of stored forward states.
+
+    The schedule is a list of actions, each of which is a tuple:
+
+    * ("advance", step): take forward steps until the state is at step
+    * ("store", step): store a checkpoint of the current state at step
+    * ("restore", step): restore the state from the checkpoint at step
+    * ("free", step): delete the checkpoint at step
+    * ("reverse", step): the state is at step - 1; take one forward step to
+      step and then the adjoint step at step
+
+    The checkpoint of the initial state at step 0 is always stored and counts
+    towards snaps.
+
+    Parameters
+    ----------
+    steps: int
+        the number of time steps
+    snaps: int
+        the maximum number of checkpoints stored at the same time
+
+    Returns
+    -------
+    forward_stores: list
+        the steps at which checkpoints are stored during the forward analysis
+    actions: list
+        the actions for the reverse sweep after the forward analysis has
+        reached the final step
+    """
+    if snaps < 1:
+        raise ValueError("At least one checkpoint is required")
+
+    actions = []
+    state = [0]
+
+    def goto(start):
+        if state[0] != start:
+            actions.append(("restore", start))
+            state[0] = start
+
+    def advance(step):
+        if step > state[0]:
+            actions.append(("advance", step))
+            state[0] = step
+
+    def reverse(start, end, free):
+        # Reverse the steps end, end - 1, ..., start + 1 using the checkpoint
+        # at start and free additional checkpoints
+        while end > start:
+            if end - start == 1 or free == 0:
+                goto(start)
+                advance(end - 1)
+                actions.append(("reverse", end))
+                state[0] = end
+                end -= 1
+                continue
+
+            # Find the fewest number of times r that each step is recomputed,
+            # then take the split so that the tail can be reversed with one
+            # less checkpoint
+            length = end - start
+            r = 1
+            while comb(free + 1 + r, free + 1) < length:
+                r += 1
+            mid = start + max(1, length - comb(free + r, free))
+
+            goto(start)
+            advance(mid)
+            actions.append(("store", mid))
+            reverse(mid, end, free - 1)
+            actions.append(("free", mid))
+            end = mid
+
+    reverse(0, steps, snaps - 1)
+
+    # The leading advance and store actions are taken by the forward analysis
+    # itself. The reverse sweep starts from the last of these checkpoints.
+    forward_stores = []
+    start = 0
+    for index, (action, step) in enumerate(actions):
+        if action == "store":
+            forward_stores.append(step)
+            start = index + 1
+        elif action != "advance":
+            break
+
+    last = 0
+    if len(forward_stores) > 0:
+        last = forward_stores[-1]
+
+    return forward_stores, [("restore", last)] + actions[start:]
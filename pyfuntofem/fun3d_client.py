@@ -35,6 +35,7 @@ from fun3d.mda.fsi.fun3d_aero import (
 )
 from funtofem import TransferScheme
 from .solver_interface import SolverInterface
+from .history_store import HistoryStore
 
 
 class Fun3dClient(SolverInterface):
@@ -47,7 +48,15 @@ class Fun3dClient(SolverInterface):
     To tell FUN3D that a body's motion should be driven by FUNtoFEM, set *motion_driver(i)='funtofem'*.
     """
 
-    def __init__(self, comm, model, flow_dt=1.0, host="localhost", port_base=49200):
+    def __init__(
+        self,
+        comm,
+        model,
+        flow_dt=1.0,
+        host="localhost",
+        port_base=49200,
+        history_store=None,
+    ):
         """
 
 
@@ -64,6 +73,8 @@ class Fun3dClient(SolverInterface):
             flow solver time step size. Used to scale the adjoint term coming into and out of FUN3D since FUN3D currently uses a different adjoint formulation than FUNtoFEM.
         host: FUN3D Aero Server
         port_base: FUN3D Aero Server base port (port for rank 0)
+        history_store: :class:`~history_store.HistoryStore`
+            storage for the force histories of unsteady scenarios (defaults to memory)
         """
 
         self.comm = comm
@@ -86,7 +97,10 @@ class Fun3dClient(SolverInterface):
         self.force_save = {}
         self.disps_save = {}
 
-        # unsteady scenarios
+        # unsteady scenarios: force_hist[scenario.id][ibody] has one row per step
+        if history_store is None:
+            history_store = HistoryStore()
+        self.history_store = history_store
         self.force_hist = {}
         for scenario in model.scenarios:
             self.force_hist[scenario.id] = {}
@@ -130,6 +144,12 @@ class Fun3dClient(SolverInterface):
             If the grid deformation failed, the intiialization will return 1
         """
 
+        # Free the force histories from the previous analysis of this scenario
+        if not scenario.steady:
+            for hist in self.force_hist[scenario.id].values():
+                self.history_store.release(hist)
+            self.force_hist[scenario.id] = {}
+
         directory = scenario.name + "/Flow"
         try:
             self.fun3d_client.pushd(directory)
@@ -591,9 +611,7 @@ class Fun3dClient(SolverInterface):
 
         if not scenario.steady:
             # save this steps forces for the adjoint
-            self.force_hist[scenario.id][step] = {}
-            for ibody, body in enumerate(bodies, 1):
-                self.force_hist[scenario.id][step][ibody] = body.aero_loads.copy()
+            self._save_forces(scenario, bodies, step)
         return 0
 
     def post(self, scenario, bodies, first_pass=False):
@@ -643,7 +661,11 @@ class Fun3dClient(SolverInterface):
             the time step number
         """
         for ibody, body in enumerate(bodies, 1):
-            body.aero_loads = self.force_hist[scenario.id][step][ibody]
+            body.aero_loads = self.force_hist[scenario.id][ibody][step]
+
+        # Start loading the forces for the next reverse steps
+        histories = list(self.force_hist[scenario.id].values())
+        self.history_store.prefetch(histories, step)
 
     def iterate_adjoint(self, scenario, bodies, step):
         """
@@ -856,7 +878,18 @@ class Fun3dClient(SolverInterface):
                 pass
 
         # save this steps forces for the adjoint
-        self.force_hist[scenario.id][step] = {}
-        for ibody, body in enumerate(bodies, 1):
-            self.force_hist[scenario.id][step][ibody] = body.aero_loads.copy()
+        self._save_forces(scenario, bodies, step)
         return 0
+
+    def _save_forces(self, scenario, bodies, step):
+        """
+        Save the aerodynamic forces at this step in the force history
+        """
+        hist = self.force_hist[scenario.id]
+        for ibody, body in enumerate(bodies, 1):
+            if ibody not in hist:
+                shape = (scenario.steps + 1, 3 * body.aero_nnodes)
+                hist[ibody] = self.history_store.allocate(shape, TransferScheme.dtype)
+            hist[ibody][step] = body.aero_loads
+
+        return
@@ -24,6 +24,9 @@ import numpy as np
 from mpi4py import MPI
 from funtofem import TransferScheme
 from .funtofem_driver import FUNtoFEMDriver
+from .solver_interface import SolverInterface
+from .checkpointing import revolve_schedule
+from .acceleration import AitkenAcceleration
 
 try:
     from .hermes_transfer import HermesTransfer
@@ -45,6 +48,8 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
         theta_init=0.125,
         theta_min=0.01,
         theta_max=1.0,
+        checkpoints=None,
+        acceleration=None,
     ):
         """
         The FUNtoFEM driver for the Nonlinear Block Gauss-Seidel
@@ -64,6 +69,16 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
             Initial value of theta for the Aitken under-relaxation
         theta_min: float
             Minimum value of theta for the Aitken under-relaxation
+        checkpoints: int
+            If given, the unsteady adjoint stores at most this many snapshots of the
+            forward state and recomputes the forward steps between them during the
+            reverse sweep. The solvers must implement save_checkpoint and load_checkpoint.
+            The time histories of the bodies are still stored for every step, so only
+            the internal states of the solvers are reduced.
+        acceleration: :class:`~acceleration.Acceleration`
+            Acceleration of the steady coupling iterations and their adjoint, such as
+            :class:`~acceleration.AndersonAcceleration`. Defaults to the Aitken
+            under-relaxation of each body.
         """
 
         super(FUNtoFEMnlbgs, self).__init__(
@@ -77,6 +92,26 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
             model=model,
         )
 
+        # Acceleration of the steady coupling iterations
+        if acceleration is None:
+            acceleration = AitkenAcceleration()
+        self.acceleration = acceleration
+        self.acceleration.set_comm(comm)
+
+        # Checkpointing for the unsteady adjoint
+        if checkpoints is not None:
+            for solver in self.solvers.values():
+                for hook in ["save_checkpoint", "load_checkpoint"]:
+                    method = getattr(type(solver), hook, None)
+                    if method is None or method is getattr(SolverInterface, hook):
+                        raise NotImplementedError(
+                            "%s does not implement %s, which is required for checkpointing"
+                            % (type(solver).__name__, hook)
+                        )
+        self.checkpoints = checkpoints
+        self.checkpoint_data = {}
+        self.checkpoint_actions = {}
+
         return
 
     def _initialize_adjoint_variables(self, scenario, bodies):
@@ -122,12 +157,18 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
                     )
                 steps = 1000
 
+        self.acceleration.initialize(scenario, self.model.bodies)
+
         # Loop over the NLBGS steps
         for step in range(1, steps + 1):
-            # Transfer displacements and temperatures
+            # Transfer displacements and temperatures. The displacements of all the
+            # bodies are communicated while the temperatures are transferred.
+            for body in self.model.bodies:
+                body.begin_transfer_disps(scenario)
             for body in self.model.bodies:
-                body.transfer_disps(scenario)
                 body.transfer_temps(scenario)
+            for body in self.model.bodies:
+                body.end_transfer_disps(scenario)
 
             # Take a step in the flow solver
             fail = self.solvers["flow"].iterate(scenario, self.model.bodies, step)
@@ -138,10 +179,14 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
                     print("Flow solver returned fail flag")
                 return fail
 
-            # Transfer the loads and heat flux
+            # Transfer the loads and heat flux. The loads of all the bodies are
+            # communicated while the heat flux is transferred.
+            for body in self.model.bodies:
+                body.begin_transfer_loads(scenario)
             for body in self.model.bodies:
-                body.transfer_loads(scenario)
                 body.transfer_heat_flux(scenario)
+            for body in self.model.bodies:
+                body.end_transfer_loads(scenario)
 
             # Take a step in the FEM model
             fail = self.solvers["structural"].iterate(scenario, self.model.bodies, step)
@@ -152,9 +197,9 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
                     print("Structural solver returned fail flag")
                 return fail
 
-            # Under-relaxation for solver stability
-            for body in self.model.bodies:
-                body.aitken_relax(scenario)
+            # Accelerate the coupling iterations
+            if self.acceleration.apply(scenario, self.model.bodies):
+                break
 
         return fail
 
@@ -181,6 +226,7 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
 
         # Initialize the adjoint variables
         self._initialize_adjoint_variables(scenario, self.model.bodies)
+        self.acceleration.initialize_adjoint(scenario, self.model.bodies)
 
         # loop over the adjoint NLBGS solver
         for step in range(1, steps + 1):
@@ -216,8 +262,9 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
                     print("Structural solver returned fail flag")
                 return fail
 
-            for body in self.model.bodies:
-                body.aitken_adjoint_relax(scenario)
+            # Accelerate the adjoint coupling iterations
+            if self.acceleration.apply_adjoint(scenario, self.model.bodies):
+                break
 
         self._extract_coordinate_derivatives(scenario, self.model.bodies, steps)
         return 0
@@ -251,36 +298,21 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
                     )
                 steps = 1000
 
-        for time_index in range(1, steps + 1):
-            # Transfer displacements and temperatures
-            for body in self.model.bodies:
-                body.transfer_disps(scenario, time_index)
-                body.transfer_temps(scenario, time_index)
-
-            # Take a step in the flow solver
-            fail = self.solvers["flow"].iterate(scenario, self.model.bodies, time_index)
+        # Store the checkpoints for the first sweep of the checkpointing schedule
+        forward_stores = []
+        if self.checkpoints is not None:
+            forward_stores, actions = revolve_schedule(steps, self.checkpoints)
+            self.checkpoint_actions[scenario.id] = actions
+            self.checkpoint_data = {}
+            self._save_checkpoint(scenario, 0)
 
-            fail = self.comm.allreduce(fail)
+        for time_index in range(1, steps + 1):
+            fail = self._step_unsteady_forward(scenario, time_index)
             if fail != 0:
-                if self.comm.Get_rank() == 0:
-                    print("Flow solver returned fail flag")
                 return fail
 
-            # Transfer the loads and heat flux
-            for body in self.model.bodies:
-                body.transfer_loads(scenario, time_index)
-                body.transfer_heat_flux(scenario, time_index)
-
-            # Take a step in the FEM model
-            fail = self.solvers["structural"].iterate(
-                scenario, self.model.bodies, time_index
-            )
-
-            fail = self.comm.allreduce(fail)
-            if fail != 0:
-                if self.comm.Get_rank() == 0:
-                    print("Structural solver returned fail flag")
-                return fail
+            if time_index in forward_stores:
+                self._save_checkpoint(scenario, time_index)
 
         return fail
 
@@ -364,6 +396,86 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
 
         # # end solve loop
 
+    def _step_unsteady_forward(self, scenario, time_index):
+        """
+        Take one coupled time step of the unsteady forward problem
+
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            the current scenario
+        time_index: int
+            the time step to take
+
+        Returns
+        -------
+        fail: int
+            fail flag for the coupled solver
+        """
+
+        # Transfer displacements and temperatures. The displacements of all the
+        # bodies are communicated while the temperatures are transferred.
+        for body in self.model.bodies:
+            body.begin_transfer_disps(scenario, time_index)
+        for body in self.model.bodies:
+            body.transfer_temps(scenario, time_index)
+        for body in self.model.bodies:
+            body.end_transfer_disps(scenario, time_index)
+
+        # Take a step in the flow solver
+        fail = self.solvers["flow"].iterate(scenario, self.model.bodies, time_index)
+
+        fail = self.comm.allreduce(fail)
+        if fail != 0:
+            if self.comm.Get_rank() == 0:
+                print("Flow solver returned fail flag")
+            return fail
+
+        # Transfer the loads and heat flux. The loads of all the bodies are
+        # communicated while the heat flux is transferred.
+        for body in self.model.bodies:
+            body.begin_transfer_loads(scenario, time_index)
+        for body in self.model.bodies:
+            body.transfer_heat_flux(scenario, time_index)
+        for body in self.model.bodies:
+            body.end_transfer_loads(scenario, time_index)
+
+        # Take a step in the FEM model
+        fail = self.solvers["structural"].iterate(
+            scenario, self.model.bodies, time_index
+        )
+
+        fail = self.comm.allreduce(fail)
+        if fail != 0:
+            if self.comm.Get_rank() == 0:
+                print("Structural solver returned fail flag")
+            return fail
+
+        return fail
+
+    def _save_checkpoint(self, scenario, step):
+        """
+        Store a snapshot of the solver states at this step
+        """
+        self.checkpoint_data[step] = {}
+        for solver in self.solvers.keys():
+            self.checkpoint_data[step][solver] = self.solvers[solver].save_checkpoint(
+                scenario, self.model.bodies, step
+            )
+
+        return
+
+    def _load_checkpoint(self, scenario, step):
+        """
+        Restore the solver states from the snapshot at this step
+        """
+        for solver in self.solvers.keys():
+            self.solvers[solver].load_checkpoint(
+                scenario, self.model.bodies, step, self.checkpoint_data[step][solver]
+            )
+
+        return
+
     def _solve_unsteady_adjoint(self, scenario):
         """
         Solves the unsteady adjoint problem using LBGS without FSI subiterations
@@ -391,205 +503,298 @@ class FUNtoFEMnlbgs(FUNtoFEMDriver):
         nfunctions = scenario.count_adjoint_functions()
         self._initialize_adjoint_variables(scenario, self.model.bodies)
 
-        # Loop over each time step in the reverse order
-        for rstep in range(1, steps + 1):
-            step = steps - rstep + 1
+        if self.checkpoints is not None:
+            fail = self._solve_unsteady_adjoint_checkpointed(scenario, nfunctions)
+            if fail != 0:
+                return fail
+        else:
+            # Loop over each time step in the reverse order
+            for rstep in range(1, steps + 1):
+                step = steps - rstep + 1
 
-            self.solvers["flow"].set_states(scenario, self.model.bodies, step)
-            # Due to the staggering, we linearize the transfer about t_s^(n-1)
-            self.solvers["structural"].set_states(scenario, self.model.bodies, step - 1)
+                # Start loading the histories for the next reverse steps
+                for body in self.model.bodies:
+                    body.prefetch_history(scenario, step)
 
-            for body in self.model.bodies:
-                if body.transfer is not None:
-                    body.aero_disps = np.zeros(
-                        body.aero_nnodes * 3, dtype=TransferScheme.dtype
-                    )
-                    body.transfer.transferDisps(body.struct_disps, body.aero_disps)
+                self.solvers["flow"].set_states(scenario, self.model.bodies, step)
+                # Due to the staggering, we linearize the transfer about t_s^(n-1)
+                self.solvers["structural"].set_states(
+                    scenario, self.model.bodies, step - 1
+                )
 
-                    struct_loads = np.zeros(
-                        body.struct_nnodes * body.xfer_ndof, dtype=TransferScheme.dtype
-                    )
-                    body.transfer.transferLoads(body.aero_loads, struct_loads)
+                fail = self._step_unsteady_adjoint(scenario, step, nfunctions)
+                if fail != 0:
+                    return fail
 
-                if "rigid" in body.motion_type and "deform" in body.motion_type:
-                    rotation = np.zeros(9, dtype=TransferScheme.dtype)
-                    translation = np.zeros(3, dtype=TransferScheme.dtype)
-                    u = np.zeros(body.aero_nnodes * 3, dtype=TransferScheme.dtype)
+        # end of solve loop
 
-                    body.rigid_transform = np.zeros((4, 4), dtype=TransferScheme.dtype)
+        # evaluate the initial conditions
+        fail = self.solvers["flow"].iterate_adjoint(scenario, self.model.bodies, step=0)
+        fail = self.comm.allreduce(fail)
+        if fail != 0:
+            if self.comm.Get_rank() == 0:
+                print("Flow solver returned fail flag")
+            return fail
 
-                    body.transfer.transformEquivRigidMotion(
-                        body.aero_disps, rotation, translation, u
-                    )
+        fail = self.solvers["structural"].iterate_adjoint(
+            scenario, self.model.bodies, step=0
+        )
+        fail = self.comm.allreduce(fail)
+        if fail != 0:
+            if self.comm.Get_rank() == 0:
+                print("Structural solver returned fail flag")
+            return fail
 
-                    body.rigid_transform[:3, :3] = rotation.reshape((3, 3), order="F")
-                    body.rigid_transform[:3, 3] = translation
-                    body.rigid_transform[-1, -1] = 1.0
+        # extract coordinate derivative term from initial condition
+        self._extract_coordinate_derivatives(scenario, self.model.bodies, step=0)
 
-                    body.global_aero_disps = body.aero_disps[:]
-                    body.aero_disps = u.copy()
+        return 0
 
-            # take a step in the structural adjoint
-            fail = self.solvers["structural"].iterate_adjoint(
-                scenario, self.model.bodies, step
-            )
+    def _solve_unsteady_adjoint_checkpointed(self, scenario, nfunctions):
+        """
+        Take the reverse sweep of the unsteady adjoint following the checkpointing
+        schedule computed during the forward analysis. The forward steps between the
+        checkpoints are recomputed, so when set_states is called for a step, the
+        solvers have just completed the forward step. The structural solver is then
+        asked for the states of the previous step.
 
-            fail = self.comm.allreduce(fail)
-            if fail != 0:
-                if self.comm.Get_rank() == 0:
-                    print("Structural solver returned fail flag")
-                return fail
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            the current scenario
+        nfunctions: int
+            number of adjoint functions
 
-            # Get load and heat flux terms for the flow solver
-            for body in self.model.bodies:
-                for func in range(nfunctions):
-                    if body.transfer is not None:
-                        # Transform load transfer adjoint variables using transpose Jacobian from
-                        # funtofem: dLdfA^T * psi_L
-                        psi_L_r = np.zeros(
-                            body.aero_nnodes * 3, dtype=TransferScheme.dtype
-                        )
-                        body.transfer.applydDduS(
-                            body.psi_S[:, func].copy(order="C"), psi_L_r
-                        )
-                        body.dLdfa[:, func] = psi_L_r
-
-                    if body.thermal_transfer is not None:
-                        # Transform heat flux transfer adjoint variables using transpose Jacobian from
-                        # funtofem: dQdftA^T * psi_Q = dTdts * psi_Q
-                        psi_Q_r = np.zeros(body.aero_nnodes, dtype=TransferScheme.dtype)
-                        body.thermal_transfer.applydQdqATrans(
-                            body.psi_T_S[:, func].copy(order="C"), psi_Q_r
-                        )
-                        body.dQdfta[:, func] = psi_Q_r
+        Returns
+        -------
+        fail: int
+            fail flag
+        """
 
-            fail = self.solvers["flow"].iterate_adjoint(
-                scenario, self.model.bodies, step
-            )
+        fail = 0
+        current = scenario.steps
+
+        for action, step in self.checkpoint_actions[scenario.id]:
+            if action == "restore":
+                self._load_checkpoint(scenario, step)
+                current = step
+            elif action == "store":
+                self._save_checkpoint(scenario, step)
+            elif action == "free":
+                del self.checkpoint_data[step]
+            elif action == "advance":
+                for time_index in range(current + 1, step + 1):
+                    fail = self._step_unsteady_forward(scenario, time_index)
+                    if fail != 0:
+                        return fail
+                current = step
+            elif action == "reverse":
+                fail = self._step_unsteady_forward(scenario, step)
+                if fail != 0:
+                    return fail
+                current = step
+
+                self.solvers["flow"].set_states(scenario, self.model.bodies, step)
+                # Due to the staggering, we linearize the transfer about t_s^(n-1).
+                # This must follow the forward step, which overwrites the structural
+                # states with those at t_s^n.
+                self.solvers["structural"].set_states(
+                    scenario, self.model.bodies, step - 1
+                )
+
+                fail = self._step_unsteady_adjoint(scenario, step, nfunctions)
+                if fail != 0:
+                    return fail
+
+        self.checkpoint_data = {}
 
-            fail = self.comm.allreduce(fail)
-            if fail != 0:
-                if self.comm.Get_rank() == 0:
-                    print("Flow solver returned fail flag")
-                return fail
+        return fail
 
-            # From the flow grid adjoint, get to the displacement adjoint
-            for body in self.model.bodies:
-                if body.transfer is not None:
-                    for func in range(nfunctions):
-                        if body.motion_type == "deform":
-                            # displacement adjoint equation
-                            body.psi_D[:, func] = -body.dGdua[:, func]
-                        elif (
-                            "rigid" in body.motion_type and "deform" in body.motion_type
-                        ):
-                            # solve the elastic deformation adjoint
-                            psi_E = np.zeros(
-                                body.aero_nnodes * 3, dtype=TransferScheme.dtype
-                            )
-                            tmt = np.linalg.inv(np.transpose(body.rigid_transform))
-                            for node in range(body.aero_nnodes):
-                                for i in range(3):
-                                    psi_E[3 * node + i] = (
-                                        tmt[i, 0] * body.dGdua[3 * node + 0, func]
-                                        + tmt[i, 1] * body.dGdua[3 * node + 1, func]
-                                        + tmt[i, 2] * body.dGdua[3 * node + 2, func]
-                                        + tmt[i, 3]
-                                    )
-
-                            # get the product dE/dT^T psi_E
-                            dEdTmat = np.zeros((3, 4), dtype=TransferScheme.dtype)
-
-                            for n in range(body.aero_nnodes):
-                                for i in range(3):
-                                    for j in range(4):
-                                        if j < 3:
-                                            dEdTmat[i, j] += (
-                                                -(
-                                                    body.aero_X[3 * n + j]
-                                                    + body.aero_disps[3 * n + j]
-                                                )
-                                                * psi_E[3 * n + i]
-                                            )
-                                        else:
-                                            dEdTmat[i, j] += -psi_E[3 * n + i]
+    def _step_unsteady_adjoint(self, scenario, step, nfunctions):
+        """
+        Take one step of the reverse sweep of the unsteady adjoint after the states
+        for this step have been set
 
-                            dEdT = dEdTmat.flatten(order="F")
-                            dEdT = self.comm.allreduce(dEdT)
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            the current scenario
+        step: int
+            the time step
+        nfunctions: int
+            number of adjoint functions
 
-                            # solve the rigid transform adjoint
-                            psi_R = np.zeros(12, dtype=TransferScheme.dtype)
-                            dGdT_func = body.dGdT[:, :, func]
-                            dGdT = dGdT_func[:3, :4].flatten(order="F")
+        Returns
+        -------
+        fail: int
+            fail flag
+        """
 
-                            psi_R = -dGdT - dEdT
+        fail = 0
 
-                            # now solve the displacement adjoint
-                            dRduA = np.zeros(
-                                3 * body.aero_nnodes, dtype=TransferScheme.dtype
-                            )
-                            body.transfer.applydRduATrans(psi_R, dRduA)
+        for body in self.model.bodies:
+            if body.transfer is not None:
+                body.aero_disps = np.zeros(
+                    body.aero_nnodes * 3, dtype=TransferScheme.dtype
+                )
+                body.transfer.transferDisps(body.struct_disps, body.aero_disps)
 
-                            body.psi_D[:, func] = -psi_E - dRduA
+                struct_loads = np.zeros(
+                    body.struct_nnodes * body.xfer_ndof, dtype=TransferScheme.dtype
+                )
+                body.transfer.transferLoads(body.aero_loads, struct_loads)
 
-                # form the RHS for the structural adjoint equation on the next reverse step
-                for func in range(nfunctions):
+            if "rigid" in body.motion_type and "deform" in body.motion_type:
+                rotation = np.zeros(9, dtype=TransferScheme.dtype)
+                translation = np.zeros(3, dtype=TransferScheme.dtype)
+                u = np.zeros(body.aero_nnodes * 3, dtype=TransferScheme.dtype)
 
-                    if body.transfer is not None:
-                        # calculate dDdu_s^T * psi_D
-                        psi_D_product = np.zeros(
-                            body.struct_nnodes * body.xfer_ndof,
-                            dtype=TransferScheme.dtype,
-                        )
-                        body.transfer.applydDduSTrans(
-                            body.psi_D[:, func].copy(order="C"), psi_D_product
-                        )
+                body.rigid_transform = np.zeros((4, 4), dtype=TransferScheme.dtype)
 
-                        # calculate dLdu_s^T * psi_L
-                        psi_L_product = np.zeros(
-                            body.struct_nnodes * body.xfer_ndof,
-                            dtype=TransferScheme.dtype,
-                        )
-                        body.transfer.applydLduSTrans(
-                            body.psi_L[:, func].copy(order="C"), psi_L_product
-                        )
-                        body.struct_rhs[:, func] = -psi_D_product - psi_L_product
+                body.transfer.transformEquivRigidMotion(
+                    body.aero_disps, rotation, translation, u
+                )
 
-                    if body.thermal_transfer is not None:
-                        # calculate dTdt_s^T * psi_T
-                        psi_T_product = np.zeros(
-                            body.struct_nnodes * body.therm_xfer_ndof,
-                            dtype=TransferScheme.dtype,
-                        )
-                        body.psi_T = body.dAdta
-                        body.thermal_transfer.applydTdtSTrans(
-                            body.psi_T[:, func].copy(order="C"), psi_T_product
-                        )
-                        body.struct_rhs_T[:, func] = -psi_T_product
+                body.rigid_transform[:3, :3] = rotation.reshape((3, 3), order="F")
+                body.rigid_transform[:3, 3] = translation
+                body.rigid_transform[-1, -1] = 1.0
 
-            # extract and accumulate coordinate derivative every step
-            self._extract_coordinate_derivatives(scenario, self.model.bodies, step)
+                body.global_aero_disps = body.aero_disps[:]
+                body.aero_disps = u.copy()
 
-        # end of solve loop
+        # take a step in the structural adjoint
+        fail = self.solvers["structural"].iterate_adjoint(
+            scenario, self.model.bodies, step
+        )
 
-        # evaluate the initial conditions
-        fail = self.solvers["flow"].iterate_adjoint(scenario, self.model.bodies, step=0)
         fail = self.comm.allreduce(fail)
         if fail != 0:
             if self.comm.Get_rank() == 0:
-                print("Flow solver returned fail flag")
+                print("Structural solver returned fail flag")
             return fail
 
-        fail = self.solvers["structural"].iterate_adjoint(
-            scenario, self.model.bodies, step=0
-        )
+        # Get load and heat flux terms for the flow solver
+        for body in self.model.bodies:
+            for func in range(nfunctions):
+                if body.transfer is not None:
+                    # Transform load transfer adjoint variables using transpose Jacobian from
+                    # funtofem: dLdfA^T * psi_L
+                    psi_L_r = np.zeros(body.aero_nnodes * 3, dtype=TransferScheme.dtype)
+                    body.transfer.applydDduS(
+                        body.psi_S[:, func].copy(order="C"), psi_L_r
+                    )
+                    body.dLdfa[:, func] = psi_L_r
+
+                if body.thermal_transfer is not None:
+                    # Transform heat flux transfer adjoint variables using transpose Jacobian from
+                    # funtofem: dQdftA^T * psi_Q = dTdts * psi_Q
+                    psi_Q_r = np.zeros(body.aero_nnodes, dtype=TransferScheme.dtype)
+                    body.thermal_transfer.applydQdqATrans(
+                        body.psi_T_S[:, func].copy(order="C"), psi_Q_r
+                    )
+                    body.dQdfta[:, func] = psi_Q_r
+
+        fail = self.solvers["flow"].iterate_adjoint(scenario, self.model.bodies, step)
+
         fail = self.comm.allreduce(fail)
         if fail != 0:
             if self.comm.Get_rank() == 0:
-                print("Structural solver returned fail flag")
+                print("Flow solver returned fail flag")
             return fail
 
-        # extract coordinate derivative term from initial condition
-        self._extract_coordinate_derivatives(scenario, self.model.bodies, step=0)
+        # From the flow grid adjoint, get to the displacement adjoint
+        for body in self.model.bodies:
+            if body.transfer is not None:
+                for func in range(nfunctions):
+                    if body.motion_type == "deform":
+                        # displacement adjoint equation
+                        body.psi_D[:, func] = -body.dGdua[:, func]
+                    elif "rigid" in body.motion_type and "deform" in body.motion_type:
+                        # solve the elastic deformation adjoint
+                        psi_E = np.zeros(
+                            body.aero_nnodes * 3, dtype=TransferScheme.dtype
+                        )
+                        tmt = np.linalg.inv(np.transpose(body.rigid_transform))
+                        for node in range(body.aero_nnodes):
+                            for i in range(3):
+                                psi_E[3 * node + i] = (
+                                    tmt[i, 0] * body.dGdua[3 * node + 0, func]
+                                    + tmt[i, 1] * body.dGdua[3 * node + 1, func]
+                                    + tmt[i, 2] * body.dGdua[3 * node + 2, func]
+                                    + tmt[i, 3]
+                                )
+
+                        # get the product dE/dT^T psi_E
+                        dEdTmat = np.zeros((3, 4), dtype=TransferScheme.dtype)
+
+                        for n in range(body.aero_nnodes):
+                            for i in range(3):
+                                for j in range(4):
+                                    if j < 3:
+                                        dEdTmat[i, j] += (
+                                            -(
+                                                body.aero_X[3 * n + j]
+                                                + body.aero_disps[3 * n + j]
+                                            )
+                                            * psi_E[3 * n + i]
+                                        )
+                                    else:
+                                        dEdTmat[i, j] += -psi_E[3 * n + i]
 
-        return 0
+                        dEdT = dEdTmat.flatten(order="F")
+                        dEdT = self.comm.allreduce(dEdT)
+
+                        # solve the rigid transform adjoint
+                        psi_R = np.zeros(12, dtype=TransferScheme.dtype)
+                        dGdT_func = body.dGdT[:, :, func]
+                        dGdT = dGdT_func[:3, :4].flatten(order="F")
+
+                        psi_R = -dGdT - dEdT
+
+                        # now solve the displacement adjoint
+                        dRduA = np.zeros(
+                            3 * body.aero_nnodes, dtype=TransferScheme.dtype
+                        )
+                        body.transfer.applydRduATrans(psi_R, dRduA)
+
+                        body.psi_D[:, func] = -psi_E - dRduA
+
+            # form the RHS for the structural adjoint equation on the next reverse step
+            for func in range(nfunctions):
+
+                if body.transfer is not None:
+                    # calculate dDdu_s^T * psi_D
+                    psi_D_product = np.zeros(
+                        body.struct_nnodes * body.xfer_ndof,
+                        dtype=TransferScheme.dtype,
+                    )
+                    body.transfer.applydDduSTrans(
+                        body.psi_D[:, func].copy(order="C"), psi_D_product
+                    )
+
+                    # calculate dLdu_s^T * psi_L
+                    psi_L_product = np.zeros(
+                        body.struct_nnodes * body.xfer_ndof,
+                        dtype=TransferScheme.dtype,
+                    )
+                    body.transfer.applydLduSTrans(
+                        body.psi_L[:, func].copy(order="C"), psi_L_product
+                    )
+                    body.struct_rhs[:, func] = -psi_D_product - psi_L_product
+
+                if body.thermal_transfer is not None:
+                    # calculate dTdt_s^T * psi_T
+                    psi_T_product = np.zeros(
+                        body.struct_nnodes * body.therm_xfer_ndof,
+                        dtype=TransferScheme.dtype,
+                    )
+                    body.psi_T = body.dAdta
+                    body.thermal_transfer.applydTdtSTrans(
+                        body.psi_T[:, func].copy(order="C"), psi_T_product
+                    )
+                    body.struct_rhs_T[:, func] = -psi_T_product
+
+        # extract and accumulate coordinate derivative every step
+        self._extract_coordinate_derivatives(scenario, self.model.bodies, step)
+
+        return fail
@@ -23,6 +23,7 @@ limitations under the License.
 from __future__ import print_function
 
 from .funtofem_driver import *
+from .aitken import aitken_update
 
 
 class FUNtoFEMnlbgsFSISubiters(FUNtoFEMDriver):
@@ -431,26 +432,15 @@ class FUNtoFEMnlbgsFSISubiters(FUNtoFEMDriver):
 
         # do the Aitken update
         for ibody, body in enumerate(self.model.bodies):
-            up = body.struct_disps - self.aitken_vec[ibody]
-            self.theta[ibody] *= (
-                1.0
-                - (up - self.up_prev[ibody]).dot(up)
-                / np.linalg.norm(up - self.up_prev[ibody]) ** 2.0
+            self.theta[ibody] = aitken_update(
+                body.struct_disps,
+                self.aitken_vec[ibody],
+                self.up_prev[ibody],
+                self.theta[ibody],
+                self.theta_min,
+                1.0,
+                0.0,
             )
-            self.theta[ibody] = np.max(
-                (np.min((self.theta[ibody], 1.0)), self.theta_min)
-            )
-
-            # handle the min/max for complex step
-            if (
-                type(self.theta[ibody]) == np.complex128
-                or type(self.theta[ibody]) == complex
-            ):
-                self.theta[ibody] = self.theta[ibody].real + 0.0j
-
-            self.aitken_vec[ibody] += self.theta[ibody] * up
-            self.up_prev[ibody] = up[:]
-            body.struct_disps = self.aitken_vec[ibody]
 
         return
 
@@ -459,47 +449,28 @@ class FUNtoFEMnlbgsFSISubiters(FUNtoFEMDriver):
         if self.aitken_init:
             self.aitken_init = False
 
-            # initialize the 'previous update' to zero
+            # initialize the 'previous update' to zero. Each function has its own
+            # theta, and all the functions are relaxed at once.
             self.up_prev = []
             self.aitken_vec = []
             self.theta = []
 
             for ibody, body in enumerate(self.model.bodies):
-                up_prev_body = []
-                aitken_vec_body = []
-                theta_body = []
-                for func in range(nfunctions):
-                    up_prev_body.append(
-                        np.zeros(
-                            body.struct_nnodes * body.xfer_ndof,
-                            dtype=TransferScheme.dtype,
-                        )
-                    )
-                    aitken_vec_body.append(
-                        np.zeros(
-                            body.struct_nnodes * body.xfer_ndof,
-                            dtype=TransferScheme.dtype,
-                        )
-                    )
-                    theta_body.append(self.theta_init)
-                self.up_prev.append(up_prev_body)
-                self.aitken_vec.append(aitken_vec_body)
-                self.theta.append(theta_body)
+                shape = (body.struct_nnodes * body.xfer_ndof, nfunctions)
+                self.up_prev.append(np.zeros(shape, dtype=TransferScheme.dtype))
+                self.aitken_vec.append(np.zeros(shape, dtype=TransferScheme.dtype))
+                self.theta.append(np.full(nfunctions, self.theta_init))
 
         # do the Aitken update
         for ibody, body in enumerate(self.model.bodies):
-            for func in range(nfunctions):
-                up = body.psi_S[:, func] - self.aitken_vec[ibody][func]
-                self.theta[ibody][func] *= (
-                    1.0
-                    - (up - self.up_prev[ibody][func]).dot(up)
-                    / np.linalg.norm(up - self.up_prev[ibody][func]) ** 2.0
-                )
-                self.theta[ibody][func] = np.max(
-                    (np.min((self.theta[ibody][func], 1.0)), self.theta_min)
-                )
-                self.aitken_vec[ibody][func] += self.theta[ibody][func] * up
-                self.up_prev[ibody][func] = up[:]
-                body.psi_S[:, func] = self.aitken_vec[ibody][func][:]
+            self.theta[ibody] = aitken_update(
+                body.psi_S,
+                self.aitken_vec[ibody],
+                self.up_prev[ibody],
+                self.theta[ibody],
+                self.theta_min,
+                1.0,
+                0.0,
+            )
 
         return self.aitken_vec
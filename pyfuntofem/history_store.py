@@ -0,0 +1,506 @@
+#!/usr/bin/env python
+"""
+This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+and design optimization.
+
+Copyright (C) 2015 Georgia Tech Research Corporation.
+Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+All rights reserved.
+
+FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+you may not use this software except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import collections
+import mmap
+import os
+import tempfile
+import threading
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class CompressedHistory(object):
+    """
+    A time history that keeps each row compressed with zlib.
+
+    Rows are decompressed into a small cache when they are accessed. The
+    array returned for a row is a view of the decompressed values, and the row
+    is compressed again once the view is no longer used, either by the cache
+    or by the caller. Values written into a view that is held after the row
+    is evicted from the cache are therefore still stored in the history.
+    """
+
+    def __init__(self, shape, dtype, fill=0.0, level=1, cache_steps=4, fp=None):
+        """
+        Parameters
+        ----------
+        shape: tuple
+            (number of time steps, number of values per time step)
+        dtype: numpy dtype
+            the type of the values
+        fill: scalar
+            the initial value of the history
+        level: int
+            zlib compression level
+        cache_steps: int
+            number of decompressed rows that are kept in the cache
+        fp: file object
+            if given, the compressed rows are appended to this file rather
+            than held in memory
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fill = fill
+        self.level = level
+        self.cache_steps = max(cache_steps, 2)
+        self.fp = fp
+
+        # Compressed rows, either the bytes or the (offset, size) in the file,
+        # and the number of times each row has been stored
+        self.rows = [None] * self.shape[0]
+        self.versions = [0] * self.shape[0]
+
+        # The views of the rows in use, the decompressed values and a copy of
+        # the values when they were loaded
+        self.cache = collections.OrderedDict()
+        self.live = {}
+        self.originals = {}
+
+        # Rows loaded ahead of time by prefetch
+        self.ready = {}
+        self.lock = threading.RLock()
+
+        return
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, step):
+        with self.lock:
+            if step < 0:
+                step += self.shape[0]
+            if step in self.cache:
+                self.cache.move_to_end(step)
+                return self.cache[step]
+
+            # Return the view that is still in use by a caller, if any
+            view = self._get_live(step)
+            if view is None:
+                if step in self.ready:
+                    values = self.ready.pop(step)
+                else:
+                    values = self._load(step)
+                self.originals[step] = values.copy()
+
+                # Store the values when the last reference to the view is gone
+                view = values.view()
+                finalizer = weakref.finalize(view, self._release, step, values)
+                finalizer.atexit = False
+                self.live[step] = finalizer
+
+            self.cache[step] = view
+            while len(self.cache) > self.cache_steps:
+                self.cache.popitem(last=False)
+
+            return view
+
+    def __setitem__(self, step, value):
+        self[step][:] = value
+
+    def __array__(self, dtype=None):
+        array = np.empty(self.shape, dtype=self.dtype)
+        with self.lock:
+            for step in range(self.shape[0]):
+                view = self._get_live(step)
+                if view is not None:
+                    array[step] = view
+                else:
+                    array[step] = self._load(step)
+        if dtype is not None:
+            return array.astype(dtype)
+        return array
+
+    def prefetch(self, steps):
+        """
+        Decompress the given rows ahead of the time that they are accessed
+        """
+        for step in steps:
+            with self.lock:
+                if step in self.live or step in self.ready:
+                    continue
+                version = self.versions[step]
+            values = self._load(step)
+
+            # Drop the values if the row was stored again in the meantime
+            with self.lock:
+                if (
+                    self.versions[step] == version
+                    and step not in self.live
+                    and step not in self.ready
+                ):
+                    self.ready[step] = values
+
+        return
+
+    def flush(self):
+        """
+        Compress all the rows that are in use
+        """
+        with self.lock:
+            self.cache.clear()
+            for step in list(self.live.keys()):
+                finalizer = self.live.get(step)
+                if finalizer is not None and finalizer.alive:
+                    values = finalizer.peek()[2][1]
+                    self._write(step, values)
+                    self.originals[step] = values.copy()
+            self.ready.clear()
+
+        return
+
+    def close(self):
+        """
+        Discard the rows in use without storing them and close the file
+        """
+        with self.lock:
+            for finalizer in self.live.values():
+                finalizer.detach()
+            self.live.clear()
+            self.cache.clear()
+            self.originals.clear()
+            self.ready.clear()
+            if self.fp is not None:
+                self.fp.close()
+
+        return
+
+    def _get_live(self, step):
+        finalizer = self.live.get(step)
+        if finalizer is not None:
+            info = finalizer.peek()
+            if info is not None:
+                return info[0]
+        return None
+
+    def _release(self, step, values):
+        with self.lock:
+            self._write(step, values)
+            self.live.pop(step, None)
+            self.originals.pop(step, None)
+
+        return
+
+    def _load(self, step):
+        with self.lock:
+            data = self.rows[step]
+            if data is not None and self.fp is not None:
+                self.fp.seek(data[0])
+                data = self.fp.read(data[1])
+
+        if data is None:
+            return np.full(self.shape[1], self.fill, dtype=self.dtype)
+        return np.frombuffer(zlib.decompress(data), dtype=self.dtype).copy()
+
+    def _write(self, step, values):
+        # Skip the rows that have not changed since they were loaded
+        original = self.originals.get(step)
+        if original is not None and original.tobytes() == values.tobytes():
+            return
+
+        data = zlib.compress(values.tobytes(), self.level)
+        if self.fp is not None:
+            self.fp.seek(0, os.SEEK_END)
+            offset = self.fp.tell()
+            self.fp.write(data)
+            data = (offset, len(data))
+        self.rows[step] = data
+        self.versions[step] += 1
+        self.ready.pop(step, None)
+
+        return
+
+
+class HistoryStore(object):
+    """
+    Storage for the time histories of the coupling variables in unsteady
+    analyses. Each history has one row per time step.
+
+    This store keeps the histories in memory. With compression, each row is
+    compressed with zlib and only a few rows are decompressed at a time.
+    """
+
+    def __init__(self, compression=False, level=1, cache_steps=4, prefetch_steps=2):
+        """
+        Parameters
+        ----------
+        compression: bool
+            compress the rows of the histories
+        level: int
+            zlib compression level
+        cache_steps: int
+            number of decompressed rows kept for each compressed history
+        prefetch_steps: int
+            number of rows loaded ahead of the reverse sweep by prefetch
+        """
+        self.compression = compression
+        self.level = level
+        self.cache_steps = cache_steps
+        self.prefetch_steps = prefetch_steps
+
+        self.executor = None
+        self.pending = []
+
+        return
+
+    def allocate(self, shape, dtype, fill=0.0):
+        """
+        Allocate a new time history
+
+        Parameters
+        ----------
+        shape: tuple
+            (number of time steps, number of values per time step)
+        dtype: numpy dtype
+            the type of the values
+        fill: scalar
+            the initial value of the history
+
+        Returns
+        -------
+        history:
+            an array, or an array-like object whose rows are indexed by time step
+        """
+        if self.compression:
+            return CompressedHistory(
+                shape,
+                dtype,
+                fill=fill,
+                level=self.level,
+                cache_steps=self.cache_steps + self.prefetch_steps,
+            )
+        return np.full(shape, fill, dtype=dtype)
+
+    def release(self, history):
+        """
+        Free the storage used by a history that is no longer needed
+        """
+        return
+
+    def prefetch(self, histories, step):
+        """
+        Start loading the rows of the histories that precede the given step,
+        which are the next rows accessed during the reverse adjoint sweep
+
+        Parameters
+        ----------
+        histories: list
+            the histories to load
+        step: int
+            the current time step
+        """
+        steps = [s for s in range(step - 1, step - 1 - self.prefetch_steps, -1)]
+        steps = [s for s in steps if s >= 0]
+        histories = [h for h in histories if isinstance(h, CompressedHistory)]
+        if len(steps) == 0 or len(histories) == 0:
+            return
+
+        self._submit(histories, steps)
+
+        return
+
+    def wait(self):
+        """
+        Wait for the prefetch requests to complete
+        """
+        for future in self.pending:
+            future.result()
+        self.pending = []
+
+        return
+
+    def close(self):
+        """
+        Wait for the prefetch requests and shut down the prefetch thread
+        """
+        self.wait()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+        return
+
+    def _submit(self, histories, steps):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # Drop the requests that have already completed
+        self.pending = [future for future in self.pending if not future.done()]
+        for history in histories:
+            self.pending.append(self.executor.submit(history.prefetch, steps))
+
+        return
+
+
+class MemmapHistoryStore(HistoryStore):
+    """
+    Storage for the time histories in files on disk so that the histories of
+    long unsteady analyses do not have to fit in memory.
+
+    Without compression, each history is a numpy.memmap of a temporary file
+    and the rows are views of the file. With compression, the compressed rows
+    are appended to a temporary file. The files are deleted when the history
+    is released or the store is closed.
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        compression=False,
+        level=1,
+        cache_steps=4,
+        prefetch_steps=2,
+    ):
+        """
+        Parameters
+        ----------
+        directory: str
+            directory for the history files (defaults to the system temporary
+            directory)
+        compression: bool
+            compress the rows of the histories
+        level: int
+            zlib compression level
+        cache_steps: int
+            number of decompressed rows kept for each compressed history
+        prefetch_steps: int
+            number of rows loaded ahead of the reverse sweep by prefetch
+        """
+        super(MemmapHistoryStore, self).__init__(
+            compression=compression,
+            level=level,
+            cache_steps=cache_steps,
+            prefetch_steps=prefetch_steps,
+        )
+        self.directory = directory
+
+        # The file names of the allocated histories
+        self.files = {}
+
+        return
+
+    def allocate(self, shape, dtype, fill=0.0):
+        # Files cannot be mapped for empty histories, e.g. on processors
+        # without any nodes
+        if np.prod(shape) == 0:
+            return np.full(shape, fill, dtype=dtype)
+
+        fd, filename = tempfile.mkstemp(
+            prefix="f2f_history_", suffix=".bin", dir=self.directory
+        )
+
+        if self.compression:
+            fp = os.fdopen(fd, "w+b")
+            history = CompressedHistory(
+                shape,
+                dtype,
+                fill=fill,
+                level=self.level,
+                cache_steps=self.cache_steps + self.prefetch_steps,
+                fp=fp,
+            )
+        else:
+            os.close(fd)
+            history = np.memmap(filename, dtype=dtype, mode="w+", shape=tuple(shape))
+            if fill != 0.0:
+                history[:] = fill
+
+        self.files[id(history)] = filename
+
+        return history
+
+    def release(self, history):
+        filename = self.files.pop(id(history), None)
+        if filename is None:
+            return
+
+        self.wait()
+        if isinstance(history, CompressedHistory):
+            history.close()
+        else:
+            # Rows returned for earlier steps may still be in use, so the file
+            # is not unmapped here. The file is removed now and its mapping is
+            # freed when the last view of it is deleted.
+            history.flush()
+        os.remove(filename)
+
+        return
+
+    def prefetch(self, histories, step):
+        steps = [s for s in range(step - 1, step - 1 - self.prefetch_steps, -1)]
+        steps = [s for s in steps if s >= 0]
+        if len(steps) == 0:
+            return
+
+        # Ask the kernel to read the rows of the memory-mapped files ahead of
+        # time. Without madvise, the rows are read by the prefetch thread.
+        touch = []
+        for history in histories:
+            if isinstance(history, np.memmap):
+                if not self._advise(history, steps):
+                    touch.append(history)
+
+        compressed = [h for h in histories if isinstance(h, CompressedHistory)]
+        if len(compressed) > 0:
+            self._submit(compressed, steps)
+        if len(touch) > 0:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1)
+            self.pending.append(self.executor.submit(self._touch, touch, steps))
+
+        return
+
+    def close(self):
+        super(MemmapHistoryStore, self).close()
+
+        for filename in self.files.values():
+            if os.path.exists(filename):
+                os.remove(filename)
+        self.files = {}
+
+        return
+
+    def _advise(self, history, steps):
+        if not hasattr(mmap, "MADV_WILLNEED"):
+            return False
+        buf = getattr(history, "_mmap", None)
+        if buf is None:
+            return False
+
+        row_size = history.shape[1] * history.itemsize
+        start = min(steps) * row_size
+        end = (max(steps) + 1) * row_size
+        start -= start % mmap.PAGESIZE
+        if end > start:
+            buf.madvise(mmap.MADV_WILLNEED, start, end - start)
+
+        return True
+
+    def _touch(self, histories, steps):
+        for history in histories:
+            for step in steps:
+                np.sum(history[step])
+
+        return
@@ -569,6 +569,54 @@ class SolverInterface(object):
         """
         pass
 
+    def save_checkpoint(self, scenario, bodies, step):
+        """
+        Save a snapshot of the solver state at this time step so that the forward analysis can be
+        restarted from it. This hook must be implemented when the driver uses checkpointing for the
+        unsteady adjoint.
+
+        With checkpointing, the driver recomputes segments of the forward analysis during the reverse
+        sweep. When set_states is called for a step, the forward analysis has just completed that step,
+        and the structural solver is then asked for the states of the previous step. The solver only
+        needs to keep the states of the current and previous steps rather than the whole history.
+
+        **Note: the time histories of the bodies are still stored for every step, so the memory saved
+        by checkpointing is in the internal states of the solvers.**
+
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            The current scenario
+        bodies: list of :class:`~body.Body` objects
+            The bodies in the model
+        step: int
+            The time step of the current state
+
+        Returns
+        -------
+        checkpoint:
+            any object that load_checkpoint can use to restore the state
+        """
+        pass
+
+    def load_checkpoint(self, scenario, bodies, step, checkpoint):
+        """
+        Restore the solver state from a snapshot created by save_checkpoint so that the next call to
+        iterate takes time step step + 1.
+
+        Parameters
+        ----------
+        scenario: :class:`~scenario.Scenario`
+            The current scenario
+        bodies: list of :class:`~body.Body` objects
+            The bodies in the model
+        step: int
+            The time step of the checkpoint
+        checkpoint:
+            the object returned by save_checkpoint
+        """
+        pass
+
     def step_pre(self, scenario, bodies, step):
         """
         Operations before at a step in an FSI subiteration case. Called in NLBGS with FSI subiterations.
@@ -387,6 +387,16 @@ class TacsUnsteadyInterface(SolverInterface):
                         body.xfer_ndof * i : body.xfer_ndof * i + body.xfer_ndof
                     ] = disps[tacs_body.dof * n : tacs_body.dof * n + body.xfer_ndof]
 
+    def save_checkpoint(self, scenario, bodies, step):
+        # The TACS integrator stores the states of every time step, so the
+        # checkpoint only records the step
+        return step
+
+    def load_checkpoint(self, scenario, bodies, step, checkpoint):
+        # Restore the displacements of the checkpoint from the integrator. The
+        # next call to iterate takes the step from the stored states.
+        self.set_states(scenario, bodies, checkpoint)
+
     def iterate_adjoint(self, scenario, bodies, step):
         fail = 0
 
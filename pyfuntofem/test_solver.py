@@ -316,6 +316,33 @@ class TestAerodynamicSolver(SolverInterface):
     def post(self, scenario, bodies):
         pass
 
+    def save_checkpoint(self, scenario, bodies, step):
+        """
+        Save the aerodynamic loads and heat flux at this step. The solver has no
+        other internal state.
+        """
+        checkpoint = []
+        for body in bodies:
+            aero_loads = body.get_aero_loads(scenario, step)
+            if aero_loads is not None:
+                aero_loads = aero_loads.copy()
+            aero_flux = body.get_aero_heat_flux(scenario, step)
+            if aero_flux is not None:
+                aero_flux = aero_flux.copy()
+            checkpoint.append((aero_loads, aero_flux))
+
+        return checkpoint
+
+    def load_checkpoint(self, scenario, bodies, step, checkpoint):
+        """Restore the aerodynamic loads and heat flux at this step"""
+        for body, (aero_loads, aero_flux) in zip(bodies, checkpoint):
+            if aero_loads is not None:
+                body.get_aero_loads(scenario, step)[:] = aero_loads
+            if aero_flux is not None:
+                body.get_aero_heat_flux(scenario, step)[:] = aero_flux
+
+        return
+
     def initialize_adjoint(self, scenario, bodies):
         """Note that this function must return a fail flag of zero on success"""
         return 0
@@ -577,6 +604,33 @@ class TestStructuralSolver(SolverInterface):
     def post(self, scenario, bodies):
         pass
 
+    def save_checkpoint(self, scenario, bodies, step):
+        """
+        Save the structural displacements and temperatures at this step. The
+        solver has no other internal state.
+        """
+        checkpoint = []
+        for body in bodies:
+            struct_disps = body.get_struct_disps(scenario, step)
+            if struct_disps is not None:
+                struct_disps = struct_disps.copy()
+            struct_temps = body.get_struct_temps(scenario, step)
+            if struct_temps is not None:
+                struct_temps = struct_temps.copy()
+            checkpoint.append((struct_disps, struct_temps))
+
+        return checkpoint
+
+    def load_checkpoint(self, scenario, bodies, step, checkpoint):
+        """Restore the structural displacements and temperatures at this step"""
+        for body, (struct_disps, struct_temps) in zip(bodies, checkpoint):
+            if struct_disps is not None:
+                body.get_struct_disps(scenario, step)[:] = struct_disps
+            if struct_temps is not None:
+                body.get_struct_temps(scenario, step)[:] = struct_temps
+
+        return
+
     def initialize_adjoint(self, scenario, bodies):
         """Note that this function must return a fail flag of zero on success"""
         return 0
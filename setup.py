@@ -57,6 +57,11 @@ lib_dirs.extend(get_global_dir(rel_lib_dirs))
 # Add the numpy/mpi4py directories
 inc_dirs.extend([numpy.get_include(), mpi4py.get_include()])
 
+# Link against OpenMP when the transfer scheme library is built with -fopenmp
+extra_link_args = []
+if os.environ.get("FUNTOFEM_USE_OPENMP"):
+    extra_link_args.append("-fopenmp")
+
 exts = []
 for mod in ["TransferScheme"]:
     exts.append(
@@ -67,6 +72,7 @@ for mod in ["TransferScheme"]:
             libraries=libs,
             library_dirs=lib_dirs,
             runtime_library_dirs=runtime_lib_dirs,
+            extra_link_args=extra_link_args,
         )
     )
 
@@ -26,7 +26,7 @@
 
 #include <cstring>
 
-#include "LocatePoint.h"
+#include "LocateSegment.h"
 
 /*
   Create the beam transfer load and displacement transfer object. This
@@ -108,79 +108,42 @@ void BeamTransfer::initialize() {
     memset(Us, 0, dof_per_node * ns * sizeof(F2FScalar));
   }
 
-  // Set up the node to element data
-  int *node_to_beam_ptr = new int[ns + 1];
-  memset(node_to_beam_ptr, 0, (ns + 1) * sizeof(int));
-
-  // Count up all the times each element refers to each node
-  for (int i = 0; i < order * nelems; i++) {
-    node_to_beam_ptr[conn[i] + 1]++;
-  }
-
-  // Reset the array so that it will point in to the list
-  // of elements
-  for (int i = 0; i < ns; i++) {
-    node_to_beam_ptr[i + 1] += node_to_beam_ptr[i];
-  }
-
-  // Allocate the array of nodes
-  int *node_to_beam = new int[node_to_beam_ptr[ns]];
-
+  // Store the end nodes of each element as a line segment
+  int *seg_nodes = new int[2 * nelems];
   for (int i = 0; i < nelems; i++) {
-    // Set the reference to the i-th element
-    for (int j = 0; j < order; j++) {
-      node_to_beam[node_to_beam_ptr[conn[order * i + j]]] = i;
-      node_to_beam_ptr[conn[order * i + j]]++;
-    }
+    seg_nodes[2 * i] = conn[order * i];
+    seg_nodes[2 * i + 1] = conn[order * (i + 1) - 1];
   }
 
-  // Reset the node->beam pointer array
-  for (int i = ns; i > 0; i--) {
-    node_to_beam_ptr[i] = node_to_beam_ptr[i - 1];
-  }
-  node_to_beam_ptr[0] = 0;
-
-  // Create instance of LocatePoint class to perform the following
-  // searches
-  int min_bin_size = 10;
-  LocatePoint *locator = new LocatePoint(Xs, ns, min_bin_size);
+  // Create a bounding volume hierarchy over the elements to find the closest
+  // element to each aerodynamic point
+  LocateSegment *locator = new LocateSegment(Xs, nelems, seg_nodes);
+  delete[] seg_nodes;
 
   // Allocate space for the data
+  if (aero_pt_to_elem) {
+    delete[] aero_pt_to_elem;
+  }
+  if (aero_pt_to_param) {
+    delete[] aero_pt_to_param;
+  }
   aero_pt_to_elem = new int[na];
   aero_pt_to_param = new double[na];
 
-  // Find the node that is closest to the beam
-  for (int i = 0; i < na; i++) {
-    // Locate the structural node that is closest to the beam
-    int node = locator->locateClosest(&Xa[3 * i]);
-
-    // Find the minimum distance from any of the adjacent elements
-    F2FScalar min_dist = 1e20;
-    int min_elem = 0;
-    double min_xi = 0.0;
-
-    for (int j = node_to_beam_ptr[node]; j < node_to_beam_ptr[node + 1]; j++) {
-      int elem = node_to_beam[j];
-
-      double xi;
-      F2FScalar dist = findParametricPoint(
-          &Xs[3 * conn[order * elem]], &Xs[3 * conn[order * (elem + 1) - 1]],
-          &Xa[3 * i], &xi);
-      if (F2FRealPart(dist) < F2FRealPart(min_dist)) {
-        min_dist = dist;
-        min_elem = elem;
-        min_xi = xi;
-      }
-    }
+  locator->locateClosestBatch(na, Xa, aero_pt_to_elem, num_threads);
+  delete locator;
 
-    // Record the closest parametric point for each aerodynamic
-    // point in the mesh
-    aero_pt_to_elem[i] = min_elem;
-    aero_pt_to_param[i] = min_xi;
+  // Record the closest parametric point for each aerodynamic point in the
+  // mesh
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+  for (int i = 0; i < na; i++) {
+    int elem = aero_pt_to_elem[i];
+    findParametricPoint(&Xs[3 * conn[order * elem]],
+                        &Xs[3 * conn[order * (elem + 1) - 1]], &Xa[3 * i],
+                        &aero_pt_to_param[i]);
   }
-
-  delete[] node_to_beam_ptr;
-  delete[] node_to_beam;
 }
 
 /*
@@ -651,15 +614,7 @@ void BeamTransfer::addTransposeRotationDerivAdjoint(const double scale,
 /*
   Based on the displacement vector
 */
-void BeamTransfer::transferDisps(const F2FScalar *struct_disps,
-                                 F2FScalar *aero_disps) {
-  // Check if struct nodes locations need to be redistributed
-  distributeStructuralMesh();
-
-  // Copy prescribed displacements into displacement vector
-  structGatherBcast(dof_per_node * ns_local, struct_disps, dof_per_node * ns,
-                    Us);
-
+void BeamTransfer::computeAeroDisps(F2FScalar *aero_disps) {
   for (int i = 0; i < na; i++) {
     // Get the element and parametric location within the element
     // where the aerodynamic node is attached.
@@ -712,15 +667,11 @@ void BeamTransfer::transferDisps(const F2FScalar *struct_disps,
 /*
   Transfer the aerodynamic loads to the structural node locations
 */
-void BeamTransfer::transferLoads(const F2FScalar *aero_loads,
-                                 F2FScalar *struct_loads) {
+void BeamTransfer::computeStructLoads(const F2FScalar *aero_loads,
+                                      F2FScalar *struct_loads_global) {
   // Copy prescribed aero loads into member variable
   memcpy(Fa, aero_loads, 3 * na * sizeof(F2FScalar));
 
-  // Zero struct loads
-  F2FScalar *struct_loads_global = new F2FScalar[dof_per_node * ns];
-  memset(struct_loads_global, 0, dof_per_node * ns * sizeof(F2FScalar));
-
   for (int i = 0; i < na; i++) {
     // Get the element and parametric location within the element
     // where the aerodynamic node is attached.
@@ -764,12 +715,6 @@ void BeamTransfer::transferLoads(const F2FScalar *aero_loads,
       addTransposeRotationDeriv(N[k], &u[3], d, fa, &fs[3]);
     }
   }
-
-  // distribute the structural loads
-  structAddScatter(dof_per_node * ns, struct_loads_global,
-                   dof_per_node * ns_local, struct_loads);
-
-  delete[] struct_loads_global;
 }
 
 // Action of transpose Jacobians needed for solving adjoint system
@@ -21,6 +21,7 @@
 
 #include "LinearizedMELD.h"
 
+#include <math.h>
 #include <stdio.h>
 
 #include <cstring>
@@ -34,7 +35,11 @@ LinearizedMELD::LinearizedMELD(MPI_Comm all, MPI_Comm structure,
     : MELD(all, structure, struct_root, aero, aero_root, symmetry, num_nearest,
            beta) {
   // Initialize the data for the transfers
-  global_H = NULL;
+  global_Hinv = NULL;
+  mat_rowp = NULL;
+  mat_cols = NULL;
+  mat_vals = NULL;
+  mat_geometry = -1;
 
   // Notify user of the type of transfer scheme they are using
   int rank;
@@ -47,8 +52,13 @@ LinearizedMELD::LinearizedMELD(MPI_Comm all, MPI_Comm structure,
 
 LinearizedMELD::~LinearizedMELD() {
   // Free the data for the transfers
-  if (global_H) {
-    delete[] global_H;
+  if (global_Hinv) {
+    delete[] global_Hinv;
+  }
+  if (mat_rowp) {
+    delete[] mat_rowp;
+    delete[] mat_cols;
+    delete[] mat_vals;
   }
 
   int rank;
@@ -68,6 +78,12 @@ LinearizedMELD::~LinearizedMELD() {
   global_beta : the weighting decay parameter
 */
 void LinearizedMELD::initialize() {
+  // Gather the full structural mesh again if it was previously localized
+  if (plan_send_counts) {
+    freeStructPlan();
+    mesh_update = 1;
+  }
+
   // global number of structural nodes
   distributeStructuralMesh();
 
@@ -89,9 +105,13 @@ void LinearizedMELD::initialize() {
     Fa = new F2FScalar[3 * na];
     memset(Fa, 0, 3 * na * sizeof(F2FScalar));
   }
-  if (ns > 0) {
-    Us = new F2FScalar[3 * ns];
-    memset(Us, 0, 3 * ns * sizeof(F2FScalar));
+
+  // Free any data from a previous initialization
+  if (global_conn) {
+    delete[] global_conn;
+  }
+  if (global_W) {
+    delete[] global_W;
   }
 
   // Create aerostructural connectivity
@@ -102,110 +122,216 @@ void LinearizedMELD::initialize() {
   global_W = new F2FScalar[nn * na];
   computeWeights(F2FRealPart(global_beta), isymm, nn, global_conn, global_W);
 
+  // Keep only the structural nodes connected to the local aerodynamic nodes
+  if (struct_distributed) {
+    localizeStructuralMesh(nn, global_conn);
+  }
+
+  if (ns > 0) {
+    Us = new F2FScalar[3 * ns];
+    memset(Us, 0, 3 * ns * sizeof(F2FScalar));
+  }
+
   // Allocate transfer variables
+  if (global_xs0bar) {
+    delete[] global_xs0bar;
+  }
+  if (global_Hinv) {
+    delete[] global_Hinv;
+  }
   global_xs0bar = new F2FScalar[3 * na];
-  global_H = new F2FScalar[9 * na];
+
+  // Only the unique entries of the symmetric inverses are stored in the
+  // memory-lean mode
+  if (memory_lean) {
+    global_Hinv = new F2FScalar[6 * na];
+  } else {
+    global_Hinv = new F2FScalar[9 * na];
+  }
+
+  // Allocate the transfer matrix, which is assembled by the first transfer
+  if (mat_rowp) {
+    delete[] mat_rowp;
+    delete[] mat_cols;
+    delete[] mat_vals;
+  }
+  mat_rowp = new int[na + 1];
+  mat_cols = new int[nn * na];
+  mat_vals = new F2FScalar[9 * nn * na];
+  mat_geometry = -1;
 }
 
 /*
-  Computes the displacements of all aerodynamic surface nodes based on
-  linearized version of MELD
-
-  Arguments
-  ---------
-  struct_disps : structural node displacements
+  Get the number of bytes allocated for the data stored by the scheme
 
   Returns
   -------
-  aero_disps   : aerodynamic node displacements
+  the number of bytes
 */
-void LinearizedMELD::transferDisps(const F2FScalar *struct_disps,
-                                   F2FScalar *aero_disps) {
-  // Check if struct nodes locations need to be redistributed
-  distributeStructuralMesh();
+size_t LinearizedMELD::getMemoryUsage() {
+  size_t nscalars = 0;
+  size_t nints = 0;
+  if (global_Hinv) {
+    nscalars += (memory_lean ? 6 : 9) * na;
+  }
+  if (mat_rowp) {
+    nints += (size_t)na + 1 + nn * na;
+    nscalars += (size_t)9 * nn * na;
+  }
 
-  // Copy prescribed displacements into displacement vector
-  structGatherBcast(3 * ns_local, struct_disps, 3 * ns, Us);
+  return MELD::getMemoryUsage() + nscalars * sizeof(F2FScalar) +
+         nints * sizeof(int);
+}
 
-  // Zero the outputs
-  memset(aero_disps, 0, 3 * na * sizeof(F2FScalar));
+/*
+  Assemble the sparse matrix that maps the structural displacements to the
+  aerodynamic displacements for the current node locations. The centroids
+  and the inverses of the point inertia matrices are stored for the
+  Jacobian-vector products, so no factorizations are needed afterwards.
+  The blocks of a structural node that is linked to an aerodynamic node
+  together with its reflection are added into a single block.
+*/
+void LinearizedMELD::assembleTransferMatrix() {
+  int *entry = new int[nn * na];
+  computeTransferPattern(nn, global_conn, mat_rowp, mat_cols, entry);
+  memset(mat_vals, 0, 9 * mat_rowp[na] * sizeof(F2FScalar));
+
+  // Copy the structural nodes and append the reflected nodes
+  F2FScalar *X0 = new F2FScalar[isymm >= 0 ? 6 * ns : 3 * ns];
+  memcpy(X0, Xs, 3 * ns * sizeof(F2FScalar));
+  reflectStructNodes(X0);
+
+  // The components of the nodes linked to an aerodynamic node
+  F2FScalar *x0 = new F2FScalar[6 * nn];
+  F2FScalar *xd = &x0[3 * nn];
 
   for (int i = 0; i < na; i++) {
     // Point aerodynamic surface node location into a
     const F2FScalar *xa = &Xa[3 * i];
 
-    // Compute the centroid of the initial set of nodes
+    // Compute the centroid of the initial set of nodes and the covariance
+    // matrix
     const int *local_conn = &global_conn[i * nn];
     const F2FScalar *W = &global_W[i * nn];
     F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    computeCentroid(local_conn, W, Xs, xs0bar);
-
-    // Compute the covariance matrix
-    F2FScalar *H = &global_H[9 * i];
-    computeCovariance(Xs, Xs, local_conn, W, xs0bar, xs0bar, H);
+    F2FScalar xsbar[3], H[9];
+    gatherStructNodes(local_conn, X0, X0, x0, xd);
+    computeCentroidCovariance(W, x0, xd, xs0bar, xsbar, H);
 
-    // Compute the inverse of the point inertia matrix
+    // Compute and store the inverse of the point inertia matrix
     F2FScalar Hinv[9];
     computePointInertiaInverse(H, Hinv);
+    if (memory_lean) {
+      F2FScalar *h = &global_Hinv[6 * i];
+      h[0] = Hinv[0];
+      h[1] = Hinv[1];
+      h[2] = Hinv[2];
+      h[3] = Hinv[4];
+      h[4] = Hinv[5];
+      h[5] = Hinv[8];
+    } else {
+      memcpy(&global_Hinv[9 * i], Hinv, 9 * sizeof(F2FScalar));
+    }
 
     // Form the vector r from the initial centroid to the aerodynamic surface
     // node
     F2FScalar r[3];
     vec_diff(xs0bar, xa, r);
 
-    // Sum the contributions from each structural node to the aerodynamic
-    // surface node's displacement
-    F2FScalar *ua = &aero_disps[3 * i];
-
     for (int j = 0; j < nn; j++) {
-      // Get structural node location
-      int indx = global_conn[nn * i + j];
+      // Form the vector q from the centroid of the undisplaced set to the
+      // node, which is reflected if needed
+      F2FScalar q[3];
+      vec_diff(xs0bar, &X0[3 * local_conn[j]], q);
+
+      // Add the contribution of the structural node to the block
+      F2FScalar A[9];
+      computeDispMatrix(W[j], r, Hinv, q, A);
+      F2FScalar *block = &mat_vals[9 * entry[nn * i + j]];
+      for (int k = 0; k < 9; k++) {
+        block[k] += A[k];
+      }
+    }
+  }
 
-      if (indx < ns) {
-        F2FScalar *xs = &Xs[3 * indx];
+  delete[] entry;
+  delete[] X0;
+  delete[] x0;
+  mat_geometry = geometry_count;
+}
 
-        // Form the vector q from the centroid of the undisplaced set to the
-        // node
-        F2FScalar q[3];
-        vec_diff(xs0bar, xs, q);
+/*
+  Get the sparse matrix that maps the structural displacements to the
+  aerodynamic displacements in block compressed row format with 3 x 3 blocks
+  stored in row-major order. The load transfer is the transpose of this
+  matrix. The block rows correspond to the local aerodynamic nodes and the
+  block columns to the global structural nodes, or to the structural nodes
+  referenced on this processor when the structural mesh is distributed. The
+  matrix is owned by the transfer scheme and is only valid until the node
+  locations are changed.
 
-        // Get structural node displacement
-        const F2FScalar *us = &Us[3 * indx];
+  Returns
+  -------
+  nrows : number of block rows
+  ncols : number of block columns
+  rowp  : offset of each block row into cols
+  cols  : block column of each nonzero block
+  vals  : values of the nonzero blocks
+*/
+void LinearizedMELD::getTransferMatrix(int *nrows, int *ncols, const int **rowp,
+                                       const int **cols,
+                                       const F2FScalar **vals) {
+  distributeStructuralMesh();
+  if (mat_geometry != geometry_count) {
+    assembleTransferMatrix();
+  }
 
-        // Compute and add contribution to aerodynamic surface node displacement
-        F2FScalar w = W[j];
-        F2FScalar uj[3];
-        computeDispContribution(w, r, Hinv, q, us, uj);
-        vec_add(uj, ua, ua);
-      } else {
-        indx = indx - ns;
+  *nrows = na;
+  *ncols = ns;
+  *rowp = mat_rowp;
+  *cols = mat_cols;
+  *vals = mat_vals;
+}
 
-        // Form the vector q from the centroid of the undisplaced set to the
-        // node
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
+/*
+  Computes the displacements of all aerodynamic surface nodes based on
+  linearized version of MELD
 
-        F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
+  The structural displacements are stored in Us by beginTransferDisps. The
+  transfer matrix is assembled again when the node locations have changed.
 
-        // Get structural node displacement
-        const F2FScalar *us = &Us[3 * indx];
+  Returns
+  -------
+  aero_disps   : aerodynamic node displacements
+*/
+void LinearizedMELD::computeAeroDisps(F2FScalar *aero_disps) {
+  if (mat_geometry != geometry_count) {
+    assembleTransferMatrix();
+  }
 
-        // Compute and add contribution to aerodynamic surface node displacement
-        F2FScalar w = W[j];
-        F2FScalar uj[3];
-        computeDispContribution(w, r, Hinv, q, us, uj);
-        vec_add(uj, ua, ua);
-      }
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+  for (int i = 0; i < na; i++) {
+    F2FScalar ua[3] = {0.0, 0.0, 0.0};
+    for (int k = mat_rowp[i]; k < mat_rowp[i + 1]; k++) {
+      const F2FScalar *A = &mat_vals[9 * k];
+      const F2FScalar *us = &Us[3 * mat_cols[k]];
+      ua[0] += A[0] * us[0] + A[1] * us[1] + A[2] * us[2];
+      ua[1] += A[3] * us[0] + A[4] * us[1] + A[5] * us[2];
+      ua[2] += A[6] * us[0] + A[7] * us[1] + A[8] * us[2];
     }
+    memcpy(&aero_disps[3 * i], ua, 3 * sizeof(F2FScalar));
   }
 }
 
 /*
   Computes inverse of point inertia matrix Hbar = H - I*Tr(H)
 
+  Hbar is symmetric, so its inverse is formed in closed form from the
+  cofactors. When the structural nodes are (nearly) collinear, Hbar is
+  singular and the least-squares inverse is computed with LAPACK instead.
+
   Arguments
   ---------
   H    : covariance matrix
@@ -226,12 +352,48 @@ void LinearizedMELD::computePointInertiaInverse(const F2FScalar *H,
   Hcopy[4] -= trace;
   Hcopy[8] -= trace;
 
+  // Compute the cofactors of the symmetric part of Hbar
+  F2FScalar a[6];
+  a[0] = Hcopy[0];
+  a[1] = 0.5 * (Hcopy[1] + Hcopy[3]);
+  a[2] = 0.5 * (Hcopy[2] + Hcopy[6]);
+  a[3] = Hcopy[4];
+  a[4] = 0.5 * (Hcopy[5] + Hcopy[7]);
+  a[5] = Hcopy[8];
+
+  F2FScalar c[6];
+  c[0] = a[3] * a[5] - a[4] * a[4];
+  c[1] = a[2] * a[4] - a[1] * a[5];
+  c[2] = a[1] * a[4] - a[2] * a[3];
+  c[3] = a[0] * a[5] - a[2] * a[2];
+  c[4] = a[1] * a[2] - a[0] * a[4];
+  c[5] = a[0] * a[3] - a[1] * a[1];
+  F2FScalar det = a[0] * c[0] + a[1] * c[1] + a[2] * c[2];
+
+  // Use the closed form unless the determinant is small relative to the
+  // cube of the largest entry of Hbar
+  double amax = 0.0;
+  for (int k = 0; k < 6; k++) {
+    if (fabs(F2FRealPart(a[k])) > amax) {
+      amax = fabs(F2FRealPart(a[k]));
+    }
+  }
+  if (fabs(F2FRealPart(det)) > 1e-10 * amax * amax * amax) {
+    F2FScalar dinv = 1.0 / det;
+    Hinv[0] = dinv * c[0];
+    Hinv[1] = Hinv[3] = dinv * c[1];
+    Hinv[2] = Hinv[6] = dinv * c[2];
+    Hinv[4] = dinv * c[3];
+    Hinv[5] = Hinv[7] = dinv * c[4];
+    Hinv[8] = dinv * c[5];
+    return;
+  }
+
   // Set Hinv = I
   memset(Hinv, 0, 9 * sizeof(F2FScalar));
   Hinv[0] = 1.0;
   Hinv[4] = 1.0;
   Hinv[8] = 1.0;
-
 #ifdef FUNTOFEM_USE_COMPLEX
   int n = 3;             // Dimension of all the matrices
   double s[3];           // Singular values
@@ -261,6 +423,31 @@ void LinearizedMELD::computePointInertiaInverse(const F2FScalar *H,
   }
 }
 
+/*
+  Get the stored inverse of the point inertia matrix for an aerodynamic node
+
+  Arguments
+  ---------
+  i    : local aerodynamic node
+
+  Returns
+  -------
+  Hinv : inverse of point inertia matrix
+*/
+void LinearizedMELD::getPointInertiaInverse(int i, F2FScalar *Hinv) {
+  if (memory_lean) {
+    const F2FScalar *h = &global_Hinv[6 * i];
+    Hinv[0] = h[0];
+    Hinv[1] = Hinv[3] = h[1];
+    Hinv[2] = Hinv[6] = h[2];
+    Hinv[4] = h[3];
+    Hinv[5] = Hinv[7] = h[4];
+    Hinv[8] = h[5];
+  } else {
+    memcpy(Hinv, &global_Hinv[9 * i], 9 * sizeof(F2FScalar));
+  }
+}
+
 /*
   Compute the result of the
 
@@ -303,8 +490,8 @@ void LinearizedMELD::adjPointInertiaInverse(const F2FScalar *Hinv,
 }
 
 /*
-  Computes contribution to displacement of aerodynamic surface node from single
-  structural node in linearized MELD
+  Computes the block of the displacement transfer matrix that links an
+  aerodynamic surface node to a single structural node in linearized MELD
 
   Arguments
   ---------
@@ -312,40 +499,32 @@ void LinearizedMELD::adjPointInertiaInverse(const F2FScalar *Hinv,
   r    : vector from centroid to aerodynamic surface node
   Hinv : inverse of point inertia matrix
   q    : vector from centroid to structural node
-  us   : displacement of structural node
 
   Returns
   -------
-  ua   : contribution to displacement of aerodynamic surface node
+  A    : w*(q^{x} * Hinv * r^{x} + I) in row-major order
 */
-void LinearizedMELD::computeDispContribution(
-    const F2FScalar w, const F2FScalar *r, const F2FScalar *Hinv,
-    const F2FScalar *q, const F2FScalar *us, F2FScalar *ua) {
-  // Compute matrix = w*(q^{x} * Hinv * r^{x} + I)
-  F2FScalar A[9];
+void LinearizedMELD::computeDispMatrix(const F2FScalar w, const F2FScalar *r,
+                                       const F2FScalar *Hinv,
+                                       const F2FScalar *q, F2FScalar *A) {
   A[0] = w * (q[2] * (r[1] * Hinv[5] - r[2] * Hinv[4]) -
               q[1] * (r[1] * Hinv[8] - r[2] * Hinv[7]) + 1.0);
-  A[1] = w * (q[1] * (r[0] * Hinv[8] - r[2] * Hinv[6]) -
+  A[3] = w * (q[1] * (r[0] * Hinv[8] - r[2] * Hinv[6]) -
               q[2] * (r[0] * Hinv[5] - r[2] * Hinv[3]));
-  A[2] = w * (q[2] * (r[0] * Hinv[4] - r[1] * Hinv[3]) -
+  A[6] = w * (q[2] * (r[0] * Hinv[4] - r[1] * Hinv[3]) -
               q[1] * (r[0] * Hinv[7] - r[1] * Hinv[6]));
-  A[3] = w * (q[0] * (r[1] * Hinv[8] - r[2] * Hinv[7]) -
+  A[1] = w * (q[0] * (r[1] * Hinv[8] - r[2] * Hinv[7]) -
               q[2] * (r[1] * Hinv[2] - r[2] * Hinv[1]));
   A[4] = w * (q[2] * (r[0] * Hinv[2] - r[2] * Hinv[0]) -
               q[0] * (r[0] * Hinv[8] - r[2] * Hinv[6]) + 1.0);
-  A[5] = w * (q[0] * (r[0] * Hinv[7] - r[1] * Hinv[6]) -
+  A[7] = w * (q[0] * (r[0] * Hinv[7] - r[1] * Hinv[6]) -
               q[2] * (r[0] * Hinv[1] - r[1] * Hinv[0]));
-  A[6] = w * (q[1] * (r[1] * Hinv[2] - r[2] * Hinv[1]) -
+  A[2] = w * (q[1] * (r[1] * Hinv[2] - r[2] * Hinv[1]) -
               q[0] * (r[1] * Hinv[5] - r[2] * Hinv[4]));
-  A[7] = w * (q[0] * (r[0] * Hinv[5] - r[2] * Hinv[3]) -
+  A[5] = w * (q[0] * (r[0] * Hinv[5] - r[2] * Hinv[3]) -
               q[1] * (r[0] * Hinv[2] - r[2] * Hinv[0]));
   A[8] = w * (q[1] * (r[0] * Hinv[1] - r[1] * Hinv[0]) -
               q[0] * (r[0] * Hinv[4] - r[1] * Hinv[3]) + 1.0);
-
-  // Compute matrix-vector product ua = A*us
-  ua[0] = A[0] * us[0] + A[3] * us[1] + A[6] * us[2];
-  ua[1] = A[1] * us[0] + A[4] * us[1] + A[7] * us[2];
-  ua[2] = A[2] * us[0] + A[5] * us[1] + A[8] * us[2];
 }
 
 /*
@@ -436,7 +615,8 @@ void LinearizedMELD::addAdjDispContribution(
 
 /*
   Computes the loads on all structural nodes based on linearized version of
-  MELD
+  MELD. The load transfer is the transpose of the displacement transfer
+  matrix.
 
   Arguments
   ---------
@@ -444,133 +624,27 @@ void LinearizedMELD::addAdjDispContribution(
 
   Returns
   -------
-  struct_loads : loads on structural nodes
+  struct_loads_global : loads on the global image of the structural nodes
 */
-void LinearizedMELD::transferLoads(const F2FScalar *aero_loads,
-                                   F2FScalar *struct_loads) {
+void LinearizedMELD::computeStructLoads(const F2FScalar *aero_loads,
+                                        F2FScalar *struct_loads_global) {
   // Copy prescribed aero loads into member variable
   memcpy(Fa, aero_loads, 3 * na * sizeof(F2FScalar));
 
-  // Zero struct loads
-  F2FScalar *struct_loads_global = new F2FScalar[3 * ns];
-  memset(struct_loads_global, 0, 3 * ns * sizeof(F2FScalar));
+  if (mat_geometry != geometry_count) {
+    assembleTransferMatrix();
+  }
 
-  // Loop over aerodynamic surface nodes
   for (int i = 0; i < na; i++) {
-    // Get aerodynamic surface node location and load
-    F2FScalar *a = &Xa[3 * i];
     const F2FScalar *fa = &Fa[3 * i];
-
-    // Compute vector d from centroid to aerodynamic surface node
-    F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    F2FScalar r[3];
-    vec_diff(xs0bar, a, r);
-
-    // Compute inverse of point inertia matrix
-    F2FScalar Hinv[9];
-    computePointInertiaInverse(&global_H[9 * i], Hinv);
-
-    // Loop over linked structural nodes
-    for (int j = 0; j < nn; j++) {
-      // Get structural node using index from connectivity
-      int indx = global_conn[nn * i + j];
-
-      if (indx < ns) {
-        F2FScalar *xs = &Xs[3 * indx];
-
-        // Compute vector q from centroid to structural node
-        F2FScalar q[3];
-        vec_diff(xs0bar, xs, q);
-
-        // Compute load contribution
-        F2FScalar *fs = &struct_loads_global[3 * indx];
-        F2FScalar w = global_W[nn * i + j];
-        F2FScalar fj[3];
-        computeLoadContribution(w, q, Hinv, r, fa, fj);
-
-        // Add load contribution into global structural load array
-        fs[0] += fj[0];
-        fs[1] += fj[1];
-        fs[2] += fj[2];
-      } else {
-        indx = indx - ns;
-
-        // Compute vector q from centroid to structural node using the
-        // symmetry condition
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-
-        // Compute vector q from centroid to structural node
-        F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
-
-        // Compute load contribution
-        F2FScalar *fs = &struct_loads_global[3 * indx];
-        F2FScalar w = global_W[nn * i + j];
-        F2FScalar fj[3];
-        computeLoadContribution(w, q, Hinv, r, fa, fj);
-
-        // Add load contribution into global structural load array
-        fs[0] += fj[0];
-        fs[1] += fj[1];
-        fs[2] += fj[2];
-      }
+    for (int k = mat_rowp[i]; k < mat_rowp[i + 1]; k++) {
+      const F2FScalar *A = &mat_vals[9 * k];
+      F2FScalar *fs = &struct_loads_global[3 * mat_cols[k]];
+      fs[0] += A[0] * fa[0] + A[3] * fa[1] + A[6] * fa[2];
+      fs[1] += A[1] * fa[0] + A[4] * fa[1] + A[7] * fa[2];
+      fs[2] += A[2] * fa[0] + A[5] * fa[1] + A[8] * fa[2];
     }
   }
-
-  // distribute the structural loads
-  structAddScatter(3 * ns, struct_loads_global, 3 * ns_local, struct_loads);
-
-  delete[] struct_loads_global;
-}
-
-/*
-  Computes contribution to displacement of aerodynamic surface node from single
-  structural node in linearized MELD
-
-  Arguments
-  ---------
-  w    : weight of structural node
-  q    : vector from centroid to structural node
-  Hinv : inverse of point inertia matrix
-  r    : vector from centroid to aerodynamic surface node
-  fa   : load on aerodynamic surface node
-
-  Returns
-  -------
-  fj   : contribution to load on structural node
-*/
-void LinearizedMELD::computeLoadContribution(
-    const F2FScalar w, const F2FScalar *q, const F2FScalar *Hinv,
-    const F2FScalar *r, const F2FScalar *fa, F2FScalar *fj) {
-  // Compute matrix = w*(rx*Hinv*qx + I)
-  F2FScalar A[9];
-
-  A[0] = w * (r[1] * (Hinv[7] * q[2] - Hinv[8] * q[1]) -
-              r[2] * (Hinv[4] * q[2] - Hinv[5] * q[1]) + 1.0);
-  A[1] = w * (r[2] * (Hinv[3] * q[2] - Hinv[5] * q[0]) -
-              r[1] * (Hinv[6] * q[2] - Hinv[8] * q[0]));
-  A[2] = w * (r[1] * (Hinv[6] * q[1] - Hinv[7] * q[0]) -
-              r[2] * (Hinv[3] * q[1] - Hinv[4] * q[0]));
-  A[3] = w * (r[2] * (Hinv[1] * q[2] - Hinv[2] * q[1]) -
-              r[0] * (Hinv[7] * q[2] - Hinv[8] * q[1]));
-  A[4] = w * (r[0] * (Hinv[6] * q[2] - Hinv[8] * q[0]) -
-              r[2] * (Hinv[0] * q[2] - Hinv[2] * q[0]) + 1.0);
-  A[5] = w * (r[2] * (Hinv[0] * q[1] - Hinv[1] * q[0]) -
-              r[0] * (Hinv[6] * q[1] - Hinv[7] * q[0]));
-  A[6] = w * (r[0] * (Hinv[4] * q[2] - Hinv[5] * q[1]) -
-              r[1] * (Hinv[1] * q[2] - Hinv[2] * q[1]));
-  A[7] = w * (r[1] * (Hinv[0] * q[2] - Hinv[2] * q[0]) -
-              r[0] * (Hinv[3] * q[2] - Hinv[5] * q[0]));
-  A[8] = w * (r[0] * (Hinv[3] * q[1] - Hinv[4] * q[0]) -
-              r[1] * (Hinv[0] * q[1] - Hinv[1] * q[0]) + 1.0);
-
-  // Compute matrix-vector product ua = A*us
-  fj[0] = A[0] * fa[0] + A[3] * fa[1] + A[6] * fa[2];
-  fj[1] = A[1] * fa[0] + A[4] * fa[1] + A[7] * fa[2];
-  fj[2] = A[2] * fa[0] + A[5] * fa[1] + A[8] * fa[2];
 }
 
 /*
@@ -730,6 +804,60 @@ void LinearizedMELD::applydLduSTrans(const F2FScalar *vecs, F2FScalar *prods) {
   memset(prods, 0, 3 * ns_local * sizeof(F2FScalar));
 }
 
+/*
+  Apply the action of the displacement transfer w.r.t structural displacements
+  transpose Jacobian to a block of input vectors
+
+  Arguments
+  ----------
+  nvecs : number of vectors in the block
+  vecs  : input block of aerodynamic vectors
+
+  Returns
+  --------
+  prods : output block of structural vectors
+*/
+void LinearizedMELD::applydDduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                          F2FScalar *prods) {
+  LDTransferScheme::applydDduSTransBatch(nvecs, vecs, prods);
+}
+
+/*
+  Apply the action of the load transfer w.r.t structural displacements
+  transpose Jacobian to a block of input vectors
+
+  Arguments
+  ----------
+  nvecs : number of vectors in the block
+  vecs  : input block of structural vectors
+
+  Returns
+  --------
+  prods : output block of structural vectors
+*/
+void LinearizedMELD::applydLduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                          F2FScalar *prods) {
+  memset(prods, 0, 3 * nvecs * ns_local * sizeof(F2FScalar));
+}
+
+/*
+  Apply the action of the load transfer w.r.t aerodynamic loads transpose
+  Jacobian to a block of input vectors
+
+  Arguments
+  ----------
+  nvecs : number of vectors in the block
+  vecs  : input block of structural vectors
+
+  Returns
+  --------
+  prods : output block of aerodynamic vectors
+*/
+void LinearizedMELD::applydLdfATransBatch(int nvecs, const F2FScalar *vecs,
+                                          F2FScalar *prods) {
+  LDTransferScheme::applydLdfATransBatch(nvecs, vecs, prods);
+}
+
 /*
   Apply the action of the displacement transfer w.r.t initial aerodynamic
   surface node locations Jacobian to the right of the transposed input vector
@@ -757,10 +885,9 @@ void LinearizedMELD::applydDdxA0(const F2FScalar *vecs, F2FScalar *prods) {
     const F2FScalar *W = &global_W[i * nn];
     F2FScalar *xs0bar = &global_xs0bar[3 * i];
 
-    // Compute the inverse of the point inertia matrix
-    F2FScalar *H = &global_H[9 * i];
+    // Get the inverse of the point inertia matrix
     F2FScalar Hinv[9];
-    computePointInertiaInverse(H, Hinv);
+    getPointInertiaInverse(i, Hinv);
 
     // Form the vector r from the initial centroid to the aerodynamic surface
     // node
@@ -845,10 +972,9 @@ void LinearizedMELD::applydDdxS0(const F2FScalar *vecs, F2FScalar *prods) {
     const F2FScalar *W = &global_W[i * nn];
     F2FScalar *xs0bar = &global_xs0bar[3 * i];
 
-    // Compute the inverse of the point inertia matrix
-    F2FScalar *H = &global_H[9 * i];
+    // Get the inverse of the point inertia matrix
     F2FScalar Hinv[9];
-    computePointInertiaInverse(H, Hinv);
+    getPointInertiaInverse(i, Hinv);
 
     // Form the vector r from the initial centroid to the aerodynamic surface
     // node
@@ -1069,9 +1195,9 @@ void LinearizedMELD::applydLdxA0(const F2FScalar *vecs, F2FScalar *prods) {
     F2FScalar r[3];
     vec_diff(xs0bar, a, r);
 
-    // Compute inverse of point inertia matrix
+    // Get the inverse of the point inertia matrix
     F2FScalar Hinv[9];
-    computePointInertiaInverse(&global_H[9 * i], Hinv);
+    getPointInertiaInverse(i, Hinv);
 
     // Zero the derivative contributions
     F2FScalar rd[3];
@@ -1155,9 +1281,9 @@ void LinearizedMELD::applydLdxS0(const F2FScalar *vecs, F2FScalar *prods) {
     F2FScalar r[3];
     vec_diff(xs0bar, a, r);
 
-    // Compute inverse of point inertia matrix
+    // Get the inverse of the point inertia matrix
     F2FScalar Hinv[9];
-    computePointInertiaInverse(&global_H[9 * i], Hinv);
+    getPointInertiaInverse(i, Hinv);
 
     // Zero the derivative contributions
     F2FScalar Hinvd[9], rd[3], xs0bard[3];
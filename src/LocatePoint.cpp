@@ -23,6 +23,7 @@
 
 #include <math.h>
 #include <stdio.h>
+#include <string.h>
 
 #include "funtofemlapack.h"
 
@@ -392,6 +393,260 @@ void LocatePoint::locateKClosest(int K, int root, const F2FScalar xpt[],
   }
 }
 
+/*
+  Locate the K-closest points for each point in a set of points
+
+  The result is identical to calling locateKClosest for each point in turn.
+  The tree is traversed in the same order for each point, but the K-closest
+  points found so far are stored in a max-heap instead of a sorted list, so
+  that each insertion costs O(log(K)) instead of O(K). Ties in the distance
+  are broken by the order in which the points are visited, as in the sorted
+  insertion. The points are processed in the order of the leaves that contain
+  them so that consecutive searches traverse the same parts of the tree, and
+  the searches are distributed across threads when compiled with OpenMP.
+
+  Arguments
+  ---------
+  K           : number of closest points to locate for each point
+  num_xpts    : number of points
+  xpts        : the (x, y, z) locations of the points
+  num_threads : number of threads used for the searches
+
+  Returns
+  -------
+  indx        : indices of the K-closest points for each point
+  dist        : sorted squared distances to the K-closest points
+*/
+void LocatePoint::locateKClosestBatch(int K, int num_xpts,
+                                      const F2FScalar xpts[], int indx[],
+                                      F2FScalar dist[], int num_threads) {
+  // Order the points by the leaf of the tree that contains them
+  int *leaf = new int[num_xpts];
+  int *leaf_ptr = new int[num_nodes + 1];
+  memset(leaf_ptr, 0, (num_nodes + 1) * sizeof(int));
+  for (int i = 0; i < num_xpts; i++) {
+    leaf[i] = findLeaf(&xpts[3 * i]);
+    leaf_ptr[leaf[i] + 1]++;
+  }
+  for (int k = 0; k < num_nodes; k++) {
+    leaf_ptr[k + 1] += leaf_ptr[k];
+  }
+
+  int *point_order = new int[num_xpts];
+  for (int i = 0; i < num_xpts; i++) {
+    point_order[leaf_ptr[leaf[i]]] = i;
+    leaf_ptr[leaf[i]]++;
+  }
+  delete[] leaf;
+  delete[] leaf_ptr;
+
+  int nfail = 0;
+#ifdef _OPENMP
+#pragma omp parallel num_threads(num_threads) reduction(+ : nfail)
+#endif
+  {
+    // The order in which the points in the heap were visited
+    int *order = new int[K];
+
+#ifdef _OPENMP
+#pragma omp for schedule(static)
+#endif
+    for (int j = 0; j < num_xpts; j++) {
+      int i = point_order[j];
+      int nk = 0, count = 0;
+      int root = 0;
+      locateKClosestHeap(K, root, &xpts[3 * i], &dist[K * i], &indx[K * i],
+                         order, &nk, &count);
+      sortHeap(&dist[K * i], &indx[K * i], order, nk);
+
+      if (nk < K) {
+        nfail++;
+      }
+    }
+
+    delete[] order;
+  }
+
+  if (nfail > 0) {
+    printf("Error nk < K = %d for %d points \n", K, nfail);
+  }
+
+  delete[] point_order;
+}
+
+/*
+  Find the leaf of the tree that contains the given point
+*/
+int LocatePoint::findLeaf(const F2FScalar xpt[]) {
+  int root = 0;
+  while (indices_ptr[root] == -1 && nodes[2 * root] != -1) {
+    F2FScalar *xav = &node_xav[3 * root];
+    F2FScalar *normal = &node_normal[3 * root];
+
+    // The normal distance
+    F2FScalar ndist =
+        ((xpt[0] - xav[0]) * normal[0] + (xpt[1] - xav[1]) * normal[1] +
+         (xpt[2] - xav[2]) * normal[2]);
+
+    if (F2FRealPart(ndist) < 0.0) {
+      root = nodes[2 * root];
+    } else {
+      root = nodes[2 * root + 1];
+    }
+  }
+
+  return root;
+}
+
+/*
+  Compare two entries in the heap of closest points. The entry that is
+  further away, or visited later for equal distances, is the greater one.
+*/
+static inline int heapGreater(const F2FScalar d1, int order1,
+                              const F2FScalar d2, int order2) {
+  return (F2FRealPart(d1) > F2FRealPart(d2) ||
+          (F2FRealPart(d1) == F2FRealPart(d2) && order1 > order2));
+}
+
+/*
+  Insert a point into a max-heap of at most K points based upon the distance
+  from the given point. When the heap is full, the furthest point is replaced.
+*/
+void LocatePoint::insertHeapIndex(F2FScalar *dist, int *indx, int *order,
+                                  int *nk, F2FScalar d, int dindex, int dorder,
+                                  int K) {
+  int i = 0;
+  if (*nk < K) {
+    // Sift the new entry up from the end of the heap
+    i = *nk;
+    *nk += 1;
+    while (i > 0) {
+      int parent = (i - 1) / 2;
+      if (!heapGreater(d, dorder, dist[parent], order[parent])) {
+        break;
+      }
+      dist[i] = dist[parent];
+      indx[i] = indx[parent];
+      order[i] = order[parent];
+      i = parent;
+    }
+  } else {
+    // Replace the furthest entry and sift the new entry down
+    while (2 * i + 1 < K) {
+      int child = 2 * i + 1;
+      if (child + 1 < K && heapGreater(dist[child + 1], order[child + 1],
+                                       dist[child], order[child])) {
+        child++;
+      }
+      if (!heapGreater(dist[child], order[child], d, dorder)) {
+        break;
+      }
+      dist[i] = dist[child];
+      indx[i] = indx[child];
+      order[i] = order[child];
+      i = child;
+    }
+  }
+
+  dist[i] = d;
+  indx[i] = dindex;
+  order[i] = dorder;
+}
+
+/*
+  Sort the heap of points in place so that the distances are increasing
+*/
+void LocatePoint::sortHeap(F2FScalar *dist, int *indx, int *order, int nk) {
+  for (int end = nk - 1; end > 0; end--) {
+    // Move the furthest point to the end of the list
+    F2FScalar d = dist[end];
+    int dindex = indx[end];
+    int dorder = order[end];
+    dist[end] = dist[0];
+    indx[end] = indx[0];
+    order[end] = order[0];
+
+    // Sift the moved entry down the remaining heap
+    int i = 0;
+    while (2 * i + 1 < end) {
+      int child = 2 * i + 1;
+      if (child + 1 < end && heapGreater(dist[child + 1], order[child + 1],
+                                         dist[child], order[child])) {
+        child++;
+      }
+      if (!heapGreater(dist[child], order[child], d, dorder)) {
+        break;
+      }
+      dist[i] = dist[child];
+      indx[i] = indx[child];
+      order[i] = order[child];
+      i = child;
+    }
+    dist[i] = d;
+    indx[i] = dindex;
+    order[i] = dorder;
+  }
+}
+
+/*!
+  Locate the K-closest points to a given point using a heap
+
+  dist  == A max-heap of the K-closest distances
+  indx  == The indices of the K-closest values
+  order == The order in which the points in the heap were visited
+  nk    == The actual number of points in the heap nk <= K
+  count == The number of points inserted so far
+*/
+void LocatePoint::locateKClosestHeap(int K, int root, const F2FScalar xpt[],
+                                     F2FScalar *dist, int *indx, int *order,
+                                     int *nk, int *count) {
+  int start = indices_ptr[root];
+  int left_node = nodes[2 * root];
+  int right_node = nodes[2 * root + 1];
+
+  if (start != -1) {  // This node is a leaf
+    // Do an exhaustive search of the points at the node
+    int end = start + num_indices[root];
+    for (int k = start; k < end; k++) {
+      int n = indices[k];
+
+      F2FScalar t = ((Xpts[3 * n] - xpt[0]) * (Xpts[3 * n] - xpt[0]) +
+                     (Xpts[3 * n + 1] - xpt[1]) * (Xpts[3 * n + 1] - xpt[1]) +
+                     (Xpts[3 * n + 2] - xpt[2]) * (Xpts[3 * n + 2] - xpt[2]));
+
+      // The furthest point in a full heap is stored first
+      if ((*nk < K) || (F2FRealPart(t) < F2FRealPart(dist[0]))) {
+        insertHeapIndex(dist, indx, order, nk, t, n, *count, K);
+        *count += 1;
+      }
+    }
+  } else {
+    F2FScalar *xav = &node_xav[3 * root];
+    F2FScalar *normal = &node_normal[3 * root];
+
+    // The normal distance
+    F2FScalar ndist =
+        ((xpt[0] - xav[0]) * normal[0] + (xpt[1] - xav[1]) * normal[1] +
+         (xpt[2] - xav[2]) * normal[2]);
+
+    if (F2FRealPart(ndist) < 0.0) {
+      locateKClosestHeap(K, left_node, xpt, dist, indx, order, nk, count);
+
+      // Search the other branch if it could contain a closer point
+      if (*nk < K || F2FRealPart(ndist * ndist) < F2FRealPart(dist[0])) {
+        locateKClosestHeap(K, right_node, xpt, dist, indx, order, nk, count);
+      }
+    } else {
+      locateKClosestHeap(K, right_node, xpt, dist, indx, order, nk, count);
+
+      // Search the other branch if it could contain a closer point
+      if (*nk < K || F2FRealPart(ndist * ndist) < F2FRealPart(dist[0])) {
+        locateKClosestHeap(K, left_node, xpt, dist, indx, order, nk, count);
+      }
+    }
+  }
+}
+
 /*!
   Split the list of indices into approximately two.
   Those on one half of a plane and those on the other.
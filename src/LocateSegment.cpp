@@ -0,0 +1,348 @@
+/*
+  This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+  and design optimization.
+
+  Copyright (C) 2015 Georgia Tech Research Corporation.
+  Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+  All rights reserved.
+
+  FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this software except in compliance with the License.
+  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+*/
+
+#include "LocateSegment.h"
+
+#include <float.h>
+#include <stdlib.h>
+#include <string.h>
+
+// Segment index and the coordinate of its midpoint used to split the tree
+struct SegmentEntry {
+  double x;
+  int seg;
+};
+
+static int compare_segment_entry(const void *a, const void *b) {
+  const SegmentEntry *ea = static_cast<const SegmentEntry *>(a);
+  const SegmentEntry *eb = static_cast<const SegmentEntry *>(b);
+  if (ea->x < eb->x) {
+    return -1;
+  } else if (ea->x > eb->x) {
+    return 1;
+  }
+  return ea->seg - eb->seg;
+}
+
+/*
+  Create an object that can rapidly locate the closest segment to a point
+
+  Arguments
+  ---------
+  Xpts         : node locations
+  nsegs        : number of segments
+  seg_nodes    : the two end nodes of each segment
+  max_num_segs : maximum number of segments stored at a leaf of the tree
+*/
+LocateSegment::LocateSegment(const F2FScalar *_Xpts, int _nsegs,
+                             const int *_seg_nodes, int _max_num_segs) {
+  Xpts = _Xpts;
+  nsegs = _nsegs;
+  max_num_segs = _max_num_segs;
+  if (max_num_segs < 1) {
+    max_num_segs = 1;
+  }
+
+  seg_nodes = new int[2 * nsegs];
+  memcpy(seg_nodes, _seg_nodes, 2 * nsegs * sizeof(int));
+
+  indices = new int[nsegs];
+  for (int i = 0; i < nsegs; i++) {
+    indices[i] = i;
+  }
+
+  // Each leaf holds at least one segment, so there are fewer than 2*nsegs
+  // nodes in the tree
+  int max_nodes = (nsegs > 0 ? 2 * nsegs : 1);
+  node_bounds = new double[6 * max_nodes];
+  node_left = new int[max_nodes];
+  node_right = new int[max_nodes];
+  node_start = new int[max_nodes];
+  node_end = new int[max_nodes];
+
+  num_nodes = 0;
+  if (nsegs > 0) {
+    build(0, nsegs);
+  }
+}
+
+LocateSegment::~LocateSegment() {
+  delete[] seg_nodes;
+  delete[] indices;
+  delete[] node_bounds;
+  delete[] node_left;
+  delete[] node_right;
+  delete[] node_start;
+  delete[] node_end;
+}
+
+/*
+  Build the tree over the segments in indices[start:end] by splitting the
+  segments in half at the median of their midpoints along the direction in
+  which the midpoints are most spread out
+
+  Returns
+  -------
+  the index of the new node
+*/
+int LocateSegment::build(int start, int end) {
+  int node = num_nodes;
+  num_nodes++;
+
+  node_start[node] = start;
+  node_end[node] = end;
+  node_left[node] = -1;
+  node_right[node] = -1;
+
+  // Compute the bounds of the segments and of their midpoints
+  double *low = &node_bounds[6 * node];
+  double *high = &node_bounds[6 * node + 3];
+  double mid_low[3], mid_high[3];
+  for (int k = 0; k < 3; k++) {
+    low[k] = mid_low[k] = DBL_MAX;
+    high[k] = mid_high[k] = -DBL_MAX;
+  }
+
+  for (int i = start; i < end; i++) {
+    const F2FScalar *X1 = &Xpts[3 * seg_nodes[2 * indices[i]]];
+    const F2FScalar *X2 = &Xpts[3 * seg_nodes[2 * indices[i] + 1]];
+    for (int k = 0; k < 3; k++) {
+      double x1 = F2FRealPart(X1[k]);
+      double x2 = F2FRealPart(X2[k]);
+      double xm = 0.5 * (x1 + x2);
+      low[k] = (x1 < low[k] ? x1 : low[k]);
+      low[k] = (x2 < low[k] ? x2 : low[k]);
+      high[k] = (x1 > high[k] ? x1 : high[k]);
+      high[k] = (x2 > high[k] ? x2 : high[k]);
+      mid_low[k] = (xm < mid_low[k] ? xm : mid_low[k]);
+      mid_high[k] = (xm > mid_high[k] ? xm : mid_high[k]);
+    }
+  }
+
+  if (end - start <= max_num_segs) {
+    return node;
+  }
+
+  // Sort the segments along the direction with the largest extent
+  int axis = 0;
+  for (int k = 1; k < 3; k++) {
+    if (mid_high[k] - mid_low[k] > mid_high[axis] - mid_low[axis]) {
+      axis = k;
+    }
+  }
+
+  int n = end - start;
+  SegmentEntry *entries = new SegmentEntry[n];
+  for (int i = 0; i < n; i++) {
+    int seg = indices[start + i];
+    entries[i].x = 0.5 * (F2FRealPart(Xpts[3 * seg_nodes[2 * seg] + axis]) +
+                          F2FRealPart(Xpts[3 * seg_nodes[2 * seg + 1] + axis]));
+    entries[i].seg = seg;
+  }
+  qsort(entries, n, sizeof(SegmentEntry), compare_segment_entry);
+  for (int i = 0; i < n; i++) {
+    indices[start + i] = entries[i].seg;
+  }
+  delete[] entries;
+
+  int mid = start + n / 2;
+  node_left[node] = build(start, mid);
+  node_right[node] = build(mid, end);
+
+  return node;
+}
+
+/*
+  Compute the squared distance between a point and a segment
+*/
+double LocateSegment::segmentDistance(int seg, const double xpt[]) {
+  const F2FScalar *X1 = &Xpts[3 * seg_nodes[2 * seg]];
+  const F2FScalar *X2 = &Xpts[3 * seg_nodes[2 * seg + 1]];
+
+  double d[3], v[3];
+  for (int k = 0; k < 3; k++) {
+    double x1 = F2FRealPart(X1[k]);
+    d[k] = F2FRealPart(X2[k]) - x1;
+    v[k] = xpt[k] - x1;
+  }
+
+  // Find the closest point on the segment as a fraction of its length
+  double L2 = d[0] * d[0] + d[1] * d[1] + d[2] * d[2];
+  double t = 0.0;
+  if (L2 > 0.0) {
+    t = (d[0] * v[0] + d[1] * v[1] + d[2] * v[2]) / L2;
+    if (t < 0.0) {
+      t = 0.0;
+    } else if (t > 1.0) {
+      t = 1.0;
+    }
+  }
+
+  double dist = 0.0;
+  for (int k = 0; k < 3; k++) {
+    double r = v[k] - t * d[k];
+    dist += r * r;
+  }
+
+  return dist;
+}
+
+/*
+  Compute the squared distance between a point and the box of a node
+*/
+double LocateSegment::boxDistance(int node, const double xpt[]) {
+  const double *low = &node_bounds[6 * node];
+  const double *high = &node_bounds[6 * node + 3];
+
+  double dist = 0.0;
+  for (int k = 0; k < 3; k++) {
+    double r = 0.0;
+    if (xpt[k] < low[k]) {
+      r = low[k] - xpt[k];
+    } else if (xpt[k] > high[k]) {
+      r = xpt[k] - high[k];
+    }
+    dist += r * r;
+  }
+
+  return dist;
+}
+
+/*
+  Locate the closest segment to the given point
+
+  Arguments
+  ---------
+  xpt : the point
+
+  Returns
+  -------
+  the index of the closest segment (-1 if there are no segments)
+*/
+int LocateSegment::locateClosest(const F2FScalar xpt[]) {
+  if (nsegs == 0) {
+    return -1;
+  }
+
+  double x[3];
+  x[0] = F2FRealPart(xpt[0]);
+  x[1] = F2FRealPart(xpt[1]);
+  x[2] = F2FRealPart(xpt[2]);
+
+  double dist = DBL_MAX;
+  int seg = -1;
+  locateClosest(0, x, &dist, &seg);
+
+  return seg;
+}
+
+/*
+  Search the subtree of a node for a segment closer than the closest one
+  found so far. The children that may contain a closer segment are visited
+  nearest first. Boxes at exactly the current distance are still visited so
+  that ties are resolved in favor of the lowest segment index.
+*/
+void LocateSegment::locateClosest(int node, const double xpt[], double *dist,
+                                  int *seg) {
+  if (node_left[node] < 0) {
+    for (int i = node_start[node]; i < node_end[node]; i++) {
+      double d = segmentDistance(indices[i], xpt);
+      if (d < *dist || (d == *dist && indices[i] < *seg)) {
+        *dist = d;
+        *seg = indices[i];
+      }
+    }
+    return;
+  }
+
+  int first = node_left[node];
+  int second = node_right[node];
+  double d_first = boxDistance(first, xpt);
+  double d_second = boxDistance(second, xpt);
+  if (d_second < d_first) {
+    int tmp = first;
+    first = second;
+    second = tmp;
+    double dtmp = d_first;
+    d_first = d_second;
+    d_second = dtmp;
+  }
+
+  if (d_first <= *dist) {
+    locateClosest(first, xpt, dist, seg);
+  }
+  if (d_second <= *dist) {
+    locateClosest(second, xpt, dist, seg);
+  }
+}
+
+/*
+  Locate the closest segment by checking every segment
+
+  Arguments
+  ---------
+  xpt : the point
+
+  Returns
+  -------
+  the index of the closest segment (-1 if there are no segments)
+*/
+int LocateSegment::locateExhaustive(const F2FScalar xpt[]) {
+  double x[3];
+  x[0] = F2FRealPart(xpt[0]);
+  x[1] = F2FRealPart(xpt[1]);
+  x[2] = F2FRealPart(xpt[2]);
+
+  double dist = DBL_MAX;
+  int seg = -1;
+  for (int i = 0; i < nsegs; i++) {
+    double d = segmentDistance(i, x);
+    if (d < dist) {
+      dist = d;
+      seg = i;
+    }
+  }
+
+  return seg;
+}
+
+/*
+  Locate the closest segment for each point in a set of points
+
+  Arguments
+  ---------
+  num_xpts    : number of points
+  xpts        : the points
+  num_threads : number of threads used for the search
+
+  Returns
+  -------
+  segs        : the index of the closest segment to each point
+*/
+void LocateSegment::locateClosestBatch(int num_xpts, const F2FScalar xpts[],
+                                       int segs[], int num_threads) {
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+  for (int i = 0; i < num_xpts; i++) {
+    segs[i] = locateClosest(&xpts[3 * i]);
+  }
+}
@@ -26,9 +26,49 @@
 
 #include <cstring>
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif  // _OPENMP
+
 #include "LocatePoint.h"
 #include "funtofemlapack.h"
 
+// Number of aerodynamic nodes whose contributions to the structural nodes are
+// computed concurrently before they are added to the structural vector
+static const int MELD_BLOCK_SIZE = 256;
+
+// Number of independent partial sums used by the gather kernels
+static const int MELD_NUM_LANES = 4;
+
+/*
+  Compute the dot product of two arrays. The sum is split into
+  MELD_NUM_LANES partial sums that do not depend on each other, so that the
+  compiler can vectorize the loop without reordering the operations.
+*/
+static inline F2FScalar dotLanes(int n, const F2FScalar *a,
+                                 const F2FScalar *b) {
+  F2FScalar s[MELD_NUM_LANES];
+  for (int l = 0; l < MELD_NUM_LANES; l++) {
+    s[l] = 0.0;
+  }
+
+  int j = 0;
+  for (; j + MELD_NUM_LANES <= n; j += MELD_NUM_LANES) {
+    for (int l = 0; l < MELD_NUM_LANES; l++) {
+      s[l] += a[j + l] * b[j + l];
+    }
+  }
+  for (int l = 0; j < n; j++, l++) {
+    s[l] += a[j] * b[j];
+  }
+
+  F2FScalar sum = 0.0;
+  for (int l = 0; l < MELD_NUM_LANES; l++) {
+    sum += s[l];
+  }
+  return sum;
+}
+
 MELD::MELD(MPI_Comm global_comm, MPI_Comm struct_comm, int struct_root,
            MPI_Comm aero_comm, int aero_root, int isymm, int num_nearest,
            F2FScalar beta)
@@ -49,6 +89,13 @@ MELD::MELD(MPI_Comm global_comm, MPI_Comm struct_comm, int struct_root,
   // Initialize the Jacobian-vector product data
   global_M1 = NULL;
   global_ipiv = NULL;
+  M1_factored = 0;
+  memory_lean = 0;
+
+  // Initialize the single precision data
+  single_precision = 0;
+  global_W_single = NULL;
+  Xs_single = NULL;
 
   // Notify user of the type of transfer scheme they are using
   int rank;
@@ -87,6 +134,14 @@ MELD::~MELD() {
     delete[] global_ipiv;
   }
 
+  // Free the single precision data
+  if (global_W_single) {
+    delete[] global_W_single;
+  }
+  if (Xs_single) {
+    delete[] Xs_single;
+  }
+
   int rank;
   MPI_Comm_rank(global_comm, &rank);
   if (rank == struct_root) {
@@ -99,6 +154,12 @@ MELD::~MELD() {
   for transfers and products
 */
 void MELD::initialize() {
+  // Gather the full structural mesh again if it was previously localized
+  if (plan_send_counts) {
+    freeStructPlan();
+    mesh_update = 1;
+  }
+
   // global number of structural nodes
   distributeStructuralMesh();
 
@@ -120,9 +181,13 @@ void MELD::initialize() {
     Fa = new F2FScalar[3 * na];
     memset(Fa, 0, 3 * na * sizeof(F2FScalar));
   }
-  if (ns > 0) {
-    Us = new F2FScalar[3 * ns];
-    memset(Us, 0, 3 * ns * sizeof(F2FScalar));
+
+  // Free any data from a previous initialization
+  if (global_conn) {
+    delete[] global_conn;
+  }
+  if (global_W) {
+    delete[] global_W;
   }
 
   // Create aerostructural connectivity
@@ -133,220 +198,454 @@ void MELD::initialize() {
   global_W = new F2FScalar[nn * na];
   computeWeights(F2FRealPart(global_beta), isymm, nn, global_conn, global_W);
 
+  // Keep only the structural nodes connected to the local aerodynamic nodes
+  if (struct_distributed) {
+    localizeStructuralMesh(nn, global_conn);
+  }
+
+  if (ns > 0) {
+    Us = new F2FScalar[3 * ns];
+    memset(Us, 0, 3 * ns * sizeof(F2FScalar));
+  }
+
   // Allocate and initialize load transfer variables
+  if (global_xs0bar) {
+    delete[] global_xs0bar;
+  }
+  if (global_R) {
+    delete[] global_R;
+  }
+  if (global_S) {
+    delete[] global_S;
+  }
   global_xs0bar = new F2FScalar[3 * na];
   global_R = new F2FScalar[9 * na];
   global_S = new F2FScalar[9 * na];
 
   // Allocate and initialize Jacobian-vector product variables
-  global_M1 = new F2FScalar[15 * 15 * na];
-  global_ipiv = new int[15 * na];
+  if (global_M1) {
+    delete[] global_M1;
+  }
+  if (global_ipiv) {
+    delete[] global_ipiv;
+  }
+  global_M1 = NULL;
+  global_ipiv = NULL;
+  if (!memory_lean) {
+    global_M1 = new F2FScalar[15 * 15 * na];
+    global_ipiv = new int[15 * na];
+  }
+  M1_factored = 0;
+
+  // Store the single precision copies of the weights and node locations
+  updateSinglePrecision();
 }
 
 /*
-  Computes the displacements of aerodynamic surface nodes by fitting an
-  optimal rigid rotation and translation to the displacement of the set of
-  structural nodes nearest each aerodynamic surface node
+  Set whether to store single precision copies of the weights and the
+  structural node locations for the load and displacement transfers
 
   Arguments
   ---------
-  struct_disps : structural node displacements
+  single : flag to use the single precision copies
+*/
+void MELD::setSinglePrecision(int single) {
+#ifdef FUNTOFEM_USE_COMPLEX
+  // The complex step requires the full precision values
+  single_precision = 0;
+#else
+  single_precision = single;
+#endif  // FUNTOFEM_USE_COMPLEX
+}
 
-  Returns
-  -------
-  aero_disps   : aerodynamic node displacements
+/*
+  Copy the weights and the structural node locations into the single
+  precision arrays used by the transfers. The copies are updated whenever the
+  weights are computed.
 */
-void MELD::transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps) {
-  // Check if struct nodes locations need to be redistributed
-  distributeStructuralMesh();
+void MELD::updateSinglePrecision() {
+  if (global_W_single) {
+    delete[] global_W_single;
+  }
+  if (Xs_single) {
+    delete[] Xs_single;
+  }
+  global_W_single = NULL;
+  Xs_single = NULL;
+
+  if (single_precision) {
+    global_W_single = new float[nn * na];
+    for (int i = 0; i < nn * na; i++) {
+      global_W_single[i] = (float)F2FRealPart(global_W[i]);
+    }
 
-  // Copy prescribed displacements into displacement vector
-  structGatherBcast(3 * ns_local, struct_disps, 3 * ns, Us);
+    // Store the reflected nodes after the nodes
+    int nr = (isymm >= 0 ? 2 * ns : ns);
+    Xs_single = new float[3 * nr];
+    for (int i = 0; i < 3 * ns; i++) {
+      Xs_single[i] = (float)F2FRealPart(Xs[i]);
+    }
+    if (isymm >= 0) {
+      for (int i = 0; i < 3 * ns; i++) {
+        Xs_single[3 * ns + i] = Xs_single[i];
+      }
+      for (int i = ns; i < 2 * ns; i++) {
+        Xs_single[3 * i + isymm] *= -1.0f;
+      }
+    }
+  }
+}
 
-  // Zero the outputs
-  memset(global_xs0bar, 0.0, 3 * na * sizeof(F2FScalar));
-  memset(global_R, 0.0, 9 * na * sizeof(F2FScalar));
-  memset(global_S, 0.0, 9 * na * sizeof(F2FScalar));
-  memset(aero_disps, 0.0, 3 * na * sizeof(F2FScalar));
+/*
+  Append the reflections about the symmetry plane to the values at the
+  structural nodes, so that the values for the structural node or reflected
+  node conn[j] in the connectivity are stored at X[3*conn[j]]. This has no
+  effect without symmetry.
 
-  // Add structural displacments to structural node locations
-  F2FScalar *Xsd = new F2FScalar[3 * ns];
-  for (int j = 0; j < 3 * ns; j++) {
-    Xsd[j] = Xs[j] + Us[j];
+  Arguments
+  ---------
+  X : the values at the structural nodes (of length 6*ns with symmetry, where
+      the first 3*ns entries are set on entry)
+*/
+void MELD::reflectStructNodes(F2FScalar *X) {
+  if (isymm >= 0) {
+    memcpy(&X[3 * ns], X, 3 * ns * sizeof(F2FScalar));
+    for (int i = ns; i < 2 * ns; i++) {
+      X[3 * i + isymm] *= -1.0;
+    }
   }
+}
 
-  for (int i = 0; i < na; i++) {
-    const F2FScalar *xa0 = &Xa[3 * i];
+/*
+  Get the number of bytes allocated for the data stored by the scheme
 
-    // Compute the centroids of the original and displaced sets of nodes
-    F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    const int *local_conn = &global_conn[i * nn];
-    const F2FScalar *W = &global_W[i * nn];
-    computeCentroid(local_conn, W, Xs, xs0bar);
+  Returns
+  -------
+  the number of bytes
+*/
+size_t MELD::getMemoryUsage() {
+  size_t nscalars = 0, nints = 0;
+  if (global_conn) {
+    nints += (size_t)nn * na;
+  }
+  if (global_W) {
+    nscalars += (size_t)nn * na;
+  }
+  if (global_xs0bar) {
+    nscalars += 3 * na;
+  }
+  if (global_R) {
+    nscalars += 9 * na;
+  }
+  if (global_S) {
+    nscalars += 9 * na;
+  }
+  if (global_M1) {
+    nscalars += (size_t)15 * 15 * na;
+  }
+  if (global_ipiv) {
+    nints += 15 * na;
+  }
+  size_t nfloats = 0;
+  if (global_W_single) {
+    nfloats += (size_t)nn * na;
+  }
+  if (Xs_single) {
+    nfloats += (isymm >= 0 ? 6 * ns : 3 * ns);
+  }
 
-    F2FScalar xsbar[3];
-    computeCentroid(local_conn, W, Xsd, xsbar);
+  return LDTransferScheme::getMemoryUsage() + nscalars * sizeof(F2FScalar) +
+         nints * sizeof(int) + nfloats * sizeof(float);
+}
 
-    // Compute the covariance matrix
-    F2FScalar H[9];
-    computeCovariance(Xs, Xsd, local_conn, W, xs0bar, xsbar, H);
+/*
+  Update the transfer scheme after the aerodynamic or structural node
+  locations have been changed. When the nodes have moved little enough that
+  the nearest structural nodes to each aerodynamic node are unchanged, the
+  connectivity is kept and only the weights are recomputed. Otherwise the
+  scheme is initialized again.
+
+  Returns
+  -------
+  1 if the scheme was initialized again, 0 otherwise
+*/
+int MELD::updateGeometry() {
+  if (!checkAeroStructConn(isymm)) {
+    initialize();
+    return 1;
+  }
 
-    // Compute the optimal rotation
-    computeRotation(H, &global_R[9 * i], &global_S[9 * i]);
+  // Update the structural node locations and recompute the weights
+  distributeStructuralMesh();
+  computeWeights(F2FRealPart(global_beta), isymm, nn, global_conn, global_W);
+  updateSinglePrecision();
 
-    // Form the vector r from the initial centroid to the aerodynamic surface
-    // node
-    F2FScalar r[3];
-    vec_diff(xs0bar, xa0, r);
+  // The load transfer matrices must be factored again
+  M1_factored = 0;
 
-    // Rotate r vector using rotation matrix
-    const F2FScalar *R = &global_R[9 * i];
-    F2FScalar rho[3];
-    rho[0] = R[0] * r[0] + R[3] * r[1] + R[6] * r[2];
-    rho[1] = R[1] * r[0] + R[4] * r[1] + R[7] * r[2];
-    rho[2] = R[2] * r[0] + R[5] * r[1] + R[8] * r[2];
+  return 0;
+}
 
-    // Add rotated vector to centroid of second set to obtain final location
-    F2FScalar xa[3];  // location of displaced aerodynamic node
-    F2FScalar *ua = &aero_disps[3 * i];  // displacement of aerodynamic node
-    vec_add(xsbar, rho, xa);
-    vec_diff(xa0, xa, ua);
+/*
+  Get the number of bytes of the restart state with the connectivity and the
+  weights. The state is not saved when the structural mesh is distributed,
+  since the connectivity then refers to the local image of the mesh.
+*/
+size_t MELD::getStateSize() {
+  if (!global_conn || struct_distributed) {
+    return 0;
   }
+  return getConnStateSize(nn);
+}
+
+/*
+  Pack the connectivity and the weights into the restart state
+*/
+void MELD::writeState(char *buffer) {
+  writeConnState(nn, global_conn, global_W, buffer);
+}
 
-  // Free memory
-  delete[] Xsd;
+/*
+  Check a restart state and keep it for initialize()
+*/
+int MELD::readState(const char *buffer, size_t size) {
+  return readConnState(buffer, size);
 }
 
 /*
-  Computes centroids of set of structural nodes
+  Add the symmetry, the number of nearest nodes that initialize() links to
+  each aerodynamic node and the decay factor to the key of the restart state
+*/
+uint64_t MELD::hashStateOptions(uint64_t key) {
+  int num_nearest = (nn < ns ? nn : ns);
+  double beta = F2FRealPart(global_beta);
+  key = hashBytes(key, "MELD", 4);
+  key = hashBytes(key, &isymm, sizeof(isymm));
+  key = hashBytes(key, &num_nearest, sizeof(num_nearest));
+  return hashBytes(key, &beta, sizeof(beta));
+}
 
-  Arguments
-  ----------
-  local_conn : IDs of structural nodes in set
-  W : array of local weights
-  X : set of all structural nodes
+/*
+  Computes the displacements of aerodynamic surface nodes by fitting an
+  optimal rigid rotation and translation to the displacement of the set of
+  structural nodes nearest each aerodynamic surface node
+
+  The structural displacements are stored in Us by beginTransferDisps
 
   Returns
-  --------
-  xsbar : centroid
+  -------
+  aero_disps   : aerodynamic node displacements
 */
-void MELD::computeCentroid(const int *local_conn, const F2FScalar *W,
-                           const F2FScalar *X, F2FScalar *xsbar) {
-  memset(xsbar, 0, 3 * sizeof(F2FScalar));
-  for (int j = 0; j < nn; j++) {
-    if (local_conn[j] < ns) {
-      const F2FScalar *xs = &X[3 * local_conn[j]];
-
-      for (int k = 0; k < 3; k++) {
-        xsbar[k] += W[j] * xs[k];
+void MELD::computeAeroDisps(F2FScalar *aero_disps) {
+  // Add the structural displacements to the structural node locations and
+  // append the reflected nodes, so that the nodes linked to each aerodynamic
+  // node are read without checking for reflections. The single precision path
+  // adds the displacements as the nodes are read instead.
+  int nr = (isymm >= 0 ? 2 * ns : ns);
+  F2FScalar *X0 = getWorkArray(STRUCT_WORK, 6 * nr);
+  F2FScalar *Xd = &X0[3 * nr];
+  if (Xs_single) {
+    memcpy(Xd, Us, 3 * ns * sizeof(F2FScalar));
+  } else {
+    memcpy(X0, Xs, 3 * ns * sizeof(F2FScalar));
+    for (int j = 0; j < 3 * ns; j++) {
+      Xd[j] = Xs[j] + Us[j];
+    }
+    reflectStructNodes(X0);
+  }
+  reflectStructNodes(Xd);
+
+#ifdef FUNTOFEM_USE_COMPLEX
+  // Use real arithmetic when none of the inputs carry a complex perturbation
+  if (weights_real && isRealValued(3 * ns, Xs) && isRealValued(3 * ns, Us) &&
+      isRealValued(3 * na, Xa)) {
+    computeAeroDispsReal(X0, Xd, aero_disps);
+    return;
+  }
+#endif  // FUNTOFEM_USE_COMPLEX
+
+  // The components of the initial and displaced nodes linked to an
+  // aerodynamic node and the weights for the single precision path, for each
+  // thread
+  F2FScalar *gather = getWorkArray(BLOCK_WORK, 7 * nn * num_threads);
+
+#ifdef _OPENMP
+#pragma omp parallel num_threads(num_threads)
+#endif
+  {
+#ifdef _OPENMP
+    F2FScalar *x0 = &gather[7 * nn * omp_get_thread_num()];
+#else
+    F2FScalar *x0 = gather;
+#endif  // _OPENMP
+    F2FScalar *xd = &x0[3 * nn];
+    F2FScalar *w = &x0[6 * nn];
+
+#ifdef _OPENMP
+#pragma omp for schedule(static)
+#endif
+    for (int i = 0; i < na; i++) {
+      const F2FScalar *xa0 = &Xa[3 * i];
+
+      // Gather the nodes and compute the centroids of the original and
+      // displaced sets of nodes and the covariance matrix
+      F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      const int *local_conn = &global_conn[i * nn];
+      F2FScalar xsbar[3];
+      F2FScalar H[9];
+      if (Xs_single) {
+        gatherStructNodesSingle(local_conn, &global_W_single[i * nn], Xs_single,
+                                Xd, w, x0, xd);
+        computeCentroidCovariance(w, x0, xd, xs0bar, xsbar, H);
+      } else {
+        gatherStructNodes(local_conn, X0, Xd, x0, xd);
+        computeCentroidCovariance(&global_W[i * nn], x0, xd, xs0bar, xsbar, H);
       }
-    } else {
-      F2FScalar rxs[3];
-      memcpy(rxs, &X[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
-      rxs[isymm] *= -1.0;
 
-      for (int k = 0; k < 3; k++) {
-        xsbar[k] += W[j] * rxs[k];
-      }
+      // Compute the optimal rotation
+      computeRotation(H, &global_R[9 * i], &global_S[9 * i]);
+
+      // Form the vector r from the initial centroid to the aerodynamic
+      // surface node
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Rotate r vector using rotation matrix
+      const F2FScalar *R = &global_R[9 * i];
+      F2FScalar rho[3];
+      rho[0] = R[0] * r[0] + R[3] * r[1] + R[6] * r[2];
+      rho[1] = R[1] * r[0] + R[4] * r[1] + R[7] * r[2];
+      rho[2] = R[2] * r[0] + R[5] * r[1] + R[8] * r[2];
+
+      // Add rotated vector to centroid of second set to obtain final location
+      F2FScalar xa[3];  // location of displaced aerodynamic node
+      F2FScalar *ua = &aero_disps[3 * i];  // displacement of aerodynamic node
+      vec_add(xsbar, rho, xa);
+      vec_diff(xa0, xa, ua);
     }
   }
+
+  // The rotations have changed so the stored factorizations are out of date
+  M1_factored = 0;
 }
 
+#ifdef FUNTOFEM_USE_COMPLEX
 /*
-  Computes covariance matrix from initial and displaced sets of structural nodes
+  Computes the displacements of the aerodynamic surface nodes in real
+  arithmetic. This gives the same result as computeAeroDisps when the node
+  locations, weights and structural displacements are all real, but avoids the
+  cost of the complex arithmetic in complex-step runs where only some of the
+  transfers are perturbed.
 
   Arguments
   ---------
-  X : initial structural node locations
-  Xd : displaced structural node locations
-  local_conn : IDs of structural nodes in set
-  W : array of local weights
-  xs0bar : initial centroid
-  xsbar : displaced centroid
+  X0 : initial structural node locations followed by the reflected nodes
+  Xd : displaced structural node locations followed by the reflected nodes
 
   Returns
   -------
-  H : covariance matrix
+  aero_disps   : aerodynamic node displacements
 */
-void MELD::computeCovariance(const F2FScalar *X, const F2FScalar *Xd,
-                             const int *local_conn, const F2FScalar *W,
-                             const F2FScalar *xs0bar, const F2FScalar *xsbar,
-                             F2FScalar *H) {
-  // Form the covariance matrix of the two point sets
-  memset(H, 0, 9 * sizeof(F2FScalar));
+void MELD::computeAeroDispsReal(const F2FScalar *X0, const F2FScalar *Xd,
+                                F2FScalar *aero_disps) {
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+  for (int i = 0; i < na; i++) {
+    const int *local_conn = &global_conn[i * nn];
+    const F2FScalar *W = &global_W[i * nn];
 
-  for (int j = 0; j < nn; j++) {
-    F2FScalar q[3];  // vector from centroid to node
-    F2FScalar p[3];  // vector from diplaced centroid to displaced node
+    // Compute the centroids of the original and displaced sets of nodes
+    double xs0bar[3] = {0.0, 0.0, 0.0};
+    double xsbar[3] = {0.0, 0.0, 0.0};
+    for (int j = 0; j < nn; j++) {
+      const F2FScalar *xs0 = &X0[3 * local_conn[j]];
+      const F2FScalar *xs = &Xd[3 * local_conn[j]];
+      double w = F2FRealPart(W[j]);
+      for (int k = 0; k < 3; k++) {
+        xs0bar[k] += w * F2FRealPart(xs0[k]);
+        xsbar[k] += w * F2FRealPart(xs[k]);
+      }
+    }
 
-    if (local_conn[j] < ns) {
-      const F2FScalar *xs0 = &X[3 * local_conn[j]];
+    // Compute the covariance matrix
+    double H[9];
+    memset(H, 0, 9 * sizeof(double));
+    for (int j = 0; j < nn; j++) {
+      const F2FScalar *xs0 = &X0[3 * local_conn[j]];
       const F2FScalar *xs = &Xd[3 * local_conn[j]];
+      double q[3], p[3];
+      for (int k = 0; k < 3; k++) {
+        q[k] = F2FRealPart(xs0[k]) - xs0bar[k];
+        p[k] = F2FRealPart(xs[k]) - xsbar[k];
+      }
 
-      vec_diff(xs0bar, xs0, q);
-      vec_diff(xsbar, xs, p);
-    } else {
-      // We're dealing with a reflected node/displacement
-      F2FScalar rxs0[3];  // Reflected xs0
-      F2FScalar rxs[3];   // Reflected xs
-
-      // Copy the node locations
-      memcpy(rxs0, &X[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
-      memcpy(rxs, &Xd[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
-
-      // Reflect the node locations about the axis of symmetry
-      rxs0[isymm] *= -1.0;
-      rxs[isymm] *= -1.0;
-
-      vec_diff(xs0bar, rxs0, q);
-      vec_diff(xsbar, rxs, p);
+      double w = F2FRealPart(W[j]);
+      for (int n = 0; n < 3; n++) {
+        for (int m = 0; m < 3; m++) {
+          H[m + 3 * n] += w * p[m] * q[n];
+        }
+      }
     }
 
-    // H_{mn} = sum_{j}^{N} w^{(j)} p_{m}^{(j)} q_{n}^{(j)}
-
-    H[0] += W[j] * p[0] * q[0];
-    H[1] += W[j] * p[1] * q[0];
-    H[2] += W[j] * p[2] * q[0];
+    // Compute the optimal rotation and S = R^{T}*H
+    double R[9];
+    if (!computePolarRotation(H, R)) {
+      F2FScalar Hc[9], Rc[9], Sc[9];
+      for (int k = 0; k < 9; k++) {
+        Hc[k] = H[k];
+      }
+      computeRotation(Hc, Rc, Sc);
+      for (int k = 0; k < 9; k++) {
+        R[k] = F2FRealPart(Rc[k]);
+      }
+    }
 
-    H[3] += W[j] * p[0] * q[1];
-    H[4] += W[j] * p[1] * q[1];
-    H[5] += W[j] * p[2] * q[1];
+    F2FScalar *Ri = &global_R[9 * i];
+    F2FScalar *Si = &global_S[9 * i];
+    for (int n = 0; n < 3; n++) {
+      for (int m = 0; m < 3; m++) {
+        Ri[m + 3 * n] = R[m + 3 * n];
+        Si[m + 3 * n] = R[3 * m] * H[3 * n] + R[3 * m + 1] * H[3 * n + 1] +
+                        R[3 * m + 2] * H[3 * n + 2];
+      }
+    }
 
-    H[6] += W[j] * p[0] * q[2];
-    H[7] += W[j] * p[1] * q[2];
-    H[8] += W[j] * p[2] * q[2];
+    // Rotate the vector from the initial centroid to the aerodynamic node and
+    // add it to the displaced centroid
+    double r[3];
+    for (int k = 0; k < 3; k++) {
+      global_xs0bar[3 * i + k] = xs0bar[k];
+      r[k] = F2FRealPart(Xa[3 * i + k]) - xs0bar[k];
+    }
+    for (int k = 0; k < 3; k++) {
+      double rho = R[k] * r[0] + R[k + 3] * r[1] + R[k + 6] * r[2];
+      aero_disps[3 * i + k] = xsbar[k] + rho - F2FRealPart(Xa[3 * i + k]);
+    }
   }
+
+  // The rotations have changed so the stored factorizations are out of date
+  M1_factored = 0;
 }
+#endif  // FUNTOFEM_USE_COMPLEX
 
 /*
-  Computes the loads on all structural nodes consistently and conservatively
-  from loads on aerodynamic surface nodes
-
-  Arguments
-  ---------
-  aero_loads   : loads on aerodynamic surface nodes
-
-  Returns
-  -------
-  struct_loads : loads on structural nodes
+  Assembles and factors the matrix M1 for every aerodynamic surface node from
+  the rotation and symmetric matrices computed in the last displacement
+  transfer. The factorizations are stored in global_M1 and global_ipiv and are
+  reused by the load transfer and the Jacobian-vector products until the next
+  call to transferDisps. In the memory-lean mode, the factorizations are not
+  stored and are computed when needed by getM1.
 */
-void MELD::transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads) {
-  // Copy prescribed aero loads into member variable
-  memcpy(Fa, aero_loads, 3 * na * sizeof(F2FScalar));
-
-  // Zero struct loads
-  F2FScalar *struct_loads_global = new F2FScalar[3 * ns];
-  memset(struct_loads_global, 0, 3 * ns * sizeof(F2FScalar));
+void MELD::factorM1() {
+  if (M1_factored || memory_lean) {
+    return;
+  }
 
-  // Loop over all aerodynamic surface nodes
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
   for (int i = 0; i < na; i++) {
-    // Compute vector d from centroid to aero node
-    const F2FScalar *xa0 = &Xa[3 * i];
-    const F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    F2FScalar r[3];
-    vec_diff(xs0bar, xa0, r);
-
-    // Compute X
     const F2FScalar *R = &global_R[9 * i];
     const F2FScalar *S = &global_S[9 * i];
     F2FScalar *M1 = &global_M1[15 * 15 * i];
@@ -355,75 +654,329 @@ void MELD::transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads) {
     int *ipiv = &global_ipiv[15 * i];
     int m = 15, info = 0;
     LAPACKgetrf(&m, &m, M1, &m, ipiv, &info);
+  }
 
-    const F2FScalar *fa = &Fa[3 * i];
-    F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
-                     -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
-                     -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
-                     0.0,           0.0,           0.0,
-                     0.0,           0.0,           0.0};
-    int one = 1;
-    info = 0;
-    LAPACKgetrs("N", &m, &one, M1, &m, ipiv, x, &m, &info);
-    F2FScalar X[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
-
-    // Compute load contribution of aerodynamic surface node to structural node
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[i * nn + j];
+  M1_factored = 1;
+}
 
-      if (indx < ns) {
-        // Compute vector q from centroid to structural node
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar q[3];
-        vec_diff(xs0bar, xs0, q);
+/*
+  Get the factored matrix M1 for an aerodynamic surface node. When the
+  factorizations are stored, this points to the stored factorization.
+  Otherwise, M1 is assembled and factored in the work arrays provided.
 
-        const F2FScalar w = global_W[nn * i + j];
-        F2FScalar *fs = &struct_loads_global[3 * indx];
+  Arguments
+  ---------
+  i         : index of the aerodynamic surface node
+  M1_work   : work array of length 15*15
+  ipiv_work : work array of length 15
 
-        // fs = w*(X^{T}*q + w*fa)
-        fs[0] += w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2] + fa[0]);
-        fs[1] += w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2] + fa[1]);
-        fs[2] += w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2] + fa[2]);
-      } else {
-        indx -= ns;
+  Returns
+  -------
+  M1        : the factored matrix M1
+  ipiv      : the pivots of the factorization
+*/
+void MELD::getM1(int i, const F2FScalar **M1, const int **ipiv,
+                 F2FScalar *M1_work, int *ipiv_work) {
+  if (!memory_lean) {
+    *M1 = &global_M1[15 * 15 * i];
+    *ipiv = &global_ipiv[15 * i];
+    return;
+  }
 
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
+  assembleM1(&global_R[9 * i], &global_S[9 * i], M1_work);
+  int m = 15, info = 0;
+  LAPACKgetrf(&m, &m, M1_work, &m, ipiv_work, &info);
+  *M1 = M1_work;
+  *ipiv = ipiv_work;
+}
 
-        F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
+/*
+  Add the contributions computed for a block of aerodynamic nodes to the
+  structural nodes. The contributions are added in the order of the
+  connectivity so that the result does not depend on the number of threads.
 
-        const F2FScalar w = global_W[nn * i + j];
-        F2FScalar *fs = &struct_loads_global[3 * indx];
+  Arguments
+  ---------
+  start   : first aerodynamic node in the block
+  end     : one past the last aerodynamic node in the block
+  dof     : number of values for each structural node
+  contrib : contributions for each aerodynamic node and connected struct node
 
-        F2FScalar rfs[3];
-        rfs[0] = w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2] + fa[0]);
-        rfs[1] = w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2] + fa[1]);
-        rfs[2] = w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2] + fa[2]);
-        rfs[isymm] *= -1.0;
+  Returns
+  -------
+  struct_vec : structural vector the contributions are added to
+*/
+void MELD::addStructContributions(int start, int end, int dof,
+                                  const F2FScalar *contrib,
+                                  F2FScalar *struct_vec) {
+  for (int i = start; i < end; i++) {
+    for (int j = 0; j < nn; j++) {
+      int indx = global_conn[nn * i + j];
+      if (indx >= ns) {
+        indx -= ns;
+      }
 
-        // fs = w*(X^{T}*q + w*fa)
-        fs[0] += rfs[0];
-        fs[1] += rfs[1];
-        fs[2] += rfs[2];
+      const F2FScalar *c = &contrib[dof * (nn * (i - start) + j)];
+      F2FScalar *v = &struct_vec[dof * indx];
+      for (int k = 0; k < dof; k++) {
+        v[k] += c[k];
       }
     }
   }
-
-  // distribute the structural loads
-  structAddScatter(3 * ns, struct_loads_global, 3 * ns_local, struct_loads);
-
-  delete[] struct_loads_global;
 }
 
 /*
-  Apply the action of the displacement transfer w.r.t structural displacments
-  Jacobian to the input vector
+  Computes centroids of set of structural nodes
 
   Arguments
-  ---------
+  ----------
+  local_conn : IDs of structural nodes in set
+  W : array of local weights
+  X : set of all structural nodes followed by the reflected nodes
+
+  Returns
+  --------
+  xsbar : centroid
+*/
+void MELD::computeCentroid(const int *local_conn, const F2FScalar *W,
+                           const F2FScalar *X, F2FScalar *xsbar) {
+  memset(xsbar, 0, 3 * sizeof(F2FScalar));
+  for (int j = 0; j < nn; j++) {
+    const F2FScalar *xs = &X[3 * local_conn[j]];
+    xsbar[0] += W[j] * xs[0];
+    xsbar[1] += W[j] * xs[1];
+    xsbar[2] += W[j] * xs[2];
+  }
+}
+
+/*
+  Gather the initial and displaced locations of the structural nodes linked
+  to an aerodynamic node into arrays of their x, y and z components
+
+  Arguments
+  ---------
+  local_conn : IDs of structural nodes in set
+  X : initial structural node locations followed by the reflected nodes
+  Xd : displaced structural node locations followed by the reflected nodes
+
+  Returns
+  -------
+  x0 : components of the initial locations (x, y and z arrays of length nn)
+  xd : components of the displaced locations
+*/
+void MELD::gatherStructNodes(const int *local_conn, const F2FScalar *X,
+                             const F2FScalar *Xd, F2FScalar *x0,
+                             F2FScalar *xd) {
+  for (int j = 0; j < nn; j++) {
+    const F2FScalar *xs0 = &X[3 * local_conn[j]];
+    const F2FScalar *xs = &Xd[3 * local_conn[j]];
+    x0[j] = xs0[0];
+    x0[nn + j] = xs0[1];
+    x0[2 * nn + j] = xs0[2];
+    xd[j] = xs[0];
+    xd[nn + j] = xs[1];
+    xd[2 * nn + j] = xs[2];
+  }
+}
+
+/*
+  Gather the weights and the initial and displaced locations of the
+  structural nodes linked to an aerodynamic node from the single precision
+  weights and node locations
+
+  Arguments
+  ---------
+  local_conn : IDs of structural nodes in set
+  W : array of local weights
+  X : initial structural node locations followed by the reflected nodes
+  U : structural node displacements followed by the reflected displacements
+
+  Returns
+  -------
+  w : the weights
+  x0 : components of the initial locations (x, y and z arrays of length nn)
+  xd : components of the displaced locations
+*/
+void MELD::gatherStructNodesSingle(const int *local_conn, const float *W,
+                                   const float *X, const F2FScalar *U,
+                                   F2FScalar *w, F2FScalar *x0, F2FScalar *xd) {
+  for (int j = 0; j < nn; j++) {
+    const float *xs0 = &X[3 * local_conn[j]];
+    const F2FScalar *us = &U[3 * local_conn[j]];
+    w[j] = W[j];
+    x0[j] = xs0[0];
+    x0[nn + j] = xs0[1];
+    x0[2 * nn + j] = xs0[2];
+    xd[j] = x0[j] + us[0];
+    xd[nn + j] = x0[nn + j] + us[1];
+    xd[2 * nn + j] = x0[2 * nn + j] + us[2];
+  }
+}
+
+/*
+  Computes the centroids of the initial and displaced sets of structural
+  nodes and the covariance matrix between them from the gathered nodes. The
+  sums over the nodes have unit stride.
+
+  Arguments
+  ---------
+  W : array of local weights
+  x0 : components of the initial locations (overwritten)
+  xd : components of the displaced locations (overwritten)
+
+  Returns
+  -------
+  xs0bar : initial centroid
+  xsbar : displaced centroid
+  H : covariance matrix
+*/
+void MELD::computeCentroidCovariance(const F2FScalar *W, F2FScalar *x0,
+                                     F2FScalar *xd, F2FScalar *xs0bar,
+                                     F2FScalar *xsbar, F2FScalar *H) {
+  for (int k = 0; k < 3; k++) {
+    xs0bar[k] = dotLanes(nn, W, &x0[k * nn]);
+    xsbar[k] = dotLanes(nn, W, &xd[k * nn]);
+  }
+
+  // Replace the initial locations with the weighted vectors from the initial
+  // centroid to the nodes q, and the displaced locations with the vectors
+  // from the displaced centroid to the displaced nodes p
+  for (int k = 0; k < 3; k++) {
+    F2FScalar *q = &x0[k * nn];
+    F2FScalar *p = &xd[k * nn];
+    for (int j = 0; j < nn; j++) {
+      q[j] = W[j] * (q[j] - xs0bar[k]);
+      p[j] = p[j] - xsbar[k];
+    }
+  }
+
+  // H_{mn} = sum_{j}^{N} w^{(j)} p_{m}^{(j)} q_{n}^{(j)}
+  for (int n = 0; n < 3; n++) {
+    for (int m = 0; m < 3; m++) {
+      H[m + 3 * n] = dotLanes(nn, &xd[m * nn], &x0[n * nn]);
+    }
+  }
+}
+
+/*
+  Computes the loads on all structural nodes consistently and conservatively
+  from loads on aerodynamic surface nodes
+
+  Arguments
+  ---------
+  aero_loads   : loads on aerodynamic surface nodes
+
+  Returns
+  -------
+  struct_loads_global : loads on the global image of the structural nodes
+*/
+void MELD::computeStructLoads(const F2FScalar *aero_loads,
+                              F2FScalar *struct_loads_global) {
+  // Copy prescribed aero loads into member variable
+  memcpy(Fa, aero_loads, 3 * na * sizeof(F2FScalar));
+
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
+
+  // Storage for the contributions from a block of aerodynamic nodes
+  F2FScalar *contrib = getWorkArray(BLOCK_WORK, 3 * nn * MELD_BLOCK_SIZE);
+
+  // Loop over all aerodynamic surface nodes
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
+    }
+    memset(contrib, 0, 3 * nn * (end - start) * sizeof(F2FScalar));
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      // Compute vector d from centroid to aero node
+      const F2FScalar *xa0 = &Xa[3 * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Compute X
+      F2FScalar M1_work[15 * 15];
+      int ipiv_work[15];
+      const F2FScalar *M1;
+      const int *ipiv;
+      getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+      int m = 15, info = 0;
+
+      const F2FScalar *fa = &Fa[3 * i];
+      F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
+                       -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
+                       -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
+                       0.0,           0.0,           0.0,
+                       0.0,           0.0,           0.0};
+      int one = 1;
+      info = 0;
+      LAPACKgetrs("N", &m, &one, M1, &m, ipiv, x, &m, &info);
+      F2FScalar X[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
+
+      // Compute load contribution of aerodynamic surface node to structural
+      // node
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[i * nn + j];
+
+        if (indx < ns) {
+          // Compute vector q from centroid to structural node
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar q[3];
+          vec_diff(xs0bar, xs0, q);
+
+          const F2FScalar w = getWeight(i, j);
+          F2FScalar *fs = &contrib[3 * (nn * (i - start) + j)];
+
+          // fs = w*(X^{T}*q + w*fa)
+          fs[0] += w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2] + fa[0]);
+          fs[1] += w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2] + fa[1]);
+          fs[2] += w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2] + fa[2]);
+        } else {
+          indx -= ns;
+
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+
+          F2FScalar q[3];
+          vec_diff(xs0bar, rxs0, q);
+
+          const F2FScalar w = getWeight(i, j);
+          F2FScalar *fs = &contrib[3 * (nn * (i - start) + j)];
+
+          F2FScalar rfs[3];
+          rfs[0] = w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2] + fa[0]);
+          rfs[1] = w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2] + fa[1]);
+          rfs[2] = w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2] + fa[2]);
+          rfs[isymm] *= -1.0;
+
+          // fs = w*(X^{T}*q + w*fa)
+          fs[0] += rfs[0];
+          fs[1] += rfs[1];
+          fs[2] += rfs[2];
+        }
+      }
+    }
+
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3, contrib, struct_loads_global);
+  }
+}
+
+/*
+  Apply the action of the displacement transfer w.r.t structural displacments
+  Jacobian to the input vector
+
+  Arguments
+  ---------
   vecs  : input vector
 
   Returns
@@ -431,14 +984,24 @@ void MELD::transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads) {
   prods : output vector
 */
 void MELD::applydDduS(const F2FScalar *vecs, F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
+
   // Make a global image of the input vector
-  F2FScalar *vecs_global = new F2FScalar[3 * ns];
+  F2FScalar *vecs_global = getWorkArray(STRUCT_WORK, 3 * ns);
   structGatherBcast(3 * ns_local, vecs, 3 * ns, vecs_global);
 
   // Zero array of Jacobian-vector products every call
   memset(prods, 0, 3 * na * sizeof(F2FScalar));
 
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
+
   // Loop over all aerodynamic surface nodes
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
   for (int i = 0; i < na; i++) {
     F2FScalar *prod = &prods[3 * i];
 
@@ -449,13 +1012,12 @@ void MELD::applydDduS(const F2FScalar *vecs, F2FScalar *prods) {
     vec_diff(xs0bar, xa0, r);
 
     // Compute XX
-    const F2FScalar *R = &global_R[9 * i];
-    const F2FScalar *S = &global_S[9 * i];
-    F2FScalar M1[15 * 15];
-    assembleM1(R, S, M1);
-    int ipiv[15];
+    F2FScalar M1_work[15 * 15];
+    int ipiv_work[15];
+    const F2FScalar *M1;
+    const int *ipiv;
+    getM1(i, &M1, &ipiv, M1_work, ipiv_work);
     int m = 15, info = 0;
-    LAPACKgetrf(&m, &m, M1, &m, ipiv, &info);
     F2FScalar x[15];
     F2FScalar XX[9 * 3];
 
@@ -494,12 +1056,14 @@ void MELD::applydDduS(const F2FScalar *vecs, F2FScalar *prods) {
       F2FScalar q[3];
       F2FScalar v[3];
       if (indx < ns) {
-        const F2FScalar *xs0 = &Xs[3 * indx];
+        F2FScalar xs0[3];
+        getStructNode(indx, xs0);
         vec_diff(xs0bar, xs0, q);
         memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
       } else {
         indx -= ns;
-        const F2FScalar *xs0 = &Xs[3 * indx];
+        F2FScalar xs0[3];
+        getStructNode(indx, xs0);
         F2FScalar rxs0[3];
         memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
         rxs0[isymm] *= -1.0;
@@ -512,7 +1076,7 @@ void MELD::applydDduS(const F2FScalar *vecs, F2FScalar *prods) {
       // Jv[k] = w * [ q[0] q[1] q[2] ][ X[0] X[3] X[6] ][ v[0] ] + w*v[k]
       //                               [ X[1] X[4] X[7] ][ v[1] ]
       //                               [ X[2] X[5] X[8] ][ v[2] ]
-      F2FScalar w = global_W[nn * i + j];
+      F2FScalar w = getWeight(i, j);
 
       for (int k = 0; k < 3; k++) {
         F2FScalar *X = &XX[9 * k];
@@ -523,9 +1087,6 @@ void MELD::applydDduS(const F2FScalar *vecs, F2FScalar *prods) {
       }
     }
   }
-
-  // Clean up the allocated memory
-  delete[] vecs_global;
 }
 
 /*
@@ -541,460 +1102,985 @@ void MELD::applydDduS(const F2FScalar *vecs, F2FScalar *prods) {
   prods : output vector
 */
 void MELD::applydDduSTrans(const F2FScalar *vecs, F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
+
   // Zero array of transpose Jacobian-vector products every call
-  F2FScalar *prods_global = new F2FScalar[3 * ns];
+  F2FScalar *prods_global = getWorkArray(STRUCT_WORK, 3 * ns);
   memset(prods_global, 0, 3 * ns * sizeof(F2FScalar));
 
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
+
+  // Storage for the contributions from a block of aerodynamic nodes
+  F2FScalar *contrib = getWorkArray(BLOCK_WORK, 3 * nn * MELD_BLOCK_SIZE);
+
   // Loop over aerodynamic surface nodes
-  for (int i = 0; i < na; i++) {
-    const F2FScalar *v = &vecs[3 * i];
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
+    }
+    memset(contrib, 0, 3 * nn * (end - start) * sizeof(F2FScalar));
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      const F2FScalar *v = &vecs[3 * i];
+
+      // Compute vector r from centroid to aero node
+      const F2FScalar *xa0 = &Xa[3 * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Compute XX
+      F2FScalar M1_work[15 * 15];
+      int ipiv_work[15];
+      const F2FScalar *M1;
+      const int *ipiv;
+      getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+      int m = 15, info = 0;
+      F2FScalar x[15];
+      F2FScalar XX[9 * 3];
+
+      memset(x, 0.0, 15 * sizeof(F2FScalar));
+      x[0] -= r[0];
+      x[3] -= r[1];
+      x[6] -= r[2];
+      int nrhs = 1;
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      memcpy(&XX[0], x, 9 * sizeof(F2FScalar));
+
+      memset(x, 0.0, 15 * sizeof(F2FScalar));
+      x[1] -= r[0];
+      x[4] -= r[1];
+      x[7] -= r[2];
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      memcpy(&XX[9], x, 9 * sizeof(F2FScalar));
+
+      memset(x, 0.0, 15 * sizeof(F2FScalar));
+      x[2] -= r[0];
+      x[5] -= r[1];
+      x[8] -= r[2];
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      memcpy(&XX[18], x, 9 * sizeof(F2FScalar));
+
+      // Loop over linked structural nodes and add up nonzero contributions to
+      // Jacobian-vector product
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        if (indx < ns) {
+          // Compute vector q from centroid to structural node
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar q[3];
+          vec_diff(xs0bar, xs0, q);
+
+          // Compute each component of the transpose Jacobian-vector product as
+          // follows:
+          // J^{T}*v = w[X_{1}^{T}*q X_{2}^{T}*q X_{3}^{T}*q]*v + w*v
+          F2FScalar w = getWeight(i, j);
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+          prod[0] -= w * v[0];
+          prod[1] -= w * v[1];
+          prod[2] -= w * v[2];
+
+          for (int k = 0; k < 3; k++) {
+            F2FScalar *X = &XX[9 * k];
+            prod[0] -= w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2]) * v[k];
+            prod[1] -= w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2]) * v[k];
+            prod[2] -= w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2]) * v[k];
+          }
+        } else {
+          indx -= ns;
+
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+
+          F2FScalar q[3];
+          vec_diff(xs0bar, rxs0, q);
+
+          F2FScalar w = getWeight(i, j);
+          F2FScalar rprod[] = {0.0, 0.0, 0.0};
+          rprod[0] += w * v[0];
+          rprod[1] += w * v[1];
+          rprod[2] += w * v[2];
+
+          for (int k = 0; k < 3; k++) {
+            F2FScalar *X = &XX[9 * k];
+            rprod[0] += w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2]) * v[k];
+            rprod[1] += w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2]) * v[k];
+            rprod[2] += w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2]) * v[k];
+          }
+          rprod[isymm] *= -1.0;
+
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+          prod[0] -= rprod[0];
+          prod[1] -= rprod[1];
+          prod[2] -= rprod[2];
+        }
+      }
+    }
 
-    // Compute vector r from centroid to aero node
-    const F2FScalar *xa0 = &Xa[3 * i];
-    const F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    F2FScalar r[3];
-    vec_diff(xs0bar, xa0, r);
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3, contrib, prods_global);
+  }
 
-    // Compute XX
-    const F2FScalar *R = &global_R[9 * i];
-    const F2FScalar *S = &global_S[9 * i];
-    F2FScalar M1[15 * 15];
-    assembleM1(R, S, M1);
-    int ipiv[15];
-    int m = 15, info = 0;
-    LAPACKgetrf(&m, &m, M1, &m, ipiv, &info);
-    F2FScalar x[15];
-    F2FScalar XX[9 * 3];
+  // distribute the results to the structural processors
+  structAddScatter(3 * ns, prods_global, 3 * ns_local, prods);
+}
 
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
-    x[0] -= r[0];
-    x[3] -= r[1];
-    x[6] -= r[2];
-    int nrhs = 1;
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    memcpy(&XX[0], x, 9 * sizeof(F2FScalar));
+/*
+  Apply the action of the load transfer w.r.t structural displacements Jacobian
+  to the input vector
 
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
-    x[1] -= r[0];
-    x[4] -= r[1];
-    x[7] -= r[2];
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    memcpy(&XX[9], x, 9 * sizeof(F2FScalar));
+  Arguments
+  ----------
+  vecs  : input vector
 
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
-    x[2] -= r[0];
-    x[5] -= r[1];
-    x[8] -= r[2];
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    memcpy(&XX[18], x, 9 * sizeof(F2FScalar));
+  Returns
+  --------
+  prods : output vector
+*/
+void MELD::applydLduS(const F2FScalar *vecs, F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
 
-    // Loop over linked structural nodes and add up nonzero contributions to
-    // Jacobian-vector product
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
+  F2FScalar *vecs_global = getWorkArray(STRUCT_WORK, 6 * ns);
+  structGatherBcast(3 * ns_local, vecs, 3 * ns, vecs_global);
 
-      if (indx < ns) {
-        // Compute vector q from centroid to structural node
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar q[3];
-        vec_diff(xs0bar, xs0, q);
+  // Zero products
+  F2FScalar *prods_global = &vecs_global[3 * ns];
+  memset(prods_global, 0, 3 * ns * sizeof(F2FScalar));
 
-        // Compute each component of the transpose Jacobian-vector product as
-        // follows:
-        // J^{T}*v = w[X_{1}^{T}*q X_{2}^{T}*q X_{3}^{T}*q]*v + w*v
-        F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
-        prod[0] -= w * v[0];
-        prod[1] -= w * v[1];
-        prod[2] -= w * v[2];
-
-        for (int k = 0; k < 3; k++) {
-          F2FScalar *X = &XX[9 * k];
-          prod[0] -= w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2]) * v[k];
-          prod[1] -= w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2]) * v[k];
-          prod[2] -= w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2]) * v[k];
-        }
-      } else {
-        indx -= ns;
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
 
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
+  // Storage for the contributions from a block of aerodynamic nodes
+  F2FScalar *contrib = getWorkArray(BLOCK_WORK, 3 * nn * MELD_BLOCK_SIZE);
 
+  // Loop over aerodynamic surface nodes
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
+    }
+    memset(contrib, 0, 3 * nn * (end - start) * sizeof(F2FScalar));
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      // Compute vector r from centroid to aero node
+      const F2FScalar *xa0 = &Xa[3 * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Get the load on the aerodynamic surface node
+      const F2FScalar *fa = &Fa[3 * i];
+
+      // Recompute X and Y
+      F2FScalar M1_work[15 * 15];
+      int ipiv_work[15];
+      const F2FScalar *M1;
+      const int *ipiv;
+      getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+      F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
+                       -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
+                       -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
+                       0.0,           0.0,           0.0,
+                       0.0,           0.0,           0.0};
+      int m = 15, nrhs = 1, info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar XT[] = {x[0], x[3], x[6], x[1], x[4], x[7], x[2], x[5], x[8]};
+      F2FScalar nY[] = {-x[9],  -x[10], -x[11], -x[10], -x[12],
+                        -x[13], -x[11], -x[13], -x[14]};
+
+      // Assemble X and Y into matrix M2
+      F2FScalar M2[15 * 15];
+      assembleM1(XT, nY, M2);
+
+      // Assemble matrix M3 from R and S
+      F2FScalar M3[15 * 15];
+      const F2FScalar *R = &global_R[9 * i];
+      const F2FScalar *S = &global_S[9 * i];
+      assembleM3(R, S, M3);
+
+      // Build right-hand side of first system to be solved
+      F2FScalar z2[15];
+      memset(z2, 0.0, 15 * sizeof(F2FScalar));
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        // Get vector q and subset of input vector
         F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
-
-        F2FScalar w = global_W[nn * i + j];
-        F2FScalar rprod[] = {0.0, 0.0, 0.0};
-        rprod[0] += w * v[0];
-        rprod[1] += w * v[1];
-        rprod[2] += w * v[2];
-
-        for (int k = 0; k < 3; k++) {
-          F2FScalar *X = &XX[9 * k];
-          rprod[0] += w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2]) * v[k];
-          rprod[1] += w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2]) * v[k];
-          rprod[2] += w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2]) * v[k];
+        F2FScalar v[3];
+        if (indx < ns) {
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          vec_diff(xs0bar, xs0, q);
+          memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+        } else {
+          indx -= ns;
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+          vec_diff(xs0bar, rxs0, q);
+          memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+          v[isymm] *= -1.0;
         }
-        rprod[isymm] *= -1.0;
 
-        F2FScalar *prod = &prods_global[3 * indx];
-        prod[0] -= rprod[0];
-        prod[1] -= rprod[1];
-        prod[2] -= rprod[2];
+        F2FScalar w = getWeight(i, j);
+
+        z2[0] -= w * q[0] * v[0];
+        z2[1] -= w * q[1] * v[0];
+        z2[2] -= w * q[2] * v[0];
+        z2[3] -= w * q[0] * v[1];
+        z2[4] -= w * q[1] * v[1];
+        z2[5] -= w * q[2] * v[1];
+        z2[6] -= w * q[0] * v[2];
+        z2[7] -= w * q[1] * v[2];
+        z2[8] -= w * q[2] * v[2];
+      }
+
+      // Solve the first linear system
+      int ipiv3[15];
+      info = 0;
+      LAPACKgetrf(&m, &m, M3, &m, ipiv3, &info);
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M3, &m, ipiv3, z2, &m, &info);
+
+      // Compute right-hand side of second system
+      F2FScalar z1[15];
+      F2FScalar alpha = -1.0, beta = 0.0;
+      int inc = 1;
+      BLASgemv("N", &m, &m, &alpha, M2, &m, z2, &inc, &beta, z1, &inc);
+
+      // Solve the second system
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, z1, &m, &info);
+
+      // Extract ZH
+      F2FScalar ZH[9] = {z1[0], z1[1], z1[2], z1[3], z1[4],
+                         z1[5], z1[6], z1[7], z1[8]};
+
+      // Loop over linked structural nodes and add contributions from
+      // aerodynamic surface node to global structural loads
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        if (indx < ns) {
+          // Compute vector q from centroid to structural node
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar q[3];
+          vec_diff(xs0bar, xs0, q);
+
+          // Compute load contribution of aerodynamic surface node to structural
+          // node
+          const F2FScalar w = getWeight(i, j);
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+
+          // prod = w * [ ZH[0] ZH[1] ZH[2] ][ q[0] ]
+          //            [ ZH[3] ZH[4] ZH[5] ][ q[1] ]
+          //            [ ZH[6] ZH[7] ZH[8] ][ q[2] ]
+          prod[0] -= w * (ZH[0] * q[0] + ZH[1] * q[1] + ZH[2] * q[2]);
+          prod[1] -= w * (ZH[3] * q[0] + ZH[4] * q[1] + ZH[5] * q[2]);
+          prod[2] -= w * (ZH[6] * q[0] + ZH[7] * q[1] + ZH[8] * q[2]);
+        } else {
+          indx -= ns;
+
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+
+          F2FScalar q[3];
+          vec_diff(xs0bar, rxs0, q);
+
+          const F2FScalar w = getWeight(i, j);
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+
+          F2FScalar rprod[3];
+          rprod[0] = w * (ZH[0] * q[0] + ZH[1] * q[1] + ZH[2] * q[2]);
+          rprod[1] = w * (ZH[3] * q[0] + ZH[4] * q[1] + ZH[5] * q[2]);
+          rprod[2] = w * (ZH[6] * q[0] + ZH[7] * q[1] + ZH[8] * q[2]);
+          rprod[isymm] *= -1.0;
+
+          prod[0] -= rprod[0];
+          prod[1] -= rprod[1];
+          prod[2] -= rprod[2];
+        }
       }
     }
+
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3, contrib, prods_global);
   }
+
   // distribute the results to the structural processors
   structAddScatter(3 * ns, prods_global, 3 * ns_local, prods);
-
-  // clean up allocated memory
-  delete[] prods_global;
 }
 
 /*
-  Apply the action of the load transfer w.r.t structural displacements Jacobian
-  to the input vector
+  Apply the action of the load transfer w.r.t structural displacements
+  transpose Jacobian to the input vector
 
   Arguments
-  ----------
+  ---------
   vecs  : input vector
 
   Returns
   --------
   prods : output vector
 */
-void MELD::applydLduS(const F2FScalar *vecs, F2FScalar *prods) {
-  F2FScalar *vecs_global = new F2FScalar[3 * ns];
+void MELD::applydLduSTrans(const F2FScalar *vecs, F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
+
+  F2FScalar *vecs_global = getWorkArray(STRUCT_WORK, 6 * ns);
   structGatherBcast(3 * ns_local, vecs, 3 * ns, vecs_global);
 
-  // Zero products
-  F2FScalar *prods_global = new F2FScalar[3 * ns];
+  // Zero products every call
+  F2FScalar *prods_global = &vecs_global[3 * ns];
   memset(prods_global, 0, 3 * ns * sizeof(F2FScalar));
 
-  // Loop over aerodynamic surface nodes
-  for (int i = 0; i < na; i++) {
-    // Compute vector r from centroid to aero node
-    const F2FScalar *xa0 = &Xa[3 * i];
-    const F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    F2FScalar r[3];
-    vec_diff(xs0bar, xa0, r);
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
 
-    // Get the load on the aerodynamic surface node
-    const F2FScalar *fa = &Fa[3 * i];
+  // Storage for the contributions from a block of aerodynamic nodes
+  F2FScalar *contrib = getWorkArray(BLOCK_WORK, 3 * nn * MELD_BLOCK_SIZE);
 
-    // Recompute X and Y
-    const F2FScalar *M1 = &global_M1[15 * 15 * i];
-    const int *ipiv = &global_ipiv[15 * i];
-    F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
-                     -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
-                     -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
-                     0.0,           0.0,           0.0,
-                     0.0,           0.0,           0.0};
-    int m = 15, nrhs = 1, info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    F2FScalar XT[] = {x[0], x[3], x[6], x[1], x[4], x[7], x[2], x[5], x[8]};
-    F2FScalar nY[] = {-x[9],  -x[10], -x[11], -x[10], -x[12],
-                      -x[13], -x[11], -x[13], -x[14]};
+  // Loop over all aerodynamic surface nodes
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
+    }
+    memset(contrib, 0, 3 * nn * (end - start) * sizeof(F2FScalar));
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      // Compute vector r from centroid to aero node
+      const F2FScalar *xa0 = &Xa[3 * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Get the load on the aerodynamic surface node
+      const F2FScalar *fa = &Fa[3 * i];
+
+      // Recompute X and Y
+      F2FScalar M1_work[15 * 15];
+      int ipiv_work[15];
+      const F2FScalar *M1;
+      const int *ipiv;
+      getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+      F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
+                       -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
+                       -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
+                       0.0,           0.0,           0.0,
+                       0.0,           0.0,           0.0};
+      int m = 15, nrhs = 1, info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar XT[] = {x[0], x[3], x[6], x[1], x[4], x[7], x[2], x[5], x[8]};
+      F2FScalar nY[] = {-x[9],  -x[10], -x[11], -x[10], -x[12],
+                        -x[13], -x[11], -x[13], -x[14]};
+
+      // Assemble X and Y into matrix M2
+      F2FScalar M2[15 * 15];
+      assembleM1(XT, nY, M2);
+
+      // Assemble matrix M3 from R and S
+      F2FScalar M3[15 * 15];
+      const F2FScalar *R = &global_R[9 * i];
+      const F2FScalar *S = &global_S[9 * i];
+      assembleM3(R, S, M3);
+
+      // Build right-hand side of first system to be solved
+      F2FScalar y2[15];
+      memset(y2, 0.0, 15 * sizeof(F2FScalar));
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        // Get vector q and subset of input vector
+        F2FScalar q[3];
+        F2FScalar v[3];
+        if (indx < ns) {
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          vec_diff(xs0bar, xs0, q);
+          memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+        } else {
+          indx -= ns;
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+          vec_diff(xs0bar, rxs0, q);
+          memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+          v[isymm] *= -1.0;
+        }
 
-    // Assemble X and Y into matrix M2
-    F2FScalar M2[15 * 15];
-    assembleM1(XT, nY, M2);
+        F2FScalar w = getWeight(i, j);
+
+        y2[0] -= w * q[0] * v[0];
+        y2[1] -= w * q[1] * v[0];
+        y2[2] -= w * q[2] * v[0];
+        y2[3] -= w * q[0] * v[1];
+        y2[4] -= w * q[1] * v[1];
+        y2[5] -= w * q[2] * v[1];
+        y2[6] -= w * q[0] * v[2];
+        y2[7] -= w * q[1] * v[2];
+        y2[8] -= w * q[2] * v[2];
+      }
 
-    // Assemble matrix M3 from R and S
-    F2FScalar M3[15 * 15];
-    const F2FScalar *R = &global_R[9 * i];
-    const F2FScalar *S = &global_S[9 * i];
-    assembleM3(R, S, M3);
+      // Solve the first linear system
+      const char *t = "T";
+      int ipiv3[15];
+      info = 0;
+      LAPACKgetrf(&m, &m, M3, &m, ipiv3, &info);
+      info = 0;
+      LAPACKgetrs(t, &m, &nrhs, M3, &m, ipiv, y2, &m, &info);
+
+      // Compute right-hand side of second system
+      F2FScalar y1[15];
+      F2FScalar alpha = -1.0, beta = 0.0;
+      int inc = 1;
+      BLASgemv(t, &m, &m, &alpha, M2, &m, y2, &inc, &beta, y1, &inc);
+
+      // Solve the second system
+      info = 0;
+      LAPACKgetrs(t, &m, &nrhs, M1, &m, ipiv, y1, &m, &info);
+
+      // Extract YF
+      F2FScalar YF[] = {y1[0], y1[1], y1[2], y1[3], y1[4],
+                        y1[5], y1[6], y1[7], y1[8]};
+
+      // Loop over linked structural nodes and add contributions from
+      // aerodynamic surface node to global structural loads
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        if (indx < ns) {
+          // Compute vector q from centroid to structural node
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar q[3];
+          vec_diff(xs0bar, xs0, q);
+
+          // Compute load contribution of aerodynamic surface node to structural
+          // node
+          F2FScalar w = getWeight(i, j);
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+
+          // prod  = w * [ YF[0] YF[3] YF[6] ][ q[0] ]
+          //             [ YF[1] YF[4] YF[7] ][ q[1] ]
+          //             [ YF[2] YF[5] YF[8] ][ q[2] ]
+          prod[0] -= w * (YF[0] * q[0] + YF[3] * q[1] + YF[6] * q[2]);
+          prod[1] -= w * (YF[1] * q[0] + YF[4] * q[1] + YF[7] * q[2]);
+          prod[2] -= w * (YF[2] * q[0] + YF[5] * q[1] + YF[8] * q[2]);
+        } else {
+          indx -= ns;
+
+          F2FScalar xs0[3];
+          getStructNode(indx, xs0);
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+
+          F2FScalar q[3];
+          vec_diff(xs0bar, rxs0, q);
+
+          const F2FScalar w = getWeight(i, j);
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+
+          F2FScalar rprod[3];
+          rprod[0] = w * (YF[0] * q[0] + YF[3] * q[1] + YF[6] * q[2]);
+          rprod[1] = w * (YF[1] * q[0] + YF[4] * q[1] + YF[7] * q[2]);
+          rprod[2] = w * (YF[2] * q[0] + YF[5] * q[1] + YF[8] * q[2]);
+          rprod[isymm] *= -1.0;
+
+          prod[0] -= rprod[0];
+          prod[1] -= rprod[1];
+          prod[2] -= rprod[2];
+        }
+      }
+    }
 
-    // Build right-hand side of first system to be solved
-    F2FScalar z2[15];
-    memset(z2, 0.0, 15 * sizeof(F2FScalar));
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3, contrib, prods_global);
+  }
 
-      // Get vector q and subset of input vector
-      F2FScalar q[3];
-      F2FScalar v[3];
-      if (indx < ns) {
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        vec_diff(xs0bar, xs0, q);
-        memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-      } else {
-        indx -= ns;
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-        vec_diff(xs0bar, rxs0, q);
-        memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-        v[isymm] *= -1.0;
-      }
+  // distribute the results to the structural processors
+  structAddScatter(3 * ns, prods_global, 3 * ns_local, prods);
+}
+
+/*
+  Compute the derivatives of the rotation w.r.t. the covariance matrix
+  contracted with the vector r from the centroid to the aerodynamic node,
+  XX = [X_{1} X_{2} X_{3}], for a single aerodynamic node. The M1 matrix must
+  be factored before this is called.
+
+  Arguments
+  ---------
+  i  : index of the aerodynamic node
+
+  Returns
+  -------
+  XX : the three 3x3 matrices stored consecutively
+*/
+void MELD::computeXX(int i, F2FScalar *XX) {
+  // Compute vector r from centroid to aero node
+  const F2FScalar *xa0 = &Xa[3 * i];
+  const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+  F2FScalar r[3];
+  vec_diff(xs0bar, xa0, r);
+
+  // Solve for all three right-hand sides at once
+  F2FScalar x[3 * 15];
+  memset(x, 0, 3 * 15 * sizeof(F2FScalar));
+  for (int k = 0; k < 3; k++) {
+    x[15 * k + k] = -r[0];
+    x[15 * k + 3 + k] = -r[1];
+    x[15 * k + 6 + k] = -r[2];
+  }
 
-      F2FScalar w = global_W[nn * i + j];
-
-      z2[0] -= w * q[0] * v[0];
-      z2[1] -= w * q[1] * v[0];
-      z2[2] -= w * q[2] * v[0];
-      z2[3] -= w * q[0] * v[1];
-      z2[4] -= w * q[1] * v[1];
-      z2[5] -= w * q[2] * v[1];
-      z2[6] -= w * q[0] * v[2];
-      z2[7] -= w * q[1] * v[2];
-      z2[8] -= w * q[2] * v[2];
+  F2FScalar M1_work[15 * 15];
+  int ipiv_work[15];
+  const F2FScalar *M1;
+  const int *ipiv;
+  getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+  int m = 15, nrhs = 3, info = 0;
+  LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+
+  for (int k = 0; k < 3; k++) {
+    memcpy(&XX[9 * k], &x[15 * k], 9 * sizeof(F2FScalar));
+  }
+}
+
+/*
+  Compute the 3x3 block of the displacement transfer Jacobian that links an
+  aerodynamic node to one of its connected structural nodes. The entry
+  T[3 * k + l] is the derivative of component k of the aerodynamic
+  displacement w.r.t. component l of the structural displacement, with the
+  sign convention of the displacement transfer residual omitted.
+
+  Arguments
+  ---------
+  XX      : the matrices computed by computeXX
+  w       : weight of the structural node
+  q       : vector from the centroid to the (reflected) structural node
+  reflect : symmetry axis if the structural node is reflected, otherwise -1
+
+  Returns
+  -------
+  T       : the 3x3 Jacobian block
+*/
+static void computeDispJacobianBlock(const F2FScalar *XX, const F2FScalar w,
+                                     const F2FScalar *q, int reflect,
+                                     F2FScalar *T) {
+  for (int k = 0; k < 3; k++) {
+    const F2FScalar *X = &XX[9 * k];
+    for (int l = 0; l < 3; l++) {
+      T[3 * k + l] =
+          w * (X[3 * l] * q[0] + X[3 * l + 1] * q[1] + X[3 * l + 2] * q[2]);
     }
+    T[3 * k + k] += w;
+  }
 
-    // Solve the first linear system
-    int ipiv3[15];
-    info = 0;
-    LAPACKgetrf(&m, &m, M3, &m, ipiv3, &info);
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M3, &m, ipiv3, z2, &m, &info);
+  if (reflect >= 0) {
+    for (int k = 0; k < 3; k++) {
+      T[3 * k + reflect] *= -1.0;
+    }
+  }
+}
 
-    // Compute right-hand side of second system
-    F2FScalar z1[15];
-    F2FScalar alpha = -1.0, beta = 0.0;
-    int inc = 1;
-    BLASgemv("N", &m, &m, &alpha, M2, &m, z2, &inc, &beta, z1, &inc);
+/*
+  Apply the action of the displacement transfer w.r.t structural displacements
+  transpose Jacobian to a block of input vectors. The structural products for
+  all the vectors are computed in one pass over the connectivity and
+  distributed with a single reduction.
 
-    // Solve the second system
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, z1, &m, &info);
+  Arguments
+  ----------
+  nvecs : number of vectors in the block
+  vecs  : input block of aerodynamic vectors
 
-    // Extract ZH
-    F2FScalar ZH[9] = {z1[0], z1[1], z1[2], z1[3], z1[4],
-                       z1[5], z1[6], z1[7], z1[8]};
+  Returns
+  --------
+  prods : output block of structural vectors
+*/
+void MELD::applydDduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
 
-    // Loop over linked structural nodes and add contributions from aerodynamic
-    // surface node to global structural loads
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
+  // Zero array of transpose Jacobian-vector products every call
+  F2FScalar *prods_global = getWorkArray(STRUCT_WORK, 3 * nvecs * ns);
+  memset(prods_global, 0, 3 * nvecs * ns * sizeof(F2FScalar));
 
-      if (indx < ns) {
-        // Compute vector q from centroid to structural node
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar q[3];
-        vec_diff(xs0bar, xs0, q);
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
 
-        // Compute load contribution of aerodynamic surface node to structural
-        // node
-        const F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
-
-        // prod = w * [ ZH[0] ZH[1] ZH[2] ][ q[0] ]
-        //            [ ZH[3] ZH[4] ZH[5] ][ q[1] ]
-        //            [ ZH[6] ZH[7] ZH[8] ][ q[2] ]
-        prod[0] -= w * (ZH[0] * q[0] + ZH[1] * q[1] + ZH[2] * q[2]);
-        prod[1] -= w * (ZH[3] * q[0] + ZH[4] * q[1] + ZH[5] * q[2]);
-        prod[2] -= w * (ZH[6] * q[0] + ZH[7] * q[1] + ZH[8] * q[2]);
-      } else {
-        indx -= ns;
+  // Storage for the contributions from a block of aerodynamic nodes
+  F2FScalar *contrib =
+      getWorkArray(BLOCK_WORK, 3 * nvecs * nn * MELD_BLOCK_SIZE);
 
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
+  // Loop over aerodynamic surface nodes
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
+    }
+    memset(contrib, 0, 3 * nvecs * nn * (end - start) * sizeof(F2FScalar));
 
-        F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      const F2FScalar *v = &vecs[3 * nvecs * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
 
-        const F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
+      // Compute XX once for all the vectors
+      F2FScalar XX[9 * 3];
+      computeXX(i, XX);
 
-        F2FScalar rprod[3];
-        rprod[0] = w * (ZH[0] * q[0] + ZH[1] * q[1] + ZH[2] * q[2]);
-        rprod[1] = w * (ZH[3] * q[0] + ZH[4] * q[1] + ZH[5] * q[2]);
-        rprod[2] = w * (ZH[6] * q[0] + ZH[7] * q[1] + ZH[8] * q[2]);
-        rprod[isymm] *= -1.0;
+      // Loop over linked structural nodes and add up nonzero contributions to
+      // Jacobian-vector products
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
 
-        prod[0] -= rprod[0];
-        prod[1] -= rprod[1];
-        prod[2] -= rprod[2];
+        // Compute vector q from centroid to structural node
+        F2FScalar xs0[3];
+        int reflect = -1;
+        if (indx < ns) {
+          getStructNode(indx, xs0);
+        } else {
+          getStructNode(indx - ns, xs0);
+          xs0[isymm] *= -1.0;
+          reflect = isymm;
+        }
+        F2FScalar q[3];
+        vec_diff(xs0bar, xs0, q);
+
+        F2FScalar T[9];
+        computeDispJacobianBlock(XX, getWeight(i, j), q, reflect, T);
+
+        // prod = -T^{T} * v for each vector in the block
+        F2FScalar *prod = &contrib[3 * nvecs * (nn * (i - start) + j)];
+        for (int l = 0; l < 3; l++) {
+          for (int k = 0; k < nvecs; k++) {
+            prod[nvecs * l + k] -= T[l] * v[k] + T[3 + l] * v[nvecs + k] +
+                                   T[6 + l] * v[2 * nvecs + k];
+          }
+        }
       }
     }
+
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3 * nvecs, contrib, prods_global);
   }
 
   // distribute the results to the structural processors
-  structAddScatter(3 * ns, prods_global, 3 * ns_local, prods);
-
-  // clean up allocated memory
-  delete[] vecs_global;
-  delete[] prods_global;
+  structAddScatter(3 * nvecs * ns, prods_global, 3 * nvecs * ns_local, prods);
 }
 
 /*
-  Apply the action of the load transfer w.r.t structural displacements
-  transpose Jacobian to the input vector
+  Apply the action of the load transfer w.r.t aerodynamic loads transpose
+  Jacobian to a block of input vectors. Since the load transfer is derived
+  from the principle of virtual work, this is the action of the displacement
+  transfer w.r.t. structural displacements Jacobian.
 
   Arguments
-  ---------
-  vecs  : input vector
+  ----------
+  nvecs : number of vectors in the block
+  vecs  : input block of structural vectors
 
   Returns
   --------
-  prods : output vector
+  prods : output block of aerodynamic vectors
 */
-void MELD::applydLduSTrans(const F2FScalar *vecs, F2FScalar *prods) {
-  F2FScalar *vecs_global = new F2FScalar[3 * ns];
-  structGatherBcast(3 * ns_local, vecs, 3 * ns, vecs_global);
-
-  // Zero products every call
-  F2FScalar *prods_global = new F2FScalar[3 * ns];
-  memset(prods_global, 0, 3 * ns * sizeof(F2FScalar));
-
-  // Loop over all aerodynamic surface nodes
-  for (int i = 0; i < na; i++) {
-    // Compute vector r from centroid to aero node
-    const F2FScalar *xa0 = &Xa[3 * i];
-    const F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    F2FScalar r[3];
-    vec_diff(xs0bar, xa0, r);
+void MELD::applydLdfATransBatch(int nvecs, const F2FScalar *vecs,
+                                F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
 
-    // Get the load on the aerodynamic surface node
-    const F2FScalar *fa = &Fa[3 * i];
+  // Make a global image of the input vectors
+  F2FScalar *vecs_global = getWorkArray(STRUCT_WORK, 3 * nvecs * ns);
+  structGatherBcast(3 * nvecs * ns_local, vecs, 3 * nvecs * ns, vecs_global);
 
-    // Recompute X and Y
-    const F2FScalar *M1 = &global_M1[15 * 15 * i];
-    const int *ipiv = &global_ipiv[15 * i];
-    F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
-                     -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
-                     -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
-                     0.0,           0.0,           0.0,
-                     0.0,           0.0,           0.0};
-    int m = 15, nrhs = 1, info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    F2FScalar XT[] = {x[0], x[3], x[6], x[1], x[4], x[7], x[2], x[5], x[8]};
-    F2FScalar nY[] = {-x[9],  -x[10], -x[11], -x[10], -x[12],
-                      -x[13], -x[11], -x[13], -x[14]};
+  // Zero array of Jacobian-vector products every call
+  memset(prods, 0, 3 * nvecs * na * sizeof(F2FScalar));
 
-    // Assemble X and Y into matrix M2
-    F2FScalar M2[15 * 15];
-    assembleM1(XT, nY, M2);
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
 
-    // Assemble matrix M3 from R and S
-    F2FScalar M3[15 * 15];
-    const F2FScalar *R = &global_R[9 * i];
-    const F2FScalar *S = &global_S[9 * i];
-    assembleM3(R, S, M3);
+  // Loop over all aerodynamic surface nodes
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+  for (int i = 0; i < na; i++) {
+    F2FScalar *prod = &prods[3 * nvecs * i];
+    const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+
+    // Compute XX once for all the vectors
+    F2FScalar XX[9 * 3];
+    computeXX(i, XX);
 
-    // Build right-hand side of first system to be solved
-    F2FScalar y2[15];
-    memset(y2, 0.0, 15 * sizeof(F2FScalar));
+    // Loop over linked structural nodes and add up nonzero contributions to
+    // Jacobian-vector products
     for (int j = 0; j < nn; j++) {
       int indx = global_conn[nn * i + j];
 
-      // Get vector q and subset of input vector
-      F2FScalar q[3];
-      F2FScalar v[3];
+      // Compute vector q from centroid to structural node
+      F2FScalar xs0[3];
+      int reflect = -1;
       if (indx < ns) {
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        vec_diff(xs0bar, xs0, q);
-        memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+        getStructNode(indx, xs0);
       } else {
         indx -= ns;
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-        vec_diff(xs0bar, rxs0, q);
-        memcpy(v, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-        v[isymm] *= -1.0;
+        getStructNode(indx, xs0);
+        xs0[isymm] *= -1.0;
+        reflect = isymm;
       }
+      F2FScalar q[3];
+      vec_diff(xs0bar, xs0, q);
 
-      F2FScalar w = global_W[nn * i + j];
-
-      y2[0] -= w * q[0] * v[0];
-      y2[1] -= w * q[1] * v[0];
-      y2[2] -= w * q[2] * v[0];
-      y2[3] -= w * q[0] * v[1];
-      y2[4] -= w * q[1] * v[1];
-      y2[5] -= w * q[2] * v[1];
-      y2[6] -= w * q[0] * v[2];
-      y2[7] -= w * q[1] * v[2];
-      y2[8] -= w * q[2] * v[2];
+      F2FScalar T[9];
+      computeDispJacobianBlock(XX, getWeight(i, j), q, reflect, T);
+
+      // prod = -T * v for each vector in the block
+      const F2FScalar *v = &vecs_global[3 * nvecs * indx];
+      for (int l = 0; l < 3; l++) {
+        for (int k = 0; k < nvecs; k++) {
+          prod[nvecs * l + k] -= T[3 * l] * v[k] + T[3 * l + 1] * v[nvecs + k] +
+                                 T[3 * l + 2] * v[2 * nvecs + k];
+        }
+      }
     }
+  }
+}
 
-    // Solve the first linear system
-    const char *t = "T";
-    int ipiv3[15];
-    info = 0;
-    LAPACKgetrf(&m, &m, M3, &m, ipiv3, &info);
-    info = 0;
-    LAPACKgetrs(t, &m, &nrhs, M3, &m, ipiv, y2, &m, &info);
+/*
+  Apply the action of the load transfer w.r.t structural displacements
+  transpose Jacobian to a block of input vectors. The matrices for each
+  aerodynamic node are assembled and factored once and the linear systems
+  are solved for all the vectors in the block together.
+
+  Arguments
+  ---------
+  nvecs : number of vectors in the block
+  vecs  : input block of structural vectors
 
-    // Compute right-hand side of second system
-    F2FScalar y1[15];
-    F2FScalar alpha = -1.0, beta = 0.0;
-    int inc = 1;
-    BLASgemv(t, &m, &m, &alpha, M2, &m, y2, &inc, &beta, y1, &inc);
+  Returns
+  --------
+  prods : output block of structural vectors
+*/
+void MELD::applydLduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
 
-    // Solve the second system
-    info = 0;
-    LAPACKgetrs(t, &m, &nrhs, M1, &m, ipiv, y1, &m, &info);
+  F2FScalar *vecs_global = getWorkArray(STRUCT_WORK, 6 * nvecs * ns);
+  structGatherBcast(3 * nvecs * ns_local, vecs, 3 * nvecs * ns, vecs_global);
 
-    // Extract YF
-    F2FScalar YF[] = {y1[0], y1[1], y1[2], y1[3], y1[4],
-                      y1[5], y1[6], y1[7], y1[8]};
+  // Zero products every call
+  F2FScalar *prods_global = &vecs_global[3 * nvecs * ns];
+  memset(prods_global, 0, 3 * nvecs * ns * sizeof(F2FScalar));
 
-    // Loop over linked structural nodes and add contributions from aerodynamic
-    // surface node to global structural loads
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
 
-      if (indx < ns) {
-        // Compute vector q from centroid to structural node
-        const F2FScalar *xs0 = &Xs[3 * indx];
+  // Storage for the contributions and the right-hand sides from a block of
+  // aerodynamic nodes
+  F2FScalar *contrib =
+      getWorkArray(BLOCK_WORK, (3 * nn + 2 * 15) * nvecs * MELD_BLOCK_SIZE);
+  F2FScalar *work = &contrib[3 * nvecs * nn * MELD_BLOCK_SIZE];
+
+  // Loop over all aerodynamic surface nodes
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
+    }
+    memset(contrib, 0, 3 * nvecs * nn * (end - start) * sizeof(F2FScalar));
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      // Compute vector r from centroid to aero node
+      const F2FScalar *xa0 = &Xa[3 * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Get the load on the aerodynamic surface node
+      const F2FScalar *fa = &Fa[3 * i];
+
+      // Recompute X and Y
+      F2FScalar M1_work[15 * 15];
+      int ipiv_work[15];
+      const F2FScalar *M1;
+      const int *ipiv;
+      getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+      F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
+                       -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
+                       -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
+                       0.0,           0.0,           0.0,
+                       0.0,           0.0,           0.0};
+      int m = 15, nrhs = 1, info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar XT[] = {x[0], x[3], x[6], x[1], x[4], x[7], x[2], x[5], x[8]};
+      F2FScalar nY[] = {-x[9],  -x[10], -x[11], -x[10], -x[12],
+                        -x[13], -x[11], -x[13], -x[14]};
+
+      // Assemble X and Y into matrix M2
+      F2FScalar M2[15 * 15];
+      assembleM1(XT, nY, M2);
+
+      // Assemble matrix M3 from R and S
+      F2FScalar M3[15 * 15];
+      const F2FScalar *R = &global_R[9 * i];
+      const F2FScalar *S = &global_S[9 * i];
+      assembleM3(R, S, M3);
+
+      // Build the right-hand sides of the first system to be solved, stored
+      // column-wise for each vector
+      F2FScalar *y2 = &work[2 * 15 * nvecs * (i - start)];
+      F2FScalar *y1 = &y2[15 * nvecs];
+      memset(y2, 0, 15 * nvecs * sizeof(F2FScalar));
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        // Get vector q
+        F2FScalar xs0[3];
+        int reflect = 0;
+        if (indx < ns) {
+          getStructNode(indx, xs0);
+        } else {
+          indx -= ns;
+          getStructNode(indx, xs0);
+          xs0[isymm] *= -1.0;
+          reflect = 1;
+        }
         F2FScalar q[3];
         vec_diff(xs0bar, xs0, q);
 
-        // Compute load contribution of aerodynamic surface node to structural
-        // node
-        F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
-
-        // prod  = w * [ YF[0] YF[3] YF[6] ][ q[0] ]
-        //             [ YF[1] YF[4] YF[7] ][ q[1] ]
-        //             [ YF[2] YF[5] YF[8] ][ q[2] ]
-        prod[0] -= w * (YF[0] * q[0] + YF[3] * q[1] + YF[6] * q[2]);
-        prod[1] -= w * (YF[1] * q[0] + YF[4] * q[1] + YF[7] * q[2]);
-        prod[2] -= w * (YF[2] * q[0] + YF[5] * q[1] + YF[8] * q[2]);
-      } else {
-        indx -= ns;
+        F2FScalar w = getWeight(i, j);
+        const F2FScalar *vnode = &vecs_global[3 * nvecs * indx];
+
+        for (int k = 0; k < nvecs; k++) {
+          // Get the subset of the input vector
+          F2FScalar v[3];
+          v[0] = vnode[k];
+          v[1] = vnode[nvecs + k];
+          v[2] = vnode[2 * nvecs + k];
+          if (reflect) {
+            v[isymm] *= -1.0;
+          }
+
+          F2FScalar *y = &y2[15 * k];
+          y[0] -= w * q[0] * v[0];
+          y[1] -= w * q[1] * v[0];
+          y[2] -= w * q[2] * v[0];
+          y[3] -= w * q[0] * v[1];
+          y[4] -= w * q[1] * v[1];
+          y[5] -= w * q[2] * v[1];
+          y[6] -= w * q[0] * v[2];
+          y[7] -= w * q[1] * v[2];
+          y[8] -= w * q[2] * v[2];
+        }
+      }
 
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
+      // Solve the first linear system for all the vectors
+      const char *t = "T";
+      int ipiv3[15];
+      info = 0;
+      LAPACKgetrf(&m, &m, M3, &m, ipiv3, &info);
+      info = 0;
+      LAPACKgetrs(t, &m, &nvecs, M3, &m, ipiv, y2, &m, &info);
 
-        F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
+      // Compute right-hand sides of second system
+      F2FScalar alpha = -1.0, beta = 0.0;
+      BLASgemm(t, "N", &m, &nvecs, &m, &alpha, M2, &m, y2, &m, &beta, y1, &m);
+
+      // Solve the second system
+      info = 0;
+      LAPACKgetrs(t, &m, &nvecs, M1, &m, ipiv, y1, &m, &info);
 
-        const F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
+      // Loop over linked structural nodes and add contributions from
+      // aerodynamic surface node to global structural loads
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
 
-        F2FScalar rprod[3];
-        rprod[0] = w * (YF[0] * q[0] + YF[3] * q[1] + YF[6] * q[2]);
-        rprod[1] = w * (YF[1] * q[0] + YF[4] * q[1] + YF[7] * q[2]);
-        rprod[2] = w * (YF[2] * q[0] + YF[5] * q[1] + YF[8] * q[2]);
-        rprod[isymm] *= -1.0;
+        // Compute vector q from centroid to structural node
+        F2FScalar xs0[3];
+        int reflect = 0;
+        if (indx < ns) {
+          getStructNode(indx, xs0);
+        } else {
+          getStructNode(indx - ns, xs0);
+          xs0[isymm] *= -1.0;
+          reflect = 1;
+        }
+        F2FScalar q[3];
+        vec_diff(xs0bar, xs0, q);
 
-        prod[0] -= rprod[0];
-        prod[1] -= rprod[1];
-        prod[2] -= rprod[2];
+        const F2FScalar w = getWeight(i, j);
+        F2FScalar *prod = &contrib[3 * nvecs * (nn * (i - start) + j)];
+
+        for (int k = 0; k < nvecs; k++) {
+          // Extract YF for this vector
+          const F2FScalar *YF = &y1[15 * k];
+
+          // rprod = w * [ YF[0] YF[3] YF[6] ][ q[0] ]
+          //             [ YF[1] YF[4] YF[7] ][ q[1] ]
+          //             [ YF[2] YF[5] YF[8] ][ q[2] ]
+          F2FScalar rprod[3];
+          rprod[0] = w * (YF[0] * q[0] + YF[3] * q[1] + YF[6] * q[2]);
+          rprod[1] = w * (YF[1] * q[0] + YF[4] * q[1] + YF[7] * q[2]);
+          rprod[2] = w * (YF[2] * q[0] + YF[5] * q[1] + YF[8] * q[2]);
+          if (reflect) {
+            rprod[isymm] *= -1.0;
+          }
+
+          prod[k] -= rprod[0];
+          prod[nvecs + k] -= rprod[1];
+          prod[2 * nvecs + k] -= rprod[2];
+        }
       }
     }
+
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3 * nvecs, contrib, prods_global);
   }
 
   // distribute the results to the structural processors
-  structAddScatter(3 * ns, prods_global, 3 * ns_local, prods);
-
-  // clean up allocated memory
-  delete[] vecs_global;
-  delete[] prods_global;
+  structAddScatter(3 * nvecs * ns, prods_global, 3 * nvecs * ns_local, prods);
 }
 
 /*
@@ -1139,6 +2225,9 @@ void MELD::assembleM3(const F2FScalar *R, const F2FScalar *S, F2FScalar *M3) {
   prods : output vector
 */
 void MELD::applydDdxA0(const F2FScalar *vecs, F2FScalar *prods) {
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
   for (int i = 0; i < na; i++) {
     // Get vector of adjoint variables and rotation matrix for each aerodynamic
     // node
@@ -1166,133 +2255,163 @@ void MELD::applydDdxA0(const F2FScalar *vecs, F2FScalar *prods) {
   prods : output vector
 */
 void MELD::applydDdxS0(const F2FScalar *vecs, F2FScalar *prods) {
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
+
   // Set products to zero
-  F2FScalar *prods_global = new F2FScalar[3 * ns];
+  F2FScalar *prods_global =
+      getWorkArray(STRUCT_WORK, isymm >= 0 ? 9 * ns : 6 * ns);
   memset(prods_global, 0.0, 3 * ns * sizeof(F2FScalar));
 
-  // Add structural displacments to structural node locations
-  F2FScalar *Xsd = new F2FScalar[3 * ns];
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
+
+  // Storage for the contributions from a block of aerodynamic nodes
+  F2FScalar *contrib = getWorkArray(BLOCK_WORK, 3 * nn * MELD_BLOCK_SIZE);
+
+  // Add structural displacments to structural node locations and append the
+  // reflected nodes
+  F2FScalar *Xsd = &prods_global[3 * ns];
   for (int j = 0; j < 3 * ns; j++) {
     Xsd[j] = Xs[j] + Us[j];
   }
+  reflectStructNodes(Xsd);
 
-  for (int i = 0; i < na; i++) {
-    const F2FScalar *lam = &vecs[3 * i];
-
-    // Compute vector r from centroid to aero node
-    const F2FScalar *xa0 = &Xa[3 * i];
-    const F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    F2FScalar r[3];
-    vec_diff(xs0bar, xa0, r);
-
-    // Compute displaced centroid xsbar
-    F2FScalar xsbar[3];
-    computeCentroid(&global_conn[i * nn], &global_W[i * nn], Xsd, xsbar);
-
-    // Compute X
-    const F2FScalar *R = &global_R[9 * i];
-    const F2FScalar *S = &global_S[9 * i];
-    F2FScalar M1[15 * 15];
-    assembleM1(R, S, M1);
-    int ipiv[15];
-    int m = 15, info = 0;
-    LAPACKgetrf(&m, &m, M1, &m, ipiv, &info);
-    F2FScalar x[] = {-lam[0] * r[0],
-                     -lam[1] * r[0],
-                     -lam[2] * r[0],
-                     -lam[0] * r[1],
-                     -lam[1] * r[1],
-                     -lam[2] * r[1],
-                     -lam[0] * r[2],
-                     -lam[1] * r[2],
-                     -lam[2] * r[2],
-                     0.0,
-                     0.0,
-                     0.0,
-                     0.0,
-                     0.0,
-                     0.0};
-    int nrhs = 1;
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    F2FScalar X[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
-
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
-
-      if (indx < ns) {
-        // Compute vector q from centroid to structural node
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar q[3];
-        vec_diff(xs0bar, xs0, q);
-
-        // Compute vector p from displaced centroid to displaced structural node
-        F2FScalar *xs = &Xsd[3 * indx];
-        F2FScalar p[3];
-        vec_diff(xsbar, xs, p);
-
-        // Compute the contribution to the products
-        F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
-
-        // prod = -w*q^{T}*X - w*p^{T}*X^{T} + w*lam^{T}*(R - I)
-
-        prod[0] += -w * (q[0] * X[0] + q[1] * X[1] + q[2] * X[2]) -
-                   w * (X[0] * p[0] + X[3] * p[1] + X[6] * p[2]) +
-                   w * (lam[0] * (R[0] - 1.0) + lam[1] * R[1] + lam[2] * R[2]);
-        prod[1] += -w * (q[0] * X[3] + q[1] * X[4] + q[2] * X[5]) -
-                   w * (X[1] * p[0] + X[4] * p[1] + X[7] * p[2]) +
-                   w * (lam[0] * R[3] + lam[1] * (R[4] - 1.0) + lam[2] * R[5]);
-        prod[2] += -w * (q[0] * X[6] + q[1] * X[7] + q[2] * X[8]) -
-                   w * (X[2] * p[0] + X[5] * p[1] + X[8] * p[2]) +
-                   w * (lam[0] * R[6] + lam[1] * R[7] + lam[2] * (R[8] - 1.0));
-      } else {
-        indx -= ns;
-
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-
-        F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
-
-        F2FScalar *xs = &Xsd[3 * indx];
-        F2FScalar rxs[3];
-        memcpy(rxs, xs, 3 * sizeof(F2FScalar));
-        rxs[isymm] *= -1.0;
-
-        F2FScalar p[3];
-        vec_diff(xsbar, rxs, p);
-
-        F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
-
-        F2FScalar rprod[3];
-        rprod[0] = -w * (q[0] * X[0] + q[1] * X[1] + q[2] * X[2]) -
-                   w * (X[0] * p[0] + X[3] * p[1] + X[6] * p[2]) +
-                   w * (lam[0] * (R[0] - 1.0) + lam[1] * R[1] + lam[2] * R[2]);
-        rprod[1] = -w * (q[0] * X[3] + q[1] * X[4] + q[2] * X[5]) -
-                   w * (X[1] * p[0] + X[4] * p[1] + X[7] * p[2]) +
-                   w * (lam[0] * R[3] + lam[1] * (R[4] - 1.0) + lam[2] * R[5]);
-        rprod[2] = -w * (q[0] * X[6] + q[1] * X[7] + q[2] * X[8]) -
-                   w * (X[2] * p[0] + X[5] * p[1] + X[8] * p[2]) +
-                   w * (lam[0] * R[6] + lam[1] * R[7] + lam[2] * (R[8] - 1.0));
-        rprod[isymm] *= -1.0;
-
-        prod[0] += rprod[0];
-        prod[1] += rprod[1];
-        prod[2] += rprod[2];
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
+    }
+    memset(contrib, 0, 3 * nn * (end - start) * sizeof(F2FScalar));
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      const F2FScalar *lam = &vecs[3 * i];
+
+      // Compute vector r from centroid to aero node
+      const F2FScalar *xa0 = &Xa[3 * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Compute displaced centroid xsbar
+      F2FScalar xsbar[3];
+      computeCentroid(&global_conn[i * nn], &global_W[i * nn], Xsd, xsbar);
+
+      // Compute X
+      const F2FScalar *R = &global_R[9 * i];
+      F2FScalar M1_work[15 * 15];
+      int ipiv_work[15];
+      const F2FScalar *M1;
+      const int *ipiv;
+      getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+      int m = 15, info = 0;
+      F2FScalar x[] = {-lam[0] * r[0],
+                       -lam[1] * r[0],
+                       -lam[2] * r[0],
+                       -lam[0] * r[1],
+                       -lam[1] * r[1],
+                       -lam[2] * r[1],
+                       -lam[0] * r[2],
+                       -lam[1] * r[2],
+                       -lam[2] * r[2],
+                       0.0,
+                       0.0,
+                       0.0,
+                       0.0,
+                       0.0,
+                       0.0};
+      int nrhs = 1;
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar X[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
+
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        if (indx < ns) {
+          // Compute vector q from centroid to structural node
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          F2FScalar q[3];
+          vec_diff(xs0bar, xs0, q);
+
+          // Compute vector p from displaced centroid to displaced structural
+          // node
+          F2FScalar *xs = &Xsd[3 * indx];
+          F2FScalar p[3];
+          vec_diff(xsbar, xs, p);
+
+          // Compute the contribution to the products
+          F2FScalar w = global_W[nn * i + j];
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+
+          // prod = -w*q^{T}*X - w*p^{T}*X^{T} + w*lam^{T}*(R - I)
+
+          prod[0] +=
+              -w * (q[0] * X[0] + q[1] * X[1] + q[2] * X[2]) -
+              w * (X[0] * p[0] + X[3] * p[1] + X[6] * p[2]) +
+              w * (lam[0] * (R[0] - 1.0) + lam[1] * R[1] + lam[2] * R[2]);
+          prod[1] +=
+              -w * (q[0] * X[3] + q[1] * X[4] + q[2] * X[5]) -
+              w * (X[1] * p[0] + X[4] * p[1] + X[7] * p[2]) +
+              w * (lam[0] * R[3] + lam[1] * (R[4] - 1.0) + lam[2] * R[5]);
+          prod[2] +=
+              -w * (q[0] * X[6] + q[1] * X[7] + q[2] * X[8]) -
+              w * (X[2] * p[0] + X[5] * p[1] + X[8] * p[2]) +
+              w * (lam[0] * R[6] + lam[1] * R[7] + lam[2] * (R[8] - 1.0));
+        } else {
+          indx -= ns;
+
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+
+          F2FScalar q[3];
+          vec_diff(xs0bar, rxs0, q);
+
+          F2FScalar *xs = &Xsd[3 * indx];
+          F2FScalar rxs[3];
+          memcpy(rxs, xs, 3 * sizeof(F2FScalar));
+          rxs[isymm] *= -1.0;
+
+          F2FScalar p[3];
+          vec_diff(xsbar, rxs, p);
+
+          F2FScalar w = global_W[nn * i + j];
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+
+          F2FScalar rprod[3];
+          rprod[0] =
+              -w * (q[0] * X[0] + q[1] * X[1] + q[2] * X[2]) -
+              w * (X[0] * p[0] + X[3] * p[1] + X[6] * p[2]) +
+              w * (lam[0] * (R[0] - 1.0) + lam[1] * R[1] + lam[2] * R[2]);
+          rprod[1] =
+              -w * (q[0] * X[3] + q[1] * X[4] + q[2] * X[5]) -
+              w * (X[1] * p[0] + X[4] * p[1] + X[7] * p[2]) +
+              w * (lam[0] * R[3] + lam[1] * (R[4] - 1.0) + lam[2] * R[5]);
+          rprod[2] =
+              -w * (q[0] * X[6] + q[1] * X[7] + q[2] * X[8]) -
+              w * (X[2] * p[0] + X[5] * p[1] + X[8] * p[2]) +
+              w * (lam[0] * R[6] + lam[1] * R[7] + lam[2] * (R[8] - 1.0));
+          rprod[isymm] *= -1.0;
+
+          prod[0] += rprod[0];
+          prod[1] += rprod[1];
+          prod[2] += rprod[2];
+        }
       }
     }
+
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3, contrib, prods_global);
   }
 
   // distribute the results to the structural processors
   structAddScatter(3 * ns, prods_global, 3 * ns_local, prods);
-
-  // clean up allocated memory
-  delete[] Xsd;
-  delete[] prods_global;
 }
 
 /*
@@ -1308,20 +2427,33 @@ void MELD::applydDdxS0(const F2FScalar *vecs, F2FScalar *prods) {
   prods : output vector
 */
 void MELD::applydLdxA0(const F2FScalar *vecs, F2FScalar *prods) {
-  F2FScalar *vecs_global = new F2FScalar[3 * ns];
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
+
+  F2FScalar *vecs_global = getWorkArray(STRUCT_WORK, 3 * ns);
   structGatherBcast(3 * ns_local, vecs, 3 * ns, vecs_global);
 
   // Zero products
   memset(prods, 0, 3 * na * sizeof(F2FScalar));
 
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
   for (int i = 0; i < na; i++) {
     const F2FScalar *fa = &Fa[3 * i];
     const F2FScalar *xs0bar = &global_xs0bar[3 * i];
     F2FScalar *prod = &prods[3 * i];
 
     // Compute X1, X2, X3
-    const F2FScalar *M1 = &global_M1[15 * 15 * i];
-    const int *ipiv = &global_ipiv[15 * i];
+    F2FScalar M1_work[15 * 15];
+    int ipiv_work[15];
+    const F2FScalar *M1;
+    const int *ipiv;
+    getM1(i, &M1, &ipiv, M1_work, ipiv_work);
     int m = 15, nrhs = 1, info = 0;
     F2FScalar x[15];
 
@@ -1386,9 +2518,6 @@ void MELD::applydLdxA0(const F2FScalar *vecs, F2FScalar *prods) {
                  w * q[2] * (X3[2] * lam[0] + X3[5] * lam[1] + X3[8] * lam[2]);
     }
   }
-
-  // Clean up the allocated memory
-  delete[] vecs_global;
 }
 
 /*
@@ -1404,279 +2533,306 @@ void MELD::applydLdxA0(const F2FScalar *vecs, F2FScalar *prods) {
   prods : output vector
 */
 void MELD::applydLdxS0(const F2FScalar *vecs, F2FScalar *prods) {
-  F2FScalar *vecs_global = new F2FScalar[3 * ns];
+  // Complete any exchange that is still in progress before the scratch
+  // arrays are reused
+  structExchangeEnd();
+
+  int nr = (isymm >= 0 ? 2 * ns : ns);
+  F2FScalar *vecs_global = getWorkArray(STRUCT_WORK, 6 * nr + 3 * ns);
   structGatherBcast(3 * ns_local, vecs, 3 * ns, vecs_global);
+  reflectStructNodes(vecs_global);
 
   // Zero products
-  F2FScalar *prods_global = new F2FScalar[3 * ns];
+  F2FScalar *prods_global = &vecs_global[3 * nr];
   memset(prods_global, 0, 3 * ns * sizeof(F2FScalar));
 
-  // Add structural displacments to structural node locations
-  F2FScalar *Xsd = new F2FScalar[3 * ns];
+  // Factor M1 if the rotations have changed since the last call
+  factorM1();
+
+  // Storage for the contributions from a block of aerodynamic nodes
+  F2FScalar *contrib = getWorkArray(BLOCK_WORK, 3 * nn * MELD_BLOCK_SIZE);
+
+  // Add structural displacments to structural node locations and append the
+  // reflected nodes
+  F2FScalar *Xsd = &prods_global[3 * ns];
   for (int j = 0; j < 3 * ns; j++) {
     Xsd[j] = Xs[j] + Us[j];
   }
+  reflectStructNodes(Xsd);
 
   // Loop over aerodynamic surface nodes
-  for (int i = 0; i < na; i++) {
-    // Compute vector r from centroid to aero node
-    const F2FScalar *xa0 = &Xa[3 * i];
-    const F2FScalar *xs0bar = &global_xs0bar[3 * i];
-    F2FScalar r[3];
-    vec_diff(xs0bar, xa0, r);
-
-    // Compute displaced centroid xsbar
-    F2FScalar xsbar[3];
-    computeCentroid(&global_conn[i * nn], &global_W[i * nn], Xsd, xsbar);
-
-    // Get the load on the aerodynamic surface node
-    const F2FScalar *fa = &Fa[3 * i];
-
-    // Recompute X and Y
-    const F2FScalar *M1 = &global_M1[15 * 15 * i];
-    const int *ipiv = &global_ipiv[15 * i];
-    F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
-                     -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
-                     -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
-                     0.0,           0.0,           0.0,
-                     0.0,           0.0,           0.0};
-    int m = 15, nrhs = 1, info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    F2FScalar XT[] = {x[0], x[3], x[6], x[1], x[4], x[7], x[2], x[5], x[8]};
-    F2FScalar nY[] = {-x[9],  -x[10], -x[11], -x[10], -x[12],
-                      -x[13], -x[11], -x[13], -x[14]};
-
-    // Assemble X and Y into matrix M2
-    F2FScalar M2[15 * 15];
-    assembleM1(XT, nY, M2);
-
-    // Assemble matrix M3 from R and S
-    F2FScalar M3[15 * 15];
-    const F2FScalar *R = &global_R[9 * i];
-    const F2FScalar *S = &global_S[9 * i];
-    assembleM3(R, S, M3);
-
-    // Build right-hand side of first system to be solved
-    F2FScalar z2[15];
-    memset(z2, 0.0, 15 * sizeof(F2FScalar));
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
-
-      // Get vector q, and subset of input vector
-      F2FScalar q[3];
-      F2FScalar lam[3];
-      if (indx < ns) {
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        vec_diff(xs0bar, xs0, q);
-        memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-      } else {
-        indx -= ns;
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-        vec_diff(xs0bar, rxs0, q);
-        memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-        lam[isymm] *= -1.0;
-      }
-
-      F2FScalar w = global_W[nn * i + j];
-
-      z2[0] -= w * q[0] * lam[0];
-      z2[1] -= w * q[1] * lam[0];
-      z2[2] -= w * q[2] * lam[0];
-      z2[3] -= w * q[0] * lam[1];
-      z2[4] -= w * q[1] * lam[1];
-      z2[5] -= w * q[2] * lam[1];
-      z2[6] -= w * q[0] * lam[2];
-      z2[7] -= w * q[1] * lam[2];
-      z2[8] -= w * q[2] * lam[2];
-    }
-
-    // Solve the first linear system
-    int ipiv3[15];
-    info = 0;
-    LAPACKgetrf(&m, &m, M3, &m, ipiv3, &info);
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M3, &m, ipiv3, z2, &m, &info);
-
-    // Compute right-hand side of second system
-    F2FScalar z1[15];
-    F2FScalar alpha = -1.0, beta = 0.0;
-    int inc = 1;
-    BLASgemv("N", &m, &m, &alpha, M2, &m, z2, &inc, &beta, z1, &inc);
-
-    // Solve the second system
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, z1, &m, &info);
-
-    // Extract ZH
-    F2FScalar ZH[9] = {z1[0], z1[1], z1[2], z1[3], z1[4],
-                       z1[5], z1[6], z1[7], z1[8]};
-
-    // Compute centroid of adjoint variables
-    F2FScalar lambar[3];
-    computeCentroid(&global_conn[i * nn], &global_W[i * nn], vecs_global,
-                    lambar);
-
-    // Compute X1, X2, X3
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
-    x[0] -= fa[0];
-    x[1] -= fa[1];
-    x[2] -= fa[2];
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    F2FScalar X1[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
-
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
-    x[3] -= fa[0];
-    x[4] -= fa[1];
-    x[5] -= fa[2];
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    F2FScalar X2[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
-
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
-    x[6] -= fa[0];
-    x[7] -= fa[1];
-    x[8] -= fa[2];
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    F2FScalar X3[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
-
-    // Compute vector for third term
-    F2FScalar qXlam[] = {0.0, 0.0, 0.0};
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
-
-      // Get vector q and subset of input vector
-      F2FScalar q[3];
-      F2FScalar lam[3];
-      if (indx < ns) {
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        vec_diff(xs0bar, xs0, q);
-        memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-      } else {
-        indx -= ns;
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-        vec_diff(xs0bar, rxs0, q);
-        memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-        lam[isymm] *= -1.0;
-      }
-
-      F2FScalar w = global_W[nn * i + j];
-      for (int m = 0; m < 3; m++) {
-        for (int n = 0; n < 3; n++) {
-          qXlam[0] += w * q[m] * X1[m + 3 * n] * lam[n];
-          qXlam[1] += w * q[m] * X2[m + 3 * n] * lam[n];
-          qXlam[2] += w * q[m] * X3[m + 3 * n] * lam[n];
-        }
-      }
+  for (int start = 0; start < na; start += MELD_BLOCK_SIZE) {
+    int end = start + MELD_BLOCK_SIZE;
+    if (end > na) {
+      end = na;
     }
-
-    // Loop over linked structural nodes and add contributions from aerodynamic
-    // surface node to global structural loads
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
-
-      if (indx < ns) {
-        // Compute vector q from centroid to structural node
-        const F2FScalar *xs0 = &Xs[3 * indx];
+    memset(contrib, 0, 3 * nn * (end - start) * sizeof(F2FScalar));
+
+#ifdef _OPENMP
+#pragma omp parallel for schedule(static) num_threads(num_threads)
+#endif
+    for (int i = start; i < end; i++) {
+      // Compute vector r from centroid to aero node
+      const F2FScalar *xa0 = &Xa[3 * i];
+      const F2FScalar *xs0bar = &global_xs0bar[3 * i];
+      F2FScalar r[3];
+      vec_diff(xs0bar, xa0, r);
+
+      // Compute displaced centroid xsbar
+      F2FScalar xsbar[3];
+      computeCentroid(&global_conn[i * nn], &global_W[i * nn], Xsd, xsbar);
+
+      // Get the load on the aerodynamic surface node
+      const F2FScalar *fa = &Fa[3 * i];
+
+      // Recompute X and Y
+      F2FScalar M1_work[15 * 15];
+      int ipiv_work[15];
+      const F2FScalar *M1;
+      const int *ipiv;
+      getM1(i, &M1, &ipiv, M1_work, ipiv_work);
+      F2FScalar x[] = {-fa[0] * r[0], -fa[1] * r[0], -fa[2] * r[0],
+                       -fa[0] * r[1], -fa[1] * r[1], -fa[2] * r[1],
+                       -fa[0] * r[2], -fa[1] * r[2], -fa[2] * r[2],
+                       0.0,           0.0,           0.0,
+                       0.0,           0.0,           0.0};
+      int m = 15, nrhs = 1, info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar XT[] = {x[0], x[3], x[6], x[1], x[4], x[7], x[2], x[5], x[8]};
+      F2FScalar nY[] = {-x[9],  -x[10], -x[11], -x[10], -x[12],
+                        -x[13], -x[11], -x[13], -x[14]};
+
+      // Assemble X and Y into matrix M2
+      F2FScalar M2[15 * 15];
+      assembleM1(XT, nY, M2);
+
+      // Assemble matrix M3 from R and S
+      F2FScalar M3[15 * 15];
+      const F2FScalar *R = &global_R[9 * i];
+      const F2FScalar *S = &global_S[9 * i];
+      assembleM3(R, S, M3);
+
+      // Build right-hand side of first system to be solved
+      F2FScalar z2[15];
+      memset(z2, 0.0, 15 * sizeof(F2FScalar));
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        // Get vector q, and subset of input vector
         F2FScalar q[3];
-        vec_diff(xs0bar, xs0, q);
-
-        // Compute vector p from displaced centroid to displaced structural node
-        F2FScalar *xs = &Xsd[3 * indx];
-        F2FScalar p[3];
-        vec_diff(xsbar, xs, p);
-
-        // Compute vector lamp from centroid of adjoint variables to the
-        // components of the adjoint variable corresponding to this node
-        const F2FScalar *lam = &vecs_global[3 * indx];
-        F2FScalar lamp[3];
-        vec_diff(lambar, lam, lamp);
+        F2FScalar lam[3];
+        if (indx < ns) {
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          vec_diff(xs0bar, xs0, q);
+          memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+        } else {
+          indx -= ns;
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+          vec_diff(xs0bar, rxs0, q);
+          memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+          lam[isymm] *= -1.0;
+        }
 
-        // Take contribution of first term
         F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
-        prod[0] -= w * (q[0] * ZH[0] + q[1] * ZH[1] + q[2] * ZH[2]) +
-                   w * (ZH[0] * p[0] + ZH[3] * p[1] + ZH[6] * p[2]);
-        prod[1] -= w * (q[0] * ZH[3] + q[1] * ZH[4] + q[2] * ZH[5]) +
-                   w * (ZH[1] * p[0] + ZH[4] * p[1] + ZH[7] * p[2]);
-        prod[2] -= w * (q[0] * ZH[6] + q[1] * ZH[7] + q[2] * ZH[8]) +
-                   w * (ZH[2] * p[0] + ZH[5] * p[1] + ZH[8] * p[2]);
-
-        // Take contribution of second term
-        prod[0] -= w * (lamp[0] * XT[0] + lamp[1] * XT[1] + lamp[2] * XT[2]);
-        prod[1] -= w * (lamp[0] * XT[3] + lamp[1] * XT[4] + lamp[2] * XT[5]);
-        prod[2] -= w * (lamp[0] * XT[6] + lamp[1] * XT[7] + lamp[2] * XT[8]);
-
-        // Take contribution of third term
-        prod[0] += w * qXlam[0];
-        prod[1] += w * qXlam[1];
-        prod[2] += w * qXlam[2];
-      } else {
-        indx -= ns;
 
-        const F2FScalar *xs0 = &Xs[3 * indx];
-        F2FScalar rxs0[3];
-        memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
+        z2[0] -= w * q[0] * lam[0];
+        z2[1] -= w * q[1] * lam[0];
+        z2[2] -= w * q[2] * lam[0];
+        z2[3] -= w * q[0] * lam[1];
+        z2[4] -= w * q[1] * lam[1];
+        z2[5] -= w * q[2] * lam[1];
+        z2[6] -= w * q[0] * lam[2];
+        z2[7] -= w * q[1] * lam[2];
+        z2[8] -= w * q[2] * lam[2];
+      }
 
+      // Solve the first linear system
+      int ipiv3[15];
+      info = 0;
+      LAPACKgetrf(&m, &m, M3, &m, ipiv3, &info);
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M3, &m, ipiv3, z2, &m, &info);
+
+      // Compute right-hand side of second system
+      F2FScalar z1[15];
+      F2FScalar alpha = -1.0, beta = 0.0;
+      int inc = 1;
+      BLASgemv("N", &m, &m, &alpha, M2, &m, z2, &inc, &beta, z1, &inc);
+
+      // Solve the second system
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, z1, &m, &info);
+
+      // Extract ZH
+      F2FScalar ZH[9] = {z1[0], z1[1], z1[2], z1[3], z1[4],
+                         z1[5], z1[6], z1[7], z1[8]};
+
+      // Compute centroid of adjoint variables
+      F2FScalar lambar[3];
+      computeCentroid(&global_conn[i * nn], &global_W[i * nn], vecs_global,
+                      lambar);
+
+      // Compute X1, X2, X3
+      memset(x, 0.0, 15 * sizeof(F2FScalar));
+      x[0] -= fa[0];
+      x[1] -= fa[1];
+      x[2] -= fa[2];
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar X1[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
+
+      memset(x, 0.0, 15 * sizeof(F2FScalar));
+      x[3] -= fa[0];
+      x[4] -= fa[1];
+      x[5] -= fa[2];
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar X2[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
+
+      memset(x, 0.0, 15 * sizeof(F2FScalar));
+      x[6] -= fa[0];
+      x[7] -= fa[1];
+      x[8] -= fa[2];
+      info = 0;
+      LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
+      F2FScalar X3[] = {x[0], x[1], x[2], x[3], x[4], x[5], x[6], x[7], x[8]};
+
+      // Compute vector for third term
+      F2FScalar qXlam[] = {0.0, 0.0, 0.0};
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        // Get vector q and subset of input vector
         F2FScalar q[3];
-        vec_diff(xs0bar, rxs0, q);
-
-        F2FScalar *xs = &Xsd[3 * indx];
-        F2FScalar rxs[3];
-        memcpy(rxs, xs, 3 * sizeof(F2FScalar));
-        rxs[isymm] *= -1.0;
-
-        F2FScalar p[3];
-        vec_diff(xsbar, rxs, p);
-
         F2FScalar lam[3];
-        memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
-        lam[isymm] *= -1.0;
-        F2FScalar lamp[3];
-        vec_diff(lambar, lam, lamp);
+        if (indx < ns) {
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          vec_diff(xs0bar, xs0, q);
+          memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+        } else {
+          indx -= ns;
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+          vec_diff(xs0bar, rxs0, q);
+          memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+          lam[isymm] *= -1.0;
+        }
 
         F2FScalar w = global_W[nn * i + j];
-        F2FScalar *prod = &prods_global[3 * indx];
-
-        F2FScalar rprod[3];
-
-        rprod[0] = w * (q[0] * ZH[0] + q[1] * ZH[1] + q[2] * ZH[2]) +
-                   w * (ZH[0] * p[0] + ZH[3] * p[1] + ZH[6] * p[2]);
-        rprod[1] = w * (q[0] * ZH[3] + q[1] * ZH[4] + q[2] * ZH[5]) +
-                   w * (ZH[1] * p[0] + ZH[4] * p[1] + ZH[7] * p[2]);
-        rprod[2] = w * (q[0] * ZH[6] + q[1] * ZH[7] + q[2] * ZH[8]) +
-                   w * (ZH[2] * p[0] + ZH[5] * p[1] + ZH[8] * p[2]);
-
-        rprod[0] += w * (lamp[0] * XT[0] + lamp[1] * XT[1] + lamp[2] * XT[2]);
-        rprod[1] += w * (lamp[0] * XT[3] + lamp[1] * XT[4] + lamp[2] * XT[5]);
-        rprod[2] += w * (lamp[0] * XT[6] + lamp[1] * XT[7] + lamp[2] * XT[8]);
-
-        rprod[0] -= w * qXlam[0];
-        rprod[1] -= w * qXlam[1];
-        rprod[2] -= w * qXlam[2];
-
-        rprod[isymm] *= -1.0;
+        for (int m = 0; m < 3; m++) {
+          for (int n = 0; n < 3; n++) {
+            qXlam[0] += w * q[m] * X1[m + 3 * n] * lam[n];
+            qXlam[1] += w * q[m] * X2[m + 3 * n] * lam[n];
+            qXlam[2] += w * q[m] * X3[m + 3 * n] * lam[n];
+          }
+        }
+      }
 
-        prod[0] -= rprod[0];
-        prod[1] -= rprod[1];
-        prod[2] -= rprod[2];
+      // Loop over linked structural nodes and add contributions from
+      // aerodynamic surface node to global structural loads
+      for (int j = 0; j < nn; j++) {
+        int indx = global_conn[nn * i + j];
+
+        if (indx < ns) {
+          // Compute vector q from centroid to structural node
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          F2FScalar q[3];
+          vec_diff(xs0bar, xs0, q);
+
+          // Compute vector p from displaced centroid to displaced structural
+          // node
+          F2FScalar *xs = &Xsd[3 * indx];
+          F2FScalar p[3];
+          vec_diff(xsbar, xs, p);
+
+          // Compute vector lamp from centroid of adjoint variables to the
+          // components of the adjoint variable corresponding to this node
+          const F2FScalar *lam = &vecs_global[3 * indx];
+          F2FScalar lamp[3];
+          vec_diff(lambar, lam, lamp);
+
+          // Take contribution of first term
+          F2FScalar w = global_W[nn * i + j];
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+          prod[0] -= w * (q[0] * ZH[0] + q[1] * ZH[1] + q[2] * ZH[2]) +
+                     w * (ZH[0] * p[0] + ZH[3] * p[1] + ZH[6] * p[2]);
+          prod[1] -= w * (q[0] * ZH[3] + q[1] * ZH[4] + q[2] * ZH[5]) +
+                     w * (ZH[1] * p[0] + ZH[4] * p[1] + ZH[7] * p[2]);
+          prod[2] -= w * (q[0] * ZH[6] + q[1] * ZH[7] + q[2] * ZH[8]) +
+                     w * (ZH[2] * p[0] + ZH[5] * p[1] + ZH[8] * p[2]);
+
+          // Take contribution of second term
+          prod[0] -= w * (lamp[0] * XT[0] + lamp[1] * XT[1] + lamp[2] * XT[2]);
+          prod[1] -= w * (lamp[0] * XT[3] + lamp[1] * XT[4] + lamp[2] * XT[5]);
+          prod[2] -= w * (lamp[0] * XT[6] + lamp[1] * XT[7] + lamp[2] * XT[8]);
+
+          // Take contribution of third term
+          prod[0] += w * qXlam[0];
+          prod[1] += w * qXlam[1];
+          prod[2] += w * qXlam[2];
+        } else {
+          indx -= ns;
+
+          const F2FScalar *xs0 = &Xs[3 * indx];
+          F2FScalar rxs0[3];
+          memcpy(rxs0, xs0, 3 * sizeof(F2FScalar));
+          rxs0[isymm] *= -1.0;
+
+          F2FScalar q[3];
+          vec_diff(xs0bar, rxs0, q);
+
+          F2FScalar *xs = &Xsd[3 * indx];
+          F2FScalar rxs[3];
+          memcpy(rxs, xs, 3 * sizeof(F2FScalar));
+          rxs[isymm] *= -1.0;
+
+          F2FScalar p[3];
+          vec_diff(xsbar, rxs, p);
+
+          F2FScalar lam[3];
+          memcpy(lam, &vecs_global[3 * indx], 3 * sizeof(F2FScalar));
+          lam[isymm] *= -1.0;
+          F2FScalar lamp[3];
+          vec_diff(lambar, lam, lamp);
+
+          F2FScalar w = global_W[nn * i + j];
+          F2FScalar *prod = &contrib[3 * (nn * (i - start) + j)];
+
+          F2FScalar rprod[3];
+
+          rprod[0] = w * (q[0] * ZH[0] + q[1] * ZH[1] + q[2] * ZH[2]) +
+                     w * (ZH[0] * p[0] + ZH[3] * p[1] + ZH[6] * p[2]);
+          rprod[1] = w * (q[0] * ZH[3] + q[1] * ZH[4] + q[2] * ZH[5]) +
+                     w * (ZH[1] * p[0] + ZH[4] * p[1] + ZH[7] * p[2]);
+          rprod[2] = w * (q[0] * ZH[6] + q[1] * ZH[7] + q[2] * ZH[8]) +
+                     w * (ZH[2] * p[0] + ZH[5] * p[1] + ZH[8] * p[2]);
+
+          rprod[0] += w * (lamp[0] * XT[0] + lamp[1] * XT[1] + lamp[2] * XT[2]);
+          rprod[1] += w * (lamp[0] * XT[3] + lamp[1] * XT[4] + lamp[2] * XT[5]);
+          rprod[2] += w * (lamp[0] * XT[6] + lamp[1] * XT[7] + lamp[2] * XT[8]);
+
+          rprod[0] -= w * qXlam[0];
+          rprod[1] -= w * qXlam[1];
+          rprod[2] -= w * qXlam[2];
+
+          rprod[isymm] *= -1.0;
+
+          prod[0] -= rprod[0];
+          prod[1] -= rprod[1];
+          prod[2] -= rprod[2];
+        }
       }
     }
+
+    // Add the contributions in a fixed order
+    addStructContributions(start, end, 3, contrib, prods_global);
   }
 
   // distribute the results to the structural processors
   structAddScatter(3 * ns, prods_global, 3 * ns_local, prods);
-
-  // Free allocated memory
-  delete[] Xsd;
-  delete[] vecs_global;
-  delete[] prods_global;
 }
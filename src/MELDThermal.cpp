@@ -40,6 +40,9 @@ MELDThermal::MELDThermal(MPI_Comm global_comm, MPI_Comm struct_comm,
       global_beta(beta) {
   global_conn = NULL;
   global_W = NULL;
+  mat_rowp = NULL;
+  mat_cols = NULL;
+  mat_vals = NULL;
 
   // Space to be allocated for the structural temperatures and aero
   // normal component of the heat flux
@@ -66,6 +69,13 @@ MELDThermal::~MELDThermal() {
     delete[] global_W;
   }
 
+  // Free the transfer matrix
+  if (mat_rowp) {
+    delete[] mat_rowp;
+    delete[] mat_cols;
+    delete[] mat_vals;
+  }
+
   int rank;
   MPI_Comm_rank(global_comm, &rank);
   if (rank == struct_root) {
@@ -78,14 +88,15 @@ MELDThermal::~MELDThermal() {
   for transfers and products
 */
 void MELDThermal::initialize() {
+  // Gather the full structural mesh again if it was previously localized
+  if (plan_send_counts) {
+    freeStructPlan();
+    mesh_update = 1;
+  }
+
   // global number of structural nodes
   distributeStructuralMesh();
 
-  if (Ts) {
-    delete[] Ts;
-  }
-  Ts = new F2FScalar[ns];
-
   if (Ha) {
     delete[] Ha;
   }
@@ -96,6 +107,14 @@ void MELDThermal::initialize() {
     nn = ns;
   }
 
+  // Free any data from a previous initialization
+  if (global_conn) {
+    delete[] global_conn;
+  }
+  if (global_W) {
+    delete[] global_W;
+  }
+
   // Create aerostructural connectivity
   global_conn = new int[nn * na];
   computeAeroStructConn(isymm, nn, global_conn);
@@ -103,6 +122,227 @@ void MELDThermal::initialize() {
   // Allocate and compute the weights
   global_W = new F2FScalar[nn * na];
   computeWeights(F2FRealPart(global_beta), isymm, nn, global_conn, global_W);
+
+  // Keep only the structural nodes connected to the local aerodynamic nodes
+  if (struct_distributed) {
+    localizeStructuralMesh(nn, global_conn);
+  }
+
+  if (Ts) {
+    delete[] Ts;
+  }
+  Ts = new F2FScalar[ns];
+
+  // Assemble the transfer matrix from the connectivity and the weights
+  if (mat_rowp) {
+    delete[] mat_rowp;
+    delete[] mat_cols;
+    delete[] mat_vals;
+  }
+  mat_rowp = new int[na + 1];
+  mat_cols = new int[nn * na];
+  mat_vals = new F2FScalar[nn * na];
+  assembleTransferMatrix();
+}
+
+/*
+  Assemble the values of the sparse matrix that maps the structural
+  temperatures to the aerodynamic temperatures. The weights of a structural
+  node that is linked to an aerodynamic node together with its reflection are
+  added into a single entry.
+*/
+void MELDThermal::assembleTransferMatrix() {
+  int *entry = new int[nn * na];
+  computeTransferPattern(nn, global_conn, mat_rowp, mat_cols, entry);
+
+  memset(mat_vals, 0, mat_rowp[na] * sizeof(F2FScalar));
+  for (int k = 0; k < nn * na; k++) {
+    mat_vals[entry[k]] += global_W[k];
+  }
+
+  delete[] entry;
+}
+
+/*
+  Compute the product of the transfer matrix with a vector on the global
+  image of the structural nodes
+
+  Arguments
+  ---------
+  x : structural vector
+
+  Returns
+  -------
+  y : aerodynamic vector
+*/
+void MELDThermal::multTransferMatrix(const F2FScalar *x, F2FScalar *y) {
+#ifdef FUNTOFEM_USE_COMPLEX
+  // Only the vector needs complex arithmetic when the weights are real
+  if (weights_real) {
+    for (int i = 0; i < na; i++) {
+      F2FScalar yi = 0.0;
+      for (int k = mat_rowp[i]; k < mat_rowp[i + 1]; k++) {
+        yi += F2FRealPart(mat_vals[k]) * x[mat_cols[k]];
+      }
+      y[i] = yi;
+    }
+    return;
+  }
+#endif  // FUNTOFEM_USE_COMPLEX
+
+  for (int i = 0; i < na; i++) {
+    F2FScalar yi = 0.0;
+    for (int k = mat_rowp[i]; k < mat_rowp[i + 1]; k++) {
+      yi += mat_vals[k] * x[mat_cols[k]];
+    }
+    y[i] = yi;
+  }
+}
+
+/*
+  Add the product of the transpose of the transfer matrix with a vector to a
+  vector on the global image of the structural nodes
+
+  Arguments
+  ---------
+  x : aerodynamic vector
+
+  Returns
+  -------
+  y : structural vector
+*/
+void MELDThermal::addMultTransposeTransferMatrix(const F2FScalar *x,
+                                                 F2FScalar *y) {
+#ifdef FUNTOFEM_USE_COMPLEX
+  // Only the vector needs complex arithmetic when the weights are real
+  if (weights_real) {
+    for (int i = 0; i < na; i++) {
+      for (int k = mat_rowp[i]; k < mat_rowp[i + 1]; k++) {
+        y[mat_cols[k]] += F2FRealPart(mat_vals[k]) * x[i];
+      }
+    }
+    return;
+  }
+#endif  // FUNTOFEM_USE_COMPLEX
+
+  for (int i = 0; i < na; i++) {
+    for (int k = mat_rowp[i]; k < mat_rowp[i + 1]; k++) {
+      y[mat_cols[k]] += mat_vals[k] * x[i];
+    }
+  }
+}
+
+/*
+  Get the sparse matrix that maps the structural temperatures to the
+  aerodynamic temperatures in compressed row format. The rows correspond to
+  the local aerodynamic nodes and the columns to the global structural nodes,
+  or to the structural nodes referenced on this processor when the
+  structural mesh is distributed. The matrix is owned by the transfer scheme
+  and is only valid until the scheme is initialized or updated again.
+
+  Returns
+  -------
+  nrows : number of rows
+  ncols : number of columns
+  rowp  : offset of each row into cols and vals
+  cols  : column of each nonzero entry
+  vals  : value of each nonzero entry
+*/
+void MELDThermal::getTransferMatrix(int *nrows, int *ncols, const int **rowp,
+                                    const int **cols, const F2FScalar **vals) {
+  *nrows = na;
+  *ncols = ns;
+  *rowp = mat_rowp;
+  *cols = mat_cols;
+  *vals = mat_vals;
+}
+
+/*
+  Get the number of bytes allocated for the data stored by the scheme
+
+  Returns
+  -------
+  the number of bytes
+*/
+size_t MELDThermal::getMemoryUsage() {
+  size_t nscalars = 0, nints = 0;
+  if (global_conn) {
+    nints += (size_t)nn * na;
+  }
+  if (global_W) {
+    nscalars += (size_t)nn * na;
+  }
+  if (mat_rowp) {
+    nints += (size_t)na + 1 + mat_rowp[na];
+    nscalars += (size_t)mat_rowp[na];
+  }
+
+  return ThermalTransfer::getMemoryUsage() + nscalars * sizeof(F2FScalar) +
+         nints * sizeof(int);
+}
+
+/*
+  Update the transfer scheme after the aerodynamic or structural node
+  locations have been changed. When the nodes have moved little enough that
+  the nearest structural nodes to each aerodynamic node are unchanged, the
+  connectivity is kept and only the weights are recomputed. Otherwise the
+  scheme is initialized again.
+
+  Returns
+  -------
+  1 if the scheme was initialized again, 0 otherwise
+*/
+int MELDThermal::updateGeometry() {
+  if (!checkAeroStructConn(isymm)) {
+    initialize();
+    return 1;
+  }
+
+  // Update the structural node locations and recompute the weights
+  distributeStructuralMesh();
+  computeWeights(F2FRealPart(global_beta), isymm, nn, global_conn, global_W);
+  assembleTransferMatrix();
+
+  return 0;
+}
+
+/*
+  Get the number of bytes of the restart state with the connectivity and the
+  weights. The state is not saved when the structural mesh is distributed,
+  since the connectivity then refers to the local image of the mesh.
+*/
+size_t MELDThermal::getStateSize() {
+  if (!global_conn || struct_distributed) {
+    return 0;
+  }
+  return getConnStateSize(nn);
+}
+
+/*
+  Pack the connectivity and the weights into the restart state
+*/
+void MELDThermal::writeState(char *buffer) {
+  writeConnState(nn, global_conn, global_W, buffer);
+}
+
+/*
+  Check a restart state and keep it for initialize()
+*/
+int MELDThermal::readState(const char *buffer, size_t size) {
+  return readConnState(buffer, size);
+}
+
+/*
+  Add the symmetry, the number of nearest nodes that initialize() links to
+  each aerodynamic node and the decay factor to the key of the restart state
+*/
+uint64_t MELDThermal::hashStateOptions(uint64_t key) {
+  int num_nearest = (nn < ns ? nn : ns);
+  double beta = F2FRealPart(global_beta);
+  key = hashBytes(key, "MELDThermal", 11);
+  key = hashBytes(key, &isymm, sizeof(isymm));
+  key = hashBytes(key, &num_nearest, sizeof(num_nearest));
+  return hashBytes(key, &beta, sizeof(beta));
 }
 
 /*
@@ -126,24 +366,8 @@ void MELDThermal::transferTemp(const F2FScalar *struct_temps,
   // Copy the temperature into the global temperature vector
   structGatherBcast(ns_local, struct_temps, ns, Ts);
 
-  // Zero the outputs
-  memset(aero_temps, 0.0, na * sizeof(F2FScalar));
-
-  for (int i = 0; i < na; i++) {
-    const int *local_conn = &global_conn[i * nn];
-    const F2FScalar *w = &global_W[i * nn];
-
-    F2FScalar Taero = 0.0;
-    for (int j = 0; j < nn; j++) {
-      if (local_conn[j] < ns) {
-        Taero += w[j] * Ts[local_conn[j]];
-      } else {
-        Taero += w[j] * Ts[local_conn[j] - ns];
-      }
-    }
-
-    aero_temps[i] = Taero;
-  }
+  // Apply the transfer matrix to the temperatures
+  multTransferMatrix(Ts, aero_temps);
 }
 
 /*
@@ -164,28 +388,13 @@ void MELDThermal::transferFlux(const F2FScalar *aero_flux,
   memcpy(Ha, aero_flux, na * sizeof(F2FScalar));
 
   // Zero struct flux
-  F2FScalar *struct_flux_global = new F2FScalar[ns];
+  F2FScalar *struct_flux_global = getWorkArray(STRUCT_WORK, ns);
   memset(struct_flux_global, 0, ns * sizeof(F2FScalar));
 
-  for (int i = 0; i < na; i++) {
-    const int *local_conn = &global_conn[i * nn];
-    const F2FScalar *w = &global_W[i * nn];
-    const F2FScalar *ha = &Ha[i];
-
-    for (int j = 0; j < nn; j++) {
-      int index = 0;
-      if (local_conn[j] < ns) {
-        index = local_conn[j];
-      } else {
-        index = local_conn[j] - ns;
-      }
-      struct_flux_global[index] += w[j] * ha[0];
-    }
-  }
+  // Apply the transpose of the transfer matrix to the flux
+  addMultTransposeTransferMatrix(Ha, struct_flux_global);
 
   structAddScatter(ns, struct_flux_global, ns_local, struct_flux);
-
-  delete[] struct_flux_global;
 }
 
 /*
@@ -205,29 +414,10 @@ void MELDThermal::applydTdtS(const F2FScalar *vecs, F2FScalar *prods) {
   F2FScalar *vecs_global = new F2FScalar[ns];
   structGatherBcast(ns_local, vecs, ns, vecs_global);
 
-  // Zero array of Jacobian-vector products every call
-  memset(prods, 0, na * sizeof(F2FScalar));
-
-  // Loop over all aerodynamic surface nodes
+  // Compute the Jacobian-vector product Jv = -W*v
+  multTransferMatrix(vecs_global, prods);
   for (int i = 0; i < na; i++) {
-    // Loop over linked structural nodes and add up nonzero contributions to
-    // Jacobian-vector product
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
-
-      F2FScalar v;
-      if (indx < ns) {
-        v = vecs_global[indx];
-      } else {
-        indx -= ns;
-        v = vecs_global[indx];
-      }
-
-      // Compute each component of the Jacobian vector product as follows:
-      // Jv[k] = w*v[k]
-      F2FScalar w = global_W[nn * i + j];
-      prods[i] -= w * v;
-    }
+    prods[i] *= -1.0;
   }
 
   // Clean up the allocated memory
@@ -251,21 +441,10 @@ void MELDThermal::applydTdtSTrans(const F2FScalar *vecs, F2FScalar *prods) {
   F2FScalar *prods_global = new F2FScalar[ns];
   memset(prods_global, 0, ns * sizeof(F2FScalar));
 
-  // Loop over aerodynamic surface nodes
-  for (int i = 0; i < na; i++) {
-    // Loop over linked structural nodes and add up nonzero contributions to
-    // Jacobian-vector product
-    for (int j = 0; j < nn; j++) {
-      int indx = global_conn[nn * i + j];
-      F2FScalar w = global_W[nn * i + j];
-
-      if (indx < ns) {
-        prods_global[indx] -= w * vecs[i];
-      } else {
-        indx -= ns;
-        prods_global[indx] -= w * vecs[i];
-      }
-    }
+  // Compute the transpose Jacobian-vector product -W^{T}*v
+  addMultTransposeTransferMatrix(vecs, prods_global);
+  for (int j = 0; j < ns; j++) {
+    prods_global[j] *= -1.0;
   }
 
   // distribute the results to the structural processors
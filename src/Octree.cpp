@@ -56,6 +56,15 @@ Octree::Octree(F2FScalar *points, int num_points, int min_point_count,
   min_edge = min_edge_length;
   max_depth = max_tree_depth;
 
+  // Initialize tree data
+  bin_depths = NULL;
+  bin_parents = NULL;
+  bin_corners = NULL;
+  points_bins = NULL;
+  leaf_bins = NULL;
+  point_ids = NULL;
+  bin_ptr = NULL;
+
   printf("Octree: creating octree with %i points...\n", npts);
 }
 
@@ -70,6 +79,8 @@ Octree::~Octree() {
   if (bin_corners) delete[] bin_corners;
   if (points_bins) delete[] points_bins;
   if (leaf_bins) delete[] leaf_bins;
+  if (point_ids) delete[] point_ids;
+  if (bin_ptr) delete[] bin_ptr;
 
   printf("Octree: freeing octree data...\n\n");
 }
@@ -80,15 +91,24 @@ Octree::~Octree() {
 void Octree::generate() {
   // Create base-level bin
   nbins = 1;
-  bin_depths = new int[nbins];
+  max_bins = 64;
+  bin_depths = new int[max_bins];
   bin_depths[0] = 0;
-  bin_parents = new int[nbins];
+  bin_parents = new int[max_bins];
   bin_parents[0] = 0;
-  bin_corners = new double[6 * nbins];
+  bin_corners = new double[6 * max_bins];
+  bin_ptr = new int[2 * max_bins];
+  bin_ptr[0] = 0;
+  bin_ptr[1] = npts;
   points_bins = new int[npts];
   memset(points_bins, 0, npts * sizeof(int));  // all points start in base bin
+  point_ids = new int[npts];
+  for (int i = 0; i < npts; i++) {
+    point_ids[i] = i;
+  }
   nleaf = 0;
-  leaf_bins = new int[nbins];  // cannot allocate an array of length zero
+  max_leaf = 64;
+  leaf_bins = new int[max_leaf];
 
   // Find corners of base bin
   double xmin[] = {Xpts[0], Xpts[1], Xpts[2]};
@@ -126,12 +146,7 @@ void Octree::generate() {
 */
 bool Octree::divide(int bin_id) {
   // Count points in bin
-  int bin_count = 0;
-  for (int i = 0; i < npts; i++) {
-    if (points_bins[i] == bin_id) {
-      bin_count++;
-    }
-  }
+  int bin_count = bin_ptr[2 * bin_id + 1] - bin_ptr[2 * bin_id];
   bool count_check = bin_count <= min_points;
 
   // Find smallest edge of bin
@@ -162,23 +177,15 @@ bool Octree::divide(int bin_id) {
       0.5 * (bin_corners[6 * bin_id + 4] + bin_corners[6 * bin_id + 1]),
       0.5 * (bin_corners[6 * bin_id + 5] + bin_corners[6 * bin_id + 2])};
 
+  // The points of this bin that have not been placed in a new bin are in
+  // point_ids[start], ..., point_ids[end-1]
+  int start = bin_ptr[2 * bin_id];
+  int end = bin_ptr[2 * bin_id + 1];
+
   // Add 8 new bins
   for (int i = 0; i < 8; i++) {
-    // Reallocate memory for the old data plus that of one new bin
-    int *new_bin_depths = new int[nbins + 1];
-    memcpy(new_bin_depths, bin_depths, nbins * sizeof(int));
-    delete[] bin_depths;
-    bin_depths = new_bin_depths;
-
-    int *new_bin_parents = new int[nbins + 1];
-    memcpy(new_bin_parents, bin_parents, nbins * sizeof(int));
-    delete[] bin_parents;
-    bin_parents = new_bin_parents;
-
-    double *new_bin_corners = new double[6 * (nbins + 1)];
-    memcpy(new_bin_corners, bin_corners, 6 * nbins * sizeof(double));
-    delete[] bin_corners;
-    bin_corners = new_bin_corners;
+    // Make room for the data of one new bin
+    extendBins();
 
     // Update depths and parents arrays
     int new_bin_id = nbins;
@@ -214,26 +221,34 @@ bool Octree::divide(int bin_id) {
       bin_corners[6 * new_bin_id + 5] = bin_corners[6 * bin_id + 5];
     }
 
-    // Find the points that fall inside the new bin
-    for (int i = 0; i < npts; i++) {
-      if (points_bins[i] == bin_id) {
-        double *x = &Xpts[3 * i];
-        double *min_corner = &bin_corners[6 * new_bin_id];
-        double *max_corner = &bin_corners[6 * new_bin_id + 3];
-        bool is_in_bin = x[0] >= min_corner[0] and x[0] <= max_corner[0] and
-                         x[1] >= min_corner[1] and x[1] <= max_corner[1] and
-                         x[2] >= min_corner[2] and x[2] <= max_corner[2];
-        if (is_in_bin) {
-          points_bins[i] = new_bin_id;
-        }
+    // Move the remaining points that fall inside the new bin to the front of
+    // the remaining range
+    double *min_corner = &bin_corners[6 * new_bin_id];
+    double *max_corner = &bin_corners[6 * new_bin_id + 3];
+    int new_end = start;
+    for (int j = start; j < end; j++) {
+      int pt = point_ids[j];
+      double *x = &Xpts[3 * pt];
+      bool is_in_bin = x[0] >= min_corner[0] and x[0] <= max_corner[0] and
+                       x[1] >= min_corner[1] and x[1] <= max_corner[1] and
+                       x[2] >= min_corner[2] and x[2] <= max_corner[2];
+      if (is_in_bin) {
+        point_ids[j] = point_ids[new_end];
+        point_ids[new_end] = pt;
+        points_bins[pt] = new_bin_id;
+        new_end++;
       }
     }
+    bin_ptr[2 * new_bin_id] = start;
+    bin_ptr[2 * new_bin_id + 1] = new_end;
+    start = new_end;
 
     // Divide the new bin and keep track of leaf bins
     bool is_leaf_bin = divide(new_bin_id);
     if (is_leaf_bin) {
-      if (nleaf > 0) {
-        int *new_leaf_bins = new int[nleaf + 1];
+      if (nleaf >= max_leaf) {
+        max_leaf *= 2;
+        int *new_leaf_bins = new int[max_leaf];
         memcpy(new_leaf_bins, leaf_bins, nleaf * sizeof(int));
         delete[] leaf_bins;
         leaf_bins = new_leaf_bins;
@@ -245,3 +260,34 @@ bool Octree::divide(int bin_id) {
 
   return false;
 }
+
+/*
+  Extend the bin arrays, doubling their length when they are full, so that
+  they can store the data for one new bin
+*/
+void Octree::extendBins() {
+  if (nbins < max_bins) {
+    return;
+  }
+  max_bins *= 2;
+
+  int *new_bin_depths = new int[max_bins];
+  memcpy(new_bin_depths, bin_depths, nbins * sizeof(int));
+  delete[] bin_depths;
+  bin_depths = new_bin_depths;
+
+  int *new_bin_parents = new int[max_bins];
+  memcpy(new_bin_parents, bin_parents, nbins * sizeof(int));
+  delete[] bin_parents;
+  bin_parents = new_bin_parents;
+
+  double *new_bin_corners = new double[6 * max_bins];
+  memcpy(new_bin_corners, bin_corners, 6 * nbins * sizeof(double));
+  delete[] bin_corners;
+  bin_corners = new_bin_corners;
+
+  int *new_bin_ptr = new int[2 * max_bins];
+  memcpy(new_bin_ptr, bin_ptr, 2 * nbins * sizeof(int));
+  delete[] bin_ptr;
+  bin_ptr = new_bin_ptr;
+}
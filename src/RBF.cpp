@@ -22,6 +22,7 @@
 #include "RBF.h"
 
 #include <math.h>
+#include <stdint.h>
 #include <stdio.h>
 
 #include <cstdlib>
@@ -30,12 +31,27 @@
 #include "Octree.h"
 #include "funtofemlapack.h"
 
+/*
+  Generate a pseudo-random number from an integer state with the splitmix64
+  generator. The same state always gives the same number.
+*/
+static uint64_t splitmix64(uint64_t x) {
+  x += 0x9e3779b97f4a7c15ULL;
+  x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9ULL;
+  x = (x ^ (x >> 27)) * 0x94d049bb133111ebULL;
+  return x ^ (x >> 31);
+}
+
 RBF::RBF(MPI_Comm global_comm, MPI_Comm struct_comm, int struct_root,
          MPI_Comm aero_comm, int aero_root, RbfType rbf_type,
          int sampling_ratio)
     : LDTransferScheme(global_comm, struct_comm, struct_root, aero_comm,
                        aero_root) {
   // Point to the selected type of RBF
+  basis_type = rbf_type;
+  phi = NULL;
+  phi_compact = NULL;
+  compact_support = 0;
   switch (rbf_type) {
     case GAUSSIAN:
       phi = &gaussian;
@@ -49,11 +65,45 @@ RBF::RBF(MPI_Comm global_comm, MPI_Comm struct_comm, int struct_root,
     case THIN_PLATE_SPLINE:
       phi = &thinPlateSpline;
       break;
+    case WENDLAND_C0:
+      phi_compact = &wendlandC0;
+      compact_support = 1;
+      break;
+    case WENDLAND_C2:
+      phi_compact = &wendlandC2;
+      compact_support = 1;
+      break;
+    case WENDLAND_C4:
+      phi_compact = &wendlandC4;
+      compact_support = 1;
+      break;
   }
 
   // Initialize sampling data
   denominator = sampling_ratio;
+  sampling_seed = 0;
   sample_ids = NULL;
+  interp_mat = NULL;
+  restart_nsub = 0;
+  restart_sample_ids = NULL;
+  restart_interp = NULL;
+
+  // Initialize the compactly supported basis function data
+  support_radius = 1.0;
+  solver_rtol = 1e-12;
+  solver_max_iters = 10000;
+  solver_converged = 1;
+  M_rowp = M_cols = NULL;
+  M_vals = NULL;
+  L_rowp = L_cols = NULL;
+  L_vals = NULL;
+  A_rowp = A_cols = NULL;
+  A_vals = NULL;
+  npoly = 0;
+  PT = NULL;
+  A_poly = NULL;
+  MinvPT = NULL;
+  Mp = NULL;
 
   // Initialize object id
   object_id = TransferScheme::object_count++;
@@ -72,6 +122,12 @@ RBF::~RBF() {
     delete[] sample_ids;
   }
 
+  // Free the interpolation data
+  if (interp_mat) {
+    delete[] interp_mat;
+  }
+  freeSparseData();
+
   int rank;
   MPI_Comm_rank(global_comm, &rank);
   if (rank == struct_root) {
@@ -104,8 +160,22 @@ void RBF::initialize() {
     memset(Us, 0, 3 * ns * sizeof(F2FScalar));
   }
 
+  // Free any data from a previous initialization
+  if (sample_ids) {
+    delete[] sample_ids;
+  }
+  if (interp_mat) {
+    delete[] interp_mat;
+  }
+  interp_mat = NULL;
+  freeSparseData();
+
   // Sample the structural nodes
-  if (denominator > 1) {
+  if (restart_sample_ids) {
+    nsub = restart_nsub;
+    sample_ids = new int[nsub];
+    memcpy(sample_ids, restart_sample_ids, nsub * sizeof(int));
+  } else if (denominator > 1) {
     printf("Transfer scheme [%i]: attempting to sample nodes using octree...\n",
            object_id);
 
@@ -119,41 +189,19 @@ void RBF::initialize() {
     nsub = octree->nleaf;
     sample_ids = new int[nsub];
 
-    // Randomly sample one point from each leaf bin of the octree
+    // Randomly sample one point from each leaf bin of the octree. The pick
+    // only depends on the seed and the leaf, so it is reproducible.
     for (int i = 0; i < nsub; i++) {
       int bin_id = octree->leaf_bins[i];
-      int num_bin_pts = 0;
-      int *bin_points_ids = new int[1];  // must allocate array to start
-
-      // First find the ids of the points in each leaf bin
-      for (int j = 0; j < ns; j++) {
-        if (octree->points_bins[j] == bin_id) {
-          if (num_bin_pts > 0) {
-            int *new_bin_points_ids = new int[num_bin_pts + 1];
-            memcpy(new_bin_points_ids, bin_points_ids,
-                   num_bin_pts * sizeof(int));
-            delete[] bin_points_ids;
-            bin_points_ids = new_bin_points_ids;
-          }
-          bin_points_ids[num_bin_pts] = j;
-          num_bin_pts++;
-        }
-      }
+      int start = octree->bin_ptr[2 * bin_id];
+      int num_bin_pts = octree->bin_ptr[2 * bin_id + 1] - start;
 
-      // Then randomly pick one id
-      double h = 1.0 / num_bin_pts;
-      double random_num = (1.0 * rand()) / RAND_MAX;
-      int k = 0;
-      while (k < num_bin_pts) {
-        if (random_num < (k + 1) * h) break;
-        k++;
-      }
+      // Pick one of the points in the bin
+      uint64_t random_num = splitmix64(sampling_seed + (uint64_t)bin_id);
+      int k = (int)(random_num % (uint64_t)num_bin_pts);
 
       // Add id to array of sampled ids
-      sample_ids[i] = bin_points_ids[k];
-
-      // Free allocated memory
-      delete[] bin_points_ids;
+      sample_ids[i] = octree->point_ids[start + k];
     }
 
     // Delete octree
@@ -175,11 +223,153 @@ void RBF::initialize() {
     }
   }
 
+  // Build the sparse interpolation for compactly supported basis functions
+  if (compact_support) {
+    int converged = buildSparseInterpolation();
+    checkSolverConvergence(converged);
+    return;
+  }
+
   // Allocate memory for interpolation matrix
   interp_mat = new F2FScalar[na * nsub];
 
   // Build the interpolation matrix
-  buildInterpolationMatrix();
+  if (restart_interp) {
+    memcpy(interp_mat, restart_interp, (size_t)na * nsub * sizeof(F2FScalar));
+  } else {
+    buildInterpolationMatrix();
+  }
+}
+
+/*
+  Get the number of bytes of the restart state with the sampled structural
+  points and, unless the basis functions have compact support, the
+  interpolation matrix
+*/
+size_t RBF::getStateSize() {
+  if (!sample_ids) {
+    return 0;
+  }
+  size_t size = 16 + nsub * sizeof(int);
+  if (interp_mat) {
+    size += (size_t)na * nsub * sizeof(F2FScalar);
+  }
+  return size;
+}
+
+/*
+  Pack the sampled points and the interpolation matrix into the restart state
+*/
+void RBF::writeState(char *buffer) {
+  int32_t sizes[4] = {nsub, na, (interp_mat ? 1 : 0), 0};
+  memcpy(buffer, sizes, 16);
+
+  // Store the interpolation matrix first so that it is aligned
+  size_t len = 0;
+  if (interp_mat) {
+    len = (size_t)na * nsub * sizeof(F2FScalar);
+    memcpy(&buffer[16], interp_mat, len);
+  }
+  memcpy(&buffer[16 + len], sample_ids, nsub * sizeof(int));
+}
+
+/*
+  Check a restart state and keep it for initialize()
+*/
+int RBF::readState(const char *buffer, size_t size) {
+  if (size < 16) {
+    return 0;
+  }
+
+  int32_t sizes[4];
+  memcpy(sizes, buffer, 16);
+  int has_interp = !compact_support;
+  if (sizes[0] < 0 || sizes[0] > ns || sizes[1] != na ||
+      sizes[2] != has_interp) {
+    return 0;
+  }
+
+  size_t len = 0;
+  if (has_interp) {
+    len = (size_t)na * sizes[0] * sizeof(F2FScalar);
+  }
+  if (size != 16 + len + sizes[0] * sizeof(int)) {
+    return 0;
+  }
+
+  // Check that the sampled points exist
+  const int *ids = reinterpret_cast<const int *>(&buffer[16 + len]);
+  for (int i = 0; i < sizes[0]; i++) {
+    if (ids[i] < 0 || ids[i] >= ns) {
+      return 0;
+    }
+  }
+
+  restart_nsub = sizes[0];
+  restart_sample_ids = ids;
+  if (has_interp) {
+    restart_interp = reinterpret_cast<const F2FScalar *>(&buffer[16]);
+  }
+
+  return 1;
+}
+
+/*
+  Release the restart state kept by readState
+*/
+void RBF::clearState() {
+  restart_nsub = 0;
+  restart_sample_ids = NULL;
+  restart_interp = NULL;
+}
+
+/*
+  Add the type of basis function and the sampling options to the key of the
+  restart state
+*/
+uint64_t RBF::hashStateOptions(uint64_t key) {
+  int options[3] = {(int)basis_type, denominator, (int)sampling_seed};
+  key = hashBytes(key, "RBF", 3);
+  key = hashBytes(key, options, sizeof(options));
+  if (compact_support) {
+    key = hashBytes(key, &support_radius, sizeof(support_radius));
+  }
+  return key;
+}
+
+/*
+  Get the number of bytes allocated for the data stored by the scheme
+
+  Returns
+  -------
+  the number of bytes
+*/
+size_t RBF::getMemoryUsage() {
+  size_t nscalars = 0, nints = 0;
+  if (sample_ids) {
+    nints += nsub;
+  }
+  if (interp_mat) {
+    nscalars += (size_t)na * nsub;
+  }
+  if (M_rowp) {
+    nints += nsub + 1 + M_rowp[nsub];
+    nscalars += M_rowp[nsub];
+  }
+  if (L_rowp) {
+    nints += nsub + 1 + L_rowp[nsub];
+    nscalars += L_rowp[nsub];
+  }
+  if (A_rowp) {
+    nints += na + 1 + A_rowp[na];
+    nscalars += A_rowp[na];
+  }
+  if (PT) {
+    nscalars += 2 * nsub * npoly + na * npoly + npoly * npoly;
+  }
+
+  return LDTransferScheme::getMemoryUsage() + nscalars * sizeof(F2FScalar) +
+         nints * sizeof(int);
 }
 
 /*
@@ -343,30 +533,666 @@ void RBF::buildInterpolationMatrix() {
   }
 }
 
+// Cell of the uniform grid used to find the nodes within the support radius
+struct RBFGridEntry {
+  long long cell;
+  int index;
+};
+
+// Comparison function for sorting the grid entries by cell
+static int compare_grid_entry(const void *a, const void *b) {
+  const RBFGridEntry *ea = (const RBFGridEntry *)a;
+  const RBFGridEntry *eb = (const RBFGridEntry *)b;
+  if (ea->cell != eb->cell) {
+    return (ea->cell < eb->cell ? -1 : 1);
+  }
+  return ea->index - eb->index;
+}
+
+// Comparison function for sorting integer arrays
+static int compare_int(const void *a, const void *b) {
+  return *(const int *)a - *(const int *)b;
+}
+
 /*
-  Computes the displacements of aerodynamic surface nodes by fitting an
-  optimal rigid rotation and translation to the displacement of the set of
-  structural nodes nearest each aerodynamic surface node
+  Build the sparse interpolation data for the compactly supported basis
+  functions
+
+  The interpolation system for the sampled structural nodes is
+
+  [ M  P^{T} ] [ gamma ] = [ us ]
+  [ P  0     ] [ beta  ]   [ 0  ]
+
+  where M is the sparse, symmetric positive definite RBF matrix and P contains
+  the polynomial terms. The polynomial coefficients are eliminated using the
+  small dense matrix M_{p} = (P*M^{-1}*P^{T})^{-1} so that each transfer only
+  requires solutions with M.
+
+  Returns
+  -------
+  1 if the solver converged, 0 otherwise
+*/
+int RBF::buildSparseInterpolation() {
+  if (na == 0) {
+    return 1;
+  }
+
+  // Store the locations of the sampled structural nodes
+  F2FScalar *Xsub = new F2FScalar[3 * nsub];
+  for (int j = 0; j < nsub; j++) {
+    memcpy(&Xsub[3 * j], &Xs[3 * sample_ids[j]], 3 * sizeof(F2FScalar));
+  }
+
+  // Include the linear terms in the directions the sampled nodes span
+  npoly = 1;
+  for (int k = 0; k < 3; k++) {
+    double xmin = 0.0, xmax = 0.0;
+    for (int j = 0; j < nsub; j++) {
+      double x = F2FRealPart(Xsub[3 * j + k]);
+      if (j == 0 || x < xmin) {
+        xmin = x;
+      }
+      if (j == 0 || x > xmax) {
+        xmax = x;
+      }
+    }
+    if (xmax - xmin > 1.0e-15) {
+      poly_dims[npoly - 1] = k;
+      npoly++;
+    }
+  }
+
+  // Build the sparse RBF matrices
+  computeCompactMatrix(nsub, Xsub, &M_rowp, &M_cols, &M_vals);
+  computeCompactMatrix(na, Xa, &A_rowp, &A_cols, &A_vals);
+
+  // Evaluate the polynomial terms at the aerodynamic nodes
+  A_poly = new F2FScalar[na * npoly];
+  for (int i = 0; i < na; i++) {
+    evalPoly(&Xa[3 * i], &A_poly[npoly * i]);
+  }
+
+  // Compute the preconditioner for the iterative solver
+  factorPreconditioner();
+
+  // Compute M^{-1}*P^{T} one polynomial term at a time
+  MinvPT = new F2FScalar[nsub * npoly];
+  PT = new F2FScalar[nsub * npoly];
+  for (int j = 0; j < nsub; j++) {
+    evalPoly(&Xsub[3 * j], &PT[npoly * j]);
+  }
+  F2FScalar *b = new F2FScalar[nsub];
+  F2FScalar *x = new F2FScalar[nsub];
+  int converged = 1;
+  for (int k = 0; k < npoly; k++) {
+    for (int j = 0; j < nsub; j++) {
+      b[j] = PT[npoly * j + k];
+    }
+    converged &= solveRBFSystem(b, x);
+    for (int j = 0; j < nsub; j++) {
+      MinvPT[npoly * j + k] = x[j];
+    }
+  }
+
+  // Form P*M^{-1}*P^{T} and invert it to obtain M_{p}
+  F2FScalar *invMp = new F2FScalar[npoly * npoly];
+  memset(invMp, 0, npoly * npoly * sizeof(F2FScalar));
+  for (int j = 0; j < nsub; j++) {
+    for (int k = 0; k < npoly; k++) {
+      for (int l = 0; l < npoly; l++) {
+        invMp[k + npoly * l] += PT[npoly * j + k] * MinvPT[npoly * j + l];
+      }
+    }
+  }
+
+  Mp = new F2FScalar[npoly * npoly];
+  memset(Mp, 0, npoly * npoly * sizeof(F2FScalar));
+  for (int k = 0; k < npoly; k++) {
+    Mp[k + npoly * k] = 1.0;
+  }
+  int *ipiv = new int[npoly];
+  int info = 0;
+  LAPACKgetrf(&npoly, &npoly, invMp, &npoly, ipiv, &info);
+  LAPACKgetrs("N", &npoly, &npoly, invMp, &npoly, ipiv, Mp, &npoly, &info);
+
+  int rank;
+  MPI_Comm_rank(global_comm, &rank);
+  if (rank == struct_root) {
+    printf("Transfer scheme [%i]: RBF matrix with %i nonzeros, %4.1f per row\n",
+           object_id, M_rowp[nsub], (1.0 * M_rowp[nsub]) / nsub);
+  }
+
+  // Free allocated memory
+  delete[] Xsub;
+  delete[] b;
+  delete[] x;
+  delete[] invMp;
+  delete[] ipiv;
+
+  return converged;
+}
+
+/*
+  Compute the sparse matrix of basis function evaluations between a set of
+  points and the sampled structural nodes. The sampled structural nodes are
+  sorted into a uniform grid of cells with an edge length equal to the support
+  radius, so only the 27 cells surrounding each point need to be searched.
 
   Arguments
   ---------
-  struct_disps : structural node displacements
+  nrows  : the number of points
+  X      : the locations of the points
 
   Returns
   -------
-  aero_disps   : aerodynamic node displacements
+  _rowp  : pointer into the columns for each row
+  _cols  : column indices of the sampled structural nodes
+  _vals  : the basis function evaluations
 */
-void RBF::transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps) {
-  // Check if struct nodes locations need to be redistributed
-  distributeStructuralMesh();
+void RBF::computeCompactMatrix(int nrows, const F2FScalar *X, int **_rowp,
+                               int **_cols, F2FScalar **_vals) {
+  double h = support_radius;
+
+  // Compute the bounding box of the sampled structural nodes
+  double xmin[3], xmax[3];
+  for (int k = 0; k < 3; k++) {
+    xmin[k] = xmax[k] = F2FRealPart(Xs[3 * sample_ids[0] + k]);
+  }
+  for (int j = 0; j < nsub; j++) {
+    for (int k = 0; k < 3; k++) {
+      double x = F2FRealPart(Xs[3 * sample_ids[j] + k]);
+      if (x < xmin[k]) {
+        xmin[k] = x;
+      }
+      if (x > xmax[k]) {
+        xmax[k] = x;
+      }
+    }
+  }
+
+  long long ncells[3];
+  for (int k = 0; k < 3; k++) {
+    ncells[k] = (long long)((xmax[k] - xmin[k]) / h) + 1;
+  }
+
+  // Sort the sampled structural nodes by cell
+  RBFGridEntry *grid = new RBFGridEntry[nsub];
+  for (int j = 0; j < nsub; j++) {
+    long long c[3];
+    for (int k = 0; k < 3; k++) {
+      c[k] =
+          (long long)((F2FRealPart(Xs[3 * sample_ids[j] + k]) - xmin[k]) / h);
+    }
+    grid[j].cell = c[0] + ncells[0] * (c[1] + ncells[1] * c[2]);
+    grid[j].index = j;
+  }
+  qsort(grid, nsub, sizeof(RBFGridEntry), compare_grid_entry);
+
+  // Count the nonzeros in each row on the first pass and fill in the column
+  // indices on the second pass
+  int *rowp = new int[nrows + 1];
+  int *cols = NULL;
+  rowp[0] = 0;
+  for (int pass = 0; pass < 2; pass++) {
+    for (int i = 0; i < nrows; i++) {
+      const F2FScalar *x = &X[3 * i];
+      int nz = 0;
+
+      long long c[3];
+      for (int k = 0; k < 3; k++) {
+        c[k] = (long long)floor((F2FRealPart(x[k]) - xmin[k]) / h);
+      }
+
+      for (long long c2 = c[2] - 1; c2 <= c[2] + 1; c2++) {
+        for (long long c1 = c[1] - 1; c1 <= c[1] + 1; c1++) {
+          for (long long c0 = c[0] - 1; c0 <= c[0] + 1; c0++) {
+            if (c0 < 0 || c0 >= ncells[0] || c1 < 0 || c1 >= ncells[1] ||
+                c2 < 0 || c2 >= ncells[2]) {
+              continue;
+            }
+            long long cell = c0 + ncells[0] * (c1 + ncells[1] * c2);
+
+            // Find the first entry in the cell with a binary search
+            int low = 0, high = nsub;
+            while (low < high) {
+              int mid = low + (high - low) / 2;
+              if (grid[mid].cell < cell) {
+                low = mid + 1;
+              } else {
+                high = mid;
+              }
+            }
+
+            for (int jp = low; jp < nsub && grid[jp].cell == cell; jp++) {
+              int j = grid[jp].index;
+              const F2FScalar *y = &Xs[3 * sample_ids[j]];
+              double d2 = F2FRealPart((x[0] - y[0]) * (x[0] - y[0]) +
+                                      (x[1] - y[1]) * (x[1] - y[1]) +
+                                      (x[2] - y[2]) * (x[2] - y[2]));
+              if (d2 < h * h) {
+                if (pass == 1) {
+                  cols[rowp[i] + nz] = j;
+                }
+                nz++;
+              }
+            }
+          }
+        }
+      }
 
-  // Copy prescribed displacements into displacement vector
-  structGatherBcast(3 * ns_local, struct_disps, 3 * ns, Us);
+      if (pass == 0) {
+        rowp[i + 1] = rowp[i] + nz;
+      } else {
+        qsort(&cols[rowp[i]], nz, sizeof(int), compare_int);
+      }
+    }
 
+    if (pass == 0) {
+      cols = new int[rowp[nrows]];
+    }
+  }
+
+  // Evaluate the basis functions
+  F2FScalar *vals = new F2FScalar[rowp[nrows]];
+  for (int i = 0; i < nrows; i++) {
+    const F2FScalar *x = &X[3 * i];
+    for (int jp = rowp[i]; jp < rowp[i + 1]; jp++) {
+      const F2FScalar *y = &Xs[3 * sample_ids[cols[jp]]];
+      F2FScalar r =
+          sqrt((x[0] - y[0]) * (x[0] - y[0]) + (x[1] - y[1]) * (x[1] - y[1]) +
+               (x[2] - y[2]) * (x[2] - y[2]));
+      vals[jp] = phi_compact(r / support_radius);
+    }
+  }
+
+  delete[] grid;
+
+  *_rowp = rowp;
+  *_cols = cols;
+  *_vals = vals;
+}
+
+/*
+  Evaluate the polynomial terms of the interpolation at a point
+
+  Arguments
+  ---------
+  x : the point
+
+  Returns
+  -------
+  p : the npoly polynomial terms
+*/
+void RBF::evalPoly(const F2FScalar *x, F2FScalar *p) {
+  p[0] = 1.0;
+  for (int k = 1; k < npoly; k++) {
+    p[k] = x[poly_dims[k - 1]];
+  }
+}
+
+/*
+  Compute the incomplete Cholesky factorization with zero fill-in of the
+  sparse RBF matrix, M ~ L*L^{T}. If the factorization breaks down, the
+  diagonal of M is increased until it succeeds.
+*/
+void RBF::factorPreconditioner() {
+  // The factor uses the lower triangular part of the nonzero pattern of M.
+  // The columns in each row are sorted so the diagonal entry is last.
+  L_rowp = new int[nsub + 1];
+  L_rowp[0] = 0;
+  for (int i = 0; i < nsub; i++) {
+    int nz = 0;
+    for (int jp = M_rowp[i]; jp < M_rowp[i + 1] && M_cols[jp] <= i; jp++) {
+      nz++;
+    }
+    L_rowp[i + 1] = L_rowp[i] + nz;
+  }
+  L_cols = new int[L_rowp[nsub]];
+  L_vals = new F2FScalar[L_rowp[nsub]];
+  for (int i = 0; i < nsub; i++) {
+    memcpy(&L_cols[L_rowp[i]], &M_cols[M_rowp[i]],
+           (L_rowp[i + 1] - L_rowp[i]) * sizeof(int));
+  }
+
+  double shift = 0.0;
+  int fail = 1;
+  while (fail) {
+    fail = 0;
+    for (int i = 0; i < nsub && !fail; i++) {
+      for (int jp = L_rowp[i]; jp < L_rowp[i + 1]; jp++) {
+        int j = L_cols[jp];
+        F2FScalar val = M_vals[M_rowp[i] + jp - L_rowp[i]];
+        if (j == i) {
+          val *= 1.0 + shift;
+        }
+
+        // Subtract the product of rows i and j over columns k < j
+        int kp = L_rowp[i];
+        int lp = L_rowp[j];
+        while (kp < jp && lp < L_rowp[j + 1] - 1) {
+          if (L_cols[kp] == L_cols[lp]) {
+            val -= L_vals[kp] * L_vals[lp];
+            kp++;
+            lp++;
+          } else if (L_cols[kp] < L_cols[lp]) {
+            kp++;
+          } else {
+            lp++;
+          }
+        }
+
+        if (j < i) {
+          L_vals[jp] = val / L_vals[L_rowp[j + 1] - 1];
+        } else if (F2FRealPart(val) > 0.0) {
+          L_vals[jp] = sqrt(val);
+        } else {
+          fail = 1;
+          break;
+        }
+      }
+    }
+
+    if (fail) {
+      shift = (shift == 0.0 ? 1e-3 : 2.0 * shift);
+    }
+  }
+}
+
+/*
+  Apply the incomplete Cholesky preconditioner z = (L*L^{T})^{-1} r
+
+  Arguments
+  ---------
+  r : the input vector
+
+  Returns
+  -------
+  z : the output vector
+*/
+void RBF::applyPreconditioner(const F2FScalar *r, F2FScalar *z) {
+  // Solve L*y = r
+  for (int i = 0; i < nsub; i++) {
+    F2FScalar t = r[i];
+    int diag = L_rowp[i + 1] - 1;
+    for (int jp = L_rowp[i]; jp < diag; jp++) {
+      t -= L_vals[jp] * z[L_cols[jp]];
+    }
+    z[i] = t / L_vals[diag];
+  }
+
+  // Solve L^{T}*z = y
+  for (int i = nsub - 1; i >= 0; i--) {
+    int diag = L_rowp[i + 1] - 1;
+    z[i] = z[i] / L_vals[diag];
+    for (int jp = L_rowp[i]; jp < diag; jp++) {
+      z[L_cols[jp]] -= L_vals[jp] * z[i];
+    }
+  }
+}
+
+/*
+  Solve the system M*x = b with the sparse RBF matrix using the conjugate
+  gradient method preconditioned with an incomplete Cholesky factorization.
+  The  inner products do not use the complex conjugate so that the complex step
+  passes through the solution. In the complex case, the real and imaginary
+  parts of the residual must both converge.
+
+  Arguments
+  ---------
+  b : the right-hand side
+
+  Returns
+  -------
+  x : the solution
+  1 if the solver converged, 0 otherwise
+*/
+int RBF::solveRBFSystem(const F2FScalar *b, F2FScalar *x) {
+  F2FScalar *r = new F2FScalar[nsub];
+  F2FScalar *z = new F2FScalar[nsub];
+  F2FScalar *p = new F2FScalar[nsub];
+  F2FScalar *q = new F2FScalar[nsub];
+
+  // Norms of the real and imaginary parts of the right-hand side
+  double bnorm[2] = {0.0, 0.0};
+  for (int i = 0; i < nsub; i++) {
+    bnorm[0] += F2FRealPart(b[i]) * F2FRealPart(b[i]);
+    bnorm[1] += F2FImagPart(b[i]) * F2FImagPart(b[i]);
+  }
+  bnorm[0] = sqrt(bnorm[0]);
+  bnorm[1] = sqrt(bnorm[1]);
+
+  memset(x, 0, nsub * sizeof(F2FScalar));
+  memcpy(r, b, nsub * sizeof(F2FScalar));
+
+  F2FScalar rz = 0.0;
+  int converged = 0;
+  for (int iter = 0; iter < solver_max_iters; iter++) {
+    // Check for convergence
+    double rnorm[2] = {0.0, 0.0};
+    for (int i = 0; i < nsub; i++) {
+      rnorm[0] += F2FRealPart(r[i]) * F2FRealPart(r[i]);
+      rnorm[1] += F2FImagPart(r[i]) * F2FImagPart(r[i]);
+    }
+    if (sqrt(rnorm[0]) <= solver_rtol * bnorm[0] &&
+        sqrt(rnorm[1]) <= solver_rtol * bnorm[1]) {
+      converged = 1;
+      break;
+    }
+
+    // Apply the preconditioner
+    applyPreconditioner(r, z);
+
+    // Update the search direction
+    F2FScalar rz_new = 0.0;
+    for (int i = 0; i < nsub; i++) {
+      rz_new += r[i] * z[i];
+    }
+    if (iter == 0) {
+      memcpy(p, z, nsub * sizeof(F2FScalar));
+    } else {
+      F2FScalar beta = rz_new / rz;
+      for (int i = 0; i < nsub; i++) {
+        p[i] = z[i] + beta * p[i];
+      }
+    }
+    rz = rz_new;
+
+    // Compute q = M*p and update the solution and residual
+    F2FScalar pq = 0.0;
+    for (int i = 0; i < nsub; i++) {
+      q[i] = 0.0;
+      for (int jp = M_rowp[i]; jp < M_rowp[i + 1]; jp++) {
+        q[i] += M_vals[jp] * p[M_cols[jp]];
+      }
+      pq += p[i] * q[i];
+    }
+
+    F2FScalar alpha = rz / pq;
+    for (int i = 0; i < nsub; i++) {
+      x[i] += alpha * p[i];
+      r[i] -= alpha * q[i];
+    }
+  }
+
+  delete[] r;
+  delete[] z;
+  delete[] p;
+  delete[] q;
+
+  return converged;
+}
+
+/*
+  Solve the interpolation system for the sampled structural nodes
+
+  [ M  P^{T} ] [ coef_rbf  ] = [ rhs_rbf  ]
+  [ P  0     ] [ coef_poly ]   [ rhs_poly ]
+
+  Arguments
+  ---------
+  rhs_rbf   : right-hand side for each sampled structural node
+  rhs_poly  : right-hand side for each polynomial term
+
+  Returns
+  -------
+  coef_rbf  : coefficient of each basis function
+  coef_poly : coefficient of each polynomial term
+  1 if the solver converged, 0 otherwise
+*/
+int RBF::solveInterpSystem(const F2FScalar *rhs_rbf, const F2FScalar *rhs_poly,
+                           F2FScalar *coef_rbf, F2FScalar *coef_poly) {
+  // Solve M*y = rhs_rbf
+  int converged = solveRBFSystem(rhs_rbf, coef_rbf);
+
+  // Compute P*y - rhs_poly
+  F2FScalar Py[4];
+  for (int k = 0; k < npoly; k++) {
+    Py[k] = -rhs_poly[k];
+  }
+  for (int j = 0; j < nsub; j++) {
+    for (int k = 0; k < npoly; k++) {
+      Py[k] += PT[npoly * j + k] * coef_rbf[j];
+    }
+  }
+
+  // The polynomial coefficients are M_{p}*(P*y - rhs_poly)
+  for (int k = 0; k < npoly; k++) {
+    coef_poly[k] = 0.0;
+    for (int l = 0; l < npoly; l++) {
+      coef_poly[k] += Mp[k + npoly * l] * Py[l];
+    }
+  }
+
+  // The basis function coefficients are y - M^{-1}*P^{T}*coef_poly
+  for (int j = 0; j < nsub; j++) {
+    for (int k = 0; k < npoly; k++) {
+      coef_rbf[j] -= MinvPT[npoly * j + k] * coef_poly[k];
+    }
+  }
+
+  return converged;
+}
+
+/*
+  Combine the convergence flags of the iterative solves on all processors so
+  that getSolverConverged() gives the same answer everywhere, and report a
+  failure once from the root processor
+
+  Arguments
+  ---------
+  converged : 1 if the local solves converged, 0 otherwise
+*/
+void RBF::checkSolverConvergence(int converged) {
+  MPI_Allreduce(&converged, &solver_converged, 1, MPI_INT, MPI_MIN,
+                global_comm);
+
+  int rank;
+  MPI_Comm_rank(global_comm, &rank);
+  if (!solver_converged && rank == struct_root) {
+    printf("Transfer scheme [%i]: RBF solver failed to converge\n", object_id);
+  }
+}
+
+/*
+  Free the data for the compactly supported basis functions
+*/
+void RBF::freeSparseData() {
+  if (M_rowp) {
+    delete[] M_rowp;
+  }
+  if (M_cols) {
+    delete[] M_cols;
+  }
+  if (M_vals) {
+    delete[] M_vals;
+  }
+  if (L_rowp) {
+    delete[] L_rowp;
+  }
+  if (L_cols) {
+    delete[] L_cols;
+  }
+  if (L_vals) {
+    delete[] L_vals;
+  }
+  if (A_rowp) {
+    delete[] A_rowp;
+  }
+  if (A_cols) {
+    delete[] A_cols;
+  }
+  if (A_vals) {
+    delete[] A_vals;
+  }
+  if (PT) {
+    delete[] PT;
+  }
+  if (A_poly) {
+    delete[] A_poly;
+  }
+  if (MinvPT) {
+    delete[] MinvPT;
+  }
+  if (Mp) {
+    delete[] Mp;
+  }
+  M_rowp = M_cols = NULL;
+  M_vals = NULL;
+  L_rowp = L_cols = NULL;
+  L_vals = NULL;
+  A_rowp = A_cols = NULL;
+  A_vals = NULL;
+  PT = NULL;
+  A_poly = NULL;
+  MinvPT = NULL;
+  Mp = NULL;
+}
+
+/*
+  Computes the displacements of aerodynamic surface nodes by fitting an
+  optimal rigid rotation and translation to the displacement of the set of
+  structural nodes nearest each aerodynamic surface node
+
+  The structural displacements are stored in Us by beginTransferDisps
+
+  Returns
+  -------
+  aero_disps   : aerodynamic node displacements
+*/
+void RBF::computeAeroDisps(F2FScalar *aero_disps) {
   // Zero the outputs
   memset(aero_disps, 0.0, 3 * na * sizeof(F2FScalar));
 
-  if (na > 0) {
+  int converged = 1;
+  if (na > 0 && compact_support) {
+    F2FScalar *us = new F2FScalar[nsub];
+    F2FScalar *gamma = new F2FScalar[nsub];
+    F2FScalar zero[4] = {0.0, 0.0, 0.0, 0.0};
+    F2FScalar beta[4];
+
+    for (int k = 0; k < 3; k++) {
+      // Solve for the coefficients of the interpolant for each component
+      for (int j = 0; j < nsub; j++) {
+        us[j] = Us[3 * sample_ids[j] + k];
+      }
+      converged &= solveInterpSystem(us, zero, gamma, beta);
+
+      // Evaluate the interpolant at the aerodynamic nodes
+      for (int i = 0; i < na; i++) {
+        F2FScalar ua = 0.0;
+        for (int l = 0; l < npoly; l++) {
+          ua += A_poly[npoly * i + l] * beta[l];
+        }
+        for (int jp = A_rowp[i]; jp < A_rowp[i + 1]; jp++) {
+          ua += A_vals[jp] * gamma[A_cols[jp]];
+        }
+        aero_disps[3 * i + k] = ua;
+      }
+    }
+
+    delete[] us;
+    delete[] gamma;
+  } else if (na > 0) {
     // Rearrange structural displacements
     F2FScalar *US = new F2FScalar[nsub * 3];
     for (int i = 0; i < nsub; i++) {
@@ -394,6 +1220,11 @@ void RBF::transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps) {
     delete[] US;
     delete[] UA;
   }
+
+  // Every processor takes part in the check so that all of them agree
+  if (compact_support) {
+    checkSolverConvergence(converged);
+  }
 }
 
 /*
@@ -406,17 +1237,44 @@ void RBF::transferDisps(const F2FScalar *struct_disps, F2FScalar *aero_disps) {
 
   Returns
   -------
-  struct_loads : loads on structural nodes
+  struct_loads_global : loads on the global image of the structural nodes
 */
-void RBF::transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads) {
+void RBF::computeStructLoads(const F2FScalar *aero_loads,
+                             F2FScalar *struct_loads_global) {
   // Copy prescribed aero loads into member variable
   memcpy(Fa, aero_loads, 3 * na * sizeof(F2FScalar));
 
-  // Zero struct loads
-  F2FScalar *struct_loads_global = new F2FScalar[3 * ns];
-  memset(struct_loads_global, 0, 3 * ns * sizeof(F2FScalar));
+  int converged = 1;
+  if (na > 0 && compact_support) {
+    F2FScalar *g = new F2FScalar[nsub];
+    F2FScalar *fs = new F2FScalar[nsub];
+
+    for (int k = 0; k < 3; k++) {
+      // Apply the transpose of the evaluation matrix at the aerodynamic nodes
+      memset(g, 0, nsub * sizeof(F2FScalar));
+      F2FScalar gpoly[4] = {0.0, 0.0, 0.0, 0.0};
+      for (int i = 0; i < na; i++) {
+        for (int l = 0; l < npoly; l++) {
+          gpoly[l] += A_poly[npoly * i + l] * Fa[3 * i + k];
+        }
+        for (int jp = A_rowp[i]; jp < A_rowp[i + 1]; jp++) {
+          g[A_cols[jp]] += A_vals[jp] * Fa[3 * i + k];
+        }
+      }
 
-  if (na > 0) {
+      // The interpolation system is symmetric, so the transpose solve is the
+      // same as the forward solve
+      F2FScalar fpoly[4];
+      converged &= solveInterpSystem(g, gpoly, fs, fpoly);
+
+      for (int j = 0; j < nsub; j++) {
+        struct_loads_global[3 * sample_ids[j] + k] = fs[j];
+      }
+    }
+
+    delete[] g;
+    delete[] fs;
+  } else if (na > 0) {
     // Copy Fa into matrix
     F2FScalar *Fxyz = new F2FScalar[na * 3];
     for (int i = 0; i < na; i++) {
@@ -449,11 +1307,10 @@ void RBF::transferLoads(const F2FScalar *aero_loads, F2FScalar *struct_loads) {
     delete[] Fsub;
   }
 
-  // distribute the structural loads
-  structAddScatter(3 * ns, struct_loads_global, 3 * ns_local, struct_loads);
-
-  // Free allocated memory
-  delete[] struct_loads_global;
+  // Every processor takes part in the check so that all of them agree
+  if (compact_support) {
+    checkSolverConvergence(converged);
+  }
 }
 
 /*
@@ -689,6 +1546,73 @@ F2FScalar RBF::thinPlateSpline(F2FScalar *x, F2FScalar *y) {
   return eval;
 }
 
+/*
+  Defines the Wendland C0 radial basis function with compact support
+
+  phi(r) = (1 - r)^{2} for r < 1 and 0 otherwise,
+  where r = ||x - y||_{2}/support_radius
+
+  Arguments
+  ---------
+  r   : normalized distance between the points
+
+  Returns
+  -------
+  phi : evaluation of radial basis function
+*/
+F2FScalar RBF::wendlandC0(F2FScalar r) {
+  if (F2FRealPart(r) >= 1.0) {
+    return 0.0;
+  }
+  F2FScalar s = 1.0 - r;
+  return s * s;
+}
+
+/*
+  Defines the Wendland C2 radial basis function with compact support
+
+  phi(r) = (1 - r)^{4}*(4*r + 1) for r < 1 and 0 otherwise,
+  where r = ||x - y||_{2}/support_radius
+
+  Arguments
+  ---------
+  r   : normalized distance between the points
+
+  Returns
+  -------
+  phi : evaluation of radial basis function
+*/
+F2FScalar RBF::wendlandC2(F2FScalar r) {
+  if (F2FRealPart(r) >= 1.0) {
+    return 0.0;
+  }
+  F2FScalar s = 1.0 - r;
+  return s * s * s * s * (4.0 * r + 1.0);
+}
+
+/*
+  Defines the Wendland C4 radial basis function with compact support
+
+  phi(r) = (1 - r)^{6}*(35*r^{2} + 18*r + 3)/3 for r < 1 and 0 otherwise,
+  where r = ||x - y||_{2}/support_radius
+
+  Arguments
+  ---------
+  r   : normalized distance between the points
+
+  Returns
+  -------
+  phi : evaluation of radial basis function
+*/
+F2FScalar RBF::wendlandC4(F2FScalar r) {
+  if (F2FRealPart(r) >= 1.0) {
+    return 0.0;
+  }
+  F2FScalar s = 1.0 - r;
+  F2FScalar s2 = s * s;
+  return s2 * s2 * s2 * (35.0 * r * r + 18.0 * r + 3.0) / 3.0;
+}
+
 /*
   Write full and sampled structural point clouds to ASCII file that can be read
   into Tecplot
@@ -32,6 +32,11 @@
 // Initialize object counter to zero
 int TransferScheme::object_count = 0;
 
+// Comparison function for sorting and searching integer arrays
+static int compare_int(const void *a, const void *b) {
+  return *(const int *)a - *(const int *)b;
+}
+
 TransferScheme::~TransferScheme() {
   // Free the aerodynamic data
   if (Xa) {
@@ -45,6 +50,52 @@ TransferScheme::~TransferScheme() {
   if (Xs_local) {
     delete[] Xs_local;
   }
+
+  // Free the distributed structural mesh data
+  freeStructPlan();
+
+  // Free the communication plan and the scratch arrays
+  delete[] comm_counts;
+  if (struct_global_info) {
+    delete[] struct_global_info;
+  }
+  if (struct_node_counts) {
+    delete[] struct_node_counts;
+    delete[] struct_node_disps;
+  }
+  if (aero_node_counts) {
+    delete[] aero_node_counts;
+    delete[] aero_node_disps;
+  }
+  for (int k = 0; k < NUM_WORK_ARRAYS; k++) {
+    if (work[k]) {
+      delete[] work[k];
+    }
+  }
+
+  // Free the node locations used to compute the connectivity
+  if (conn_Xa) {
+    delete[] conn_Xa;
+  }
+  if (conn_Xs_local) {
+    delete[] conn_Xs_local;
+  }
+}
+
+/*
+  Set the number of threads used by the transfer kernels and the
+  connectivity search. This has no effect unless the library is compiled with
+  OpenMP.
+
+  Arguments
+  ---------
+  nthreads : number of threads (values less than one are set to one)
+*/
+void TransferScheme::setNumThreads(int nthreads) {
+  num_threads = nthreads;
+  if (num_threads < 1) {
+    num_threads = 1;
+  }
 }
 
 /*
@@ -52,6 +103,7 @@ TransferScheme::~TransferScheme() {
 */
 void TransferScheme::setAeroNodes(const F2FScalar *aero_X, int aero_nnodes) {
   na = aero_nnodes;
+  geometry_count++;
 
   // Free the aerodynamic data if any is allocated
   if (Xa) {
@@ -70,6 +122,220 @@ void TransferScheme::setAeroNodes(const F2FScalar *aero_X, int aero_nnodes) {
   } else {
     Xa = NULL;
   }
+
+  // Exchange the number of nodes on each aerodynamic processor once so that
+  // the collectives do not need to
+  if (aero_comm != MPI_COMM_NULL) {
+    int aero_nprocs;
+    MPI_Comm_size(aero_comm, &aero_nprocs);
+    if (!aero_node_counts) {
+      aero_node_counts = new int[aero_nprocs];
+      aero_node_disps = new int[aero_nprocs];
+    }
+    MPI_Allgather(&na, 1, MPI_INT, aero_node_counts, 1, MPI_INT, aero_comm);
+    aero_node_disps[0] = 0;
+    for (int proc = 1; proc < aero_nprocs; proc++) {
+      aero_node_disps[proc] =
+          aero_node_disps[proc - 1] + aero_node_counts[proc - 1];
+    }
+  }
+
+  // Compute the centroid of the aerodynamic nodes
+  memset(Xa_bar, 0, 3 * sizeof(F2FScalar));
+  for (int i = 0; i < na; i++) {
+    Xa_bar[0] += Xa[3 * i];
+    Xa_bar[1] += Xa[3 * i + 1];
+    Xa_bar[2] += Xa[3 * i + 2];
+  }
+  MPI_Allreduce(MPI_IN_PLACE, Xa_bar, 3, F2F_MPI_TYPE, MPI_SUM, global_comm);
+  if (na_global > 0) {
+    for (int k = 0; k < 3; k++) {
+      Xa_bar[k] *= 1.0 / na_global;
+    }
+  }
+}
+
+/*
+  Get the number of bytes allocated for the node locations, the
+  point-to-point communication pattern, the scratch arrays and the data used
+  to check the connectivity
+
+  Returns
+  -------
+  the number of bytes
+*/
+size_t TransferScheme::getMemoryUsage() {
+  size_t nscalars = 0, nints = 0;
+  if (Xa) {
+    nscalars += 3 * na;
+  }
+  if (Xs) {
+    nscalars += 3 * ns;
+  }
+  if (Xs_local) {
+    nscalars += 3 * ns_local;
+  }
+  if (conn_Xa) {
+    nscalars += 3 * conn_na;
+  }
+  if (conn_Xs_local) {
+    nscalars += 3 * conn_ns_local;
+  }
+  if (plan_send_counts) {
+    int size;
+    MPI_Comm_size(global_comm, &size);
+    nints += 4 * size + plan_send_disps[size - 1] + plan_send_counts[size - 1];
+  }
+  for (int k = 0; k < NUM_WORK_ARRAYS; k++) {
+    if (work[k]) {
+      nscalars += work_len[k];
+    }
+  }
+
+  return nscalars * sizeof(F2FScalar) + nints * sizeof(int);
+}
+
+/*
+  Computes the displacements of the aerodynamic surface nodes from the
+  displacements of the structural nodes
+
+  Arguments
+  ---------
+  struct_disps : structural node displacements
+
+  Returns
+  -------
+  aero_disps   : aerodynamic node displacements
+*/
+void LDTransferScheme::transferDisps(const F2FScalar *struct_disps,
+                                     F2FScalar *aero_disps) {
+  beginTransferDisps(struct_disps);
+  endTransferDisps(aero_disps);
+}
+
+/*
+  Computes the loads on the structural nodes from the loads on the
+  aerodynamic surface nodes
+
+  Arguments
+  ---------
+  aero_loads   : loads on aerodynamic surface nodes
+
+  Returns
+  -------
+  struct_loads : loads on structural nodes
+*/
+void LDTransferScheme::transferLoads(const F2FScalar *aero_loads,
+                                     F2FScalar *struct_loads) {
+  beginTransferLoads(aero_loads, struct_loads);
+  endTransferLoads();
+}
+
+/*
+  Start the displacement transfer by sending the structural displacements to
+  the processors that need them. The transfer is completed by
+  endTransferDisps, and struct_disps must not be modified until then.
+
+  Arguments
+  ---------
+  struct_disps : structural node displacements
+*/
+void LDTransferScheme::beginTransferDisps(const F2FScalar *struct_disps) {
+  // Check if struct nodes locations need to be redistributed
+  distributeStructuralMesh();
+
+  // Start copying the prescribed displacements into the displacement vector
+  structGatherBcastBegin(struct_node_dof * ns_local, struct_disps,
+                         struct_node_dof * ns, Us);
+}
+
+/*
+  Complete the displacement transfer started by beginTransferDisps
+
+  Returns
+  -------
+  aero_disps   : aerodynamic node displacements
+*/
+void LDTransferScheme::endTransferDisps(F2FScalar *aero_disps) {
+  structExchangeEnd();
+  computeAeroDisps(aero_disps);
+}
+
+/*
+  Start the load transfer by computing the loads on the global image of the
+  structural nodes and sending them to the owning processors. The transfer is
+  completed by endTransferLoads, and struct_loads must not be used until
+  then.
+
+  Arguments
+  ---------
+  aero_loads   : loads on aerodynamic surface nodes
+
+  Returns
+  -------
+  struct_loads : loads on structural nodes (valid after endTransferLoads)
+*/
+void LDTransferScheme::beginTransferLoads(const F2FScalar *aero_loads,
+                                          F2FScalar *struct_loads) {
+  // Complete any exchange that is still in progress before the scratch
+  // array is reused
+  structExchangeEnd();
+
+  // Zero struct loads
+  F2FScalar *struct_loads_global =
+      getWorkArray(STRUCT_WORK, struct_node_dof * ns);
+  memset(struct_loads_global, 0, struct_node_dof * ns * sizeof(F2FScalar));
+
+  computeStructLoads(aero_loads, struct_loads_global);
+
+  // Start distributing the structural loads
+  structAddScatterBegin(struct_node_dof * ns, struct_loads_global,
+                        struct_node_dof * ns_local, struct_loads);
+}
+
+/*
+  Complete the load transfer started by beginTransferLoads
+*/
+void LDTransferScheme::endTransferLoads() { structExchangeEnd(); }
+
+/*
+  Get the number of bytes allocated for the data stored by the load and
+  displacement transfer scheme
+
+  Returns
+  -------
+  the number of bytes
+*/
+size_t LDTransferScheme::getMemoryUsage() {
+  size_t nscalars = 0;
+  if (Us) {
+    nscalars += struct_node_dof * ns;
+  }
+  if (Fa) {
+    nscalars += 3 * na;
+  }
+
+  return TransferScheme::getMemoryUsage() + nscalars * sizeof(F2FScalar);
+}
+
+/*
+  Get the number of bytes allocated for the data stored by the thermal
+  transfer scheme
+
+  Returns
+  -------
+  the number of bytes
+*/
+size_t ThermalTransfer::getMemoryUsage() {
+  size_t nscalars = 0;
+  if (Ts) {
+    nscalars += ns;
+  }
+  if (Ha) {
+    nscalars += na;
+  }
+
+  return TransferScheme::getMemoryUsage() + nscalars * sizeof(F2FScalar);
 }
 
 /*
@@ -101,15 +367,65 @@ void TransferScheme::distributeStructuralMesh() {
 
   if (mesh_update > 0) {
     mesh_update = 0;
+    geometry_count++;
+
+    // Once the structural mesh has been localized, only update the locations
+    // of the structural nodes referenced on this processor
+    if (plan_send_counts) {
+      structPlanForward(3, Xs_local, Xs);
+      return;
+    }
 
-    // Compute the number of structural nodes on the structural root processor
+    // Exchange the number of nodes on each structural processor once so that
+    // the collectives do not need to
     if (struct_comm != MPI_COMM_NULL) {
-      MPI_Reduce(&ns_local, &ns, 1, MPI_INT, MPI_SUM, 0, struct_comm);
+      int struct_nprocs;
+      MPI_Comm_size(struct_comm, &struct_nprocs);
+      if (!struct_node_counts) {
+        struct_node_counts = new int[struct_nprocs];
+        struct_node_disps = new int[struct_nprocs];
+      }
+      MPI_Allgather(&ns_local, 1, MPI_INT, struct_node_counts, 1, MPI_INT,
+                    struct_comm);
+      struct_node_disps[0] = 0;
+      for (int proc = 1; proc < struct_nprocs; proc++) {
+        struct_node_disps[proc] =
+            struct_node_disps[proc - 1] + struct_node_counts[proc - 1];
+      }
+      ns = struct_node_disps[struct_nprocs - 1] +
+           struct_node_counts[struct_nprocs - 1];
     }
 
     // Broadcast the number of nodes across all the processors
     MPI_Bcast(&ns, 1, MPI_INT, struct_root, global_comm);
 
+    // Find where the structural nodes of each processor on global_comm are
+    // stored in the global ordering for the nonblocking collectives
+    int size;
+    MPI_Comm_size(global_comm, &size);
+    if (!struct_global_info) {
+      struct_global_info = new int[2 * size];
+    }
+    int info[2] = {0, 0};
+    if (struct_comm != MPI_COMM_NULL) {
+      int struct_rank;
+      MPI_Comm_rank(struct_comm, &struct_rank);
+      info[0] = ns_local;
+      info[1] = struct_node_disps[struct_rank];
+    }
+    MPI_Allgather(info, 2, MPI_INT, struct_global_info, 2, MPI_INT,
+                  global_comm);
+
+    // Check if the nodes are stored in the order of the ranks on global_comm
+    struct_contiguous = 1;
+    for (int proc = 0, offset = 0; proc < size; proc++) {
+      if (struct_global_info[2 * proc] > 0 &&
+          struct_global_info[2 * proc + 1] != offset) {
+        struct_contiguous = 0;
+      }
+      offset += struct_global_info[2 * proc];
+    }
+
     // Allocate memory for structural data, initialize displacement array
     if (Xs) {
       delete[] Xs;
@@ -148,6 +464,22 @@ void TransferScheme::distributeStructuralMesh() {
 */
 void TransferScheme::structAddScatter(int global_len, F2FScalar *global_data,
                                       int local_len, F2FScalar *local_data) {
+  int dof = 1;
+  if (ns > 0) {
+    dof = global_len / ns;
+  } else if (ns_local > 0) {
+    dof = local_len / ns_local;
+  }
+
+  // Send the contributions directly to the owning structural processors
+  if (plan_send_counts) {
+    structPlanReverse(dof, global_data, local_data);
+    return;
+  }
+
+  // Complete any exchange that is still in progress
+  structExchangeEnd();
+
   // Reduce values on global_comm to the struct_root processor
   int global_rank;
   MPI_Comm_rank(global_comm, &global_rank);
@@ -160,36 +492,22 @@ void TransferScheme::structAddScatter(int global_len, F2FScalar *global_data,
                struct_root, global_comm);
   }
 
-  // Scatter the values across all aero_comm processors
+  // Scatter the values across all struct_comm processors
   if (struct_comm != MPI_COMM_NULL) {
-    // Gather how many values each processor has
-    int struct_nprocs, struct_rank;
+    int struct_nprocs;
     MPI_Comm_size(struct_comm, &struct_nprocs);
-    MPI_Comm_rank(struct_comm, &struct_rank);
-
-    int *nvalues = new int[struct_nprocs];
-    memset(nvalues, 0, struct_nprocs * sizeof(int));
-
-    MPI_Gather(&local_len, 1, MPI_INT, nvalues, 1, MPI_INT, 0, struct_comm);
-
-    // Collect the values nodes on the root
-    int *disps = new int[struct_nprocs];
-    memset(disps, 0, struct_nprocs * sizeof(int));
 
-    if (struct_rank == 0) {
-      for (int proc = 0; proc < struct_nprocs; proc++) {
-        if (proc > 0) {
-          disps[proc] = disps[proc - 1] + nvalues[proc - 1];
-        }
-      }
+    // Scale the number of nodes on each processor by the values per node
+    int *nvalues = &comm_counts[0];
+    int *disps = &comm_counts[struct_nprocs];
+    for (int proc = 0; proc < struct_nprocs; proc++) {
+      nvalues[proc] = dof * struct_node_counts[proc];
+      disps[proc] = dof * struct_node_disps[proc];
     }
 
-    // Scatter from the root aero processor
+    // Scatter from the root structural processor
     MPI_Scatterv(global_data, nvalues, disps, F2F_MPI_TYPE, local_data,
                  local_len, F2F_MPI_TYPE, 0, struct_comm);
-
-    delete[] nvalues;
-    delete[] disps;
   }
 }
 
@@ -210,34 +528,37 @@ void TransferScheme::structAddScatter(int global_len, F2FScalar *global_data,
 void TransferScheme::structGatherBcast(int local_len,
                                        const F2FScalar *local_data,
                                        int global_len, F2FScalar *global_data) {
-  // Collect how many structural nodes every processor has
-  if (struct_comm != MPI_COMM_NULL) {
-    int struct_nprocs, struct_rank;
-    MPI_Comm_size(struct_comm, &struct_nprocs);
-    MPI_Comm_rank(struct_comm, &struct_rank);
+  int dof = 1;
+  if (ns > 0) {
+    dof = global_len / ns;
+  } else if (ns_local > 0) {
+    dof = local_len / ns_local;
+  }
 
-    int *nvalues = new int[struct_nprocs];
-    memset(nvalues, 0, struct_nprocs * sizeof(int));
+  // Receive only the values for the structural nodes referenced here
+  if (plan_send_counts) {
+    structPlanForward(dof, local_data, global_data);
+    return;
+  }
 
-    MPI_Gather(&local_len, 1, MPI_INT, nvalues, 1, MPI_INT, 0, struct_comm);
+  // Complete any exchange that is still in progress
+  structExchangeEnd();
 
-    // Collect the values nodes on the root
-    int *disps = new int[struct_nprocs];
-    memset(disps, 0, struct_nprocs * sizeof(int));
+  // Collect the values on the root structural processor
+  if (struct_comm != MPI_COMM_NULL) {
+    int struct_nprocs;
+    MPI_Comm_size(struct_comm, &struct_nprocs);
 
-    if (struct_rank == 0) {
-      for (int proc = 0; proc < struct_nprocs; proc++) {
-        if (proc > 0) {
-          disps[proc] = disps[proc - 1] + nvalues[proc - 1];
-        }
-      }
+    // Scale the number of nodes on each processor by the values per node
+    int *nvalues = &comm_counts[0];
+    int *disps = &comm_counts[struct_nprocs];
+    for (int proc = 0; proc < struct_nprocs; proc++) {
+      nvalues[proc] = dof * struct_node_counts[proc];
+      disps[proc] = dof * struct_node_disps[proc];
     }
 
     MPI_Gatherv(local_data, local_len, F2F_MPI_TYPE, global_data, nvalues,
                 disps, F2F_MPI_TYPE, 0, struct_comm);
-
-    delete[] nvalues;
-    delete[] disps;
   }
 
   // Broadcast the global list to all the processors
@@ -251,33 +572,23 @@ void TransferScheme::structGatherBcast(int local_len,
 void TransferScheme::aeroScatter(int global_len, F2FScalar *global_data,
                                  int local_len, F2FScalar *local_data) {
   if (aero_comm != MPI_COMM_NULL) {
-    // Collect how many nodes each aerodynamic processor has
-    int aero_nprocs, aero_rank;
+    int aero_nprocs;
     MPI_Comm_size(aero_comm, &aero_nprocs);
-    MPI_Comm_rank(aero_comm, &aero_rank);
-
-    int *nvalues = new int[aero_nprocs];
-    memset(nvalues, 0, aero_nprocs * sizeof(int));
-
-    MPI_Gather(&local_len, 1, MPI_INT, nvalues, 1, MPI_INT, 0, aero_comm);
-
-    // Collect the values nodes on the root
-    int *disps = new int[aero_nprocs];
-    memset(disps, 0, aero_nprocs * sizeof(int));
 
-    if (aero_rank == 0) {
-      for (int proc = 0; proc < aero_nprocs; proc++) {
-        if (proc > 0) {
-          disps[proc] = disps[proc - 1] + nvalues[proc - 1];
-        }
-      }
+    // Scale the number of nodes on each processor by the values per node
+    int dof = 0;
+    if (na_global > 0) {
+      dof = global_len / na_global;
+    }
+    int *nvalues = &comm_counts[0];
+    int *disps = &comm_counts[aero_nprocs];
+    for (int proc = 0; proc < aero_nprocs; proc++) {
+      nvalues[proc] = dof * aero_node_counts[proc];
+      disps[proc] = dof * aero_node_disps[proc];
     }
 
     MPI_Scatterv(global_data, nvalues, disps, F2F_MPI_TYPE, local_data,
-                 local_len, F2F_MPI_TYPE, aero_root, aero_comm);
-
-    delete[] nvalues;
-    delete[] disps;
+                 local_len, F2F_MPI_TYPE, 0, aero_comm);
   }
 }
 
@@ -287,34 +598,25 @@ void TransferScheme::aeroScatter(int global_len, F2FScalar *global_data,
 */
 void TransferScheme::aeroGatherBcast(int local_len, const F2FScalar *local_data,
                                      int global_len, F2FScalar *global_data) {
-  // Collect how many structural nodes every processor has
+  // Collect the values on the root aerodynamic processor
   if (aero_comm != MPI_COMM_NULL) {
-    int aero_nprocs, aero_rank;
+    int aero_nprocs;
     MPI_Comm_size(aero_comm, &aero_nprocs);
-    MPI_Comm_rank(aero_comm, &aero_rank);
 
-    int *nvalues = new int[aero_nprocs];
-    memset(nvalues, 0, aero_nprocs * sizeof(int));
-
-    MPI_Gather(&local_len, 1, MPI_INT, nvalues, 1, MPI_INT, 0, struct_comm);
-
-    // Collect the values nodes on the root
-    int *disps = new int[aero_nprocs];
-    memset(disps, 0, aero_nprocs * sizeof(int));
-
-    if (aero_rank == 0) {
-      for (int proc = 0; proc < aero_nprocs; proc++) {
-        if (proc > 0) {
-          disps[proc] = disps[proc - 1] + nvalues[proc - 1];
-        }
-      }
+    // Scale the number of nodes on each processor by the values per node
+    int dof = 0;
+    if (na_global > 0) {
+      dof = global_len / na_global;
+    }
+    int *nvalues = &comm_counts[0];
+    int *disps = &comm_counts[aero_nprocs];
+    for (int proc = 0; proc < aero_nprocs; proc++) {
+      nvalues[proc] = dof * aero_node_counts[proc];
+      disps[proc] = dof * aero_node_disps[proc];
     }
 
     MPI_Gatherv(local_data, local_len, F2F_MPI_TYPE, global_data, nvalues,
                 disps, F2F_MPI_TYPE, 0, aero_comm);
-
-    delete[] nvalues;
-    delete[] disps;
   }
 
   // Broadcast the global list to all the processors
@@ -322,168 +624,1293 @@ void TransferScheme::aeroGatherBcast(int local_len, const F2FScalar *local_data,
 }
 
 /*
-  Builds aerostructural connectivity through LocatePoint search, linking each
-  aerodynamic node with a specified number of nearest structural nodes
+  Replace the global image of the structural mesh with the structural nodes
+  that are referenced by the connectivity on this processor. This builds the
+  point-to-point communication pattern that is used by structGatherBcast and
+  structAddScatter for all subsequent transfers, so that no processor needs to
+  hold the full structural mesh after initialization.
+
+  The connectivity is renumbered in place so that structural node k in the
+  local image has index k and its reflected counterpart has index k + ns,
+  where ns is the number of structural nodes in the local image.
 
   Arguments
   ---------
-  isymm  : Symmetry index
-  nn     : The number of nearest neighbors
-  tol    : Symmetry plane tolerance
-
-  Returns
-  -------
-  conn   : aerostructural connectivity
+  nn    : number of structural nodes connected to each aerodynamic node
+  conn  : aerostructural connectivity (renumbered on exit)
 */
-void TransferScheme::computeAeroStructConn(int isymm, int nn, int *conn,
-                                           double tol) {
-  // Copy or duplicate and reflect the unique structural nodes
-  F2FScalar *Xs_dup = NULL;
-  int num_locate_nodes = 0;
-  int *locate_to_reflected_index = NULL;
-
-  if (isymm >= 0) {
-    Xs_dup = new F2FScalar[6 * ns];
-    memcpy(Xs_dup, Xs, 3 * ns * sizeof(F2FScalar));
+void TransferScheme::localizeStructuralMesh(int nn, int *conn) {
+  freeStructPlan();
 
-    locate_to_reflected_index = new int[ns];
+  int size, rank;
+  MPI_Comm_size(global_comm, &size);
+  MPI_Comm_rank(global_comm, &rank);
 
-    num_locate_nodes = 0;
-    for (int k = 0; k < ns; k++) {
-      if (fabs(F2FRealPart(Xs_dup[3 * k + isymm])) > tol) {
-        // Node is not on the plane of symmetry, so copy it
-        int kk = num_locate_nodes + ns;
-        memcpy(&Xs_dup[3 * kk], &Xs_dup[3 * k], 3 * sizeof(F2FScalar));
+  // Find the structural node ranges owned by each processor in global_comm.
+  // The global ordering of the nodes follows the rank ordering in struct_comm.
+  int struct_rank = -1;
+  int num_owned = 0;
+  if (struct_comm != MPI_COMM_NULL) {
+    MPI_Comm_rank(struct_comm, &struct_rank);
+    num_owned = ns_local;
+  }
+  int *struct_ranks = new int[size];
+  int *owned_counts = new int[size];
+  MPI_Allgather(&struct_rank, 1, MPI_INT, struct_ranks, 1, MPI_INT,
+                global_comm);
+  MPI_Allgather(&num_owned, 1, MPI_INT, owned_counts, 1, MPI_INT, global_comm);
 
-        // reflect the point
-        Xs_dup[3 * kk + isymm] *= -1.0;
+  int struct_size = 0;
+  for (int k = 0; k < size; k++) {
+    if (struct_ranks[k] >= 0) {
+      struct_size++;
+    }
+  }
 
-        // Record the index
-        locate_to_reflected_index[num_locate_nodes] = k + ns;
-        num_locate_nodes++;
-      }
+  // Compute the owner in global_comm and the first node of each struct rank
+  int *owner = new int[struct_size];
+  int *owner_ptr = new int[struct_size + 1];
+  for (int k = 0; k < size; k++) {
+    if (struct_ranks[k] >= 0) {
+      owner[struct_ranks[k]] = k;
+      owner_ptr[struct_ranks[k] + 1] = owned_counts[k];
     }
-    num_locate_nodes += ns;
-  } else {
-    Xs_dup = new F2FScalar[3 * ns];
-    memcpy(Xs_dup, Xs, 3 * ns * sizeof(F2FScalar));
-    num_locate_nodes = ns;
+  }
+  owner_ptr[0] = 0;
+  for (int k = 0; k < struct_size; k++) {
+    owner_ptr[k + 1] += owner_ptr[k];
   }
 
-  // Create instance of LocatePoint class to perform the following searches
-  int min_bin_size = 10;
-  LocatePoint *locator =
-      new LocatePoint(Xs_dup, num_locate_nodes, min_bin_size);
+  // Create the sorted list of unique structural nodes referenced here
+  int nconn = nn * na;
+  int *nodes = new int[nconn];
+  for (int k = 0; k < nconn; k++) {
+    nodes[k] = (conn[k] < ns ? conn[k] : conn[k] - ns);
+  }
+  qsort(nodes, nconn, sizeof(int), compare_int);
+  int nunique = 0;
+  for (int k = 0; k < nconn; k++) {
+    if (nunique == 0 || nodes[k] != nodes[nunique - 1]) {
+      nodes[nunique] = nodes[k];
+      nunique++;
+    }
+  }
 
-  // Indices of nearest nodes
-  int *indx = new int[nn];
-  F2FScalar *dist = new F2FScalar[nn];
+  // Order the local image by the global rank of the owning processor so that
+  // the received values from each processor are contiguous. Since the nodes
+  // owned by each struct rank form a contiguous range, the sorted nodes owned
+  // by each processor are contiguous as well.
+  plan_recv_counts = new int[size];
+  plan_recv_disps = new int[size];
+  memset(plan_recv_counts, 0, size * sizeof(int));
 
-  // For each aerodynamic node, copy the indices of the nearest n structural
-  // nodes into the conn array
-  for (int i = 0; i < na; i++) {
-    F2FScalar xa0[3];
-    memcpy(xa0, &Xa[3 * i], 3 * sizeof(F2FScalar));
+  int *node_start = new int[size];
+  for (int k = 0, sr = 0; k < nunique; k++) {
+    while (nodes[k] >= owner_ptr[sr + 1]) {
+      sr++;
+    }
+    if (plan_recv_counts[owner[sr]] == 0) {
+      node_start[owner[sr]] = k;
+    }
+    plan_recv_counts[owner[sr]]++;
+  }
 
-    locator->locateKClosest(nn, indx, dist, xa0);
+  plan_recv_disps[0] = 0;
+  for (int k = 1; k < size; k++) {
+    plan_recv_disps[k] = plan_recv_disps[k - 1] + plan_recv_counts[k - 1];
+  }
 
-    for (int k = 0; k < nn; k++) {
-      if (indx[k] >= ns) {
-        int kk = indx[k] - ns;
-        conn[nn * i + k] = locate_to_reflected_index[kk];
-      } else {
-        conn[nn * i + k] = indx[k];
-      }
+  // Compute the position in the local image of each sorted node and the
+  // local node number on the owning processor
+  int *image_index = new int[nunique];
+  int *request = new int[nunique];
+  for (int k = 0; k < size; k++) {
+    int sr = struct_ranks[k];
+    for (int j = 0; j < plan_recv_counts[k]; j++) {
+      int node = node_start[k] + j;
+      image_index[node] = plan_recv_disps[k] + j;
+      request[plan_recv_disps[k] + j] = nodes[node] - owner_ptr[sr];
     }
   }
 
-  // Free the duplicate array
-  delete[] Xs_dup;
+  // Exchange the requests so that each owner knows which nodes to send
+  plan_send_counts = new int[size];
+  plan_send_disps = new int[size];
+  MPI_Alltoall(plan_recv_counts, 1, MPI_INT, plan_send_counts, 1, MPI_INT,
+               global_comm);
 
-  if (locate_to_reflected_index) {
-    delete[] locate_to_reflected_index;
+  plan_send_disps[0] = 0;
+  for (int k = 1; k < size; k++) {
+    plan_send_disps[k] = plan_send_disps[k - 1] + plan_send_counts[k - 1];
   }
+  int nsend = plan_send_disps[size - 1] + plan_send_counts[size - 1];
+  plan_send_nodes = new int[nsend];
 
-  // Delete the LocatePoint object and release memory
-  delete[] indx;
-  delete[] dist;
-  delete locator;
+  MPI_Alltoallv(request, plan_recv_counts, plan_recv_disps, MPI_INT,
+                plan_send_nodes, plan_send_counts, plan_send_disps, MPI_INT,
+                global_comm);
+
+  // Renumber the connectivity in terms of the local image
+  int ns_global = ns;
+  for (int k = 0; k < nconn; k++) {
+    int node = (conn[k] < ns_global ? conn[k] : conn[k] - ns_global);
+    int *ptr = (int *)bsearch(&node, nodes, nunique, sizeof(int), compare_int);
+    int index = image_index[ptr - nodes];
+    conn[k] = (conn[k] < ns_global ? index : index + nunique);
+  }
+
+  // Replace the global structural mesh with the local image
+  ns = nunique;
+  if (Xs) {
+    delete[] Xs;
+  }
+  Xs = new F2FScalar[3 * ns];
+  structPlanForward(3, Xs_local, Xs);
+
+  delete[] struct_ranks;
+  delete[] owned_counts;
+  delete[] owner;
+  delete[] owner_ptr;
+  delete[] nodes;
+  delete[] node_start;
+  delete[] image_index;
+  delete[] request;
 }
 
 /*
-  Computes weights of structural nodes
+  Free the point-to-point communication pattern for the distributed mesh
+*/
+void TransferScheme::freeStructPlan() {
+  if (plan_send_counts) {
+    delete[] plan_send_counts;
+    delete[] plan_send_disps;
+    delete[] plan_send_nodes;
+    delete[] plan_recv_counts;
+    delete[] plan_recv_disps;
+  }
+  plan_send_counts = NULL;
+  plan_send_disps = NULL;
+  plan_send_nodes = NULL;
+  plan_recv_counts = NULL;
+  plan_recv_disps = NULL;
+}
+
+/*
+  Send the values of the locally owned structural nodes to the processors
+  that reference them
 
   Arguments
   ---------
-  beta   : Exponential factor
-  isymm  : Symmetry index
-  nn     : The number of nearest neighbors
-  conn   : Connectivity array aero nodes -> structural nodes
-  tol    : Symmetry plane tolerance
+  dof        : number of values per structural node
+  local_data : values on the locally owned structural nodes
 
-  Returns
-  --------
-  W : weights
+  Output
+  ------
+  image_data : values on the structural nodes in the local image
+*/
+void TransferScheme::structPlanForward(int dof, const F2FScalar *local_data,
+                                       F2FScalar *image_data) {
+  structPlanForwardBegin(dof, local_data, image_data);
+  structExchangeEnd();
+}
+
+/*
+  Send the contributions to the structural nodes in the local image back to
+  the owning processors and add them together
+
+  Arguments
+  ---------
+  dof        : number of values per structural node
+  image_data : contributions on the structural nodes in the local image
+
+  Output
+  ------
+  local_data : summed values on the locally owned structural nodes
+*/
+void TransferScheme::structPlanReverse(int dof, const F2FScalar *image_data,
+                                       F2FScalar *local_data) {
+  structPlanReverseBegin(dof, image_data, local_data);
+  structExchangeEnd();
+}
+
+/*
+  Start sending the values of the locally owned structural nodes to the
+  processors that reference them. The exchange is completed by
+  structExchangeEnd.
+*/
+void TransferScheme::structPlanForwardBegin(int dof,
+                                            const F2FScalar *local_data,
+                                            F2FScalar *image_data) {
+  // Complete any exchange that is still in progress
+  structExchangeEnd();
+
+  int size;
+  MPI_Comm_size(global_comm, &size);
+
+  int *send_counts = &comm_counts[4 * size];
+  int *send_disps = &comm_counts[5 * size];
+  int *recv_counts = &comm_counts[6 * size];
+  int *recv_disps = &comm_counts[7 * size];
+  for (int k = 0; k < size; k++) {
+    send_counts[k] = dof * plan_send_counts[k];
+    send_disps[k] = dof * plan_send_disps[k];
+    recv_counts[k] = dof * plan_recv_counts[k];
+    recv_disps[k] = dof * plan_recv_disps[k];
+  }
+
+  // Pack the values requested by the other processors
+  int nsend = plan_send_disps[size - 1] + plan_send_counts[size - 1];
+  F2FScalar *send_buf = getWorkArray(COMM_WORK, dof * nsend);
+  for (int k = 0; k < nsend; k++) {
+    memcpy(&send_buf[dof * k], &local_data[dof * plan_send_nodes[k]],
+           dof * sizeof(F2FScalar));
+  }
+
+  MPI_Ialltoallv(send_buf, send_counts, send_disps, F2F_MPI_TYPE, image_data,
+                 recv_counts, recv_disps, F2F_MPI_TYPE, global_comm,
+                 &exchange_request);
+}
+
+/*
+  Start sending the contributions to the structural nodes in the local image
+  back to the owning processors. The contributions are added together by
+  structExchangeEnd.
+*/
+void TransferScheme::structPlanReverseBegin(int dof,
+                                            const F2FScalar *image_data,
+                                            F2FScalar *local_data) {
+  // Complete any exchange that is still in progress
+  structExchangeEnd();
+
+  int size;
+  MPI_Comm_size(global_comm, &size);
+
+  int *send_counts = &comm_counts[4 * size];
+  int *send_disps = &comm_counts[5 * size];
+  int *recv_counts = &comm_counts[6 * size];
+  int *recv_disps = &comm_counts[7 * size];
+  for (int k = 0; k < size; k++) {
+    send_counts[k] = dof * plan_send_counts[k];
+    send_disps[k] = dof * plan_send_disps[k];
+    recv_counts[k] = dof * plan_recv_counts[k];
+    recv_disps[k] = dof * plan_recv_disps[k];
+  }
+
+  int nsend = plan_send_disps[size - 1] + plan_send_counts[size - 1];
+  F2FScalar *send_buf = getWorkArray(COMM_WORK, dof * nsend);
+
+  MPI_Ialltoallv(image_data, recv_counts, recv_disps, F2F_MPI_TYPE, send_buf,
+                 send_counts, send_disps, F2F_MPI_TYPE, global_comm,
+                 &exchange_request);
+
+  // Record where the contributions are added once they arrive
+  exchange_dof = dof;
+  exchange_local = local_data;
+}
+
+/*
+  Start gathering the local structural values and broadcasting them to all
+  processors. This is the nonblocking version of structGatherBcast, and is
+  completed by structExchangeEnd. Neither array may be used until then.
+
+  Arguments
+  ---------
+  local_len    : local length of distributed structural data
+  local_data   : local distributed array of data
+  global_len   : global length of the data
+
+  Output
+  ------
+  global_data  : global array of the structural data
+*/
+void TransferScheme::structGatherBcastBegin(int local_len,
+                                            const F2FScalar *local_data,
+                                            int global_len,
+                                            F2FScalar *global_data) {
+  // Complete any exchange that is still in progress
+  structExchangeEnd();
+
+  int dof = 1;
+  if (ns > 0) {
+    dof = global_len / ns;
+  } else if (ns_local > 0) {
+    dof = local_len / ns_local;
+  }
+
+  if (plan_send_counts) {
+    structPlanForwardBegin(dof, local_data, global_data);
+    return;
+  }
+
+  // Gather the values from the structural processors in a single collective
+  // on global_comm
+  int size;
+  MPI_Comm_size(global_comm, &size);
+  int *nvalues = &comm_counts[4 * size];
+  int *disps = &comm_counts[5 * size];
+  for (int proc = 0; proc < size; proc++) {
+    nvalues[proc] = dof * struct_global_info[2 * proc];
+    disps[proc] = dof * struct_global_info[2 * proc + 1];
+  }
+
+  MPI_Iallgatherv(local_data, local_len, F2F_MPI_TYPE, global_data, nvalues,
+                  disps, F2F_MPI_TYPE, global_comm, &exchange_request);
+}
+
+/*
+  Start adding the structural values from all processors and scattering them
+  to the structures. This is the nonblocking version of structAddScatter, and
+  is completed by structExchangeEnd. Neither array may be used until then.
+
+  When the structural nodes are not stored in the order of the ranks on
+  global_comm, the values cannot be summed with a single reduce-scatter and
+  the blocking version is used instead.
+
+  Arguments
+  ---------
+  global_len   : length of structural data (same on all struct_comm)
+  global_data  : array of the structural data (to be added together)
+  local_len    : local length of distributed structural data
+
+  Output
+  ------
+  local_data   : local added/scattered data
+*/
+void TransferScheme::structAddScatterBegin(int global_len,
+                                           F2FScalar *global_data,
+                                           int local_len,
+                                           F2FScalar *local_data) {
+  // Complete any exchange that is still in progress
+  structExchangeEnd();
+
+  int dof = 1;
+  if (ns > 0) {
+    dof = global_len / ns;
+  } else if (ns_local > 0) {
+    dof = local_len / ns_local;
+  }
+
+  if (plan_send_counts) {
+    structPlanReverseBegin(dof, global_data, local_data);
+    return;
+  }
+
+  if (!struct_contiguous) {
+    structAddScatter(global_len, global_data, local_len, local_data);
+    return;
+  }
+
+  int size;
+  MPI_Comm_size(global_comm, &size);
+  int *nvalues = &comm_counts[4 * size];
+  for (int proc = 0; proc < size; proc++) {
+    nvalues[proc] = dof * struct_global_info[2 * proc];
+  }
+
+  MPI_Ireduce_scatter(global_data, local_data, nvalues, F2F_MPI_TYPE, MPI_SUM,
+                      global_comm, &exchange_request);
+}
+
+/*
+  Complete the exchange started by structGatherBcastBegin or
+  structAddScatterBegin. This does nothing if there is no exchange in
+  progress.
+*/
+void TransferScheme::structExchangeEnd() {
+  MPI_Wait(&exchange_request, MPI_STATUS_IGNORE);
+
+  // Add the contributions from all processors to the owned nodes
+  if (exchange_local) {
+    int size;
+    MPI_Comm_size(global_comm, &size);
+    int nsend = plan_send_disps[size - 1] + plan_send_counts[size - 1];
+    const F2FScalar *recv_buf = work[COMM_WORK];
+
+    memset(exchange_local, 0, exchange_dof * ns_local * sizeof(F2FScalar));
+    for (int k = 0; k < nsend; k++) {
+      for (int j = 0; j < exchange_dof; j++) {
+        exchange_local[exchange_dof * plan_send_nodes[k] + j] +=
+            recv_buf[exchange_dof * k + j];
+      }
+    }
+    exchange_local = NULL;
+  }
+}
+
+/*
+  Get one of the scratch arrays that are kept between transfers. The array
+  is only reallocated when a longer one is requested, so repeated transfers
+  do not allocate any memory. The contents are not preserved.
+
+  Arguments
+  ---------
+  k   : index of the scratch array
+  len : required length of the array
+
+  Returns
+  -------
+  the scratch array
+*/
+F2FScalar *TransferScheme::getWorkArray(int k, int len) {
+  if (len > work_len[k] || !work[k]) {
+    if (work[k]) {
+      delete[] work[k];
+    }
+    if (len < 1) {
+      len = 1;
+    }
+    work_len[k] = len;
+    work[k] = new F2FScalar[len];
+  }
+  return work[k];
+}
+
+/*
+  Builds aerostructural connectivity through LocatePoint search, linking each
+  aerodynamic node with a specified number of nearest structural nodes
+
+  Arguments
+  ---------
+  isymm  : Symmetry index
+  nn     : The number of nearest neighbors
+  tol    : Symmetry plane tolerance
+
+  Returns
+  -------
+  conn   : aerostructural connectivity
+*/
+void TransferScheme::computeAeroStructConn(int isymm, int nn, int *conn,
+                                           double tol) {
+  // Use the connectivity read from a restart file in place of the search
+  if (restart_conn) {
+    const int *rconn = restart_conn;
+    restart_conn = NULL;
+    if (restart_nn == nn) {
+      memcpy(conn, rconn, nn * na * sizeof(int));
+      conn_gap = restart_gap;
+      recordConnNodes();
+      return;
+    }
+    restart_W = NULL;
+  }
+
+  // Copy or duplicate and reflect the unique structural nodes
+  F2FScalar *Xs_dup = NULL;
+  int num_locate_nodes = 0;
+  int *locate_to_reflected_index = NULL;
+
+  if (isymm >= 0) {
+    Xs_dup = new F2FScalar[6 * ns];
+    memcpy(Xs_dup, Xs, 3 * ns * sizeof(F2FScalar));
+
+    locate_to_reflected_index = new int[ns];
+
+    num_locate_nodes = 0;
+    for (int k = 0; k < ns; k++) {
+      if (fabs(F2FRealPart(Xs_dup[3 * k + isymm])) > tol) {
+        // Node is not on the plane of symmetry, so copy it
+        int kk = num_locate_nodes + ns;
+        memcpy(&Xs_dup[3 * kk], &Xs_dup[3 * k], 3 * sizeof(F2FScalar));
+
+        // reflect the point
+        Xs_dup[3 * kk + isymm] *= -1.0;
+
+        // Record the index
+        locate_to_reflected_index[num_locate_nodes] = k + ns;
+        num_locate_nodes++;
+      }
+    }
+    num_locate_nodes += ns;
+  } else {
+    Xs_dup = new F2FScalar[3 * ns];
+    memcpy(Xs_dup, Xs, 3 * ns * sizeof(F2FScalar));
+    num_locate_nodes = ns;
+  }
+
+  // Create instance of LocatePoint class to perform the following searches
+  int min_bin_size = 10;
+  LocatePoint *locator =
+      new LocatePoint(Xs_dup, num_locate_nodes, min_bin_size);
+
+  // Find the nearest n + 1 structural nodes for all the aerodynamic nodes at
+  // once. The extra node gives the distance to the nearest structural node
+  // that is not connected.
+  int nsearch = nn;
+  if (nn < num_locate_nodes) {
+    nsearch = nn + 1;
+  }
+  int *indx = new int[nsearch * na];
+  F2FScalar *dist = new F2FScalar[nsearch * na];
+  locator->locateKClosestBatch(nsearch, na, Xa, indx, dist, num_threads);
+
+  // Copy the indices into the conn array, converting the indices of the
+  // reflected nodes
+  conn_gap = 1e300;
+  for (int i = 0; i < na; i++) {
+    for (int k = 0; k < nn; k++) {
+      int n = indx[nsearch * i + k];
+      if (n >= ns) {
+        conn[nn * i + k] = locate_to_reflected_index[n - ns];
+      } else {
+        conn[nn * i + k] = n;
+      }
+    }
+
+    // Find the smallest separation between the farthest connected node and
+    // the nearest unconnected node
+    if (nsearch > nn) {
+      double gap = sqrt(F2FRealPart(dist[nsearch * i + nn])) -
+                   sqrt(F2FRealPart(dist[nsearch * i + nn - 1]));
+      if (gap < conn_gap) {
+        conn_gap = gap;
+      }
+    }
+  }
+
+  // Record the node locations used to compute the connectivity
+  recordConnNodes();
+
+  // Free the duplicate array
+  delete[] Xs_dup;
+
+  if (locate_to_reflected_index) {
+    delete[] locate_to_reflected_index;
+  }
+
+  // Delete the LocatePoint object and release memory
+  delete[] indx;
+  delete[] dist;
+  delete locator;
+}
+
+/*
+  Record the node locations used to compute the connectivity
+*/
+void TransferScheme::recordConnNodes() {
+  if (conn_Xa) {
+    delete[] conn_Xa;
+  }
+  if (conn_Xs_local) {
+    delete[] conn_Xs_local;
+  }
+  conn_na = na;
+  conn_ns_local = ns_local;
+  conn_Xa = new F2FScalar[3 * na];
+  memcpy(conn_Xa, Xa, 3 * na * sizeof(F2FScalar));
+  conn_Xs_local = new F2FScalar[3 * ns_local];
+  memcpy(conn_Xs_local, Xs_local, 3 * ns_local * sizeof(F2FScalar));
+}
+
+/*
+  Record the current node locations as the ones used to compute the
+  connectivity. The separation is reduced by twice the largest distances
+  moved by the aerodynamic and structural nodes since the connectivity was
+  computed, so that checkAeroStructConn remains conservative. This must be
+  called on all processors in global_comm.
+*/
+void TransferScheme::rebaseAeroStructConn() {
+  int valid = (conn_na == na && conn_ns_local == ns_local);
+  double values[2] = {0.0, 0.0};
+  if (valid) {
+    for (int i = 0; i < na; i++) {
+      F2FScalar d[3];
+      vec_diff(&conn_Xa[3 * i], &Xa[3 * i], d);
+      double dist = sqrt(F2FRealPart(vec_dot(d, d)));
+      if (dist > values[0]) {
+        values[0] = dist;
+      }
+    }
+    for (int i = 0; i < ns_local; i++) {
+      F2FScalar d[3];
+      vec_diff(&conn_Xs_local[3 * i], &Xs_local[3 * i], d);
+      double dist = sqrt(F2FRealPart(vec_dot(d, d)));
+      if (dist > values[1]) {
+        values[1] = dist;
+      }
+    }
+  }
+
+  MPI_Allreduce(MPI_IN_PLACE, &valid, 1, MPI_INT, MPI_MIN, global_comm);
+  MPI_Allreduce(MPI_IN_PLACE, values, 2, MPI_DOUBLE, MPI_MAX, global_comm);
+
+  if (valid) {
+    conn_gap -= 2.0 * (values[0] + values[1]);
+    recordConnNodes();
+  }
+}
+
+/*
+  Check whether the connectivity computed by the last call to
+  computeAeroStructConn is still valid for the current node locations.
+
+  The distance between any pair of nodes changes by at most da + ds, where da
+  and ds are the largest distances moved by any aerodynamic and structural
+  node. The set of nearest structural nodes for each aerodynamic node is
+  therefore unchanged when 2 * (da + ds) is smaller than the separation
+  between the farthest connected node and the nearest unconnected node. This
+  must be called on all processors in global_comm.
+
+  Arguments
+  ---------
+  isymm  : Symmetry index
+  tol    : Symmetry plane tolerance
+
+  Returns
+  -------
+  1 if the connectivity is valid on all processors, 0 otherwise
+*/
+int TransferScheme::checkAeroStructConn(int isymm, double tol) {
+  // Flag, the largest distances moved and the negative of the separation
+  double values[4] = {0.0, 0.0, 0.0, -conn_gap};
+
+  if (conn_na != na || conn_ns_local != ns_local) {
+    values[0] = 1.0;
+  } else {
+    for (int i = 0; i < na; i++) {
+      F2FScalar d[3];
+      vec_diff(&conn_Xa[3 * i], &Xa[3 * i], d);
+      double dist = sqrt(F2FRealPart(vec_dot(d, d)));
+      if (dist > values[1]) {
+        values[1] = dist;
+      }
+    }
+
+    for (int i = 0; i < ns_local; i++) {
+      F2FScalar d[3];
+      vec_diff(&conn_Xs_local[3 * i], &Xs_local[3 * i], d);
+      double dist = sqrt(F2FRealPart(vec_dot(d, d)));
+      if (dist > values[2]) {
+        values[2] = dist;
+      }
+
+      // Nodes that cross the symmetry plane tolerance change the set of
+      // reflected nodes
+      if (isymm >= 0) {
+        int off_plane = fabs(F2FRealPart(conn_Xs_local[3 * i + isymm])) > tol;
+        int now_off_plane = fabs(F2FRealPart(Xs_local[3 * i + isymm])) > tol;
+        if (off_plane != now_off_plane) {
+          values[0] = 1.0;
+        }
+      }
+    }
+  }
+
+  MPI_Allreduce(MPI_IN_PLACE, values, 4, MPI_DOUBLE, MPI_MAX, global_comm);
+
+  if (values[0] > 0.0) {
+    return 0;
+  }
+
+  double gap = -values[3];
+  return (2.0 * (values[1] + values[2]) < gap);
+}
+
+/*
+  Computes weights of structural nodes
+
+  Arguments
+  ---------
+  beta   : Exponential factor
+  isymm  : Symmetry index
+  nn     : The number of nearest neighbors
+  conn   : Connectivity array aero nodes -> structural nodes
+  tol    : Symmetry plane tolerance
+
+  Returns
+  --------
+  W : weights
 */
 void TransferScheme::computeWeights(double beta, int isymm, int nn,
                                     const int *conn, F2FScalar *W, double tol) {
+  // Use the weights read from a restart file with the connectivity
+  if (restart_W) {
+    memcpy(W, restart_W, nn * na * sizeof(F2FScalar));
+    restart_W = NULL;
+    weights_real = isRealValued(nn * na, W);
+    return;
+  }
+
   for (int i = 0; i < na; i++) {
     const F2FScalar *xa0 = &Xa[3 * i];
     const int *local_conn = &conn[i * nn];
     F2FScalar *w = &W[i * nn];
 
-    // Compute the weights based on the difference between the aerodynamic
-    // point location and the local undeformed structural point
-    F2FScalar wtotal = 0.0;
-    F2FScalar v[3];
+    // Compute the weights based on the difference between the aerodynamic
+    // point location and the local undeformed structural point
+    F2FScalar wtotal = 0.0;
+    F2FScalar v[3];
+
+    // Find the average squared distance for normalization
+    F2FScalar v2_avg = 0.0;
+
+    for (int j = 0; j < nn; j++) {
+      if (local_conn[j] < ns) {
+        const F2FScalar *xs0 = &Xs[3 * local_conn[j]];
+        vec_diff(xs0, xa0, v);
+      } else {
+        F2FScalar rxs0[3];  // Reflected xs0
+        memcpy(rxs0, &Xs[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
+        rxs0[isymm] *= -1.0;
+        vec_diff(rxs0, xa0, v);
+      }
+      v2_avg += vec_dot(v, v) / (1.0 * nn);
+    }
+
+    // Make sure we don't divide by zero
+    if (F2FRealPart(v2_avg) < tol) {
+      v2_avg = tol;
+    }
+
+    for (int j = 0; j < nn; j++) {
+      if (local_conn[j] < ns) {
+        const F2FScalar *xs0 = &Xs[3 * local_conn[j]];
+        vec_diff(xs0, xa0, v);
+      } else {
+        F2FScalar rxs0[3];  // Reflected xs0
+        memcpy(rxs0, &Xs[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
+        rxs0[isymm] *= -1.0;
+        vec_diff(rxs0, xa0, v);
+      }
+      w[j] = exp(-beta * vec_dot(v, v) / v2_avg);
+      wtotal += w[j];
+    }
+
+    // Normalize the weights
+    wtotal = 1.0 / wtotal;
+    for (int j = 0; j < nn; j++) {
+      w[j] *= wtotal;
+    }
+  }
+
+  // Record if the weights carry a complex perturbation
+  weights_real = isRealValued(nn * na, W);
+}
+
+/*
+  Compute the nonzero pattern of the sparse matrix that maps the structural
+  nodes to the aerodynamic nodes through the connectivity. Each row
+  corresponds to an aerodynamic node and each column to a structural node in
+  Xs. A structural node that is linked to an aerodynamic node more than once,
+  for instance together with its reflection across the symmetry plane, is
+  stored once in the row.
+
+  Arguments
+  ---------
+  nn    : number of structural nodes linked to each aerodynamic node
+  conn  : aerostructural connectivity
+
+  Returns
+  -------
+  rowp  : offset of each row into cols (length na + 1)
+  cols  : structural node of each nonzero entry (length at most nn*na)
+  entry : nonzero entry that each link in the connectivity contributes to
+*/
+void TransferScheme::computeTransferPattern(int nn, const int *conn, int *rowp,
+                                            int *cols, int *entry) {
+  // Position of each structural node in the current row (or -1)
+  int *marker = new int[ns > 0 ? ns : 1];
+  for (int j = 0; j < ns; j++) {
+    marker[j] = -1;
+  }
+
+  rowp[0] = 0;
+  for (int i = 0; i < na; i++) {
+    int nnz = rowp[i];
+    for (int j = 0; j < nn; j++) {
+      int indx = conn[nn * i + j];
+      if (indx >= ns) {
+        indx -= ns;
+      }
+      if (marker[indx] < 0) {
+        marker[indx] = nnz;
+        cols[nnz] = indx;
+        nnz++;
+      }
+      entry[nn * i + j] = marker[indx];
+    }
+    rowp[i + 1] = nnz;
+
+    // Reset the markers for the next row
+    for (int k = rowp[i]; k < nnz; k++) {
+      marker[cols[k]] = -1;
+    }
+  }
+
+  delete[] marker;
+}
+
+// Magic string and version at the start of a restart file
+static const char STATE_MAGIC[8] = {'F', '2', 'F', 'S', 'T', 'A', 'T', 'E'};
+static const int32_t STATE_VERSION = 1;
+
+// Largest number of bytes read or written by a processor in one call
+static const uint64_t STATE_CHUNK_SIZE = 1 << 30;
+
+/*
+  Write or read the state of each processor with collective calls, in chunks
+  so that the counts fit in an int
+
+  Arguments
+  ---------
+  fh     : the open file
+  comm   : the communicator of the file
+  write  : flag to write (or read) the bytes
+  offset : offset of the state of this processor in the file
+  buffer : the state of this processor
+  len    : number of bytes of the state of this processor
+
+  Returns
+  -------
+  1 if the bytes were not all written or read, 0 otherwise
+*/
+static int accessStateBytes(MPI_File fh, MPI_Comm comm, int write,
+                            MPI_Offset offset, char *buffer, uint64_t len) {
+  uint64_t nchunks = (len + STATE_CHUNK_SIZE - 1) / STATE_CHUNK_SIZE;
+  MPI_Allreduce(MPI_IN_PLACE, &nchunks, 1, MPI_UINT64_T, MPI_MAX, comm);
+
+  int fail = 0;
+  for (uint64_t k = 0; k < nchunks; k++) {
+    uint64_t start = k * STATE_CHUNK_SIZE;
+    int count = 0;
+    if (start < len) {
+      count = (int)(len - start < STATE_CHUNK_SIZE ? len - start
+                                                   : STATE_CHUNK_SIZE);
+    } else {
+      start = 0;
+    }
+
+    MPI_Status status;
+    int err, nbytes = 0;
+    if (write) {
+      err = MPI_File_write_at_all(fh, offset + start, &buffer[start], count,
+                                  MPI_BYTE, &status);
+    } else {
+      err = MPI_File_read_at_all(fh, offset + start, &buffer[start], count,
+                                 MPI_BYTE, &status);
+    }
+    if (err == MPI_SUCCESS) {
+      MPI_Get_count(&status, MPI_BYTE, &nbytes);
+    }
+    if (err != MPI_SUCCESS || nbytes != count) {
+      fail = 1;
+    }
+  }
+
+  return fail;
+}
+
+/*
+  Add bytes to a 64-bit FNV-1a hash
+
+  Arguments
+  ---------
+  key  : the hash of the previous bytes
+  data : the bytes
+  len  : number of bytes
+
+  Returns
+  -------
+  the hash including the bytes
+*/
+uint64_t TransferScheme::hashBytes(uint64_t key, const void *data, size_t len) {
+  const unsigned char *bytes = static_cast<const unsigned char *>(data);
+  for (size_t i = 0; i < len; i++) {
+    key ^= bytes[i];
+    key *= 0x100000001b3ULL;
+  }
+  return key;
+}
+
+/*
+  Compute the key of the restart state on this processor from the layout of
+  the processors, the node locations and the options of the scheme. This must
+  be called on all processors in global_comm.
+
+  Returns
+  -------
+  the key of the state on this processor
+*/
+uint64_t TransferScheme::computeStateKey() {
+  // Gather the structural mesh so that ns is the global number of nodes
+  distributeStructuralMesh();
+
+  int size, rank;
+  MPI_Comm_size(global_comm, &size);
+  MPI_Comm_rank(global_comm, &rank);
+
+  int sizes[7] = {(int)sizeof(F2FScalar), size, rank,    struct_node_dof,
+                  aero_node_dof,          na,   ns_local};
+  uint64_t key = 0xcbf29ce484222325ULL;
+  key = hashBytes(key, STATE_MAGIC, sizeof(STATE_MAGIC));
+  key = hashBytes(key, sizes, sizeof(sizes));
+  key = hashBytes(key, &ns, sizeof(ns));
+  key = hashBytes(key, Xa, 3 * na * sizeof(F2FScalar));
+  key = hashBytes(key, Xs_local, 3 * ns_local * sizeof(F2FScalar));
+
+  return hashStateOptions(key);
+}
+
+/*
+  Save the data computed by initialize() to a restart file. The file starts
+  with a header that is followed by the key, offset and size of the state of
+  each processor, and then the states in rank order. The file is written with
+  MPI-IO, so this must be called on all processors in global_comm.
+
+  Arguments
+  ---------
+  filename : name of the restart file
+
+  Returns
+  -------
+  1 if the file was written, 0 if the scheme has no state or the file could
+  not be written
+*/
+int TransferScheme::saveState(const char *filename) {
+  int size, rank;
+  MPI_Comm_size(global_comm, &size);
+  MPI_Comm_rank(global_comm, &rank);
+
+  uint64_t key = computeStateKey();
+
+  // Make the separation of the connectivity relative to the current nodes
+  rebaseAeroStructConn();
+
+  uint64_t len = getStateSize();
+  uint64_t max_len = 0;
+  MPI_Allreduce(&len, &max_len, 1, MPI_UINT64_T, MPI_MAX, global_comm);
+  if (max_len == 0) {
+    return 0;
+  }
+
+  char *buffer = new char[len > 0 ? len : 1];
+  if (len > 0) {
+    writeState(buffer);
+  }
+
+  // Compute the offset of the state of this processor in the file
+  uint64_t offset = 0;
+  MPI_Exscan(&len, &offset, 1, MPI_UINT64_T, MPI_SUM, global_comm);
+  if (rank == 0) {
+    offset = 0;
+  }
+  offset += 16 + 24 * (uint64_t)size;
+
+  MPI_File fh;
+  int opened = (MPI_File_open(global_comm, (char *)filename,
+                              MPI_MODE_WRONLY | MPI_MODE_CREATE, MPI_INFO_NULL,
+                              &fh) == MPI_SUCCESS);
+  int fail = !opened;
+  MPI_Allreduce(MPI_IN_PLACE, &fail, 1, MPI_INT, MPI_MAX, global_comm);
+
+  if (!fail) {
+    MPI_File_set_size(fh, 0);
+
+    // Write the header from the root and the table entry of each processor
+    char header[16];
+    int32_t info[2] = {STATE_VERSION, (int32_t)size};
+    memcpy(header, STATE_MAGIC, 8);
+    memcpy(&header[8], info, 8);
+    uint64_t entry[3] = {key, offset, len};
+
+    MPI_Status status;
+    if (MPI_File_write_at_all(fh, 0, header, (rank == 0 ? 16 : 0), MPI_BYTE,
+                              &status) != MPI_SUCCESS) {
+      fail = 1;
+    }
+    if (MPI_File_write_at_all(fh, 16 + 24 * (MPI_Offset)rank, entry, 24,
+                              MPI_BYTE, &status) != MPI_SUCCESS) {
+      fail = 1;
+    }
+    if (accessStateBytes(fh, global_comm, 1, offset, buffer, len)) {
+      fail = 1;
+    }
+  }
+  if (opened) {
+    MPI_File_close(&fh);
+  }
+  delete[] buffer;
+
+  MPI_Allreduce(MPI_IN_PLACE, &fail, 1, MPI_INT, MPI_MAX, global_comm);
+
+  return !fail;
+}
+
+/*
+  Initialize the scheme from a restart file written by saveState. The file
+  is only used if it was written with the same number of processors and the
+  key of the state on every processor matches the current node locations and
+  options. Otherwise the scheme is not changed and initialize() must be
+  called instead. This must be called on all processors in global_comm.
+
+  Arguments
+  ---------
+  filename : name of the restart file
+
+  Returns
+  -------
+  1 if the scheme was initialized from the file, 0 otherwise
+*/
+int TransferScheme::loadState(const char *filename) {
+  int size, rank;
+  MPI_Comm_size(global_comm, &size);
+  MPI_Comm_rank(global_comm, &rank);
+
+  uint64_t key = computeStateKey();
+
+  MPI_File fh;
+  int opened = (MPI_File_open(global_comm, (char *)filename, MPI_MODE_RDONLY,
+                              MPI_INFO_NULL, &fh) == MPI_SUCCESS);
+  int match = opened;
+  MPI_Allreduce(MPI_IN_PLACE, &match, 1, MPI_INT, MPI_MIN, global_comm);
+
+  // Check the header and the key of the state of this processor
+  uint64_t entry[3] = {0, 0, 0};
+  if (match) {
+    char header[16];
+    int32_t info[2];
+    MPI_Status status;
+    int nbytes = 0;
+    if (MPI_File_read_at_all(fh, 0, header, 16, MPI_BYTE, &status) ==
+        MPI_SUCCESS) {
+      MPI_Get_count(&status, MPI_BYTE, &nbytes);
+    }
+    memcpy(info, &header[8], 8);
+    if (nbytes != 16 || memcmp(header, STATE_MAGIC, 8) != 0 ||
+        info[0] != STATE_VERSION || info[1] != size) {
+      match = 0;
+    }
+    MPI_Allreduce(MPI_IN_PLACE, &match, 1, MPI_INT, MPI_MIN, global_comm);
+  }
+  if (match) {
+    MPI_Status status;
+    int nbytes = 0;
+    if (MPI_File_read_at_all(fh, 16 + 24 * (MPI_Offset)rank, entry, 24,
+                             MPI_BYTE, &status) == MPI_SUCCESS) {
+      MPI_Get_count(&status, MPI_BYTE, &nbytes);
+    }
+    if (nbytes != 24 || entry[0] != key) {
+      match = 0;
+    }
+    MPI_Allreduce(MPI_IN_PLACE, &match, 1, MPI_INT, MPI_MIN, global_comm);
+  }
+
+  // Read and check the state of this processor
+  char *buffer = NULL;
+  if (match) {
+    uint64_t len = entry[2];
+    buffer = new char[len > 0 ? len : 1];
+    if (accessStateBytes(fh, global_comm, 0, entry[1], buffer, len) ||
+        !readState(buffer, len)) {
+      match = 0;
+    }
+    MPI_Allreduce(MPI_IN_PLACE, &match, 1, MPI_INT, MPI_MIN, global_comm);
+  }
+  if (opened) {
+    MPI_File_close(&fh);
+  }
+
+  // Initialize the scheme with the state in place of the setup
+  if (match) {
+    initialize();
+  }
+  restart_conn = NULL;
+  restart_W = NULL;
+  clearState();
+  if (buffer) {
+    delete[] buffer;
+  }
+
+  return match;
+}
+
+/*
+  Get the number of bytes of the restart state of a scheme that is set up
+  with computeAeroStructConn and computeWeights
+
+  Arguments
+  ---------
+  nn : number of structural nodes linked to each aerodynamic node
+
+  Returns
+  -------
+  the number of bytes
+*/
+size_t TransferScheme::getConnStateSize(int nn) {
+  return 16 + (size_t)nn * na * (sizeof(F2FScalar) + sizeof(int));
+}
+
+/*
+  Pack the connectivity and the weights into the restart state
+
+  Arguments
+  ---------
+  nn     : number of structural nodes linked to each aerodynamic node
+  conn   : aerostructural connectivity
+  W      : weights
+
+  Returns
+  -------
+  buffer : the restart state (of length getConnStateSize(nn))
+*/
+void TransferScheme::writeConnState(int nn, const int *conn, const F2FScalar *W,
+                                    char *buffer) {
+  int32_t sizes[2] = {nn, na};
+  memcpy(buffer, sizes, 8);
+  memcpy(&buffer[8], &conn_gap, 8);
+
+  // Store the weights first so that they are aligned
+  size_t len = (size_t)nn * na;
+  memcpy(&buffer[16], W, len * sizeof(F2FScalar));
+  memcpy(&buffer[16 + len * sizeof(F2FScalar)], conn, len * sizeof(int));
+}
+
+/*
+  Check the connectivity and the weights in a restart state and keep them
+  for the following calls to computeAeroStructConn and computeWeights
+
+  Arguments
+  ---------
+  buffer : the restart state
+  size   : number of bytes of the restart state
+
+  Returns
+  -------
+  1 if the state is valid, 0 otherwise
+*/
+int TransferScheme::readConnState(const char *buffer, size_t size) {
+  if (struct_distributed || size < 16) {
+    return 0;
+  }
+
+  int32_t sizes[2];
+  memcpy(sizes, buffer, 8);
+  if (sizes[0] < 0 || sizes[1] != na || size != getConnStateSize(sizes[0])) {
+    return 0;
+  }
+
+  size_t len = (size_t)sizes[0] * na;
+  restart_nn = sizes[0];
+  memcpy(&restart_gap, &buffer[8], 8);
+  restart_W = reinterpret_cast<const F2FScalar *>(&buffer[16]);
+  restart_conn =
+      reinterpret_cast<const int *>(&buffer[16 + len * sizeof(F2FScalar)]);
+
+  return 1;
+}
+
+/*
+  Apply the transpose of the displacement transfer w.r.t. structural
+  displacements Jacobian to a block of vectors, one vector at a time
+
+  Arguments
+  ---------
+  nvecs : number of vectors in the block
+  vecs  : input block of aerodynamic vectors
+
+  Returns
+  -------
+  prods : output block of structural vectors
+*/
+void LDTransferScheme::applydDduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                            F2FScalar *prods) {
+  int aero_len = getLocalAeroArrayLen();
+  int struct_len = getLocalStructArrayLen();
+  F2FScalar *vec = new F2FScalar[aero_len];
+  F2FScalar *prod = new F2FScalar[struct_len];
+
+  for (int k = 0; k < nvecs; k++) {
+    for (int i = 0; i < aero_len; i++) {
+      vec[i] = vecs[nvecs * i + k];
+    }
+    applydDduSTrans(vec, prod);
+    for (int i = 0; i < struct_len; i++) {
+      prods[nvecs * i + k] = prod[i];
+    }
+  }
+
+  delete[] vec;
+  delete[] prod;
+}
 
-    // Find the average squared distance for normalization
-    F2FScalar v2_avg = 0.0;
+/*
+  Apply the transpose of the load transfer w.r.t. structural displacements
+  Jacobian to a block of vectors, one vector at a time
 
-    for (int j = 0; j < nn; j++) {
-      if (local_conn[j] < ns) {
-        const F2FScalar *xs0 = &Xs[3 * local_conn[j]];
-        vec_diff(xs0, xa0, v);
-      } else {
-        F2FScalar rxs0[3];  // Reflected xs0
-        memcpy(rxs0, &Xs[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-        vec_diff(rxs0, xa0, v);
-      }
-      v2_avg += vec_dot(v, v) / (1.0 * nn);
-    }
+  Arguments
+  ---------
+  nvecs : number of vectors in the block
+  vecs  : input block of structural vectors
 
-    // Make sure we don't divide by zero
-    if (F2FRealPart(v2_avg) < tol) {
-      v2_avg = tol;
+  Returns
+  -------
+  prods : output block of structural vectors
+*/
+void LDTransferScheme::applydLduSTransBatch(int nvecs, const F2FScalar *vecs,
+                                            F2FScalar *prods) {
+  int struct_len = getLocalStructArrayLen();
+  F2FScalar *vec = new F2FScalar[struct_len];
+  F2FScalar *prod = new F2FScalar[struct_len];
+
+  for (int k = 0; k < nvecs; k++) {
+    for (int i = 0; i < struct_len; i++) {
+      vec[i] = vecs[nvecs * i + k];
     }
-
-    for (int j = 0; j < nn; j++) {
-      if (local_conn[j] < ns) {
-        const F2FScalar *xs0 = &Xs[3 * local_conn[j]];
-        vec_diff(xs0, xa0, v);
-      } else {
-        F2FScalar rxs0[3];  // Reflected xs0
-        memcpy(rxs0, &Xs[3 * (local_conn[j] - ns)], 3 * sizeof(F2FScalar));
-        rxs0[isymm] *= -1.0;
-        vec_diff(rxs0, xa0, v);
-      }
-      w[j] = exp(-beta * vec_dot(v, v) / v2_avg);
-      wtotal += w[j];
+    applydLduSTrans(vec, prod);
+    for (int i = 0; i < struct_len; i++) {
+      prods[nvecs * i + k] = prod[i];
     }
+  }
 
-    // Normalize the weights
-    wtotal = 1.0 / wtotal;
-    for (int j = 0; j < nn; j++) {
-      w[j] *= wtotal;
+  delete[] vec;
+  delete[] prod;
+}
+
+/*
+  Apply the transpose of the load transfer w.r.t. aerodynamic loads Jacobian
+  to a block of vectors, one vector at a time
+
+  Arguments
+  ---------
+  nvecs : number of vectors in the block
+  vecs  : input block of structural vectors
+
+  Returns
+  -------
+  prods : output block of aerodynamic vectors
+*/
+void LDTransferScheme::applydLdfATransBatch(int nvecs, const F2FScalar *vecs,
+                                            F2FScalar *prods) {
+  int aero_len = getLocalAeroArrayLen();
+  int struct_len = getLocalStructArrayLen();
+  F2FScalar *vec = new F2FScalar[struct_len];
+  F2FScalar *prod = new F2FScalar[aero_len];
+
+  for (int k = 0; k < nvecs; k++) {
+    for (int i = 0; i < struct_len; i++) {
+      vec[i] = vecs[nvecs * i + k];
+    }
+    applydLdfATrans(vec, prod);
+    for (int i = 0; i < aero_len; i++) {
+      prods[nvecs * i + k] = prod[i];
     }
   }
+
+  delete[] vec;
+  delete[] prod;
 }
 
 /*
   Transform a set of aerodynamic surface displacements into a least-squares
   fit of rotation and translation plus elastic deformations
 
+  The centroids and the covariance matrix are sums over the aerodynamic nodes,
+  so each processor forms the partial sums over its own nodes and these are
+  combined with a single reduction. The centroid of the undeformed nodes is
+  computed in setAeroNodes. The node locations are taken relative to this
+  centroid, so the sum of q over all nodes vanishes and the covariance matrix
+  only requires the sum of the products p*q^{T} without the displaced
+  centroid.
+
   Arguments
   ----------
   aero_disps : aerodynamic surface node displacements
@@ -497,58 +1924,26 @@ void TransferScheme::computeWeights(double beta, int isymm, int nn,
 void LDTransferScheme::transformEquivRigidMotion(const F2FScalar *aero_disps,
                                                  F2FScalar *R, F2FScalar *t,
                                                  F2FScalar *u) {
-  // Gather aerodynamic node locations and displacements
-  F2FScalar *Xa_global = new F2FScalar[3 * na_global];
-  aeroGatherBcast(3 * na, Xa, 3 * na_global, Xa_global);
-
-  F2FScalar *Ua_global = new F2FScalar[3 * na_global];
-  aeroGatherBcast(3 * na, aero_disps, 3 * na_global, Ua_global);
+  // Form the partial sums of the displaced node locations and the covariance
+  // matrix relative to the undeformed centroid
+  F2FScalar sums[12];
+  memset(sums, 0, 12 * sizeof(F2FScalar));
+  F2FScalar *H = &sums[3];
 
-  // Adds aerodynamic displacements to aerodynamic node locations
-  F2FScalar *Xad_global = new F2FScalar[3 * na_global];
-  for (int i = 0; i < 3 * na_global; i++) {
-    Xad_global[i] = Xa_global[i] + Ua_global[i];
-  }
-
-  // Allocate global array of elastic displacements
-  F2FScalar *u_global = new F2FScalar[3 * na_global];
-
-  // Compute centroids of the original and displaced node locations
-  F2FScalar x0_bar[3];
-  memset(x0_bar, 0.0, 3 * sizeof(F2FScalar));
-  F2FScalar x_bar[3];
-  memset(x_bar, 0.0, 3 * sizeof(F2FScalar));
-
-  for (int j = 0; j < na_global; j++) {
-    x0_bar[0] += Xa_global[3 * j + 0];
-    x0_bar[1] += Xa_global[3 * j + 1];
-    x0_bar[2] += Xa_global[3 * j + 2];
-    x_bar[0] += Xad_global[3 * j + 0];
-    x_bar[1] += Xad_global[3 * j + 1];
-    x_bar[2] += Xad_global[3 * j + 2];
-  }
-
-  x0_bar[0] *= 1.0 / na_global;
-  x0_bar[1] *= 1.0 / na_global;
-  x0_bar[2] *= 1.0 / na_global;
-  x_bar[0] *= 1.0 / na_global;
-  x_bar[1] *= 1.0 / na_global;
-  x_bar[2] *= 1.0 / na_global;
-
-  // Form the covariance matrix
-  F2FScalar H[9];
-  memset(H, 0.0, 9 * sizeof(F2FScalar));
-
-  for (int j = 0; j < na_global; j++) {
+  for (int j = 0; j < na; j++) {
     F2FScalar q[3];
-    q[0] = Xa_global[3 * j + 0] - x0_bar[0];
-    q[1] = Xa_global[3 * j + 1] - x0_bar[1];
-    q[2] = Xa_global[3 * j + 2] - x0_bar[2];
+    q[0] = Xa[3 * j + 0] - Xa_bar[0];
+    q[1] = Xa[3 * j + 1] - Xa_bar[1];
+    q[2] = Xa[3 * j + 2] - Xa_bar[2];
 
     F2FScalar p[3];
-    p[0] = Xad_global[3 * j + 0] - x_bar[0];
-    p[1] = Xad_global[3 * j + 1] - x_bar[1];
-    p[2] = Xad_global[3 * j + 2] - x_bar[2];
+    p[0] = q[0] + aero_disps[3 * j + 0];
+    p[1] = q[1] + aero_disps[3 * j + 1];
+    p[2] = q[2] + aero_disps[3 * j + 2];
+
+    sums[0] += p[0];
+    sums[1] += p[1];
+    sums[2] += p[2];
 
     H[0] += p[0] * q[0];
     H[1] += p[1] * q[0];
@@ -561,6 +1956,15 @@ void LDTransferScheme::transformEquivRigidMotion(const F2FScalar *aero_disps,
     H[8] += p[2] * q[2];
   }
 
+  MPI_Allreduce(MPI_IN_PLACE, sums, 12, F2F_MPI_TYPE, MPI_SUM, global_comm);
+
+  // Compute centroids of the original and displaced node locations
+  F2FScalar x0_bar[3], x_bar[3];
+  for (int k = 0; k < 3; k++) {
+    x0_bar[k] = Xa_bar[k];
+    x_bar[k] = Xa_bar[k] + sums[k] / (1.0 * na_global);
+  }
+
   for (int k = 0; k < 9; k++) {
     H[k] *= 1.0 / na_global;
   }
@@ -574,15 +1978,15 @@ void LDTransferScheme::transformEquivRigidMotion(const F2FScalar *aero_disps,
   t[2] = x_bar[2] - R[2] * x0_bar[0] - R[5] * x0_bar[1] - R[8] * x0_bar[2];
 
   // Compute elastic deformations (deviation from rigid motion)
-  for (int j = 0; j < na_global; j++) {
+  for (int j = 0; j < na; j++) {
     F2FScalar Xa_rigid[] = {t[0], t[1], t[2]};
-    F2FScalar *x = &Xa_global[3 * j];
+    const F2FScalar *x = &Xa[3 * j];
     Xa_rigid[0] += R[0] * x[0] + R[3] * x[1] + R[6] * x[2];
     Xa_rigid[1] += R[1] * x[0] + R[4] * x[1] + R[7] * x[2];
     Xa_rigid[2] += R[2] * x[0] + R[5] * x[1] + R[8] * x[2];
-    u_global[3 * j + 0] = Xad_global[3 * j + 0] - Xa_rigid[0];
-    u_global[3 * j + 1] = Xad_global[3 * j + 1] - Xa_rigid[1];
-    u_global[3 * j + 2] = Xad_global[3 * j + 2] - Xa_rigid[2];
+    u[3 * j + 0] = x[0] + aero_disps[3 * j + 0] - Xa_rigid[0];
+    u[3 * j + 1] = x[1] + aero_disps[3 * j + 1] - Xa_rigid[1];
+    u[3 * j + 2] = x[2] + aero_disps[3 * j + 2] - Xa_rigid[2];
   }
 
   // Copy rotation matrix and centroid to global variables for use in
@@ -590,69 +1994,75 @@ void LDTransferScheme::transformEquivRigidMotion(const F2FScalar *aero_disps,
   memcpy(Raero, R, 9 * sizeof(F2FScalar));
   memcpy(xa0bar, x0_bar, 3 * sizeof(F2FScalar));
   memcpy(xabar, x_bar, 3 * sizeof(F2FScalar));
-
-  // Scatter elastic deformations to aerodynamic processors
-  aeroScatter(3 * na_global, u_global, na, u);
-
-  // Free memory
-  delete[] Xa_global;
-  delete[] Ua_global;
-  delete[] Xad_global;
-  delete[] u_global;
 }
 
 /*
-  Apply the action of the rigid transformation w.r.t aerodynamic surface node
-  displacements Jacobian to the input vector
+  Contract the sensitivities of the equivalent rigid rotation with respect to
+  the covariance matrix with the adjoint vectors for the rotation and the
+  translation. This reduces the sensitivities to two 3 x 3 matrices so that
+  the products with each aerodynamic node are cheap.
 
   Arguments
   ---------
-  vecs       : input vector
+  psi_R : adjoint vector for the rotation
+  psi_t : adjoint vector for the translation
 
   Returns
   -------
-  prods      : output vectors
+  Y     : psi_{R}^{T}*dR/dH
+  X     : X^{T} = d(psi_{t}^{T}*R*xA0bar)/dH
 */
-void LDTransferScheme::applydRduATrans(const F2FScalar *vecs,
-                                       F2FScalar *prods) {
-  // Compute the rotation sensitivities
-  F2FScalar dR[9 * 9];
-
+void LDTransferScheme::computeRigidRotationSens(const F2FScalar *psi_R,
+                                                F2FScalar *Y,
+                                                const F2FScalar *psi_t,
+                                                F2FScalar *X) {
   F2FScalar M1[15 * 15];
   assembleM1(Raero, Saero, M1);
   int ipiv[15], m = 15, info = 0;
   LAPACKgetrf(&m, &m, M1, &m, ipiv, &info);
 
+  memset(Y, 0, 9 * sizeof(F2FScalar));
+  memset(X, 0, 9 * sizeof(F2FScalar));
+
   for (int k = 0; k < 9; k++) {
     // Solve system for each component of R
     F2FScalar x[15];
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
+    memset(x, 0, 15 * sizeof(F2FScalar));
     x[k] = -1.0;
     int nrhs = 1;
     info = 0;
     LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    memcpy(&dR[9 * k], x, 9 * sizeof(F2FScalar));
-  }
 
-  // Decompose input adjoint vector into rotation and translation parts
-  F2FScalar psi_R[9];
-  memcpy(psi_R, vecs, 9 * sizeof(F2FScalar));
-  F2FScalar psi_t[3];
-  memcpy(psi_t, &vecs[9], 3 * sizeof(F2FScalar));
-
-  // Compute X^{T} = d(psi_{t}^{T}*R*xA0bar)/dH
-  F2FScalar X[9];
-  memset(X, 0.0, 9 * sizeof(F2FScalar));
-  for (int m = 0; m < 3; m++) {
-    for (int n = 0; n < 3; n++) {
-      for (int i = 0; i < 3; i++) {
-        for (int j = 0; j < 3; j++) {
-          X[i + 3 * j] +=
-              psi_t[m] * dR[(i + 3 * j) + 9 * (m + 3 * n)] * xa0bar[n];
-        }
-      }
+    // Add the contributions from R[k] = R[m + 3*n]
+    F2FScalar wx = psi_t[k % 3] * xa0bar[k / 3];
+    for (int i = 0; i < 9; i++) {
+      Y[i] += psi_R[k] * x[i];
+      X[i] += wx * x[i];
     }
   }
+}
+
+/*
+  Apply the action of the rigid transformation w.r.t aerodynamic surface node
+  displacements Jacobian to the input vector
+
+  Arguments
+  ---------
+  vecs       : input vector
+
+  Returns
+  -------
+  prods      : output vectors
+*/
+void LDTransferScheme::applydRduATrans(const F2FScalar *vecs,
+                                       F2FScalar *prods) {
+  // Decompose input adjoint vector into rotation and translation parts
+  const F2FScalar *psi_R = &vecs[0];
+  const F2FScalar *psi_t = &vecs[9];
+
+  // Contract the rotation sensitivities with the adjoint vectors
+  F2FScalar X[9], Y[9];
+  computeRigidRotationSens(psi_R, Y, psi_t, X);
 
   // Compute the weight (simply 1/na)
   F2FScalar w = 1.0 / na_global;
@@ -662,32 +2072,23 @@ void LDTransferScheme::applydRduATrans(const F2FScalar *vecs,
   for (int i = 0; i < na; i++) {
     F2FScalar *prod = &prods[3 * i];
 
-    // Compute the translation contribution
-    // tcont = -w*(psi_{t} - X^{T}*q)
-    F2FScalar tcont[3];
-
     const F2FScalar *xa0 = &Xa[3 * i];
     F2FScalar q[3];
     vec_diff(xa0bar, xa0, q);
 
+    // Compute the translation contribution
+    // tcont = -w*(psi_{t} - X^{T}*q)
+    F2FScalar tcont[3];
     tcont[0] = -w * (psi_t[0] - X[0] * q[0] - X[1] * q[1] - X[2] * q[2]);
     tcont[1] = -w * (psi_t[1] - X[3] * q[0] - X[4] * q[1] - X[5] * q[2]);
     tcont[2] = -w * (psi_t[2] - X[6] * q[0] - X[7] * q[1] - X[8] * q[2]);
 
     // Compute the rotation contribution
+    // rcont = -w*Y^{T}*q
     F2FScalar rcont[3];
-    memset(rcont, 0.0, 3 * sizeof(F2FScalar));
-
-    for (int m = 0; m < 3; m++) {
-      for (int n = 0; n < 3; n++) {
-        for (int k = 0; k < 3; k++) {
-          for (int j = 0; j < 3; j++) {
-            rcont[k] -=
-                w * dR[(j + 3 * k) + 9 * (m + 3 * n)] * q[j] * psi_R[m + 3 * n];
-          }
-        }
-      }
-    }
+    rcont[0] = -w * (Y[0] * q[0] + Y[1] * q[1] + Y[2] * q[2]);
+    rcont[1] = -w * (Y[3] * q[0] + Y[4] * q[1] + Y[5] * q[2]);
+    rcont[2] = -w * (Y[6] * q[0] + Y[7] * q[1] + Y[8] * q[2]);
 
     // Add the translation and rotation contributions into prod
     prod[0] = rcont[0] + tcont[0];
@@ -721,98 +2122,60 @@ void LDTransferScheme::applydRduATrans(const F2FScalar *vecs,
 void LDTransferScheme::applydRdxA0Trans(const F2FScalar *aero_disps,
                                         const F2FScalar *vecs,
                                         F2FScalar *prods) {
-  // Compute the rotation sensitivities
-  F2FScalar dR[9 * 9];
-
-  F2FScalar M1[15 * 15];
-  assembleM1(Raero, Saero, M1);
-  int ipiv[15], m = 15, info = 0;
-  LAPACKgetrf(&m, &m, M1, &m, ipiv, &info);
-
-  for (int k = 0; k < 9; k++) {
-    // Solve system for each component of R
-    F2FScalar x[15];
-    memset(x, 0.0, 15 * sizeof(F2FScalar));
-    x[k] = -1.0;
-    int nrhs = 1;
-    info = 0;
-    LAPACKgetrs("N", &m, &nrhs, M1, &m, ipiv, x, &m, &info);
-    memcpy(&dR[9 * k], x, 9 * sizeof(F2FScalar));
-  }
-
   // Decompose input adjoint vector into rotation and translation parts
-  F2FScalar psi_R[9];
-  memcpy(psi_R, vecs, 9 * sizeof(F2FScalar));
-  F2FScalar psi_t[3];
-  memcpy(psi_t, &vecs[9], 3 * sizeof(F2FScalar));
-
-  // Compute X^{T} = d(psi_{t}^{T}*R*xA0bar)/dH
-  F2FScalar X[9];
-  memset(X, 0.0, 9 * sizeof(F2FScalar));
-  for (int m = 0; m < 3; m++) {
-    for (int n = 0; n < 3; n++) {
-      for (int i = 0; i < 3; i++) {
-        for (int j = 0; j < 3; j++) {
-          X[i + 3 * j] +=
-              psi_t[m] * dR[(i + 3 * j) + 9 * (m + 3 * n)] * xa0bar[n];
-        }
-      }
-    }
-  }
+  const F2FScalar *psi_R = &vecs[0];
+  const F2FScalar *psi_t = &vecs[9];
+
+  // Contract the rotation sensitivities with the adjoint vectors
+  F2FScalar X[9], Y[9];
+  computeRigidRotationSens(psi_R, Y, psi_t, X);
 
   // Compute the weight (simply 1/na)
   F2FScalar w = 1.0 / na_global;
 
+  // The contribution of psi_{t}^{T}*(R - I) is the same for every node
+  F2FScalar tR[3];
+  tR[0] = w * (psi_t[0] * (Raero[0] - 1.0) + psi_t[1] * Raero[1] +
+               psi_t[2] * Raero[2]);
+  tR[1] = w * (psi_t[0] * Raero[3] + psi_t[1] * (Raero[4] - 1.0) +
+               psi_t[2] * Raero[5]);
+  tR[2] = w * (psi_t[0] * Raero[6] + psi_t[1] * Raero[7] +
+               psi_t[2] * (Raero[8] - 1.0));
+
   // For each aero node, the product consists of rotation and translation
   // contributions
   for (int i = 0; i < na; i++) {
     F2FScalar *prod = &prods[3 * i];
 
-    // Compute the translation contribution
-    // tcont = w*(X^{T}*q + X*p + psi_{t}^{T}*(R - I))
-    F2FScalar tcont[3];
-    memset(tcont, 0.0, 3 * sizeof(F2FScalar));
-
     const F2FScalar *xa0 = &Xa[3 * i];
     F2FScalar q[3];
     vec_diff(xa0bar, xa0, q);
 
-    tcont[0] += w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2]);
-    tcont[1] += w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2]);
-    tcont[2] += w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2]);
-
     const F2FScalar *ua = &aero_disps[3 * i];
     F2FScalar p[3];
     p[0] = xa0[0] + ua[0] - xabar[0];
     p[1] = xa0[1] + ua[1] - xabar[1];
     p[2] = xa0[2] + ua[2] - xabar[2];
 
-    tcont[0] += w * (X[0] * p[0] + X[3] * p[1] + X[6] * p[2]);
-    tcont[1] += w * (X[1] * p[0] + X[4] * p[1] + X[7] * p[2]);
-    tcont[2] += w * (X[2] * p[0] + X[5] * p[1] + X[8] * p[2]);
-
-    tcont[0] += w * (psi_t[0] * (Raero[0] - 1.0) + psi_t[1] * Raero[1] +
-                     psi_t[2] * Raero[2]);
-    tcont[1] += w * (psi_t[0] * Raero[3] + psi_t[1] * (Raero[4] - 1.0) +
-                     psi_t[2] * Raero[5]);
-    tcont[2] += w * (psi_t[0] * Raero[6] + psi_t[1] * Raero[7] +
-                     psi_t[2] * (Raero[8] - 1.0));
+    // Compute the translation contribution
+    // tcont = w*(X^{T}*q + X*p + psi_{t}^{T}*(R - I))
+    F2FScalar tcont[3];
+    tcont[0] = tR[0] + w * (X[0] * q[0] + X[1] * q[1] + X[2] * q[2] +
+                            X[0] * p[0] + X[3] * p[1] + X[6] * p[2]);
+    tcont[1] = tR[1] + w * (X[3] * q[0] + X[4] * q[1] + X[5] * q[2] +
+                            X[1] * p[0] + X[4] * p[1] + X[7] * p[2]);
+    tcont[2] = tR[2] + w * (X[6] * q[0] + X[7] * q[1] + X[8] * q[2] +
+                            X[2] * p[0] + X[5] * p[1] + X[8] * p[2]);
 
     // Compute the rotation contribution
+    // rcont = -w*(Y^{T}*q + Y*p)
     F2FScalar rcont[3];
-    memset(rcont, 0.0, 3 * sizeof(F2FScalar));
-
-    for (int m = 0; m < 3; m++) {
-      for (int n = 0; n < 3; n++) {
-        for (int j = 0; j < 3; j++) {
-          for (int k = 0; k < 3; k++) {
-            rcont[k] -= w * psi_R[m + 3 * n] *
-                        (dR[(j + 3 * k) + 9 * (m + 3 * n)] * q[j] +
-                         dR[(k + 3 * j) + 9 * (m + 3 * n)] * p[j]);
-          }
-        }
-      }
-    }
+    rcont[0] = -w * (Y[0] * q[0] + Y[1] * q[1] + Y[2] * q[2] + Y[0] * p[0] +
+                     Y[3] * p[1] + Y[6] * p[2]);
+    rcont[1] = -w * (Y[3] * q[0] + Y[4] * q[1] + Y[5] * q[2] + Y[1] * p[0] +
+                     Y[4] * p[1] + Y[7] * p[2]);
+    rcont[2] = -w * (Y[6] * q[0] + Y[7] * q[1] + Y[8] * q[2] + Y[2] * p[0] +
+                     Y[5] * p[1] + Y[8] * p[2]);
 
     // Add the translation and rotation contributions into prod
     prod[0] = rcont[0] + tcont[0];
@@ -1851,7 +3214,11 @@ int LDTransferScheme::testdLdxS0Products(const F2FScalar *struct_disps,
 }
 
 /*
-  Computes decomposition H = RS using the Singular Value Decomposition (SVD)
+  Computes the polar decomposition H = RS
+
+  The rotation is found with the Newton iteration in computePolarRotation.
+  When H is too close to being rank one, or the closest rotation is not well
+  defined, the SVD is used instead.
 
   Arguments
   ----------
@@ -1865,6 +3232,41 @@ int LDTransferScheme::testdLdxS0Products(const F2FScalar *struct_disps,
 */
 void LDTransferScheme::computeRotation(const F2FScalar *H, F2FScalar *R,
                                        F2FScalar *S) {
+  if (!computePolarRotation(H, R)) {
+    computeRotationSVD(H, R);
+  }
+
+  // Compute the positive-semidefinite polar decomposition matrix S
+  // S = R^{T}*H
+  // [ S[0] S[3] S[6] ] = [ R[0] R[1] R[2] ][ H[0] H[3] H[6] ]
+  // [ S[1] S[4] S[7] ] = [ R[3] R[4] R[5] ][ H[1] H[4] H[7] ]
+  // [ S[2] S[5] S[8] ] = [ R[6] R[7] R[8] ][ H[2] H[5] H[8] ]
+  S[0] = R[0] * H[0] + R[1] * H[1] + R[2] * H[2];
+  S[1] = R[3] * H[0] + R[4] * H[1] + R[5] * H[2];
+  S[2] = R[6] * H[0] + R[7] * H[1] + R[8] * H[2];
+  S[3] = R[0] * H[3] + R[1] * H[4] + R[2] * H[5];
+  S[4] = R[3] * H[3] + R[4] * H[4] + R[5] * H[5];
+  S[5] = R[6] * H[3] + R[7] * H[4] + R[8] * H[5];
+  S[6] = R[0] * H[6] + R[1] * H[7] + R[2] * H[8];
+  S[7] = R[3] * H[6] + R[4] * H[7] + R[5] * H[8];
+  S[8] = R[6] * H[6] + R[7] * H[7] + R[8] * H[8];
+}
+
+/*
+  Computes the rotation matrix from the polar decomposition H = RS using the
+  Singular Value Decomposition (SVD). In complex mode, the derivative of the
+  rotation is found by solving the linearized system assembled by assembleM1.
+
+  Arguments
+  ----------
+  H : covariance matrix
+
+  Returns
+  --------
+  R : rotation matrix
+
+*/
+void LDTransferScheme::computeRotationSVD(const F2FScalar *H, F2FScalar *R) {
   // Allocate memory for local variables
   int m = 3, n = 3, lda = 3, ldu = 3, ldvt = 3, info, lwork = 50;  // for SVD
   F2FReal work[50];     // work matrix for SVD
@@ -1969,21 +3371,6 @@ void LDTransferScheme::computeRotation(const F2FScalar *H, F2FScalar *R,
   }
 
 #endif  // FUNTOFEM_USE_COMPLEX
-
-  // Compute the positive-semidefinite polar decomposition matrix S
-  // S = R^{T}*H
-  // [ S[0] S[3] S[6] ] = [ R[0] R[1] R[2] ][ H[0] H[3] H[6] ]
-  // [ S[1] S[4] S[7] ] = [ R[3] R[4] R[5] ][ H[1] H[4] H[7] ]
-  // [ S[2] S[5] S[8] ] = [ R[6] R[7] R[8] ][ H[2] H[5] H[8] ]
-  S[0] = R[0] * H[0] + R[1] * H[1] + R[2] * H[2];
-  S[1] = R[3] * H[0] + R[4] * H[1] + R[5] * H[2];
-  S[2] = R[6] * H[0] + R[7] * H[1] + R[8] * H[2];
-  S[3] = R[0] * H[3] + R[1] * H[4] + R[2] * H[5];
-  S[4] = R[3] * H[3] + R[4] * H[4] + R[5] * H[5];
-  S[5] = R[6] * H[3] + R[7] * H[4] + R[8] * H[5];
-  S[6] = R[0] * H[6] + R[1] * H[7] + R[2] * H[8];
-  S[7] = R[3] * H[6] + R[4] * H[7] + R[5] * H[8];
-  S[8] = R[6] * H[6] + R[7] * H[7] + R[8] * H[8];
 }
 
 /*
@@ -2625,3 +4012,163 @@ F2FScalar det(const F2FScalar *A) {
 
   return detA;
 }
+
+/*
+  Compute the cofactor matrix of a 3x3 matrix (given in column major order)
+
+  The columns of the cofactor matrix are the cross products of the columns of
+  A so that A^{T}*C = det(A)*I.
+*/
+template <class ScalarType>
+static inline void cofactorMatrix(const ScalarType *A, ScalarType *C) {
+  C[0] = A[4] * A[8] - A[5] * A[7];
+  C[1] = A[5] * A[6] - A[3] * A[8];
+  C[2] = A[3] * A[7] - A[4] * A[6];
+  C[3] = A[7] * A[2] - A[8] * A[1];
+  C[4] = A[8] * A[0] - A[6] * A[2];
+  C[5] = A[6] * A[1] - A[7] * A[0];
+  C[6] = A[1] * A[5] - A[2] * A[4];
+  C[7] = A[2] * A[3] - A[0] * A[5];
+  C[8] = A[0] * A[4] - A[1] * A[3];
+}
+
+void cofactor(const F2FScalar *A, F2FScalar *C) { cofactorMatrix(A, C); }
+
+/*
+  Compute the rotation matrix from the polar decomposition H = RS using the
+  scaled Newton iteration
+
+  X_{k+1} = 0.5*(gamma_k*X_{k} + X_{k}^{-T}/gamma_k)
+
+  The iteration starts from X_{0} = H + cof(H), with H scaled to unit norm.
+  Adding the cofactor matrix does not change the singular vectors of H. When
+  det(H) > 0, this increases each singular value. When det(H) < 0, it flips
+  the sign of the smallest singular value. In both cases, the orthogonal
+  factor is the proper rotation that maximizes tr(R^{T}*H), which is the same
+  R as the SVD approach. When H is rank deficient, X_{0} is still well
+  conditioned.
+
+  The scaling factors gamma_k are computed from the real part only, so the
+  iteration is analytic and the complex step gives the derivative of R.
+
+  Arguments
+  ----------
+  H : covariance matrix
+
+  Returns
+  --------
+  R    : rotation matrix
+  flag : 1 if the iteration converged, 0 if H is too close to singular and the
+         SVD should be used instead
+*/
+template <class ScalarType>
+static int polarRotation(const ScalarType *H, ScalarType *R) {
+  const int max_iters = 25;
+  const double min_det = 1e-6;
+  const double rtol = 1e-12;
+
+  // Scale the matrix to unit Frobenius norm
+  double hnorm = 0.0;
+  for (int i = 0; i < 9; i++) {
+    hnorm += F2FRealPart(H[i]) * F2FRealPart(H[i]);
+  }
+  hnorm = sqrt(hnorm);
+  if (hnorm == 0.0) {
+    return 0;
+  }
+
+  ScalarType X[9], C[9];
+  for (int i = 0; i < 9; i++) {
+    X[i] = H[i] / hnorm;
+  }
+  cofactorMatrix(X, C);
+  for (int i = 0; i < 9; i++) {
+    X[i] += C[i];
+  }
+
+  for (int iter = 0; iter < max_iters; iter++) {
+    cofactorMatrix(X, C);
+    ScalarType detX = X[0] * C[0] + X[1] * C[1] + X[2] * C[2];
+
+    // Compute the Frobenius norms of X and cof(X)
+    double xnorm = 0.0, cnorm = 0.0;
+    for (int i = 0; i < 9; i++) {
+      xnorm += F2FRealPart(X[i]) * F2FRealPart(X[i]);
+      cnorm += F2FRealPart(C[i]) * F2FRealPart(C[i]);
+    }
+    xnorm = sqrt(xnorm);
+    cnorm = sqrt(cnorm);
+
+    // Give up if the starting point is close to singular or is not a proper
+    // rotation
+    double detr = F2FRealPart(detX);
+    if (iter == 0 && detr <= min_det * xnorm * xnorm * xnorm) {
+      return 0;
+    }
+
+    // Scale by gamma = sqrt(||X^{-1}||/||X||) with X^{-T} = cof(X)/det(X)
+    double gamma = sqrt(cnorm / (detr * xnorm));
+    ScalarType inv = 1.0 / (gamma * detX);
+
+    double dxr = 0.0, dxi = 0.0, xi = 0.0;
+    for (int i = 0; i < 9; i++) {
+      ScalarType Xnew = 0.5 * (gamma * X[i] + inv * C[i]);
+      ScalarType dX = Xnew - X[i];
+      X[i] = Xnew;
+
+      dxr += F2FRealPart(dX) * F2FRealPart(dX);
+      dxi += F2FImagPart(dX) * F2FImagPart(dX);
+      xi += F2FImagPart(Xnew) * F2FImagPart(Xnew);
+    }
+
+    // The iteration converges quadratically so the last update bounds the
+    // error in the previous iterate. Check the complex perturbation
+    // separately since it is much smaller than the real part.
+    if (dxr <= rtol * rtol && dxi <= rtol * rtol * xi) {
+      memcpy(R, X, 9 * sizeof(ScalarType));
+      return 1;
+    }
+  }
+
+  return 0;
+}
+
+int computePolarRotation(const F2FScalar *H, F2FScalar *R) {
+  return polarRotation(H, R);
+}
+
+#ifdef FUNTOFEM_USE_COMPLEX
+/*
+  Real-valued versions of the cofactor matrix and the rotation, used when the
+  inputs to a transfer carry no complex perturbation
+*/
+void cofactor(const F2FReal *A, F2FReal *C) { cofactorMatrix(A, C); }
+
+int computePolarRotation(const F2FReal *H, F2FReal *R) {
+  return polarRotation(H, R);
+}
+#endif  // FUNTOFEM_USE_COMPLEX
+
+/*
+  Check whether the imaginary parts of an array are all zero. This is always
+  true in real mode.
+
+  Arguments
+  ---------
+  n : length of the array
+  x : the array
+
+  Returns
+  -------
+  1 if the array is real-valued, 0 otherwise
+*/
+int isRealValued(int n, const F2FScalar *x) {
+#ifdef FUNTOFEM_USE_COMPLEX
+  for (int i = 0; i < n; i++) {
+    if (F2FImagPart(x[i]) != 0.0) {
+      return 0;
+    }
+  }
+#endif  // FUNTOFEM_USE_COMPLEX
+  return 1;
+}
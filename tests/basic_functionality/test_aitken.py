@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+and design optimization.
+
+Copyright (C) 2015 Georgia Tech Research Corporation.
+Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+All rights reserved.
+
+FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+you may not use this software except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from pyfuntofem.aitken import aitken_update
+import numpy as np
+import unittest
+
+
+def reference_update(vec, aitken_vec, prev_update, theta, theta_min, theta_max):
+    """
+    Aitken update of a single vector written out in full
+    """
+    up = vec - aitken_vec
+    norm2 = np.linalg.norm(up - prev_update) ** 2.0
+    if norm2 > 0.0:
+        theta *= 1.0 - np.real((up - prev_update).dot(up)) / norm2
+        theta = np.max((np.min((theta, theta_max)), theta_min))
+    aitken_vec = aitken_vec + theta * up
+    return aitken_vec, up, theta
+
+
+class AitkenTest(unittest.TestCase):
+    def test_block_update(self):
+        n, nfunc = 30, 4
+        for dtype in [np.float64, np.complex128]:
+            aitken_vec = np.random.rand(n, nfunc).astype(dtype)
+            prev_update = np.random.rand(n, nfunc).astype(dtype)
+            theta = np.random.uniform(0.1, 0.9, nfunc)
+            vec = np.random.rand(n, nfunc).astype(dtype)
+            if dtype == np.complex128:
+                vec += 1e-30j * np.random.rand(n, nfunc)
+
+            # Compute the expected values one column at a time
+            expected = []
+            for k in range(nfunc):
+                expected.append(
+                    reference_update(
+                        vec[:, k],
+                        aitken_vec[:, k],
+                        prev_update[:, k],
+                        theta[k],
+                        0.01,
+                        1.0,
+                    )
+                )
+
+            theta = aitken_update(vec, aitken_vec, prev_update, theta, 0.01, 1.0, 0.0)
+
+            for k in range(nfunc):
+                vec_k, up_k, theta_k = expected[k]
+                self.assertAlmostEqual(theta[k], theta_k)
+                assert np.allclose(vec[:, k], vec_k)
+                assert np.allclose(aitken_vec[:, k], vec_k)
+                assert np.allclose(prev_update[:, k], up_k)
+
+    def test_convergence(self):
+        # A fixed-point iteration x <- A x + b that diverges without relaxation
+        n, nfunc = 20, 3
+        np.random.seed(0)
+        Q, _ = np.linalg.qr(np.random.rand(n, n))
+        A = Q.dot(np.diag(np.linspace(-1.5, 0.5, n))).dot(Q.T)
+        b = np.random.rand(n, nfunc)
+        x_exact = np.linalg.solve(np.eye(n) - A, b)
+
+        x = np.zeros((n, nfunc))
+        aitken_vec = np.zeros((n, nfunc))
+        prev_update = np.zeros((n, nfunc))
+        theta = np.full(nfunc, 0.125)
+        for i in range(200):
+            x = A.dot(x) + b
+            theta = aitken_update(x, aitken_vec, prev_update, theta, 0.01, 1.0, 1e-30)
+
+        assert np.allclose(x, x_exact)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,9 +22,34 @@ limitations under the License.
 
 from pyfuntofem.model import Body
 from pyfuntofem.model import Variable
+from pyfuntofem.model import Scenario
+from pyfuntofem.model import Function
+from mpi4py import MPI
+import numpy as np
+import os
+import tempfile
 import unittest
 
 
+class PythonTransfer:
+    """
+    A transfer scheme implemented in Python that only provides the
+    single-vector Jacobian products, like HermesTransfer
+    """
+
+    def __init__(self, transfer):
+        self.transfer = transfer
+
+    def applydLdfATrans(self, psi, out):
+        self.transfer.applydLdfATrans(psi, out)
+
+    def applydLduSTrans(self, psi, out):
+        self.transfer.applydLduSTrans(psi, out)
+
+    def applydDduSTrans(self, psi, out):
+        self.transfer.applydDduSTrans(psi, out)
+
+
 class BodyTest(unittest.TestCase):
     def test_body(self):
         body = Body(
@@ -152,3 +177,163 @@ class BodyTest(unittest.TestCase):
 
         assert len(vars) == body.count_uncoupled_variables()
         assert vars[0].name == "var 1"
+
+    def test_body_unsteady_history(self):
+        comm = MPI.COMM_WORLD
+        body = Body(
+            name="test body",
+            id=1,
+            fun3d=False,
+            analysis_type="aerothermoelastic",
+        )
+        body.initialize_struct_nodes(np.random.rand(3 * 5))
+        body.initialize_aero_nodes(np.random.rand(3 * 7))
+        options = {"scheme": "meld", "thermal_scheme": "meld", "npts": 5}
+        body.initialize_transfer(comm, comm, 0, comm, 0, transfer_options=options)
+
+        scenario = Scenario(name="unsteady", steady=False, steps=4, T_ref=250.0)
+        body.initialize_variables(scenario)
+
+        assert body.aero_disps[scenario.id].shape == (5, 21)
+        assert body.struct_loads[scenario.id].shape == (5, 15)
+        assert body.aero_temps[scenario.id].shape == (5, 7)
+        assert np.all(body.struct_temps[scenario.id] == 250.0)
+
+        # The getters return views of the rows of the history
+        aero_disps = body.get_aero_disps(scenario, time_index=2)
+        aero_disps[:] = 1.0
+        assert np.all(body.aero_disps[scenario.id][2] == 1.0)
+        assert np.all(body.aero_disps[scenario.id][1] == 0.0)
+
+        struct_temps = body.get_struct_temps(scenario, time_index=3)
+        struct_temps[:] = 300.0
+        assert np.all(body.struct_temps[scenario.id][3] == 300.0)
+
+    def test_body_python_transfer_adjoint(self):
+        comm = MPI.COMM_WORLD
+        body = Body(name="test body", id=1, fun3d=False, analysis_type="aeroelastic")
+        body.initialize_struct_nodes(np.random.rand(3 * 5))
+        body.initialize_aero_nodes(np.random.rand(3 * 7))
+        options = {"scheme": "meld", "npts": 5}
+        body.initialize_transfer(comm, comm, 0, comm, 0, transfer_options=options)
+
+        scenario = Scenario(name="steady", steady=True)
+        scenario.add_function(Function("ksfailure", analysis_type="structural"))
+        scenario.add_function(Function("mass", analysis_type="structural"))
+        nf = scenario.count_adjoint_functions()
+
+        body.initialize_variables(scenario)
+        struct_disps = body.get_struct_disps(scenario)
+        struct_disps[:] = 0.01 * np.random.rand(struct_disps.size)
+        body.transfer_disps(scenario)
+        body.transfer_loads(scenario)
+
+        body.initialize_adjoint_variables(scenario)
+        body.struct_loads_ajp[:] = np.random.rand(3 * 5, nf)
+        body.aero_disps_ajp[:] = np.random.rand(3 * 7, nf)
+
+        # Products with the batched Jacobian products of the transfer scheme
+        body.transfer_loads_adjoint(scenario)
+        body.transfer_disps_adjoint(scenario)
+        aero_loads_ajp = body.aero_loads_ajp.copy()
+        struct_disps_ajp = body.struct_disps_ajp.copy()
+
+        # A Python transfer scheme falls back to one product per function
+        body.transfer = PythonTransfer(body.transfer)
+        body.transfer_loads_adjoint(scenario)
+        body.transfer_disps_adjoint(scenario)
+        assert np.allclose(body.aero_loads_ajp, aero_loads_ajp)
+        assert np.allclose(body.struct_disps_ajp, struct_disps_ajp)
+
+    def test_body_aitken_adjoint_seed(self):
+        comm = MPI.COMM_WORLD
+        body = Body(name="test body", id=1, fun3d=False, analysis_type="aeroelastic")
+        body.initialize_struct_nodes(np.random.rand(3 * 5))
+        body.initialize_aero_nodes(np.random.rand(3 * 7))
+        options = {"scheme": "meld", "npts": 5}
+        body.initialize_transfer(comm, comm, 0, comm, 0, transfer_options=options)
+
+        scenarios = []
+        for id in [1, 2]:
+            scenario = Scenario(name="steady", id=id, steady=True)
+            scenario.add_function(Function("mass", analysis_type="structural"))
+            scenarios.append(scenario)
+
+        # Forward relaxation of each scenario ends with a different theta
+        thetas = []
+        for scenario, iterates in zip(scenarios, [[1.0, 3.0, 2.0], [1.0, 0.5, 0.3]]):
+            body.initialize_variables(scenario)
+            struct_disps = body.get_struct_disps(scenario)
+            for value in iterates:
+                struct_disps[:] = value
+                body.aitken_relax(scenario)
+            thetas.append(body.theta)
+        assert thetas[0] != thetas[1]
+
+        # The adjoint of the first scenario starts from its own forward theta
+        # and not from the theta of the scenario that ran last. The zero
+        # update leaves theta unchanged.
+        for scenario, theta in zip(scenarios, thetas):
+            body.initialize_adjoint_variables(scenario)
+            body.aitken_adjoint_relax(scenario)
+            assert np.all(body.theta_adjoint == theta)
+
+    def test_body_state_file(self):
+        comm = MPI.COMM_WORLD
+        struct_X = np.random.rand(3 * 5)
+        aero_X = np.random.rand(3 * 7)
+
+        with tempfile.TemporaryDirectory() as dirname:
+            # All the bodies get the same options from the driver
+            state_file = os.path.join(dirname, "meld_state")
+            options = {"scheme": "meld", "npts": 5, "state_file": state_file}
+
+            bodies = []
+            for id in [1, 2]:
+                body = Body(
+                    name="body", id=id, fun3d=False, analysis_type="aeroelastic"
+                )
+                body.initialize_struct_nodes(struct_X)
+                body.initialize_aero_nodes((1.0 + id) * aero_X)
+                body.initialize_transfer(comm, comm, 0, comm, 0, options)
+                bodies.append(body)
+
+            # Each body saves its own restart file that matches its nodes
+            for body in bodies:
+                filename = "%s.%d" % (state_file, body.id)
+                assert os.path.exists(filename)
+                assert body.transfer.loadState(filename)
+
+    def test_body_begin_end_transfer(self):
+        comm = MPI.COMM_WORLD
+        scenario = Scenario(name="steady", steady=True)
+        options = {"scheme": "meld", "npts": 5}
+
+        bodies = []
+        for id in [1, 2]:
+            body = Body(name="body", id=id, fun3d=False, analysis_type="aeroelastic")
+            body.initialize_struct_nodes(np.random.rand(3 * 5))
+            body.initialize_aero_nodes(np.random.rand(3 * 7))
+            body.initialize_transfer(comm, comm, 0, comm, 0, options)
+            body.initialize_variables(scenario)
+            body.get_struct_disps(scenario)[:] = 0.01 * np.random.rand(3 * 5)
+            body.get_aero_loads(scenario)[:] = np.random.rand(3 * 7)
+            bodies.append(body)
+
+        # Transfer with the transfers of both bodies in progress at once
+        for body in bodies:
+            body.begin_transfer_disps(scenario)
+        for body in bodies:
+            body.end_transfer_disps(scenario)
+        for body in bodies:
+            body.begin_transfer_loads(scenario)
+        for body in bodies:
+            body.end_transfer_loads(scenario)
+
+        for body in bodies:
+            aero_disps = np.zeros(3 * 7, dtype=body.dtype)
+            struct_loads = np.zeros(3 * 5, dtype=body.dtype)
+            body.transfer.transferDisps(body.get_struct_disps(scenario), aero_disps)
+            body.transfer.transferLoads(body.get_aero_loads(scenario), struct_loads)
+            assert np.allclose(body.get_aero_disps(scenario), aero_disps)
+            assert np.allclose(body.get_struct_loads(scenario), struct_loads)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+and design optimization.
+
+Copyright (C) 2015 Georgia Tech Research Corporation.
+Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+All rights reserved.
+
+FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+you may not use this software except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from pyfuntofem.history_store import (
+    CompressedHistory,
+    HistoryStore,
+    MemmapHistoryStore,
+)
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check_store(self, store, dtype=np.float64):
+        nt, n = 12, 50
+        values = np.random.rand(nt, n).astype(dtype)
+
+        hist = store.allocate((nt, n), dtype, fill=3.0)
+        assert np.all(hist[5] == 3.0)
+
+        # Write the rows through the arrays returned for each step
+        for step in range(nt):
+            row = hist[step]
+            row[:] = values[step]
+
+        # Read the rows back in reverse order while prefetching ahead
+        for step in range(nt - 1, -1, -1):
+            store.prefetch([hist], step)
+            assert np.all(hist[step] == values[step])
+        store.wait()
+
+        assert np.all(np.asarray(hist) == values)
+
+        store.release(hist)
+        store.close()
+
+    def test_memory(self):
+        self.check_store(HistoryStore())
+
+    def test_memory_compressed(self):
+        self.check_store(HistoryStore(compression=True))
+        self.check_store(HistoryStore(compression=True), dtype=np.complex128)
+
+    def test_compressed_held_row(self):
+        hist = CompressedHistory((10, 8), np.float64, cache_steps=2)
+
+        # Write into a row after it has been evicted from the cache
+        row = hist[0]
+        for step in range(1, 10):
+            hist[step][:] = step
+        row[:] = -1.0
+        assert np.all(hist[0] == -1.0)
+
+        # The values are stored once the row is no longer used
+        row[:] = -2.0
+        del row
+        for step in range(1, 10):
+            assert np.all(hist[step] == step)
+        assert np.all(hist[0] == -2.0)
+        assert len(hist.live) <= hist.cache_steps
+
+    def test_compressed_prefetch_race(self):
+        hist = CompressedHistory((10, 8), np.float64, cache_steps=2)
+        hist[3][:] = 1.0
+        for step in range(4, 10):
+            hist[step]
+
+        # Store new values for the row while the prefetch is loading it
+        load = hist._load
+
+        def racing_load(step):
+            values = load(step)
+            hist._load = load
+            hist[step][:] = 2.0
+            for other in range(5, 10):
+                hist[other]
+            return values
+
+        hist._load = racing_load
+        hist.prefetch([3])
+
+        assert 3 not in hist.ready
+        assert np.all(hist[3] == 2.0)
+
+    def test_memmap(self):
+        store = MemmapHistoryStore(directory=self.directory)
+        self.check_store(store)
+        assert len(os.listdir(self.directory)) == 0
+
+    def test_memmap_held_row(self):
+        store = MemmapHistoryStore(directory=self.directory)
+        hist = store.allocate((4, 8), np.float64, fill=2.0)
+
+        # A row that is held across the release stays readable and writable
+        row = hist[2]
+        store.release(hist)
+        del hist
+        assert len(os.listdir(self.directory)) == 0
+        assert np.all(row == 2.0)
+        row[:] = 1.0
+        assert np.all(row == 1.0)
+        store.close()
+
+    def test_memmap_compressed(self):
+        store = MemmapHistoryStore(directory=self.directory, compression=True)
+        self.check_store(store)
+        assert len(os.listdir(self.directory)) == 0
+
+    def test_memmap_empty(self):
+        store = MemmapHistoryStore(directory=self.directory)
+        hist = store.allocate((4, 0), np.float64)
+        assert hist.shape == (4, 0)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+"""
+This file is part of the package FUNtoFEM for coupled aeroelastic simulation
+and design optimization.
+
+Copyright (C) 2015 Georgia Tech Research Corporation.
+Additional copyright (C) 2015 Kevin Jacobson, Jan Kiviaho and Graeme Kennedy.
+All rights reserved.
+
+FUNtoFEM is licensed under the Apache License, Version 2.0 (the "License");
+you may not use this software except in compliance with the License.
+You may obtain a copy of the License at
+
+   http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from math import comb
+import numpy as np
+from mpi4py import MPI
+from pyfuntofem.model import FUNtoFEMmodel, Body, Scenario
+from pyfuntofem.driver import FUNtoFEMnlbgs
+from pyfuntofem.solver_interface import SolverInterface
+from pyfuntofem.test_solver import TestAerodynamicSolver, TestStructuralSolver
+from pyfuntofem.checkpointing import revolve_schedule
+import unittest
+
+
+class StepSolver(SolverInterface):
+    """
+    A solver that only keeps track of its current time step.
+
+    Like a real solver, iterate overwrites the current state with the state of
+    the new step, and set_states restores the state of an earlier step. Unless
+    keep_history is set, only the states of the current and previous steps are
+    available, as required by checkpointing.
+    """
+
+    def __init__(self, keep_history=False):
+        self.keep_history = keep_history
+        self.step = 0
+        self.steps_taken = 0
+        self.states = {0: self._state(0)}
+        self.state = self.states[0]
+
+    def _state(self, step):
+        return np.sin(1.0 + step)
+
+    def iterate(self, scenario, bodies, step):
+        assert step == self.step + 1
+        self.step = step
+        self.steps_taken += 1
+        self.states[step] = self._state(step)
+        if not self.keep_history:
+            self.states = {step - 1: self.states[step - 1], step: self.states[step]}
+        self.state = self.states[step]
+        return 0
+
+    def set_states(self, scenario, bodies, step):
+        self.state = self.states[step]
+
+    def save_checkpoint(self, scenario, bodies, step):
+        assert self.step == step
+        return {"step": step, "state": self.states[step]}
+
+    def load_checkpoint(self, scenario, bodies, step, checkpoint):
+        assert checkpoint["step"] == step
+        self.step = step
+        self.states = {step: checkpoint["state"]}
+        self.state = self.states[step]
+
+
+class CheckpointingTest(unittest.TestCase):
+    def check_schedule(self, steps, snaps):
+        forward_stores, actions = revolve_schedule(steps, snaps)
+
+        # Replay the schedule starting from the end of the forward analysis
+        stored = set([0] + forward_stores)
+        max_stored = len(stored)
+        current = steps
+        num_steps = steps
+        reversed_steps = []
+        for action, step in actions:
+            if action == "restore":
+                assert step in stored
+                current = step
+            elif action == "store":
+                assert step == current
+                stored.add(step)
+                max_stored = max(max_stored, len(stored))
+            elif action == "free":
+                stored.remove(step)
+            elif action == "advance":
+                assert step > current
+                num_steps += step - current
+                current = step
+            elif action == "reverse":
+                assert current == step - 1
+                num_steps += 1
+                current = step
+                reversed_steps.append(step)
+
+        assert reversed_steps == list(range(steps, 0, -1))
+        assert max_stored <= snaps
+
+        return num_steps
+
+    def test_schedule(self):
+        cases = [(1, 1), (7, 1), (10, 2), (37, 3), (100, 2), (300, 4), (500, 8)]
+        for steps, snaps in cases + [(10000, 20)]:
+            num_steps = self.check_schedule(steps, snaps)
+
+            # With the binomial schedule each step is computed at most r + 1
+            # times, where r is the fewest repetitions that snaps checkpoints
+            # allow for this number of steps
+            r = 1
+            while comb(snaps + r, snaps) < steps:
+                r += 1
+            assert num_steps <= (r + 1) * steps
+
+    def _setup_driver(self, steps, checkpoints):
+        comm = MPI.COMM_WORLD
+
+        model = FUNtoFEMmodel("model")
+        body = Body("plate", analysis_type="aeroelastic", fun3d=False)
+        body.initialize_struct_nodes(np.random.rand(3 * 8))
+        body.initialize_aero_nodes(np.random.rand(3 * 10))
+        model.add_body(body)
+
+        scenario = Scenario("unsteady", steady=False, steps=steps)
+        model.add_scenario(scenario)
+
+        keep_history = checkpoints is None
+        solvers = {
+            "flow": StepSolver(keep_history),
+            "structural": StepSolver(keep_history),
+        }
+        transfer_options = {"analysis_type": "aeroelastic", "scheme": "meld", "npts": 4}
+        driver = FUNtoFEMnlbgs(
+            solvers,
+            comm,
+            comm,
+            0,
+            comm,
+            0,
+            transfer_options,
+            model=model,
+            checkpoints=checkpoints,
+        )
+
+        # Record the states that each adjoint step linearizes about instead of
+        # solving the adjoint
+        linearization = []
+
+        def step_adjoint(scenario, step, nfunctions):
+            flow_state = solvers["flow"].state
+            struct_state = solvers["structural"].state
+            linearization.append((step, flow_state, struct_state))
+            return 0
+
+        driver._step_unsteady_adjoint = step_adjoint
+
+        return driver, scenario, solvers, linearization
+
+    def test_driver(self):
+        steps = 25
+        driver, scenario, solvers, linearization = self._setup_driver(steps, 4)
+
+        fail = driver.solve_forward()
+        assert fail == 0
+        assert solvers["flow"].steps_taken == steps
+
+        fail = driver._solve_unsteady_adjoint(scenario)
+        assert fail == 0
+        assert [lin[0] for lin in linearization] == list(range(steps, 0, -1))
+        assert len(driver.checkpoint_data) == 0
+
+        # The forward steps are recomputed as given by the schedule
+        assert solvers["flow"].steps_taken == self.check_schedule(steps, 4)
+
+    def test_driver_linearization(self):
+        steps = 25
+
+        # Reverse sweep with all the states stored by the solvers
+        driver, scenario, solvers, stored = self._setup_driver(steps, None)
+        assert driver.solve_forward() == 0
+        assert driver._solve_unsteady_adjoint(scenario) == 0
+
+        # Reverse sweep with the checkpointed forward recomputation
+        driver, scenario, solvers, checkpointed = self._setup_driver(steps, 3)
+        assert driver.solve_forward() == 0
+        assert driver._solve_unsteady_adjoint(scenario) == 0
+
+        # The transfer is linearized about the structural states at step - 1
+        assert checkpointed == stored
+        for step, flow_state, struct_state in checkpointed:
+            assert flow_state == solvers["flow"]._state(step)
+            assert struct_state == solvers["structural"]._state(step - 1)
+
+    def test_solver_hooks(self):
+        comm = MPI.COMM_WORLD
+        steps = 4
+
+        model = FUNtoFEMmodel("model")
+        body = Body("plate", analysis_type="aeroelastic", fun3d=False)
+        model.add_body(body)
+        scenario = Scenario("unsteady", steady=False, steps=steps)
+        model.add_scenario(scenario)
+
+        transfer_options = {"analysis_type": "aeroelastic", "scheme": "meld", "npts": 5}
+
+        # Solvers without the checkpointing hooks are rejected up front
+        solvers = {"flow": SolverInterface(), "structural": StepSolver()}
+        with self.assertRaises(NotImplementedError):
+            FUNtoFEMnlbgs(
+                solvers,
+                comm,
+                comm,
+                0,
+                comm,
+                0,
+                transfer_options,
+                model=model,
+                checkpoints=2,
+            )
+
+        solvers = {
+            "flow": TestAerodynamicSolver(comm, model),
+            "structural": TestStructuralSolver(comm, model),
+        }
+        driver = FUNtoFEMnlbgs(
+            solvers,
+            comm,
+            comm,
+            0,
+            comm,
+            0,
+            transfer_options,
+            model=model,
+            checkpoints=2,
+        )
+
+        # The test solvers restore the states of the checkpoint step
+        body.initialize_variables(scenario)
+        struct_disps = body.get_struct_disps(scenario, 2)
+        aero_loads = body.get_aero_loads(scenario, 2)
+        struct_disps[:] = np.random.rand(struct_disps.size)
+        aero_loads[:] = np.random.rand(aero_loads.size)
+        struct_disps_saved = struct_disps.copy()
+        aero_loads_saved = aero_loads.copy()
+
+        driver._save_checkpoint(scenario, 2)
+        struct_disps[:] = 0.0
+        aero_loads[:] = 0.0
+        driver._load_checkpoint(scenario, 2)
+
+        assert np.allclose(body.get_struct_disps(scenario, 2), struct_disps_saved)
+        assert np.allclose(body.get_aero_loads(scenario, 2), aero_loads_saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,11 +8,12 @@ from pyfuntofem.body import Body
 from pyfuntofem.function import Function
 from pyfuntofem.test_solver import TestAerodynamicSolver, TestStructuralSolver
 from pyfuntofem.funtofem_nlbgs_driver import FUNtoFEMnlbgs
+from pyfuntofem.acceleration import AndersonAcceleration, IQNILSAcceleration
 import unittest
 
 
 class CoupledFrameworkTest(unittest.TestCase):
-    def _setup_model_and_driver(self):
+    def _setup_model_and_driver(self, acceleration=None):
 
         # Build the model
         model = FUNtoFEMmodel("model")
@@ -60,7 +61,15 @@ class CoupledFrameworkTest(unittest.TestCase):
 
         # instantiate the driver
         driver = FUNtoFEMnlbgs(
-            solvers, comm, comm, 0, comm, 0, transfer_options, model=model
+            solvers,
+            comm,
+            comm,
+            0,
+            comm,
+            0,
+            transfer_options,
+            model=model,
+            acceleration=acceleration,
         )
 
         return model, driver
@@ -106,8 +115,17 @@ class CoupledFrameworkTest(unittest.TestCase):
         return
 
     def test_coupled_derivatives(self):
+        self._check_coupled_derivatives()
 
-        model, driver = self._setup_model_and_driver()
+    def test_coupled_derivatives_anderson(self):
+        self._check_coupled_derivatives(AndersonAcceleration(depth=4, beta=0.8))
+
+    def test_coupled_derivatives_iqnils(self):
+        self._check_coupled_derivatives(IQNILSAcceleration(depth=4))
+
+    def _check_coupled_derivatives(self, acceleration=None):
+
+        model, driver = self._setup_model_and_driver(acceleration)
 
         # Check whether to use the complex-step method or now
         complex_step = False
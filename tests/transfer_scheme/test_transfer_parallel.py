@@ -3,6 +3,9 @@ Test the transfer schemes using non-overlapping sub-communicators
 
 """
 
+import os
+import shutil
+import tempfile
 import numpy as np
 from funtofem import TransferScheme
 from mpi4py import MPI
@@ -88,6 +91,286 @@ class TransferSchemeTest(unittest.TestCase):
 
         return
 
+    def test_meld_distributed(self):
+        comm, struct_comm, struct_root, aero_comm, aero_root = self._get_comms(
+            MPI.COMM_WORLD
+        )
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = self._get_aero_nnodes(aero_comm)
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = self._get_struct_nnodes(struct_comm)
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        # Create a replicated and a distributed version of the same scheme
+        transfers = []
+        for distributed in [False, True]:
+            transfer = TransferScheme.pyMELD(
+                comm, struct_comm, struct_root, aero_comm, aero_root, isymm, nn, beta
+            )
+            transfer.setDistributedStructMesh(distributed)
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(struct_X)
+            transfer.initialize()
+            transfers.append(transfer)
+
+        # Set random displacements and forces
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        # Check that the transfers are identical
+        uA = []
+        fS = []
+        for transfer in transfers:
+            uA.append(np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype))
+            fS.append(np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype))
+            transfer.transferDisps(uS, uA[-1])
+            transfer.transferLoads(fA, fS[-1])
+
+        assert np.allclose(uA[0], uA[1], rtol=1e-12, atol=1e-14)
+        assert np.allclose(fS[0], fS[1], rtol=1e-12, atol=1e-14)
+
+        dh = 1e-6
+        rtol = 1e-5
+        atol = 1e-30
+        if TransferScheme.dtype == complex:
+            dh = 1e-30
+            rtol = 1e-9
+            atol = 1e-30
+
+        fail = transfers[1].testAllDerivatives(uS, fA, dh, rtol, atol)
+
+        assert fail == 0
+
+        return
+
+    def test_meld_rigid_motion(self):
+        comm, struct_comm, struct_root, aero_comm, aero_root = self._get_comms(
+            MPI.COMM_WORLD
+        )
+
+        # Set typical parameter values
+        isymm = -1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = self._get_aero_nnodes(aero_comm)
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        uA = 0.1 * np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        # The adjoint vector for the rotation and translation is the same on
+        # every processor
+        psi = np.random.RandomState(0).random_sample(12).astype(TransferScheme.dtype)
+
+        # Decompose the distributed displacements
+        transfer = TransferScheme.pyMELD(
+            comm, struct_comm, struct_root, aero_comm, aero_root, isymm, nn, beta
+        )
+        transfer.setAeroNodes(aero_X)
+
+        R = np.zeros(9, dtype=TransferScheme.dtype)
+        t = np.zeros(3, dtype=TransferScheme.dtype)
+        u = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        transfer.transformEquivRigidMotion(uA, R, t, u)
+
+        dRduA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        transfer.applydRduATrans(psi, dRduA)
+        dRdxA0 = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        transfer.applydRdxA0Trans(uA, psi, dRdxA0)
+
+        # Repeat the computation on a single processor with all of the nodes
+        all_X = np.concatenate(comm.allgather(aero_X))
+        all_uA = np.concatenate(comm.allgather(uA))
+        start = sum(comm.allgather(3 * aero_nnodes)[: comm.rank])
+        end = start + 3 * aero_nnodes
+
+        serial = TransferScheme.pyMELD(
+            MPI.COMM_SELF,
+            MPI.COMM_SELF,
+            0,
+            MPI.COMM_SELF,
+            0,
+            isymm,
+            nn,
+            beta,
+        )
+        serial.setAeroNodes(all_X)
+
+        R0 = np.zeros(9, dtype=TransferScheme.dtype)
+        t0 = np.zeros(3, dtype=TransferScheme.dtype)
+        u0 = np.zeros(len(all_X), dtype=TransferScheme.dtype)
+        serial.transformEquivRigidMotion(all_uA, R0, t0, u0)
+
+        dRduA0 = np.zeros(len(all_X), dtype=TransferScheme.dtype)
+        serial.applydRduATrans(psi, dRduA0)
+        dRdxA00 = np.zeros(len(all_X), dtype=TransferScheme.dtype)
+        serial.applydRdxA0Trans(all_uA, psi, dRdxA00)
+
+        np.testing.assert_allclose(R, R0, rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(t, t0, rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(u, u0[start:end], rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(dRduA, dRduA0[start:end], rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(dRdxA0, dRdxA00[start:end], rtol=1e-10, atol=1e-12)
+
+        return
+
+    def test_meld_nonblocking(self):
+        comm = MPI.COMM_WORLD
+        rank = comm.rank
+        size = comm.size
+        if size < 2:
+            raise ValueError("Test must be run with 2 or more MPI ranks")
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        np.random.seed(1234567 + 2345678 * rank)
+        aero_nnodes = self._get_aero_nnodes(comm)
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        all_X = np.concatenate(comm.allgather(aero_X))
+        all_fA = np.concatenate(comm.allgather(fA))
+        aero_start = sum(comm.allgather(3 * aero_nnodes)[:rank])
+        aero_end = aero_start + 3 * aero_nnodes
+
+        # The structural nodes are ordered by the rank on struct_comm, which is
+        # either the same as or the reverse of the rank on comm
+        for reverse in [False, True]:
+            color = 55 if rank < size // 2 else MPI.UNDEFINED
+            struct_comm = comm.Split(color, -rank if reverse else rank)
+            struct_root = size // 2 - 1 if reverse else 0
+
+            struct_nnodes = self._get_struct_nnodes(struct_comm)
+            struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+            uS = 0.1 * np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+            # Compute the reference transfers on a single processor
+            struct_start = 0
+            all_struct = None
+            if struct_comm != MPI.COMM_NULL:
+                struct_start = sum(
+                    struct_comm.allgather(3 * struct_nnodes)[: struct_comm.rank]
+                )
+                all_struct = (
+                    np.concatenate(struct_comm.allgather(struct_X)),
+                    np.concatenate(struct_comm.allgather(uS)),
+                )
+            all_struct_X, all_uS = comm.bcast(all_struct, root=0)
+            struct_end = struct_start + 3 * struct_nnodes
+
+            serial = TransferScheme.pyMELD(
+                MPI.COMM_SELF, MPI.COMM_SELF, 0, MPI.COMM_SELF, 0, isymm, nn, beta
+            )
+            serial.setAeroNodes(all_X)
+            serial.setStructNodes(all_struct_X)
+            serial.initialize()
+            uA0 = np.zeros(len(all_X), dtype=TransferScheme.dtype)
+            fS0 = np.zeros(len(all_struct_X), dtype=TransferScheme.dtype)
+            serial.transferDisps(all_uS, uA0)
+            serial.transferLoads(all_fA, fS0)
+
+            for distributed in [False, True]:
+                transfer = TransferScheme.pyMELD(
+                    comm, struct_comm, struct_root, comm, 0, isymm, nn, beta
+                )
+                transfer.setDistributedStructMesh(distributed)
+                transfer.setAeroNodes(aero_X)
+                transfer.setStructNodes(struct_X)
+                transfer.initialize()
+
+                # Overlap the transfers with some unrelated work
+                uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+                transfer.beginTransferDisps(uS)
+                work = np.sum(fA**2)
+                transfer.endTransferDisps(uA)
+
+                fS = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+                transfer.beginTransferLoads(fA, fS)
+                work += np.sum(uA**2)
+                transfer.endTransferLoads()
+
+                np.testing.assert_allclose(
+                    uA, uA0[aero_start:aero_end], rtol=1e-10, atol=1e-12
+                )
+                np.testing.assert_allclose(
+                    fS, fS0[struct_start:struct_end], rtol=1e-10, atol=1e-12
+                )
+
+                # The blocking transfers give the same result
+                uA1 = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+                fS1 = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+                transfer.transferDisps(uS, uA1)
+                transfer.transferLoads(fA, fS1)
+                np.testing.assert_allclose(uA, uA1, rtol=1e-14, atol=1e-15)
+                np.testing.assert_allclose(fS, fS1, rtol=1e-14, atol=1e-15)
+
+        return
+
+    def test_meld_save_state(self):
+        comm, struct_comm, struct_root, aero_comm, aero_root = self._get_comms(
+            MPI.COMM_WORLD
+        )
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = self._get_aero_nnodes(aero_comm)
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = self._get_struct_nnodes(struct_comm)
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uA = []
+        tmpdir = None
+        if comm.rank == 0:
+            tmpdir = tempfile.mkdtemp()
+        tmpdir = comm.bcast(tmpdir, root=0)
+        filename = os.path.join(tmpdir, "meld.state")
+        try:
+            for k in range(2):
+                transfer = TransferScheme.pyMELD(
+                    comm,
+                    struct_comm,
+                    struct_root,
+                    aero_comm,
+                    aero_root,
+                    isymm,
+                    nn,
+                    beta,
+                )
+                transfer.setAeroNodes(aero_X)
+                transfer.setStructNodes(struct_X)
+
+                # The state of each process is read from the file on restart
+                if k == 0:
+                    transfer.initialize()
+                    assert transfer.saveState(filename)
+                else:
+                    assert transfer.loadState(filename)
+
+                uA.append(np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype))
+                transfer.transferDisps(uS, uA[-1])
+        finally:
+            comm.barrier()
+            if comm.rank == 0:
+                shutil.rmtree(tmpdir)
+
+        np.testing.assert_array_equal(uA[0], uA[1])
+
+        return
+
     def test_meld_thermal(self):
         comm, struct_comm, struct_root, aero_comm, aero_root = self._get_comms(
             MPI.COMM_WORLD
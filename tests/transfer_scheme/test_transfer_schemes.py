@@ -1,3 +1,5 @@
+import os
+import tempfile
 import numpy as np
 from funtofem import TransferScheme
 from mpi4py import MPI
@@ -44,6 +46,424 @@ class TransferSchemeTest(unittest.TestCase):
 
         return
 
+    def test_meld_batch(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+        nvecs = 4  # Number of vectors in the block
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        # Blocks of adjoint vectors
+        va = np.random.random((3 * aero_nnodes, nvecs)).astype(TransferScheme.dtype)
+        vs = np.random.random((3 * struct_nnodes, nvecs)).astype(TransferScheme.dtype)
+
+        for scheme in [TransferScheme.pyMELD, TransferScheme.pyLinearizedMELD]:
+            transfer = scheme(comm, comm, 0, comm, 0, isymm, nn, beta)
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(struct_X)
+            transfer.initialize()
+
+            uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+            fS = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+            transfer.transferDisps(uS, uA)
+            transfer.transferLoads(fA, fS)
+
+            # Compute the products for the whole block at once
+            dDduS = np.zeros((3 * struct_nnodes, nvecs), dtype=TransferScheme.dtype)
+            dLduS = np.zeros((3 * struct_nnodes, nvecs), dtype=TransferScheme.dtype)
+            dLdfA = np.zeros((3 * aero_nnodes, nvecs), dtype=TransferScheme.dtype)
+            transfer.applydDduSTransBatch(va, dDduS)
+            transfer.applydLduSTransBatch(vs, dLduS)
+            transfer.applydLdfATransBatch(vs, dLdfA)
+
+            # Check each column against the single vector products
+            ps = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+            pa = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+            for k in range(nvecs):
+                transfer.applydDduSTrans(va[:, k].copy(), ps)
+                np.testing.assert_allclose(dDduS[:, k], ps, rtol=1e-10, atol=1e-12)
+
+                transfer.applydLduSTrans(vs[:, k].copy(), ps)
+                np.testing.assert_allclose(dLduS[:, k], ps, rtol=1e-10, atol=1e-12)
+
+                transfer.applydLdfATrans(vs[:, k].copy(), pa)
+                np.testing.assert_allclose(dLdfA[:, k], pa, rtol=1e-10, atol=1e-12)
+
+        return
+
+    def test_meld_work_arrays(self):
+        comm = MPI.COMM_WORLD
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        vA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        vS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        transfer = TransferScheme.pyMELD(comm, comm, 0, comm, 0, 1, 10, 0.5)
+        transfer.setAeroNodes(aero_X)
+        transfer.setStructNodes(struct_X)
+        transfer.initialize()
+
+        uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        fS = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+        transfer.transferDisps(uS, uA)
+        transfer.transferLoads(fA, fS)
+
+        def products():
+            prods = []
+            for func, v, n in [
+                (transfer.applydDduS, vS, aero_nnodes),
+                (transfer.applydDduSTrans, vA, struct_nnodes),
+                (transfer.applydLduS, vS, struct_nnodes),
+                (transfer.applydLduSTrans, vS, struct_nnodes),
+                (transfer.applydLdxS0, vS, struct_nnodes),
+                (transfer.applydDdxS0, vA, struct_nnodes),
+            ]:
+                prod = np.zeros(3 * n, dtype=TransferScheme.dtype)
+                func(v, prod)
+                prods.append(prod)
+            return prods
+
+        # The products reuse the scratch arrays, so repeated calls must agree
+        prods = products()
+
+        # The products complete a load transfer that is still in progress
+        # before they reuse the scratch arrays
+        fS_pending = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+        transfer.beginTransferLoads(fA, fS_pending)
+        for prod, prod_again in zip(prods, products()):
+            np.testing.assert_array_equal(prod, prod_again)
+        transfer.endTransferLoads()
+        np.testing.assert_array_equal(fS_pending, fS)
+
+        return
+
+    def test_meld_update_geometry(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        # Slightly perturbed node locations
+        aero_X1 = aero_X + 1e-8 * np.random.random(3 * aero_nnodes)
+        struct_X1 = struct_X + 1e-8 * np.random.random(3 * struct_nnodes)
+
+        for scheme in [TransferScheme.pyMELD, TransferScheme.pyLinearizedMELD]:
+            transfer = scheme(comm, comm, 0, comm, 0, isymm, nn, beta)
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(struct_X)
+            transfer.initialize()
+
+            # The connectivity is kept for a small perturbation
+            transfer.setAeroNodes(aero_X1)
+            transfer.setStructNodes(struct_X1)
+            assert not transfer.updateGeometry()
+
+            # Compare against a scheme initialized with the new locations
+            new_transfer = scheme(comm, comm, 0, comm, 0, isymm, nn, beta)
+            new_transfer.setAeroNodes(aero_X1)
+            new_transfer.setStructNodes(struct_X1)
+            new_transfer.initialize()
+
+            uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+            new_uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+            transfer.transferDisps(uS, uA)
+            new_transfer.transferDisps(uS, new_uA)
+            np.testing.assert_allclose(uA, new_uA, rtol=1e-12, atol=1e-14)
+
+            # The scheme is initialized again for a large perturbation
+            transfer.setStructNodes(struct_X1[::-1].copy())
+            assert transfer.updateGeometry()
+
+        return
+
+    def test_meld_memory_lean(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        vs = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        # Create a scheme that stores the factorizations and one that does not
+        transfers = []
+        for lean in [False, True]:
+            transfer = TransferScheme.pyMELD(comm, comm, 0, comm, 0, isymm, nn, beta)
+            transfer.setMemoryLean(lean)
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(struct_X)
+            transfer.initialize()
+            transfers.append(transfer)
+
+        assert transfers[1].getMemoryUsage() < transfers[0].getMemoryUsage()
+
+        # Check that the transfers and products are identical
+        fS = []
+        dLduS = []
+        dLdxS0 = []
+        for transfer in transfers:
+            uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+            transfer.transferDisps(uS, uA)
+
+            fS.append(np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype))
+            transfer.transferLoads(fA, fS[-1])
+
+            dLduS.append(np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype))
+            transfer.applydLduSTrans(vs, dLduS[-1])
+
+            dLdxS0.append(np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype))
+            transfer.applydLdxS0(vs, dLdxS0[-1])
+
+        np.testing.assert_allclose(fS[0], fS[1], rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(dLduS[0], dLduS[1], rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(dLdxS0[0], dLdxS0[1], rtol=1e-12, atol=1e-14)
+
+        dh = 1e-6
+        rtol = 1e-5
+        atol = 1e-30
+        if TransferScheme.dtype == complex:
+            dh = 1e-30
+            rtol = 1e-9
+            atol = 1e-30
+
+        fail = transfers[1].testAllDerivatives(uS, fA, dh, rtol, atol)
+
+        assert fail == 0
+
+        return
+
+    def test_meld_single_precision(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = -1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 50  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        # Offset the nodes from the origin so that the rounding of the node
+        # locations is not negligible
+        aero_nnodes = 133
+        aero_X = (5.0 + np.random.random(3 * aero_nnodes)).astype(TransferScheme.dtype)
+
+        struct_nnodes = 151
+        struct_X = (5.0 + np.random.random(3 * struct_nnodes)).astype(
+            TransferScheme.dtype
+        )
+
+        uS = 0.1 * np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        # Create a double precision and a single precision scheme
+        transfers = []
+        for single in [False, True]:
+            transfer = TransferScheme.pyMELD(comm, comm, 0, comm, 0, isymm, nn, beta)
+            transfer.setSinglePrecision(single)
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(struct_X)
+            transfer.initialize()
+            transfers.append(transfer)
+
+        # Check that the transfers agree to single precision
+        uA = []
+        fS = []
+        for transfer in transfers:
+            uA.append(np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype))
+            transfer.transferDisps(uS, uA[-1])
+
+            fS.append(np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype))
+            transfer.transferLoads(fA, fS[-1])
+
+        uA_err = np.linalg.norm(uA[1] - uA[0]) / np.linalg.norm(uA[0])
+        fS_err = np.linalg.norm(fS[1] - fS[0]) / np.linalg.norm(fS[0])
+        self.assertLess(uA_err, 1e-5)
+        self.assertLess(fS_err, 1e-5)
+
+        # The total load is conserved to the accuracy of the weights
+        self.assertAlmostEqual(np.sum(fS[1]).real / np.sum(fA).real, 1.0, places=5)
+
+        # The load transfer is the transpose of the displacement transfer
+        # Jacobian, so the products must use the same weights and nodes
+        for transfer, fS_transfer in zip(transfers, fS):
+            prod = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+            transfer.applydDduSTrans(fA, prod)
+            err = np.linalg.norm(fS_transfer + prod) / np.linalg.norm(fS_transfer)
+            self.assertLess(err, 1e-12)
+
+            prods = np.zeros((3 * struct_nnodes, 1), dtype=TransferScheme.dtype)
+            transfer.applydDduSTransBatch(fA.reshape(-1, 1).copy(), prods)
+            err = np.linalg.norm(fS_transfer + prods[:, 0])
+            self.assertLess(err / np.linalg.norm(fS_transfer), 1e-12)
+
+        # Check that the copies are updated with the geometry
+        for transfer, uA_geo in zip(transfers, uA):
+            transfer.setStructNodes(struct_X + 1e-6)
+            assert not transfer.updateGeometry()
+            transfer.transferDisps(uS, uA_geo)
+
+        uA_err = np.linalg.norm(uA[1] - uA[0]) / np.linalg.norm(uA[0])
+        self.assertLess(uA_err, 1e-5)
+
+        return
+
+    def test_meld_rigid_rotation(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = -1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+        transfer = TransferScheme.pyMELD(comm, comm, 0, comm, 0, isymm, nn, beta)
+
+        # Place the structural nodes in a plane so that the covariance
+        # matrices are rank deficient
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        transfer.setAeroNodes(aero_X)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        struct_X[2::3] = 0.0
+        transfer.setStructNodes(struct_X)
+
+        transfer.initialize()
+
+        # Rotate the structure by a large angle about a skewed axis
+        axis = np.array([1.0, -2.0, 0.5])
+        axis /= np.linalg.norm(axis)
+        theta = 1.2
+        K = np.array(
+            [
+                [0.0, -axis[2], axis[1]],
+                [axis[2], 0.0, -axis[0]],
+                [-axis[1], axis[0], 0.0],
+            ]
+        )
+        Q = np.eye(3) + np.sin(theta) * K + (1.0 - np.cos(theta)) * K @ K
+        t = np.array([0.1, -0.3, 0.2])
+
+        Xs = struct_X.reshape(-1, 3)
+        uS = (Xs @ Q.T + t - Xs).flatten().astype(TransferScheme.dtype)
+        uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        transfer.transferDisps(uS, uA)
+
+        # The aerodynamic nodes must follow the rigid motion exactly
+        Xa = aero_X.reshape(-1, 3)
+        uA_exact = (Xa @ Q.T + t - Xa).flatten()
+        np.testing.assert_allclose(uA, uA_exact, rtol=1e-10, atol=1e-12)
+
+        # Check the derivatives about a perturbed rigid motion
+        uS += 0.01 * np.random.random(3 * struct_nnodes)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        dh = 1e-6
+        rtol = 1e-5
+        atol = 1e-30
+        if TransferScheme.dtype == complex:
+            dh = 1e-30
+            rtol = 1e-9
+            atol = 1e-30
+
+        fail = transfer.testAllDerivatives(uS, fA, dh, rtol, atol)
+
+        assert fail == 0
+
+        return
+
+    def test_real_inputs(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = 0.1 * np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        tS = np.random.random(struct_nnodes).astype(TransferScheme.dtype)
+        hA = np.random.random(aero_nnodes).astype(TransferScheme.dtype)
+
+        # In complex mode, a tiny imaginary part forces the transfers to use
+        # complex arithmetic instead of the real-valued path
+        h = 0.0
+        if TransferScheme.dtype == complex:
+            h = 1e-30j
+
+        meld = TransferScheme.pyMELD(comm, comm, 0, comm, 0, isymm, nn, beta)
+        meld.setAeroNodes(aero_X)
+        meld.setStructNodes(struct_X)
+        meld.initialize()
+
+        uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        meld.transferDisps(uS, uA)
+        uA_cs = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        meld.transferDisps(uS + h * uS, uA_cs)
+
+        np.testing.assert_allclose(uA.real, uA_cs.real, rtol=1e-12, atol=1e-14)
+        assert np.all(uA.imag == 0.0)
+
+        # Compare the thermal transfers with real and perturbed weights
+        tA = []
+        hS = []
+        for X in [struct_X, struct_X + h * struct_X]:
+            thermal = TransferScheme.pyMELDThermal(
+                comm, comm, 0, comm, 0, isymm, nn, beta
+            )
+            thermal.setAeroNodes(aero_X)
+            thermal.setStructNodes(X)
+            thermal.initialize()
+
+            tA.append(np.zeros(aero_nnodes, dtype=TransferScheme.dtype))
+            thermal.transferTemp(tS, tA[-1])
+            hS.append(np.zeros(struct_nnodes, dtype=TransferScheme.dtype))
+            thermal.transferFlux(hA, hS[-1])
+
+        np.testing.assert_allclose(tA[0].real, tA[1].real, rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(hS[0].real, hS[1].real, rtol=1e-12, atol=1e-14)
+
+        return
+
     def test_meld_thermal(self):
 
         comm = MPI.COMM_WORLD
@@ -119,6 +539,193 @@ class TransferSchemeTest(unittest.TestCase):
 
         return
 
+    def test_linear_meld_memory_lean(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        # Place the first structural nodes on a line so that some of the point
+        # inertia matrices are singular
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        struct_X[0:30:3] = 0.5
+        struct_X[1:30:3] = 0.5
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        # Create a scheme that stores the full inverses and one that does not
+        transfers = []
+        for lean in [False, True]:
+            transfer = TransferScheme.pyLinearizedMELD(
+                comm, comm, 0, comm, 0, isymm, nn, beta
+            )
+            transfer.setMemoryLean(lean)
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(struct_X)
+            transfer.initialize()
+            transfers.append(transfer)
+
+        assert transfers[1].getMemoryUsage() < transfers[0].getMemoryUsage()
+
+        # Check that the transfers and products are identical
+        uA = []
+        dDdxS0 = []
+        for transfer in transfers:
+            uA.append(np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype))
+            transfer.transferDisps(uS, uA[-1])
+
+            dDdxS0.append(np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype))
+            transfer.applydDdxS0(fA, dDdxS0[-1])
+
+        assert np.all(np.isfinite(uA[0]))
+        np.testing.assert_allclose(uA[0], uA[1], rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(dDdxS0[0], dDdxS0[1], rtol=1e-12, atol=1e-14)
+
+        return
+
+    def test_transfer_matrix(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        # Compare the linearized MELD transfers with the sparse matrix
+        linear = TransferScheme.pyLinearizedMELD(
+            comm, comm, 0, comm, 0, isymm, nn, beta
+        )
+        linear.setAeroNodes(aero_X)
+        linear.setStructNodes(struct_X)
+        linear.initialize()
+
+        D = linear.getTransferMatrix()
+        assert D.shape == (3 * aero_nnodes, 3 * struct_nnodes)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        linear.transferDisps(uS, uA)
+        np.testing.assert_allclose(D @ uS, uA, rtol=1e-12, atol=1e-14)
+
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        fS = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+        linear.transferLoads(fA, fS)
+        np.testing.assert_allclose(D.T @ fA, fS, rtol=1e-12, atol=1e-14)
+
+        # The matrix is assembled again when the node locations change
+        struct_X += 0.01 * np.random.random(3 * struct_nnodes)
+        linear.setStructNodes(struct_X)
+        linear.transferDisps(uS, uA)
+        D = linear.getTransferMatrix()
+        np.testing.assert_allclose(D @ uS, uA, rtol=1e-12, atol=1e-14)
+
+        # Compare the thermal transfers with the sparse matrix
+        thermal = TransferScheme.pyMELDThermal(comm, comm, 0, comm, 0, isymm, nn, beta)
+        thermal.setAeroNodes(aero_X)
+        thermal.setStructNodes(struct_X)
+        thermal.initialize()
+
+        W = thermal.getTransferMatrix()
+        assert W.shape == (aero_nnodes, struct_nnodes)
+        np.testing.assert_allclose(W.sum(axis=1), 1.0, rtol=1e-12)
+
+        tS = np.random.random(struct_nnodes).astype(TransferScheme.dtype)
+        tA = np.zeros(aero_nnodes, dtype=TransferScheme.dtype)
+        thermal.transferTemp(tS, tA)
+        np.testing.assert_allclose(W @ tS, tA, rtol=1e-12, atol=1e-14)
+
+        hA = np.random.random(aero_nnodes).astype(TransferScheme.dtype)
+        hS = np.zeros(struct_nnodes, dtype=TransferScheme.dtype)
+        thermal.transferFlux(hA, hS)
+        np.testing.assert_allclose(W.T @ hA, hS, rtol=1e-12, atol=1e-14)
+
+        return
+
+    def test_save_state(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        isymm = 1  # Symmetry axis (0, 1, 2 or -1 for no symmetry)
+        nn = 10  # Number of nearest neighbors to consider
+        beta = 0.5  # Relative decay factor
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 200
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+        tS = np.random.random(struct_nnodes).astype(TransferScheme.dtype)
+
+        def create(scheme, X=struct_X, b=beta):
+            if scheme == "meld":
+                transfer = TransferScheme.pyMELD(comm, comm, 0, comm, 0, isymm, nn, b)
+            elif scheme == "thermal":
+                transfer = TransferScheme.pyMELDThermal(
+                    comm, comm, 0, comm, 0, isymm, nn, b
+                )
+            else:
+                transfer = TransferScheme.pyRBF(
+                    comm, comm, 0, comm, 0, TransferScheme.PY_THIN_PLATE_SPLINE, 4
+                )
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(X)
+            return transfer
+
+        def apply(transfer):
+            if isinstance(transfer, TransferScheme.pyMELDThermal):
+                tA = np.zeros(aero_nnodes, dtype=TransferScheme.dtype)
+                transfer.transferTemp(tS, tA)
+                return tA
+            uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+            fS = np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype)
+            transfer.transferDisps(uS, uA)
+            transfer.transferLoads(fA, fS)
+            return np.concatenate((uA, fS))
+
+        # The sampled point clouds are written to the working directory
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            try:
+                for scheme in ["meld", "thermal", "rbf"]:
+                    filename = scheme + ".state"
+                    transfer = create(scheme)
+                    assert not transfer.loadState(filename)
+                    transfer.initialize()
+                    assert transfer.saveState(filename)
+
+                    # A matching restart gives the same transfers
+                    restart = create(scheme)
+                    assert restart.loadState(filename)
+                    np.testing.assert_array_equal(apply(restart), apply(transfer))
+
+                    # Different node locations or options do not match
+                    moved = struct_X.copy()
+                    moved[0] += 1e-3
+                    assert not create(scheme, X=moved).loadState(filename)
+                    if scheme != "rbf":
+                        assert not create(scheme, b=2.0 * beta).loadState(filename)
+            finally:
+                os.chdir(cwd)
+
+        return
+
     def test_rbf(self):
         comm = MPI.COMM_WORLD
 
@@ -157,6 +764,142 @@ class TransferSchemeTest(unittest.TestCase):
 
         return
 
+    def test_rbf_sampling(self):
+        comm = MPI.COMM_WORLD
+
+        # Set typical parameter values
+        rbf_type = TransferScheme.PY_THIN_PLATE_SPLINE
+        sampling_ratio = 4
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 200
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        dh = 1e-6
+        rtol = 1e-5
+        atol = 1e-30
+        if TransferScheme.dtype == complex:
+            dh = 1e-30
+            rtol = 1e-9
+            atol = 1e-30
+
+        # The sampled point clouds are written to the working directory
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            try:
+                # The same seed must give the same sampled nodes
+                fS = []
+                for seed in [7, 7]:
+                    transfer = TransferScheme.pyRBF(
+                        comm, comm, 0, comm, 0, rbf_type, sampling_ratio
+                    )
+                    transfer.setSamplingSeed(seed)
+                    transfer.setAeroNodes(aero_X)
+                    transfer.setStructNodes(struct_X)
+                    transfer.initialize()
+
+                    fS.append(np.zeros(3 * struct_nnodes, dtype=TransferScheme.dtype))
+                    transfer.transferLoads(fA, fS[-1])
+
+                fail = transfer.testAllDerivatives(uS, fA, dh, rtol, atol)
+            finally:
+                os.chdir(cwd)
+
+        assert fail == 0
+
+        # Only the sampled structural nodes receive loads
+        nsampled = np.count_nonzero(fS[0].reshape(-1, 3).any(axis=1))
+        assert 0 < nsampled < struct_nnodes
+        assert np.array_equal(fS[0], fS[1])
+
+        return
+
+    def test_rbf_wendland(self):
+        comm = MPI.COMM_WORLD
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        # Set random forces
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        fA = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        # Affine displacement field that must be reproduced exactly
+        A = np.random.random((3, 3))
+        c = np.random.random(3)
+        uS_affine = (struct_X.reshape(-1, 3) @ A.T + c).flatten()
+        uA_affine = (aero_X.reshape(-1, 3) @ A.T + c).flatten()
+
+        dh = 1e-6
+        rtol = 1e-5
+        atol = 1e-30
+        if TransferScheme.dtype == complex:
+            dh = 1e-30
+            rtol = 1e-9
+            atol = 1e-30
+
+        for rbf_type in [
+            TransferScheme.PY_WENDLAND_C0,
+            TransferScheme.PY_WENDLAND_C2,
+            TransferScheme.PY_WENDLAND_C4,
+        ]:
+            transfer = TransferScheme.pyRBF(comm, comm, 0, comm, 0, rbf_type, 1)
+            transfer.setSupportRadius(0.6)
+            transfer.setAeroNodes(aero_X)
+            transfer.setStructNodes(struct_X)
+            transfer.initialize()
+
+            uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+            transfer.transferDisps(uS_affine.astype(TransferScheme.dtype), uA)
+            np.testing.assert_allclose(uA, uA_affine, rtol=1e-8, atol=1e-10)
+
+            assert transfer.getSolverConverged()
+
+            fail = transfer.testAllDerivatives(uS, fA, dh, rtol, atol)
+
+            assert fail == 0
+
+        return
+
+    def test_rbf_solver_options(self):
+        comm = MPI.COMM_WORLD
+
+        aero_nnodes = 33
+        aero_X = np.random.random(3 * aero_nnodes).astype(TransferScheme.dtype)
+
+        struct_nnodes = 51
+        struct_X = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+        uS = np.random.random(3 * struct_nnodes).astype(TransferScheme.dtype)
+
+        rbf_type = TransferScheme.PY_WENDLAND_C2
+        transfer = TransferScheme.pyRBF(comm, comm, 0, comm, 0, rbf_type, 1)
+        transfer.setSupportRadius(0.6)
+        transfer.setSolverOptions(1e-12, 1)
+        transfer.setAeroNodes(aero_X)
+        transfer.setStructNodes(struct_X)
+        transfer.initialize()
+
+        # A single iteration is not enough for the solves to converge
+        uA = np.zeros(3 * aero_nnodes, dtype=TransferScheme.dtype)
+        transfer.transferDisps(uS, uA)
+        assert not transfer.getSolverConverged()
+
+        # The flag is reset once the solves converge
+        transfer.setSolverOptions(1e-10, 10000)
+        transfer.transferDisps(uS, uA)
+        assert transfer.getSolverConverged()
+
+        return
+
     def test_beam_transfer(self):
 
         comm = MPI.COMM_WORLD